@@ -0,0 +1,56 @@
+"""add ancestor_ids to hierarchy_node
+
+Revision ID: 3f9c2a7d41b8
+Revises: 28bb08137807
+Create Date: 2026-10-17 10:12:41.118203
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3f9c2a7d41b8"
+down_revision = "28bb08137807"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "hierarchy_node",
+        sa.Column("ancestor_ids", postgresql.ARRAY(sa.Integer()), nullable=True),
+    )
+
+    # Walk down from the roots. Nodes on a parent cycle are unreachable from
+    # any root and keep a NULL path, which readers resolve by walking parent_id.
+    op.execute(
+        """
+        WITH RECURSIVE paths(id, ancestor_ids) AS (
+            SELECT id, ARRAY[]::integer[]
+            FROM hierarchy_node
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT child.id, paths.id || paths.ancestor_ids
+            FROM hierarchy_node child
+            JOIN paths ON child.parent_id = paths.id
+        )
+        UPDATE hierarchy_node
+        SET ancestor_ids = paths.ancestor_ids
+        FROM paths
+        WHERE hierarchy_node.id = paths.id
+        """
+    )
+
+    op.create_index(
+        "ix_hierarchy_node_ancestor_ids",
+        "hierarchy_node",
+        ["ancestor_ids"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_hierarchy_node_ancestor_ids", table_name="hierarchy_node")
+    op.drop_column("hierarchy_node", "ancestor_ids")
@@ -1,5 +1,6 @@
 import time
 import traceback
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from time import sleep
 from typing import Any, cast
@@ -20,7 +21,10 @@ from tenacity import (
 )
 
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
-from ee.onyx.db.document import upsert_document_external_perms
+from ee.onyx.db.document import (
+    upsert_document_external_perms,
+    upsert_document_external_perms_batch,
+)
 from ee.onyx.external_permissions.sync_params import get_source_perm_sync_config
 from onyx.access.models import DocExternalAccess, ElementExternalAccess
 from onyx.background.celery.apps.app_base import task_logger
@@ -65,9 +69,13 @@ from onyx.db.enums import (
     SyncStatus,
     SyncType,
 )
+from onyx.db.hierarchy import HierarchyNodePermissions
 from onyx.db.hierarchy import (
     update_hierarchy_node_permissions as db_update_hierarchy_node_permissions,
 )
+from onyx.db.hierarchy import (
+    update_hierarchy_node_permissions_batch as db_update_hierarchy_node_permissions_batch,
+)
 from onyx.db.models import ConnectorCredentialPair
 from onyx.db.permission_sync_attempt import (
     complete_doc_permission_sync_attempt,
@@ -605,17 +613,14 @@ def connector_permission_sync_generator_task(
 
             tasks_generated = 0
             docs_with_errors = 0
-            for doc_external_access in document_external_accesses:
-                if callback.should_stop():
-                    raise RuntimeError(
-                        f"Permission sync task timed out or stop signal detected: "
-                        f"cc_pair={cc_pair_id} "
-                        f"tasks_generated={tasks_generated}"
-                    )
+            docs_changed = 0
+            pending_permissions: list[ElementExternalAccess] = []
 
+            def _flush_pending_permissions() -> None:
+                nonlocal tasks_generated, docs_with_errors, docs_changed
                 result = redis_connector.permissions.update_db(
                     lock=lock,
-                    new_permissions=[doc_external_access],
+                    new_permissions=pending_permissions,
                     source_string=connector_type,
                     connector_id=cc_pair.connector.id,
                     credential_id=cc_pair.credential.id,
@@ -623,10 +628,31 @@ def connector_permission_sync_generator_task(
                 )
                 tasks_generated += result.num_updated
                 docs_with_errors += result.num_errors
+                docs_changed += result.num_changed
+                pending_permissions.clear()
+
+            for doc_external_access in document_external_accesses:
+                if callback.should_stop():
+                    raise RuntimeError(
+                        f"Permission sync task timed out or stop signal detected: "
+                        f"cc_pair={cc_pair_id} "
+                        f"tasks_generated={tasks_generated}"
+                    )
+
+                pending_permissions.append(doc_external_access)
+                if (
+                    len(pending_permissions)
+                    >= redis_connector.permissions.DB_UPDATE_BATCH_SIZE
+                ):
+                    _flush_pending_permissions()
+
+            if pending_permissions:
+                _flush_pending_permissions()
 
             task_logger.info(
                 f"RedisConnector.permissions.generate_tasks finished. "
-                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated} docs_with_errors={docs_with_errors}"
+                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated} "
+                f"docs_changed={docs_changed} docs_with_errors={docs_with_errors}"
             )
 
             inc_doc_perm_sync_docs_processed(connector_type, tasks_generated)
@@ -767,6 +793,91 @@ def element_update_permissions(
     return True
 
 
+@retry(
+    retry=retry_if_exception(is_retryable_sqlalchemy_error),
+    wait=wait_random_exponential(
+        multiplier=1, max=DOCUMENT_PERMISSIONS_UPDATE_MAX_WAIT
+    ),
+    stop=stop_after_delay(DOCUMENT_PERMISSIONS_UPDATE_STOP_AFTER),
+)
+def elements_update_permissions(
+    tenant_id: str,
+    permissions: list[ElementExternalAccess],
+    source_type_str: str,
+    connector_id: int,
+    credential_id: int,
+) -> tuple[int, int]:
+    """Batched element_update_permissions: one session, one user upsert and one
+    write per element type for the whole batch. Elements whose permissions are
+    already up to date are not written, so their documents aren't re-synced.
+
+    Returns (number of elements changed, number already up to date)."""
+    doc_accesses = [p for p in permissions if isinstance(p, DocExternalAccess)]
+    node_permissions_by_source: dict[
+        DocumentSource, dict[str, HierarchyNodePermissions]
+    ] = defaultdict(dict)
+    for node_access in permissions:
+        if isinstance(node_access, DocExternalAccess):
+            continue
+        external_access = node_access.external_access
+        node_permissions_by_source[DocumentSource(node_access.source)][
+            node_access.raw_node_id
+        ] = HierarchyNodePermissions(
+            is_public=external_access.is_public,
+            external_user_emails=(
+                list(external_access.external_user_emails)
+                if external_access.external_user_emails
+                else None
+            ),
+            external_user_group_ids=(
+                list(external_access.external_user_group_ids)
+                if external_access.external_user_group_ids
+                else None
+            ),
+        )
+
+    with get_session_with_tenant(tenant_id=tenant_id) as db_session:
+        # Add the users to the DB if they don't exist
+        batch_add_ext_perm_user_if_not_exists(
+            db_session=db_session,
+            emails=list(
+                {
+                    email
+                    for element_access in permissions
+                    for email in element_access.external_access.external_user_emails
+                }
+            ),
+            continue_on_error=True,
+        )
+
+        doc_result = upsert_document_external_perms_batch(
+            db_session=db_session,
+            doc_external_accesses=doc_accesses,
+            source_type=DocumentSource(source_type_str),
+        )
+        if doc_result.created_doc_ids:
+            # Documents created to hold their permissions belong to the cc_pair
+            upsert_document_by_connector_credential_pair(
+                db_session=db_session,
+                connector_id=connector_id,
+                credential_id=credential_id,
+                document_ids=doc_result.created_doc_ids,
+            )
+
+        num_changed = len(doc_result.created_doc_ids) + len(doc_result.changed_doc_ids)
+        num_unchanged = doc_result.num_unchanged
+        for source, node_permissions in node_permissions_by_source.items():
+            nodes_changed, nodes_unchanged = db_update_hierarchy_node_permissions_batch(
+                db_session=db_session,
+                source=source,
+                node_permissions=node_permissions,
+            )
+            num_changed += nodes_changed
+            num_unchanged += nodes_unchanged
+
+    return num_changed, num_unchanged
+
+
 def validate_permission_sync_fences(
     tenant_id: str,
     r: TenantRedisClient,
@@ -1,8 +1,10 @@
 import csv
 import io
+from collections.abc import Iterator
 from datetime import datetime
 
 from celery import Task, shared_task
+from sqlalchemy.orm import Session
 
 from ee.onyx.server.query_history.api import (
     ONYX_ANONYMIZED_EMAIL,
@@ -51,12 +53,7 @@ def export_query_history_task(
         raise RuntimeError("No task id defined for this task; cannot identify it")
 
     task_id = self.request.id
-    stream = io.StringIO()
-    writer = csv.DictWriter(
-        stream,
-        fieldnames=list(QuestionAnswerPairSnapshot.model_fields.keys()),
-    )
-    writer.writeheader()
+    report_name = construct_query_history_report_name(task_id)
 
     with get_session_with_current_tenant() as db_session:
         try:
@@ -65,41 +62,13 @@ def export_query_history_task(
                 task_id=task_id,
             )
 
-            snapshot_generator = fetch_and_process_chat_session_history(
-                db_session=db_session,
-                start=start,
-                end=end,
-            )
-
-            query_history_type = load_settings().query_history_type
-            for snapshot in snapshot_generator:
-                if query_history_type == QueryHistoryType.ANONYMIZED:
-                    snapshot.user_email = ONYX_ANONYMIZED_EMAIL
-
-                writer.writerows(
-                    # Sanitize to prevent CSV/formula injection against
-                    # whoever opens the export in a spreadsheet (ON-008).
-                    sanitize_csv_row(qa_pair.to_json())
-                    for qa_pair in QuestionAnswerPairSnapshot.from_chat_session_snapshot(
-                        snapshot
-                    )
-                )
-
-        except Exception:
-            logger.exception("Failed to export query history with task_id=%r", task_id)
-            mark_task_as_finished_with_id(
-                db_session=db_session,
-                task_id=task_id,
-                success=False,
-            )
-            raise
-
-    report_name = construct_query_history_report_name(task_id)
-    with get_session_with_current_tenant() as db_session:
-        try:
-            stream.seek(0)
-            get_default_file_store().save_file(
-                content=stream,
+            get_default_file_store().save_file_from_chunks(
+                chunks=_yield_query_history_csv_chunks(
+                    db_session=db_session,
+                    start=start,
+                    end=end,
+                    query_history_type=load_settings().query_history_type,
+                ),
                 display_name=report_name,
                 file_origin=FileOrigin.QUERY_HISTORY_CSV,
                 file_type=FileType.CSV,
@@ -117,11 +86,56 @@ def export_query_history_task(
             )
         except Exception:
             logger.exception(
-                "Failed to save query history export file; report_name=%r", report_name
+                "Failed to export query history with task_id=%r; report_name=%r",
+                task_id,
+                report_name,
             )
+            db_session.rollback()
             mark_task_as_finished_with_id(
                 db_session=db_session,
                 task_id=task_id,
                 success=False,
             )
             raise
+
+
+def _yield_query_history_csv_chunks(
+    db_session: Session,
+    start: datetime,
+    end: datetime,
+    query_history_type: QueryHistoryType | None,
+) -> Iterator[bytes]:
+    """Encoded CSV, one chunk per chat session, so the export is never held in
+    memory as a whole."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer,
+        fieldnames=list(QuestionAnswerPairSnapshot.model_fields.keys()),
+    )
+
+    def _drain() -> bytes:
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writeheader()
+    yield _drain()
+
+    for snapshot in fetch_and_process_chat_session_history(
+        db_session=db_session,
+        start=start,
+        end=end,
+    ):
+        if query_history_type == QueryHistoryType.ANONYMIZED:
+            snapshot.user_email = ONYX_ANONYMIZED_EMAIL
+
+        writer.writerows(
+            # Sanitize to prevent CSV/formula injection against
+            # whoever opens the export in a spreadsheet (ON-008).
+            sanitize_csv_row(qa_pair.to_json())
+            for qa_pair in QuestionAnswerPairSnapshot.from_chat_session_snapshot(
+                snapshot
+            )
+        )
+        yield _drain()
@@ -1,12 +1,24 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from onyx.access.models import ExternalAccess
+from onyx.access.models import DocExternalAccess, ExternalAccess
 from onyx.access.utils import build_ext_group_name_for_onyx
-from onyx.configs.constants import DocumentSource
+from onyx.configs.constants import DEFAULT_BOOST, DocumentSource
 from onyx.db.models import Document as DbDocument
+from onyx.db.utils import model_to_dict
+from onyx.kg.models import KGStage
+
+
+class ExternalPermsBatchResult(BaseModel):
+    # Documents that did not exist yet and were created to hold the permissions
+    created_doc_ids: list[str]
+    # Existing documents whose permissions changed; marked for index sync
+    changed_doc_ids: list[str]
+    num_unchanged: int
 
 
 def upsert_document_external_perms__no_commit(
@@ -100,3 +112,110 @@ def upsert_document_external_perms(
         db_session.commit()
 
     return False
+
+
+def upsert_document_external_perms_batch(
+    db_session: Session,
+    doc_external_accesses: list[DocExternalAccess],
+    source_type: DocumentSource,
+) -> ExternalPermsBatchResult:
+    """Batched upsert_document_external_perms.
+
+    The stored permissions of the whole batch are read in one query and only
+    documents whose permissions differ are written, in one statement. Bumping
+    last_modified is what marks a document for index sync, so unchanged
+    documents are left alone entirely.
+    """
+    # A repeated doc id keeps its last permissions, as sequential upserts would
+    accesses_by_doc_id = {access.doc_id: access for access in doc_external_accesses}
+    if not accesses_by_doc_id:
+        return ExternalPermsBatchResult(
+            created_doc_ids=[], changed_doc_ids=[], num_unchanged=0
+        )
+
+    stored_perms = {
+        row.id: row
+        for row in db_session.execute(
+            select(
+                DbDocument.id,
+                DbDocument.external_user_emails,
+                DbDocument.external_user_group_ids,
+                DbDocument.is_public,
+            ).where(DbDocument.id.in_(list(accesses_by_doc_id)))
+        )
+    }
+
+    now = datetime.now(timezone.utc)
+    new_documents: list[dict] = []
+    changed_rows: list[dict] = []
+    num_unchanged = 0
+    for doc_id, doc_access in accesses_by_doc_id.items():
+        external_access = doc_access.external_access
+        prefixed_external_groups = {
+            build_ext_group_name_for_onyx(ext_group_name=group_id, source=source_type)
+            for group_id in external_access.external_user_group_ids
+        }
+        stored = stored_perms.get(doc_id)
+        if stored is None:
+            # Stored ahead of indexing, see upsert_document_external_perms
+            new_documents.append(
+                model_to_dict(
+                    DbDocument(
+                        id=doc_id,
+                        semantic_id="",
+                        from_ingestion_api=False,
+                        boost=DEFAULT_BOOST,
+                        hidden=False,
+                        secondary_only_sync_pending=False,
+                        last_modified=now,
+                        kg_stage=KGStage.NOT_STARTED,
+                        external_user_emails=sorted(
+                            external_access.external_user_emails
+                        ),
+                        external_user_group_ids=sorted(prefixed_external_groups),
+                        is_public=external_access.is_public,
+                    )
+                )
+            )
+            continue
+
+        if (
+            external_access.external_user_emails
+            == set(stored.external_user_emails or [])
+            and prefixed_external_groups == set(stored.external_user_group_ids or [])
+            and external_access.is_public == stored.is_public
+        ):
+            num_unchanged += 1
+            continue
+
+        changed_rows.append(
+            {
+                "id": doc_id,
+                "external_user_emails": sorted(external_access.external_user_emails),
+                "external_user_group_ids": sorted(prefixed_external_groups),
+                "is_public": external_access.is_public,
+                "last_modified": now,
+            }
+        )
+
+    created_doc_ids: list[str] = []
+    if new_documents:
+        # Indexing may have created some of them since the read above; those
+        # are skipped rather than failing the batch and caught by the next sync
+        created_doc_ids = list(
+            db_session.scalars(
+                insert(DbDocument)
+                .values(new_documents)
+                .on_conflict_do_nothing(index_elements=["id"])
+                .returning(DbDocument.id)
+            )
+        )
+    if changed_rows:
+        db_session.execute(update(DbDocument), changed_rows)
+    db_session.commit()
+
+    return ExternalPermsBatchResult(
+        created_doc_ids=created_doc_ids,
+        changed_doc_ids=[row["id"] for row in changed_rows],
+        num_unchanged=num_unchanged,
+    )
@@ -6,6 +6,7 @@ from sqlalchemy import delete, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from onyx.access.acl_cache import invalidate_user_acl_cache_on_commit
 from onyx.access.utils import build_ext_group_name_for_onyx
 from onyx.configs.constants import DocumentSource
 from onyx.db.models import PublicExternalUserGroup, User, User__ExternalUserGroupId
@@ -30,6 +31,7 @@ def delete_user__ext_group_for_user__no_commit(
     db_session: Session,
     user_id: UUID,
 ) -> None:
+    invalidate_user_acl_cache_on_commit(db_session)
     db_session.execute(
         delete(User__ExternalUserGroupId).where(
             User__ExternalUserGroupId.user_id == user_id
@@ -41,6 +43,7 @@ def delete_user__ext_group_for_cc_pair__no_commit(
     db_session: Session,
     cc_pair_id: int,
 ) -> None:
+    invalidate_user_acl_cache_on_commit(db_session)
     db_session.execute(
         delete(User__ExternalUserGroupId).where(
             User__ExternalUserGroupId.cc_pair_id == cc_pair_id
@@ -52,6 +55,7 @@ def delete_public_external_group_for_cc_pair__no_commit(
     db_session: Session,
     cc_pair_id: int,
 ) -> None:
+    invalidate_user_acl_cache_on_commit(db_session)
     db_session.execute(
         delete(PublicExternalUserGroup).where(
             PublicExternalUserGroup.cc_pair_id == cc_pair_id
@@ -100,6 +104,8 @@ def upsert_external_groups(
     if not external_groups:
         return
 
+    invalidate_user_acl_cache_on_commit(db_session)
+
     # Collect all emails from all groups to batch-add users at once
     all_group_member_emails: set[str] = set()
     for external_group in external_groups:
@@ -196,6 +202,7 @@ def remove_stale_external_groups(
     db_session: Session,
     cc_pair_id: int,
 ) -> None:
+    invalidate_user_acl_cache_on_commit(db_session)
     db_session.execute(
         delete(User__ExternalUserGroupId).where(
             User__ExternalUserGroupId.cc_pair_id == cc_pair_id,
@@ -1,16 +1,25 @@
-from collections.abc import Sequence
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import BinaryExpression, ColumnElement, asc, desc, distinct
+from sqlalchemy import BinaryExpression, ColumnElement, asc, desc, distinct, tuple_
 from sqlalchemy.orm import Session, contains_eager, joinedload
 from sqlalchemy.sql import case, func, select
 from sqlalchemy.sql.expression import UnaryExpression, literal
 
 from ee.onyx.background.task_name_builders import QUERY_HISTORY_TASK_NAME_PREFIX
+from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
 from onyx.configs.constants import QAFeedbackType
 from onyx.db.chat import content_persisting_sessions_filter
-from onyx.db.models import ChatMessage, ChatMessageFeedback, ChatSession, TaskQueueState
+from onyx.db.models import (
+    ChatMessage,
+    ChatMessage__SearchDoc,
+    ChatMessageFeedback,
+    ChatSession,
+    SearchDoc,
+    TaskQueueState,
+)
 from onyx.db.tasks import get_all_tasks_with_prefix
 
 
@@ -120,6 +129,94 @@ def get_page_of_chat_sessions(
     return db_session.scalars(stmt).unique().all()
 
 
+def get_chat_sessions_before(
+    start_time: datetime | None,
+    end_time: datetime | None,
+    db_session: Session,
+    page_size: int,
+    before: tuple[datetime, UUID] | None = None,
+) -> Sequence[ChatSession]:
+    """Keyset-paginated variant of `get_page_of_chat_sessions` for exports.
+
+    Sessions come newest first, ordered by (time_created, id). `before` is the
+    key of the last session of the previous page, so every page is an index
+    range scan instead of an ever-growing OFFSET. Messages are not loaded; see
+    `yield_chat_messages_for_sessions` and friends.
+    """
+    conditions = _build_filter_conditions(start_time, end_time, None)
+    if before is not None:
+        conditions.append(
+            tuple_(ChatSession.time_created, ChatSession.id)
+            < tuple_(literal(before[0]), literal(before[1]))
+        )
+
+    stmt = (
+        select(ChatSession)
+        .filter(*conditions)
+        .options(
+            joinedload(ChatSession.user),
+            joinedload(ChatSession.persona),
+        )
+        .order_by(desc(ChatSession.time_created), desc(ChatSession.id))
+        .limit(page_size)
+    )
+    return db_session.scalars(stmt).unique().all()
+
+
+def yield_chat_messages_for_sessions(
+    chat_session_ids: list[UUID],
+    db_session: Session,
+    yield_per: int = DB_YIELD_PER_DEFAULT,
+) -> Iterator[ChatMessage]:
+    """Streams every message of the given sessions through a server-side cursor.
+
+    Relationships are left unloaded; pair with `get_latest_feedback_by_message`
+    and `get_search_docs_by_message` to stay at a fixed number of queries.
+    """
+    stmt = (
+        select(ChatMessage)
+        .where(ChatMessage.chat_session_id.in_(chat_session_ids))
+        .order_by(ChatMessage.chat_session_id, asc(ChatMessage.id))
+        .execution_options(stream_results=True)
+    )
+    yield from db_session.scalars(stmt).yield_per(yield_per)
+
+
+def get_latest_feedback_by_message(
+    chat_session_ids: list[UUID],
+    db_session: Session,
+) -> dict[int, ChatMessageFeedback]:
+    stmt = (
+        select(ChatMessageFeedback)
+        .join(ChatMessage, ChatMessageFeedback.chat_message_id == ChatMessage.id)
+        .where(ChatMessage.chat_session_id.in_(chat_session_ids))
+        .order_by(asc(ChatMessageFeedback.id))
+    )
+    # Later feedback overwrites earlier feedback on the same message
+    return {
+        feedback.chat_message_id: feedback
+        for feedback in db_session.scalars(stmt)
+        if feedback.chat_message_id is not None
+    }
+
+
+def get_search_docs_by_message(
+    chat_session_ids: list[UUID],
+    db_session: Session,
+) -> dict[int, list[SearchDoc]]:
+    stmt = (
+        select(ChatMessage__SearchDoc.chat_message_id, SearchDoc)
+        .join(SearchDoc, ChatMessage__SearchDoc.search_doc_id == SearchDoc.id)
+        .join(ChatMessage, ChatMessage__SearchDoc.chat_message_id == ChatMessage.id)
+        .where(ChatMessage.chat_session_id.in_(chat_session_ids))
+        .order_by(asc(SearchDoc.id))
+    )
+    search_docs_by_message: dict[int, list[SearchDoc]] = defaultdict(list)
+    for chat_message_id, search_doc in db_session.execute(stmt):
+        search_docs_by_message[chat_message_id].append(search_doc)
+    return search_docs_by_message
+
+
 def fetch_persisting_chat_session_by_id(
     chat_session_id: UUID,
     db_session: Session,
@@ -31,6 +31,7 @@ from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from ee.onyx.server.scim.filtering import ScimFilter, ScimFilterOperator
 from ee.onyx.server.scim.models import ScimMappingFields
+from onyx.access.acl_cache import invalidate_user_acl_cache_on_commit
 from onyx.db.dal import DAL
 from onyx.db.enums import AccountType, GrantSource, Permission
 from onyx.db.models import (
@@ -583,6 +584,8 @@ class ScimDAL(DAL):
         """Update group attributes and set the modification timestamp."""
         if name is not None:
             group.name = name
+            # User ACLs name groups by name
+            invalidate_user_acl_cache_on_commit(self._session)
         group.time_last_modified_by_user = func.now()
 
     def delete_group(self, group: UserGroup) -> None:
@@ -11,6 +11,7 @@ from ee.onyx.server.user_group.models import (
     UserGroupCreate,
     UserGroupUpdate,
 )
+from onyx.access.acl_cache import invalidate_user_acl_cache_on_commit
 from onyx.auth.permissions import (
     NON_TOGGLEABLE_PERMISSIONS,
     get_effective_permissions,
@@ -947,6 +948,8 @@ def rename_user_group(
 
     db_user_group.name = new_name
     db_user_group.time_last_modified_by_user = func.now()
+    # User ACLs name groups by name
+    invalidate_user_acl_cache_on_commit(db_session)
 
     # CC pair documents in Vespa contain the group name, so we need to
     # trigger a sync to update them with the new name.
@@ -1,4 +1,5 @@
 import uuid
+from collections import defaultdict
 from collections.abc import Generator
 from datetime import datetime, timezone
 from http import HTTPStatus
@@ -12,8 +13,12 @@ from ee.onyx.background.task_name_builders import query_history_task_name
 from ee.onyx.db.query_history import (
     fetch_persisting_chat_session_by_id,
     get_all_query_history_export_tasks,
+    get_chat_sessions_before,
+    get_latest_feedback_by_message,
     get_page_of_chat_sessions,
+    get_search_docs_by_message,
     get_total_filtered_chat_sessions_count,
+    yield_chat_messages_for_sessions,
 )
 from ee.onyx.server.query_history.models import (
     ChatSessionMinimal,
@@ -42,7 +47,7 @@ from onyx.db.chat import get_chat_sessions_by_user
 from onyx.db.engine.sql_engine import get_session
 from onyx.db.enums import Permission, TaskStatus
 from onyx.db.file_record import get_query_history_export_files
-from onyx.db.models import ChatSession, User
+from onyx.db.models import ChatMessage, ChatSession, User
 from onyx.db.tasks import get_task_with_id, register_task
 from onyx.error_handling.error_codes import OnyxErrorCode
 from onyx.error_handling.exceptions import OnyxError
@@ -50,7 +55,6 @@ from onyx.file_store.file_store import get_default_file_store
 from onyx.server.documents.models import PaginatedReturn
 from onyx.server.query_and_chat.models import ChatSessionDetails, ChatSessionsResponse
 from onyx.server.settings.store import load_settings
-from onyx.utils.threadpool_concurrency import parallel_yield
 from shared_configs.contextvars import get_current_tenant_id
 
 router = APIRouter()
@@ -70,11 +74,7 @@ def ensure_query_history_is_enabled(
     return query_history_type
 
 
-def yield_snapshot_from_chat_session(
-    chat_session: ChatSession,
-    db_session: Session,
-) -> Generator[ChatSessionSnapshot | None]:
-    yield snapshot_from_chat_session(chat_session=chat_session, db_session=db_session)
+_EXPORT_PAGE_SIZE = 100
 
 
 def fetch_and_process_chat_session_history(
@@ -83,42 +83,101 @@ def fetch_and_process_chat_session_history(
     end: datetime,
     limit: int | None = 500,  # noqa: ARG001
 ) -> Generator[ChatSessionSnapshot]:
-    PAGE_SIZE = 100
+    """Yields a snapshot per session, newest first.
 
-    page = 0
+    Sessions are paged by (time_created, id) keyset, and each page costs a fixed
+    number of queries regardless of how many sessions or messages it holds, so
+    neither the per-page cost nor the memory held grows with the export size.
+    """
+    before: tuple[datetime, UUID] | None = None
     while True:
-        paged_chat_sessions = get_page_of_chat_sessions(
+        chat_sessions = get_chat_sessions_before(
             start_time=start,
             end_time=end,
             db_session=db_session,
-            page_num=page,
-            page_size=PAGE_SIZE,
+            page_size=_EXPORT_PAGE_SIZE,
+            before=before,
         )
-
-        if not paged_chat_sessions:
+        if not chat_sessions:
             break
 
-        paged_snapshots = parallel_yield(
-            [
-                yield_snapshot_from_chat_session(
-                    db_session=db_session,
-                    chat_session=chat_session,
-                )
-                for chat_session in paged_chat_sessions
-            ]
+        chat_session_ids = [chat_session.id for chat_session in chat_sessions]
+        messages_by_session: dict[UUID, dict[int, ChatMessage]] = defaultdict(dict)
+        for message in yield_chat_messages_for_sessions(
+            chat_session_ids=chat_session_ids, db_session=db_session
+        ):
+            messages_by_session[message.chat_session_id][message.id] = message
+        latest_feedback_by_message = get_latest_feedback_by_message(
+            chat_session_ids=chat_session_ids, db_session=db_session
+        )
+        search_docs_by_message = get_search_docs_by_message(
+            chat_session_ids=chat_session_ids, db_session=db_session
         )
 
-        for snapshot in paged_snapshots:
-            if snapshot:
-                yield snapshot
+        for chat_session in chat_sessions:
+            messages = _build_mainline_messages(messages_by_session[chat_session.id])
+            # Older chats may not have the right structure
+            if messages is None:
+                continue
+
+            yield _snapshot_from_chat_session(
+                chat_session=chat_session,
+                message_snapshots=[
+                    MessageSnapshot.from_message_details(
+                        message=message,
+                        latest_feedback=latest_feedback_by_message.get(message.id),
+                        search_docs=search_docs_by_message.get(message.id, []),
+                    )
+                    for message in messages
+                    if message.message_type != MessageType.SYSTEM
+                ],
+            )
 
-        # If we've fetched *less* than a `PAGE_SIZE` worth
-        # of data, we have reached the end of the
-        # pagination sequence; break.
-        if len(paged_chat_sessions) < PAGE_SIZE:
+        if len(chat_sessions) < _EXPORT_PAGE_SIZE:
             break
 
-        page += 1
+        before = (chat_sessions[-1].time_created, chat_sessions[-1].id)
+
+
+def _build_mainline_messages(
+    messages_by_id: dict[int, ChatMessage],
+) -> list[ChatMessage] | None:
+    """`create_chat_history_chain` over messages that are already loaded.
+
+    Returns None where that function would raise, since the export skips
+    sessions without a valid chain instead of failing.
+    """
+    root_message = next(
+        (
+            message
+            for message in messages_by_id.values()
+            if message.parent_message_id is None
+        ),
+        None,
+    )
+    if root_message is None:
+        return None if messages_by_id else []
+
+    mainline_messages: list[ChatMessage] = []
+    previous_message: ChatMessage | None = None
+    current_message = root_message
+    while current_message.latest_child_message_id is not None:
+        child_message = messages_by_id.get(current_message.latest_child_message_id)
+        if child_message is None or len(mainline_messages) >= len(messages_by_id):
+            # Dangling or cyclic child pointer
+            return None
+        current_message = child_message
+
+        if (
+            current_message.message_type == MessageType.ASSISTANT
+            and previous_message is not None
+            and previous_message.message_type == MessageType.ASSISTANT
+        ):
+            return None
+        mainline_messages.append(current_message)
+        previous_message = current_message
+
+    return mainline_messages
 
 
 def snapshot_from_chat_session(
@@ -135,6 +194,20 @@ def snapshot_from_chat_session(
     except RuntimeError:
         return None
 
+    return _snapshot_from_chat_session(
+        chat_session=chat_session,
+        message_snapshots=[
+            MessageSnapshot.build(message)
+            for message in messages
+            if message.message_type != MessageType.SYSTEM
+        ],
+    )
+
+
+def _snapshot_from_chat_session(
+    chat_session: ChatSession,
+    message_snapshots: list[MessageSnapshot],
+) -> ChatSessionSnapshot:
     flow_type = SessionType.SLACK if chat_session.onyxbot_flow else SessionType.CHAT
 
     return ChatSessionSnapshot(
@@ -143,11 +216,7 @@ def snapshot_from_chat_session(
             chat_session.user.email if chat_session.user else None
         ),
         name=chat_session.description,
-        messages=[
-            MessageSnapshot.build(message)
-            for message in messages
-            if message.message_type != MessageType.SYSTEM
-        ],
+        messages=message_snapshots,
         assistant_id=chat_session.persona_id,
         assistant_name=chat_session.persona.name if chat_session.persona else None,
         time_created=chat_session.time_created,
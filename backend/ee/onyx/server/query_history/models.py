@@ -8,7 +8,14 @@ from onyx.auth.users import get_display_email
 from onyx.background.task_utils import extract_task_id_from_query_history_report_name
 from onyx.configs.constants import MessageType, QAFeedbackType, SessionType
 from onyx.db.enums import TaskStatus
-from onyx.db.models import ChatMessage, ChatSession, FileRecord, TaskQueueState
+from onyx.db.models import (
+    ChatMessage,
+    ChatMessageFeedback,
+    ChatSession,
+    FileRecord,
+    SearchDoc,
+    TaskQueueState,
+)
 
 
 class AbridgedSearchDoc(BaseModel):
@@ -30,25 +37,35 @@ class MessageSnapshot(BaseModel):
 
     @classmethod
     def build(cls, message: ChatMessage) -> "MessageSnapshot":
-        latest_messages_feedback_obj = (
-            message.chat_message_feedbacks[-1]
-            if len(message.chat_message_feedbacks) > 0
-            else None
+        return cls.from_message_details(
+            message=message,
+            latest_feedback=(
+                message.chat_message_feedbacks[-1]
+                if len(message.chat_message_feedbacks) > 0
+                else None
+            ),
+            search_docs=message.search_docs,
         )
+
+    @classmethod
+    def from_message_details(
+        cls,
+        message: ChatMessage,
+        latest_feedback: ChatMessageFeedback | None,
+        search_docs: list[SearchDoc],
+    ) -> "MessageSnapshot":
+        """Builds the snapshot from details loaded in bulk, so the message's
+        own relationships are never touched."""
         feedback_type = (
             (
                 QAFeedbackType.LIKE
-                if latest_messages_feedback_obj.is_positive
+                if latest_feedback.is_positive
                 else QAFeedbackType.DISLIKE
             )
-            if latest_messages_feedback_obj
-            else None
-        )
-        feedback_text = (
-            latest_messages_feedback_obj.feedback_text
-            if latest_messages_feedback_obj
+            if latest_feedback
             else None
         )
+        feedback_text = latest_feedback.feedback_text if latest_feedback else None
         return cls(
             id=message.id,
             message=message.message,
@@ -59,7 +76,7 @@ class MessageSnapshot(BaseModel):
                     semantic_identifier=document.semantic_id,
                     link=document.link,
                 )
-                for document in message.search_docs
+                for document in search_docs
             ],
             feedback_type=feedback_type,
             feedback_text=feedback_text,
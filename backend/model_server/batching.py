@@ -0,0 +1,246 @@
+"""Cross-request dynamic batching for the bi-encoder.
+
+Query embedding traffic is many concurrent requests of a few short texts each.
+Encoding them one request at a time runs many tiny forward passes that contend
+for the model. Instead, requests are queued to a single inference thread, which
+waits up to EMBEDDING_BATCH_MAX_WAIT_MS for more requests of the same model and
+a similar text length, then encodes them all in one ``encode`` call and hands
+each caller its slice of the result.
+
+Using one thread per process also means the model is never called
+concurrently, which avoids the tokenizers "Already borrowed" error.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+from prometheus_client import Histogram
+
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import (
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = setup_logger()
+
+# Rough token estimate, only used for bucketing and batch sizing.
+_CHARS_PER_TOKEN = 4
+_MIN_LENGTH_BUCKET = 16
+
+EMBED_QUEUE_WAIT = Histogram(
+    "onyx_model_server_embed_queue_wait_seconds",
+    "Time an embedding request waited for its batch to start encoding",
+    ["model"],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5],
+)
+
+EMBED_BATCH_SIZE = Histogram(
+    "onyx_model_server_embed_batch_size",
+    "Texts encoded together in one forward pass",
+    ["model"],
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024],
+)
+
+EMBED_BATCH_REQUESTS = Histogram(
+    "onyx_model_server_embed_batch_requests",
+    "Requests merged into one forward pass",
+    ["model"],
+    buckets=[1, 2, 4, 8, 16, 32, 64],
+)
+
+
+class _BatchKey(NamedTuple):
+    model_name: str
+    max_context_length: int
+    normalize_embeddings: bool
+    # Power of two at or above the estimated token length of the longest text,
+    # so short queries are not padded to the length of long passages.
+    length_bucket: int
+
+
+class _EmbedJob(NamedTuple):
+    key: _BatchKey
+    texts: list[str]
+    # Estimated padded tokens: length_bucket * len(texts)
+    tokens: int
+    loop: asyncio.AbstractEventLoop
+    future: "asyncio.Future[npt.NDArray[np.floating]]"
+    enqueued_at: float
+
+
+def _length_bucket(texts: list[str], max_context_length: int) -> int:
+    longest = min(
+        max(len(text) for text in texts) // _CHARS_PER_TOKEN + 1, max_context_length
+    )
+    bucket = _MIN_LENGTH_BUCKET
+    while bucket < longest:
+        bucket *= 2
+    return bucket
+
+
+def _resolve(
+    job: _EmbedJob,
+    result: npt.NDArray[np.floating] | None,
+    error: BaseException | None,
+) -> None:
+    def _set() -> None:
+        # The caller may have gone away (e.g. the client disconnected).
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        elif result is not None:
+            job.future.set_result(result)
+
+    try:
+        job.loop.call_soon_threadsafe(_set)
+    except RuntimeError:
+        # Event loop already closed
+        pass
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        load_model: Callable[[str, int], "SentenceTransformer"],
+        max_wait_seconds: float = EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+        max_batch_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    ) -> None:
+        self._load_model = load_model
+        self._max_wait_seconds = max_wait_seconds
+        self._max_batch_tokens = max_batch_tokens
+        self._queue: queue.Queue[_EmbedJob] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+    async def embed(
+        self,
+        texts: list[str],
+        model_name: str,
+        max_context_length: int,
+        normalize_embeddings: bool,
+    ) -> npt.NDArray[np.floating]:
+        """Returns one row per text. Rows are views into the batch's output, so
+        callers that keep them should not mutate them."""
+        loop = asyncio.get_running_loop()
+        key = _BatchKey(
+            model_name,
+            max_context_length,
+            normalize_embeddings,
+            _length_bucket(texts, max_context_length),
+        )
+        job = _EmbedJob(
+            key=key,
+            texts=texts,
+            tokens=key.length_bucket * len(texts),
+            loop=loop,
+            future=loop.create_future(),
+            enqueued_at=time.monotonic(),
+        )
+        self._ensure_started()
+        self._queue.put(job)
+        return await job.future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-inference", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        pending: list[_EmbedJob] = []
+        while True:
+            try:
+                pending = self._gather(pending)
+                batch, pending = self._take_batch(pending)
+                self._encode_batch(batch)
+            except Exception:
+                logger.exception("Embedding inference loop error")
+
+    def _gather(self, pending: list[_EmbedJob]) -> list[_EmbedJob]:
+        """Waits for more jobs until the oldest one has waited max_wait, or its
+        batch is already full."""
+        if not pending:
+            pending = [self._queue.get()]
+
+        first = pending[0]
+        deadline = first.enqueued_at + self._max_wait_seconds
+        key_tokens = sum(job.tokens for job in pending if job.key == first.key)
+        while key_tokens < self._max_batch_tokens:
+            timeout = deadline - time.monotonic()
+            try:
+                job = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            pending.append(job)
+            if job.key == first.key:
+                key_tokens += job.tokens
+        return pending
+
+    def _take_batch(
+        self, pending: list[_EmbedJob]
+    ) -> tuple[list[_EmbedJob], list[_EmbedJob]]:
+        """Takes the oldest job plus every later job with the same key that
+        fits in the token budget. The rest stay queued, in order."""
+        key = pending[0].key
+        batch: list[_EmbedJob] = []
+        rest: list[_EmbedJob] = []
+        tokens = 0
+        for job in pending:
+            if job.key == key and (
+                not batch or tokens + job.tokens <= self._max_batch_tokens
+            ):
+                batch.append(job)
+                tokens += job.tokens
+            else:
+                rest.append(job)
+        return batch, rest
+
+    def _encode_batch(self, batch: list[_EmbedJob]) -> None:
+        key = batch[0].key
+        started = time.monotonic()
+        for job in batch:
+            EMBED_QUEUE_WAIT.labels(model=key.model_name).observe(
+                started - job.enqueued_at
+            )
+        texts = [text for job in batch for text in job.texts]
+        EMBED_BATCH_SIZE.labels(model=key.model_name).observe(len(texts))
+        EMBED_BATCH_REQUESTS.labels(model=key.model_name).observe(len(batch))
+
+        try:
+            model = self._load_model(key.model_name, key.max_context_length)
+            embeddings = np.asarray(
+                model.encode(texts, normalize_embeddings=key.normalize_embeddings)
+            )
+            if embeddings.ndim != 2 or len(embeddings) != len(texts):
+                raise RuntimeError(
+                    f"Model returned {len(embeddings)} embeddings "
+                    f"for {len(texts)} texts"
+                )
+        except Exception as e:
+            for job in batch:
+                _resolve(job, None, e)
+            return
+
+        offset = 0
+        for job in batch:
+            _resolve(job, embeddings[offset : offset + len(job.texts)], None)
+            offset += len(job.texts)
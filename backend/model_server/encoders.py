@@ -1,14 +1,27 @@
-import asyncio
 import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
-from fastapi import APIRouter, HTTPException, Request
+import numpy as np
+import numpy.typing as npt
+from fastapi import APIRouter, HTTPException, Request, Response
 
+from model_server.batching import EmbeddingBatcher
+from model_server.onnx_backend import load_onnx_embedding_model
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
-from shared_configs.configs import DEFAULT_DOCUMENT_ENCODER_MODEL
-from shared_configs.enums import EmbedTextType
-from shared_configs.model_server_models import Embedding, EmbedRequest, EmbedResponse
+from shared_configs.configs import (
+    DEFAULT_DOCUMENT_ENCODER_MODEL,
+    EMBEDDING_MODEL_BACKEND,
+)
+from shared_configs.enums import EmbeddingsEncoding, EmbedTextType
+from shared_configs.model_server_models import (
+    EMBEDDINGS_BINARY_MEDIA_TYPE,
+    Embedding,
+    EmbedRequest,
+    EmbedResponse,
+    encode_embeddings_base64,
+    encode_embeddings_binary,
+)
 
 if TYPE_CHECKING:
     from sentence_transformers import SentenceTransformer
@@ -54,15 +67,33 @@ def get_embedding_model(
 
     global _GLOBAL_MODELS_DICT
 
-    if model_name not in _GLOBAL_MODELS_DICT:
-        logger.notice("Loading %s", model_name)
-        model = SentenceTransformer(
+    local_files_only = model_name == DEFAULT_DOCUMENT_ENCODER_MODEL
+
+    def _load_torch_model() -> "SentenceTransformer":
+        return SentenceTransformer(
             model_name_or_path=model_name,
-            local_files_only=model_name == DEFAULT_DOCUMENT_ENCODER_MODEL,
+            local_files_only=local_files_only,
             trust_remote_code=False,
         )
-        model.max_seq_length = max_context_length
-        _prewarm_rope(model, max_context_length)
+
+    if model_name not in _GLOBAL_MODELS_DICT:
+        logger.notice("Loading %s", model_name)
+        onnx_model = None
+        if EMBEDDING_MODEL_BACKEND == "onnx":
+            onnx_model = load_onnx_embedding_model(
+                model_name,
+                load_torch_model=_load_torch_model,
+                local_files_only=local_files_only,
+            )
+
+        if onnx_model is not None:
+            # RoPE caches only exist in the torch model
+            model = onnx_model
+            model.max_seq_length = max_context_length
+        else:
+            model = _load_torch_model()
+            model.max_seq_length = max_context_length
+            _prewarm_rope(model, max_context_length)
         _GLOBAL_MODELS_DICT[model_name] = model
     else:
         model = _GLOBAL_MODELS_DICT[model_name]
@@ -75,36 +106,42 @@ def get_embedding_model(
     return _GLOBAL_MODELS_DICT[model_name]
 
 
-ENCODING_RETRIES = 3
-ENCODING_RETRY_DELAY = 0.1
+# Looks get_embedding_model up on every call so it can be patched in tests.
+_EMBEDDING_BATCHER = EmbeddingBatcher(
+    load_model=lambda model_name, max_context_length: get_embedding_model(
+        model_name=model_name, max_context_length=max_context_length
+    )
+)
 
 
-def _concurrent_embedding(
-    texts: list[str], model: "SentenceTransformer", normalize_embeddings: bool
-) -> Any:
-    """Synchronous wrapper for concurrent_embedding to use with run_in_executor."""
-    for _ in range(ENCODING_RETRIES):
-        try:
-            return model.encode(texts, normalize_embeddings=normalize_embeddings)
-        except RuntimeError as e:
-            # There is a concurrency bug in the SentenceTransformer library that causes
-            # the model to fail to encode texts. It's pretty rare and we want to allow
-            # concurrent embedding, hence we retry (the specific error is
-            # "RuntimeError: Already borrowed" and occurs in the transformers library)
-            logger.warning("Error encoding texts, retrying: %s", e)
-            time.sleep(ENCODING_RETRY_DELAY)
-    return model.encode(texts, normalize_embeddings=normalize_embeddings)
+async def embed_text(
+    texts: list[str],
+    model_name: str | None,
+    max_context_length: int,
+    normalize_embeddings: bool,
+    prefix: str | None,
+    gpu_type: str = "UNKNOWN",
+) -> list[Embedding]:
+    embeddings = await _embed_text_array(
+        texts=texts,
+        model_name=model_name,
+        max_context_length=max_context_length,
+        normalize_embeddings=normalize_embeddings,
+        prefix=prefix,
+        gpu_type=gpu_type,
+    )
+    return embeddings.tolist()
 
 
 @simple_log_function_time()
-async def embed_text(
+async def _embed_text_array(
     texts: list[str],
     model_name: str | None,
     max_context_length: int,
     normalize_embeddings: bool,
     prefix: str | None,
     gpu_type: str = "UNKNOWN",
-) -> list[Embedding]:
+) -> npt.NDArray[np.floating]:
     if not all(texts):
         logger.error("Empty strings provided for embedding")
         raise ValueError("Empty strings are not allowed for embedding.")
@@ -132,20 +169,13 @@ async def embed_text(
 
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
-        local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
-        )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: _concurrent_embedding(
-                prefixed_texts, local_model, normalize_embeddings
-            ),
+        # Batched with concurrent requests and run on the inference thread
+        embeddings = await _EMBEDDING_BATCHER.embed(
+            texts=prefixed_texts,
+            model_name=model_name,
+            max_context_length=max_context_length,
+            normalize_embeddings=normalize_embeddings,
         )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
 
         elapsed = time.monotonic() - start
         logger.info(
@@ -170,17 +200,32 @@ async def embed_text(
     return embeddings
 
 
-@router.post("/bi-encoder-embed")
+@router.post("/bi-encoder-embed", response_model=EmbedResponse)
 async def route_bi_encoder_embed(
     request: Request,
     embed_request: EmbedRequest,
-) -> EmbedResponse:
+) -> EmbedResponse | Response:
     return await process_embed_request(embed_request, request.app.state.gpu_type)
 
 
+def _build_embed_response(
+    embeddings: npt.NDArray[np.floating], encoding: EmbeddingsEncoding
+) -> EmbedResponse | Response:
+    if encoding == EmbeddingsEncoding.BINARY:
+        return Response(
+            content=encode_embeddings_binary(embeddings),
+            media_type=EMBEDDINGS_BINARY_MEDIA_TYPE,
+        )
+    if encoding == EmbeddingsEncoding.BASE64:
+        return EmbedResponse(
+            embeddings=[], embeddings_base64=encode_embeddings_base64(embeddings)
+        )
+    return EmbedResponse(embeddings=embeddings.tolist())
+
+
 async def process_embed_request(
     embed_request: EmbedRequest, gpu_type: str = "UNKNOWN"
-) -> EmbedResponse:
+) -> EmbedResponse | Response:
     from litellm.exceptions import RateLimitError
 
     # Only local models should use this endpoint - API providers should make direct API calls
@@ -204,7 +249,7 @@ async def process_embed_request(
         else:
             prefix = None
 
-        embeddings = await embed_text(
+        embeddings = await _embed_text_array(
             texts=embed_request.texts,
             model_name=embed_request.model_name,
             max_context_length=embed_request.max_context_length,
@@ -212,7 +257,7 @@ async def process_embed_request(
             prefix=prefix,
             gpu_type=gpu_type,
         )
-        return EmbedResponse(embeddings=embeddings)
+        return _build_embed_response(embeddings, embed_request.response_encoding)
     except RateLimitError as e:
         raise HTTPException(
             status_code=429,
@@ -0,0 +1,223 @@
+"""ONNX Runtime backend for the local bi-encoder.
+
+Selected with EMBEDDING_MODEL_BACKEND=onnx. The configured model is exported to
+ONNX once (sentence-transformers reuses the repo's own graph when it ships one),
+optionally int8 dynamic-quantized for the given CPU instruction set, and saved
+under EMBEDDING_ONNX_EXPORT_DIR so restarts load it directly.
+
+Before an exported graph is used it has to reproduce the torch embeddings of
+PARITY_CORPUS within EMBEDDING_ONNX_MIN_COSINE_SIMILARITY. The score is saved
+next to the graph, so torch is only loaded for the first check. Models that do
+not export cleanly, or lose too much to quantization, stay on torch.
+
+scripts/benchmark_embedding_backends.py compares throughput and parity of the
+backends for a given model.
+"""
+
+import json
+import os
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import (
+    EMBEDDING_ONNX_EXPORT_DIR,
+    EMBEDDING_ONNX_MIN_COSINE_SIMILARITY,
+    EMBEDDING_ONNX_QUANTIZATION,
+)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = setup_logger()
+
+ONNX_QUANTIZATION_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+# Mix of short queries, prose, code and non-English text, so quantization
+# errors in any part of the vocabulary show up.
+PARITY_CORPUS = [
+    "How do I reset my password?",
+    "quarterly revenue report Q3",
+    "The onboarding checklist covers laptop setup, accounts, and the first week "
+    "of meetings with the team.",
+    "Incident response runbook: page the on-call engineer, open a war room "
+    "channel, and post status updates every 30 minutes until resolved.",
+    "def retry(fn, attempts=3):\n    for i in range(attempts):\n        try:\n"
+    "            return fn()\n        except Exception:\n            pass",
+    "SELECT user_id, count(*) FROM events GROUP BY user_id ORDER BY 2 DESC;",
+    "Die Urlaubsrichtlinie gilt für alle Mitarbeiter ab dem ersten Arbeitstag.",
+    "客户升级流程需要在二十四小时内完成。",
+    "🚀 Release 2.4 ships faster indexing, SSO fixes, and a new admin panel.",
+    "x",
+]
+
+_PARITY_FILE_NAME = "parity.json"
+_ONNX_SUBFOLDER = "onnx"
+
+
+def min_cosine_similarity(reference: npt.ArrayLike, candidate: npt.ArrayLike) -> float:
+    """Lowest row-wise cosine similarity between two embedding matrices."""
+    reference_array = np.asarray(reference, dtype=np.float64)
+    candidate_array = np.asarray(candidate, dtype=np.float64)
+    if reference_array.shape != candidate_array.shape:
+        raise ValueError(
+            f"Embedding shapes differ: {reference_array.shape} vs "
+            f"{candidate_array.shape}"
+        )
+    norms = np.linalg.norm(reference_array, axis=1) * np.linalg.norm(
+        candidate_array, axis=1
+    )
+    similarities = np.einsum("ij,ij->i", reference_array, candidate_array) / np.where(
+        norms == 0, 1, norms
+    )
+    return float(similarities.min())
+
+
+def onnx_file_name(quantization: str | None) -> str:
+    if quantization is None:
+        return f"{_ONNX_SUBFOLDER}/model.onnx"
+    if quantization not in ONNX_QUANTIZATION_CONFIGS:
+        raise ValueError(
+            f"Unsupported ONNX quantization {quantization!r}, expected one of "
+            f"{ONNX_QUANTIZATION_CONFIGS}"
+        )
+    return f"{_ONNX_SUBFOLDER}/model_qint8_{quantization}.onnx"
+
+
+def get_export_dir(model_name: str) -> Path:
+    return Path(EMBEDDING_ONNX_EXPORT_DIR) / model_name.replace("/", "__")
+
+
+def load_onnx_model(
+    path: str, file_name: str, **kwargs: object
+) -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(
+        path,
+        backend="onnx",
+        model_kwargs={"file_name": file_name, "provider": "CPUExecutionProvider"},
+        trust_remote_code=False,
+        **kwargs,
+    )
+
+
+def export_onnx_model(
+    model_name: str, quantization: str | None, local_files_only: bool
+) -> tuple[Path, str]:
+    """Makes sure the (quantized) ONNX graph of ``model_name`` exists under the
+    export dir. Returns the dir and the graph's file name relative to it."""
+    export_dir = get_export_dir(model_name)
+    base_file_name = onnx_file_name(None)
+
+    if not (export_dir / base_file_name).exists():
+        logger.notice("Exporting %s to ONNX in %s", model_name, export_dir)
+        model = load_onnx_model(
+            model_name, base_file_name, local_files_only=local_files_only
+        )
+        # Export next to the target and rename, so a crash never leaves a
+        # partial export that later loads would pick up
+        tmp_dir = export_dir.with_name(f"{export_dir.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        model.save_pretrained(str(tmp_dir))
+        try:
+            tmp_dir.replace(export_dir)
+        except OSError:
+            # Another process finished the same export first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    file_name = onnx_file_name(quantization)
+    if quantization is not None and not (export_dir / file_name).exists():
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        logger.notice(
+            "Quantizing the ONNX graph of %s for %s", model_name, quantization
+        )
+        export_dynamic_quantized_onnx_model(
+            load_onnx_model(str(export_dir), base_file_name),
+            quantization_config=quantization,
+            model_name_or_path=str(export_dir),
+        )
+
+    return export_dir, file_name
+
+
+def _read_parity_scores(export_dir: Path) -> dict[str, float]:
+    try:
+        return json.loads((export_dir / _PARITY_FILE_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable ONNX parity file in %s", export_dir)
+        return {}
+
+
+def _write_parity_score(export_dir: Path, file_name: str, score: float) -> None:
+    scores = _read_parity_scores(export_dir)
+    scores[file_name] = score
+    tmp_path = export_dir / f"{_PARITY_FILE_NAME}.tmp-{os.getpid()}"
+    tmp_path.write_text(json.dumps(scores, indent=2, sort_keys=True))
+    tmp_path.replace(export_dir / _PARITY_FILE_NAME)
+
+
+def measure_parity(
+    onnx_model: "SentenceTransformer",
+    torch_model: "SentenceTransformer",
+    texts: list[str] = PARITY_CORPUS,
+) -> float:
+    """Lowest cosine similarity between the two models' embeddings of
+    ``texts``."""
+    return min_cosine_similarity(
+        torch_model.encode(texts, normalize_embeddings=False),
+        onnx_model.encode(texts, normalize_embeddings=False),
+    )
+
+
+def load_onnx_embedding_model(
+    model_name: str,
+    load_torch_model: Callable[[], "SentenceTransformer"],
+    local_files_only: bool,
+    quantization: str | None = EMBEDDING_ONNX_QUANTIZATION,
+    min_similarity: float = EMBEDDING_ONNX_MIN_COSINE_SIMILARITY,
+) -> "SentenceTransformer | None":
+    """Returns the ONNX Runtime model, or None if it could not be exported or
+    does not match the torch model closely enough. Callers fall back to torch
+    in that case."""
+    try:
+        export_dir, file_name = export_onnx_model(
+            model_name, quantization, local_files_only=local_files_only
+        )
+        onnx_model = load_onnx_model(str(export_dir), file_name)
+        score = _read_parity_scores(export_dir).get(file_name)
+        if score is None:
+            score = measure_parity(onnx_model, load_torch_model())
+            _write_parity_score(export_dir, file_name, score)
+    except Exception:
+        logger.exception(
+            "Failed to load %s with ONNX Runtime, falling back to torch", model_name
+        )
+        return None
+
+    if score < min_similarity:
+        logger.error(
+            "ONNX graph %s of %s only reaches cosine similarity %.4f to torch "
+            "(need %.4f), falling back to torch",
+            file_name,
+            model_name,
+            score,
+            min_similarity,
+        )
+        return None
+
+    logger.notice(
+        "Using ONNX Runtime for %s (%s, cosine similarity to torch %.4f)",
+        model_name,
+        file_name,
+        score,
+    )
+    return onnx_model
@@ -0,0 +1,124 @@
+"""Per-tenant cache of the ACL each user searches with.
+
+build_access_filters_for_user runs on every search. In EE it reads the user's
+groups and external groups from Postgres, so a user synced into thousands of
+external groups (Google, Confluence, Slack) pays for a query and a large set
+build on every chat turn.
+
+Entries are keyed by user and namespaced by a per-tenant generation token.
+Anything that changes group memberships, group names or a user's email mints a
+new token once its transaction commits, which drops every entry at once.
+Entries are stored sorted, in the order the document indexes receive them.
+
+Cache failures are non-fatal: readers fall through to Postgres.
+"""
+
+import json
+import uuid
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from onyx.cache.factory import get_cache_backend
+from onyx.cache.interface import CACHE_TRANSIENT_ERRORS, CacheBackend
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_GENERATION_KEY = "user_acl:generation"
+_ENTRY_KEY_PREFIX = "user_acl:entry"
+# Session.info flag so a transaction registers a single invalidation
+_INVALIDATE_ON_COMMIT_KEY = "invalidate_user_acl_cache_on_commit"
+# Staleness bound for membership changes that bypass explicit invalidation
+ENTRY_TTL_SECONDS = 600
+
+
+class UserAclCacheLookup(BaseModel):
+    """Result of a cache lookup.
+
+    `generation` is the token observed at lookup time, and the fill MUST be
+    written under it: a reader that loaded memberships before a change would
+    otherwise store them under the token minted after the change.
+    `generation` is None when the cache was unreachable; the fill is skipped.
+    """
+
+    acl: list[str] | None
+    generation: str | None
+
+
+def _current_generation(cache: CacheBackend) -> str:
+    raw = cache.get(_GENERATION_KEY)
+    if raw is not None:
+        return raw.decode("utf-8", errors="replace")
+
+    # Concurrent initialisers converge on whichever token was written first
+    cache.set_if_absent(_GENERATION_KEY, uuid.uuid4().hex)
+    raw = cache.get(_GENERATION_KEY)
+    return raw.decode("utf-8", errors="replace") if raw is not None else ""
+
+
+def _entry_key(generation: str, user_id: UUID) -> str:
+    return f"{_ENTRY_KEY_PREFIX}:{generation}:{user_id}"
+
+
+def get_cached_user_acl(user_id: UUID) -> UserAclCacheLookup:
+    try:
+        cache = get_cache_backend()
+        generation = _current_generation(cache)
+        raw = cache.get(_entry_key(generation, user_id))
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning("User ACL cache read failed", exc_info=True)
+        return UserAclCacheLookup(acl=None, generation=None)
+
+    if raw is None:
+        return UserAclCacheLookup(acl=None, generation=generation)
+
+    try:
+        acl = json.loads(raw)
+    except ValueError:
+        logger.warning("Discarding unreadable cached ACL for user %s", user_id)
+        return UserAclCacheLookup(acl=None, generation=generation)
+    return UserAclCacheLookup(acl=acl, generation=generation)
+
+
+def cache_user_acl(user_id: UUID, acl: list[str], generation: str | None) -> None:
+    if not generation:
+        return
+    try:
+        get_cache_backend().set(
+            _entry_key(generation, user_id), json.dumps(acl), ex=ENTRY_TTL_SECONDS
+        )
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning("User ACL cache write failed", exc_info=True)
+
+
+def invalidate_user_acl_cache(tenant_id: str | None = None) -> None:
+    try:
+        get_cache_backend(tenant_id=tenant_id).set(_GENERATION_KEY, uuid.uuid4().hex)
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "User ACL cache invalidation failed; entries expire via TTL",
+            exc_info=True,
+        )
+
+
+def invalidate_user_acl_cache_on_commit(db_session: Session) -> None:
+    """Invalidates the cache once the session's transaction commits.
+
+    Invalidating before the commit would let a concurrent search re-cache the
+    pre-commit memberships under the new token. A rolled back transaction
+    leaves the listener armed for the next commit, which only costs a refill.
+    """
+    if db_session.info.get(_INVALIDATE_ON_COMMIT_KEY):
+        return
+    db_session.info[_INVALIDATE_ON_COMMIT_KEY] = True
+    tenant_id = get_current_tenant_id()
+
+    def _invalidate(session: Session) -> None:
+        session.info.pop(_INVALIDATE_ON_COMMIT_KEY, None)
+        invalidate_user_acl_cache(tenant_id)
+
+    event.listen(db_session, "after_commit", _invalidate, once=True)
@@ -29,6 +29,7 @@ from onyx.server.metrics.indexing_task_metrics import (
     on_indexing_task_prerun,
 )
 from onyx.server.metrics.metrics_server import start_metrics_server
+from onyx.server.metrics.shared_executor import register_shared_executor_metrics
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MULTI_TENANT
 
@@ -130,6 +131,8 @@ def on_worker_init(sender: Worker, **kwargs: Any) -> None:
 
 @worker_ready.connect
 def on_worker_ready(sender: Any, **kwargs: Any) -> None:
+    # Contextual RAG and image summarization run on the shared llm-io pool.
+    register_shared_executor_metrics()
     start_metrics_server("docprocessing")
     app_base.on_worker_ready(sender, **kwargs)
 
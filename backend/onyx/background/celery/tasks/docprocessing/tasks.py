@@ -1727,7 +1727,11 @@ def _docprocessing_task(
         # also keep the millisecond delta so DOCPROCESSING_SETUP can subtract
         # it to avoid double-counting.
         batch_load_start = time.monotonic()
-        documents = storage.get_batch(batch_num)
+        # The indexing pipeline takes the whole batch as a list, so every
+        # document is held from here on. Decoding from the spooled blob only
+        # keeps the raw bytes out of memory alongside them.
+        stored_documents = storage.get_batch(batch_num)
+        documents = list(stored_documents) if stored_documents is not None else None
         batch_load_ms = max(0, int((time.monotonic() - batch_load_start) * 1000))
         safe_record_single_event(
             IndexAttemptStage.BATCH_LOAD, index_attempt_id, batch_load_ms
@@ -2020,6 +2024,7 @@ def _docprocessing_task(
             f"docs={len(index_pipeline_result.failures) + index_pipeline_result.total_docs} "
             f"chunks={index_pipeline_result.total_chunks} "
             f"failures={len(index_pipeline_result.failures)} "
+            f"contextual_rag_llm_calls_saved={index_pipeline_result.contextual_rag_llm_calls_saved} "
             f"elapsed={elapsed_time:.2f}s"
         )
 
@@ -6,7 +6,7 @@ from celery import Celery
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
-from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
+from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT, DOCUMENT_SYNC_BATCH_SIZE
 from onyx.configs.constants import (
     CELERY_DOCUMENT_SYNC_TASK_EXPIRES,
     CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT,
@@ -76,6 +76,43 @@ def reset_document_sync(r: TenantRedisClient) -> None:
     r.delete(DOCUMENT_SYNC_FENCE_KEY)
 
 
+def _send_document_sync_task(
+    r: TenantRedisClient,
+    celery_app: Celery,
+    document_ids: list[str],
+    priority: OnyxCeleryPriority,
+    tenant_id: str,
+) -> None:
+    """Send one sync task covering document_ids. A single document goes out as
+    the per-document task so the two modes share a queue and fence cleanly."""
+    # Create a unique task ID
+    custom_task_id = f"{DOCUMENT_SYNC_PREFIX}_{uuid4()}"
+
+    # Add to the tracking taskset in Redis BEFORE creating the celery task
+    r.sadd(DOCUMENT_SYNC_TASKSET_KEY, custom_task_id)
+    r.expire(DOCUMENT_SYNC_TASKSET_KEY, TASKSET_TTL)
+
+    if len(document_ids) == 1:
+        task_name = OnyxCeleryTask.DOCUMENT_INDEX_METADATA_SYNC_TASK
+        task_kwargs: dict[str, object] = dict(
+            document_id=document_ids[0], tenant_id=tenant_id
+        )
+    else:
+        task_name = OnyxCeleryTask.DOCUMENT_INDEX_METADATA_BATCH_SYNC_TASK
+        task_kwargs = dict(document_ids=document_ids, tenant_id=tenant_id)
+
+    # Create the Celery task
+    celery_app.send_task(
+        task_name,
+        kwargs=task_kwargs,
+        queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
+        task_id=custom_task_id,
+        priority=priority,
+        expires=CELERY_DOCUMENT_SYNC_TASK_EXPIRES,
+        ignore_result=True,
+    )
+
+
 def generate_document_sync_tasks(
     r: TenantRedisClient,
     max_tasks: int,
@@ -83,6 +120,7 @@ def generate_document_sync_tasks(
     db_session: Session,
     lock: RedisLock,
     tenant_id: str,
+    batch_size: int = DOCUMENT_SYNC_BATCH_SIZE,
 ) -> tuple[int, int]:
     """Generate sync tasks for all documents that need syncing.
 
@@ -93,6 +131,8 @@ def generate_document_sync_tasks(
         db_session: Database session
         lock: Redis lock for coordination
         tenant_id: Tenant identifier
+        batch_size: Maximum number of documents per task. Documents are only
+            batched with others of the same priority.
 
     Returns:
         tuple[int, int]: (tasks_generated, total_docs_found)
@@ -100,6 +140,8 @@ def generate_document_sync_tasks(
     last_lock_time = time.monotonic()
     num_tasks_sent = 0
     num_docs = 0
+    batch_size = max(1, batch_size)
+    pending_by_priority: dict[OnyxCeleryPriority, list[str]] = {}
 
     stmt = construct_document_id_select_by_needs_sync_or_secondary_pending()
     port_running = any_future_port_in_progress(db_session)
@@ -122,13 +164,6 @@ def generate_document_sync_tasks(
 
         num_docs += 1
 
-        # Create a unique task ID
-        custom_task_id = f"{DOCUMENT_SYNC_PREFIX}_{uuid4()}"
-
-        # Add to the tracking taskset in Redis BEFORE creating the celery task
-        r.sadd(DOCUMENT_SYNC_TASKSET_KEY, custom_task_id)
-        r.expire(DOCUMENT_SYNC_TASKSET_KEY, TASKSET_TTL)
-
         # Deferred FUTURE sync: LOW mid-port (may not be in FUTURE yet; don't
         # starve needs_sync), HIGH post-port since that drain gates the flip —
         # which is also why needs_sync yields to LOW during it.
@@ -141,22 +176,26 @@ def generate_document_sync_tasks(
         else:
             priority = OnyxCeleryPriority.MEDIUM
 
-        # Create the Celery task
-        celery_app.send_task(
-            OnyxCeleryTask.DOCUMENT_INDEX_METADATA_SYNC_TASK,
-            kwargs=dict(document_id=doc_id, tenant_id=tenant_id),
-            queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
-            task_id=custom_task_id,
-            priority=priority,
-            expires=CELERY_DOCUMENT_SYNC_TASK_EXPIRES,
-            ignore_result=True,
-        )
+        pending = pending_by_priority.setdefault(priority, [])
+        pending.append(doc_id)
+        if len(pending) < batch_size:
+            continue
 
+        _send_document_sync_task(r, celery_app, pending, priority, tenant_id)
+        pending_by_priority[priority] = []
         num_tasks_sent += 1
 
         if num_tasks_sent >= max_tasks:
             break
 
+    # Flush partially filled batches. Anything left over once max_tasks is hit
+    # is still stale in the db and gets picked up on the next pass.
+    for priority, pending in pending_by_priority.items():
+        if not pending or num_tasks_sent >= max_tasks:
+            continue
+        _send_document_sync_task(r, celery_app, pending, priority, tenant_id)
+        num_tasks_sent += 1
+
     return num_tasks_sent, num_docs
 
 
@@ -11,7 +11,8 @@ from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 from tenacity import RetryError
 
-from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_document, get_access_for_documents
+from onyx.access.models import DocumentAccess
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.background.celery.tasks.shared.tasks import (
@@ -35,19 +36,25 @@ from onyx.configs.constants import (
 )
 from onyx.db.document import (
     document_has_indexable_cc_pair,
+    filter_document_ids_with_indexable_cc_pair,
     get_document,
+    get_documents_by_ids,
     mark_document_as_synced,
     mark_document_synced_secondary_pending,
+    mark_documents_as_synced,
+    mark_documents_synced_secondary_pending,
 )
 from onyx.db.document_set import (
     delete_document_set,
     fetch_document_sets,
     fetch_document_sets_for_document,
+    fetch_document_sets_for_documents,
     get_document_set_by_id,
     mark_document_set_as_synced,
 )
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import SyncStatus, SyncType
+from onyx.db.models import Document as DbDocument
 from onyx.db.models import DocumentSet, UserGroup
 from onyx.db.port_attempt import port_backfill_has_pending_work
 from onyx.db.search_settings import get_active_search_settings
@@ -637,3 +644,280 @@ def document_index_metadata_sync_task(
         )
 
     return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
+
+
+def _unwrap_retry_error(ex: Exception) -> Exception:
+    """The exception tenacity gave up on, or ex itself."""
+    if isinstance(ex, RetryError):
+        inner = ex.last_attempt.exception()
+        if isinstance(inner, Exception):
+            return inner
+    return ex
+
+
+def _build_batch_metadata_update_requests(
+    docs: list[DbDocument],
+    doc_id_to_doc_sets: dict[str, list[str]],
+    doc_id_to_access: dict[str, DocumentAccess],
+) -> list[MetadataUpdateRequest]:
+    """One request per distinct set of metadata values. After a user group or
+    document set change most of a batch ends up with identical metadata, so
+    this usually collapses to a handful of requests."""
+    grouped: dict[tuple[Any, ...], list[DbDocument]] = {}
+    for doc in docs:
+        access = doc_id_to_access[doc.id]
+        key = (
+            frozenset(access.to_acl()),
+            access.is_public,
+            frozenset(doc_id_to_doc_sets.get(doc.id, [])),
+            doc.boost,
+            doc.hidden,
+            doc.doc_created_at,
+        )
+        grouped.setdefault(key, []).append(doc)
+
+    update_requests: list[MetadataUpdateRequest] = []
+    for group in grouped.values():
+        first = group[0]
+        update_requests.append(
+            MetadataUpdateRequest(
+                document_ids=[doc.id for doc in group],
+                doc_id_to_chunk_cnt={
+                    doc.id: doc.chunk_count if doc.chunk_count is not None else -1
+                    for doc in group
+                },
+                access=doc_id_to_access[first.id],
+                document_sets=set(doc_id_to_doc_sets.get(first.id, [])),
+                boost=first.boost,
+                hidden=first.hidden,
+                created_at=first.doc_created_at,
+            )
+        )
+    return update_requests
+
+
+def _apply_batch_metadata_update(
+    retry_document_index: RetryDocumentIndex,
+    update_requests: list[MetadataUpdateRequest],
+) -> tuple[set[str], dict[str, Exception]]:
+    """Applies update_requests to one index, attributing outcomes per document.
+
+    Returns:
+        (deferred_document_ids, failed_document_id_to_exception). Deferred
+        documents are missing from a still-porting index.
+    """
+    deferred_document_ids: set[str] = set()
+    try:
+        retry_document_index.update(update_requests)
+        return deferred_document_ids, {}
+    except SecondaryIndexDocumentMissingError as e:
+        deferred_document_ids.update(e.document_ids)
+        return deferred_document_ids, {}
+    except Exception as ex:
+        e = _unwrap_retry_error(ex)
+        if not isinstance(e, httpx.HTTPStatusError):
+            # Timeouts and the like have already been retried by tenacity and
+            # would most likely hit every document again, so fail the whole
+            # batch rather than burn the time limit on per-document calls.
+            return deferred_document_ids, {
+                document_id: e
+                for update_request in update_requests
+                for document_id in update_request.document_ids
+            }
+
+    # A rejected request fails every document in the batch. Split it up so one
+    # bad document does not keep the rest from syncing.
+    failed_document_id_to_exception: dict[str, Exception] = {}
+    for update_request in update_requests:
+        for document_id in update_request.document_ids:
+            single_request = update_request.model_copy(
+                update={
+                    "document_ids": [document_id],
+                    "doc_id_to_chunk_cnt": {
+                        document_id: update_request.doc_id_to_chunk_cnt[document_id]
+                    },
+                }
+            )
+            try:
+                retry_document_index.update([single_request])
+            except SecondaryIndexDocumentMissingError:
+                deferred_document_ids.add(document_id)
+            except Exception as ex:
+                failed_document_id_to_exception[document_id] = _unwrap_retry_error(ex)
+    return deferred_document_ids, failed_document_id_to_exception
+
+
+@shared_task(  # ty: ignore[invalid-argument-type]
+    name=OnyxCeleryTask.DOCUMENT_INDEX_METADATA_BATCH_SYNC_TASK,
+    bind=True,
+    soft_time_limit=LIGHT_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_TIME_LIMIT,
+    max_retries=3,
+)
+def document_index_metadata_batch_sync_task(
+    self: Task,
+    document_ids: list[str],
+    *,
+    tenant_id: str,
+) -> bool:
+    """Batched form of document_index_metadata_sync_task.
+
+    Same three phases, but metadata for every document is read with bulk
+    queries and documents sharing identical metadata go to the index as a
+    single MetadataUpdateRequest. Deferrals and failures are still tracked per
+    document: synced documents are marked synced, and a retry only carries the
+    documents that failed with a retryable error.
+    """
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+    failed_document_id_to_exception: dict[str, Exception] = {}
+    retryable_document_ids: list[str] = []
+
+    try:
+        # Phase 1: read DB state, then release the connection.
+        # See document_index_metadata_sync_task.
+        doc_id_to_last_modified: dict[str, datetime | None] = {}
+        update_requests: list[MetadataUpdateRequest] = []
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            primary_search_settings = active_search_settings.primary
+            secondary_search_settings = active_search_settings.secondary
+            primary_backfill_in_progress = (
+                primary_search_settings.port_backfill_source_id is not None
+                and port_backfill_has_pending_work(
+                    db_session, primary_search_settings.id
+                )
+            )
+
+            docs = get_documents_by_ids(db_session, document_ids)
+            if docs:
+                found_ids = [doc.id for doc in docs]
+                doc_id_to_doc_sets = dict(
+                    fetch_document_sets_for_documents(found_ids, db_session)
+                )
+                doc_id_to_access = get_access_for_documents(
+                    document_ids=found_ids, db_session=db_session
+                )
+                update_requests = _build_batch_metadata_update_requests(
+                    docs, doc_id_to_doc_sets, doc_id_to_access
+                )
+                doc_id_to_last_modified = {doc.id: doc.last_modified for doc in docs}
+
+        if not update_requests:
+            elapsed = time.monotonic() - start
+            task_logger.info(
+                f"docs={len(document_ids)} action=no_operation elapsed={elapsed:.2f}"
+            )
+            completion_status = OnyxCeleryTaskCompletionStatus.SKIPPED
+            return False
+
+        document_indices = get_all_document_indices(
+            search_settings=primary_search_settings,
+            secondary_search_settings=secondary_search_settings,
+            httpx_client=HttpxPool.get("vespa"),
+            primary_backfill_in_progress=primary_backfill_in_progress,
+        )
+
+        # Phase 2: document-index I/O — no DB connection held.
+        deferred_document_ids: set[str] = set()
+        for document_index in document_indices:
+            deferred, failed = _apply_batch_metadata_update(
+                RetryDocumentIndex(document_index), update_requests
+            )
+            deferred_document_ids.update(deferred)
+            failed_document_id_to_exception.update(failed)
+
+        # Phase 3: write back to PG in a fresh transaction, skipping anything
+        # that failed so it stays stale.
+        synced = {
+            document_id: last_modified
+            for document_id, last_modified in doc_id_to_last_modified.items()
+            if document_id not in failed_document_id_to_exception
+        }
+        with get_session_with_current_tenant() as db_session:
+            portable_deferred_ids = filter_document_ids_with_indexable_cc_pair(
+                db_session,
+                [
+                    document_id
+                    for document_id in synced
+                    if document_id in deferred_document_ids
+                ],
+            )
+            mark_documents_synced_secondary_pending(
+                {
+                    document_id: synced[document_id]
+                    for document_id in portable_deferred_ids
+                },
+                db_session,
+            )
+            mark_documents_as_synced(
+                {
+                    document_id: last_modified
+                    for document_id, last_modified in synced.items()
+                    if document_id not in portable_deferred_ids
+                },
+                db_session,
+            )
+
+        elapsed = time.monotonic() - start
+        task_logger.info(
+            f"docs={len(document_ids)} action=sync synced={len(synced)} "
+            f"deferred={len(portable_deferred_ids)} "
+            f"failed={len(failed_document_id_to_exception)} elapsed={elapsed:.2f}"
+        )
+
+        for document_id, e in failed_document_id_to_exception.items():
+            if isinstance(e, httpx.HTTPStatusError):
+                task_logger.error(
+                    f"Non-retryable HTTPStatusError: doc={document_id} status={e.response.status_code}"
+                )
+            else:
+                retryable_document_ids.append(document_id)
+
+        if not failed_document_id_to_exception:
+            completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+        elif not retryable_document_ids:
+            completion_status = OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+        else:
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+    except SoftTimeLimitExceeded:
+        task_logger.info(f"SoftTimeLimitExceeded exception. docs={len(document_ids)}")
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        # Failed outside the index I/O (e.g. the DB), retry the whole batch
+        e = _unwrap_retry_error(ex)
+        task_logger.exception(
+            f"document_index_metadata_batch_sync_task exceptioned: docs={len(document_ids)}"
+        )
+
+        completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+        if self.max_retries is not None and self.request.retries >= self.max_retries:
+            completion_status = OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+
+        countdown = 2 ** (self.request.retries + 4)
+        self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
+    finally:
+        task_logger.info(
+            f"document_index_metadata_batch_sync_task completed: "
+            f"status={completion_status.value} docs={len(document_ids)}"
+        )
+
+    if retryable_document_ids:
+        # Only the documents that failed go around again, the rest are synced.
+        # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+        countdown = 2 ** (self.request.retries + 4)
+        self.retry(  # this will raise a celery exception
+            kwargs=dict(document_ids=retryable_document_ids, tenant_id=tenant_id),
+            exc=failed_document_id_to_exception[retryable_document_ids[0]],
+            countdown=countdown,
+        )
+
+    return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
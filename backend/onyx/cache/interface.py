@@ -1,5 +1,8 @@
 import abc
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
 from enum import Enum
+from typing import Literal, NamedTuple
 
 from redis.exceptions import RedisError
 from sqlalchemy.exc import SQLAlchemyError
@@ -67,6 +70,60 @@ class CacheLock(abc.ABC):
         self.release()
 
 
+CacheValue = str | bytes | int | float
+
+
+class CachePipelineOp(NamedTuple):
+    """One queued pipeline command. ``value`` is only set for ``"set"`` and
+    ``seconds`` is the TTL for ``"set"`` (optional) and ``"expire"``."""
+
+    kind: Literal["set", "delete", "expire"]
+    key: str
+    value: CacheValue | None = None
+    seconds: int | None = None
+
+
+class CachePipeline:
+    """Write batch returned by ``CacheBackend.pipeline()``.
+
+    Commands are queued in order and only sent when the ``pipeline()`` context
+    exits cleanly; an exception inside the block discards them. The batch is
+    not atomic — a backend error can leave it partially applied.
+
+    The base implementation replays the queue one command at a time, so every
+    backend supports it; backends override ``execute`` to save round trips.
+    """
+
+    def __init__(self, backend: "CacheBackend") -> None:
+        self._backend = backend
+        self._ops: list[CachePipelineOp] = []
+
+    def set(self, key: str, value: CacheValue, ex: int | None = None) -> None:
+        self._ops.append(CachePipelineOp("set", key, value, ex))
+
+    def delete(self, key: str) -> None:
+        self._ops.append(CachePipelineOp("delete", key))
+
+    def expire(self, key: str, seconds: int) -> None:
+        self._ops.append(CachePipelineOp("expire", key, seconds=seconds))
+
+    def reset(self) -> None:
+        """Discard every queued command."""
+        self._ops = []
+
+    def execute(self) -> None:
+        ops, self._ops = self._ops, []
+        for op in ops:
+            if op.kind == "set":
+                assert op.value is not None
+                self._backend.set(op.key, op.value, ex=op.seconds)
+            elif op.kind == "delete":
+                self._backend.delete(op.key)
+            else:
+                assert op.seconds is not None
+                self._backend.expire(op.key, op.seconds)
+
+
 class CacheBackend(abc.ABC):
     """Thin abstraction over a key-value cache with TTL, locks, and blocking lists.
 
@@ -127,6 +184,38 @@ class CacheBackend(abc.ABC):
         """
         raise NotImplementedError
 
+    # -- multi-key ---------------------------------------------------------
+    # Defaults fall back to one call per key; backends override them to use a
+    # single round trip.
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        """Return the unexpired value of each key, aligned with *keys*."""
+        return [self.get(key) for key in keys]
+
+    def mset(self, mapping: Mapping[str, CacheValue], ex: int | None = None) -> None:
+        """Set every key in *mapping*, all with the same TTL."""
+        for key, value in mapping.items():
+            self.set(key, value, ex=ex)
+
+    def mexpire(self, keys: list[str], seconds: int) -> None:
+        """Reset the TTL of every existing key in *keys*. Missing keys are
+        ignored."""
+        for key in keys:
+            self.expire(key, seconds)
+
+    @contextmanager
+    def pipeline(self) -> Generator[CachePipeline, None, None]:
+        """Queue writes and send them together when the block exits cleanly."""
+        pipe = self._new_pipeline()
+        try:
+            yield pipe
+            pipe.execute()
+        finally:
+            pipe.reset()
+
+    def _new_pipeline(self) -> CachePipeline:
+        return CachePipeline(self)
+
     # -- distributed lock --------------------------------------------------
 
     @abc.abstractmethod
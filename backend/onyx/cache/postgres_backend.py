@@ -8,10 +8,24 @@ import hashlib
 import struct
 import time
 import uuid
+from collections.abc import Mapping
 from contextlib import AbstractContextManager
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Delete,
+    String,
+    Update,
+    any_,
+    bindparam,
+    delete,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, Insert
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
@@ -20,6 +34,9 @@ from onyx.cache.interface import (
     TTL_NO_EXPIRY,
     CacheBackend,
     CacheLock,
+    CachePipeline,
+    CachePipelineOp,
+    CacheValue,
 )
 from onyx.db.models import CacheStore
 
@@ -46,6 +63,42 @@ def _to_bytes(value: str | bytes | int | float) -> bytes:
     return str(value).encode()
 
 
+def _expires_at(ex: int | None) -> datetime | None:
+    return (
+        datetime.now(timezone.utc) + timedelta(seconds=ex) if ex is not None else None
+    )
+
+
+def _key_in(keys: list[str]) -> ColumnElement[bool]:
+    """``key = ANY(:keys)`` — one array parameter, so the statement text does
+    not change with the number of keys."""
+    return CacheStore.key == any_(bindparam("keys", keys, type_=ARRAY(String)))
+
+
+def _upsert_many_stmt(mapping: Mapping[str, CacheValue], ex: int | None) -> Insert:
+    expires_at = _expires_at(ex)
+    stmt = pg_insert(CacheStore).values(
+        [
+            {"key": key, "value": _to_bytes(value), "expires_at": expires_at}
+            for key, value in mapping.items()
+        ]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[CacheStore.key],
+        set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+    )
+
+
+def _expire_many_stmt(keys: list[str], seconds: int) -> Update:
+    return (
+        update(CacheStore).where(_key_in(keys)).values(expires_at=_expires_at(seconds))
+    )
+
+
+def _delete_many_stmt(keys: list[str]) -> Delete:
+    return delete(CacheStore).where(_key_in(keys))
+
+
 # ------------------------------------------------------------------
 # Lock
 # ------------------------------------------------------------------
@@ -132,6 +185,67 @@ class PostgresCacheLock(CacheLock):
         return False
 
 
+# ------------------------------------------------------------------
+# Pipeline
+# ------------------------------------------------------------------
+
+
+class PostgresCachePipeline(CachePipeline):
+    """Runs the queued commands in one session and one transaction.
+
+    Consecutive commands of the same kind (and TTL) are folded into a single
+    multi-row statement, so a pipeline of N sets followed by N expires costs two
+    statements rather than 2N sessions.
+    """
+
+    def __init__(self, backend: CacheBackend, tenant_id: str) -> None:
+        super().__init__(backend)
+        self._tenant_id = tenant_id
+
+    def execute(self) -> None:
+        from onyx.db.engine.sql_engine import get_session_with_tenant
+
+        ops, self._ops = self._ops, []
+        if not ops:
+            return
+        with get_session_with_tenant(tenant_id=self._tenant_id) as session:
+            for group in _group_pipeline_ops(ops):
+                head = group[0]
+                keys = [op.key for op in group]
+                if head.kind == "set":
+                    stmt: Insert | Update | Delete = _upsert_many_stmt(
+                        {op.key: op.value for op in group if op.value is not None},
+                        head.seconds,
+                    )
+                elif head.kind == "expire":
+                    assert head.seconds is not None
+                    stmt = _expire_many_stmt(keys, head.seconds)
+                else:
+                    stmt = _delete_many_stmt(keys)
+                session.execute(stmt)
+            session.commit()
+
+
+def _group_pipeline_ops(ops: list[CachePipelineOp]) -> list[list[CachePipelineOp]]:
+    """Split *ops* into runs that can each be one statement. A set run also
+    breaks on a repeated key — ``ON CONFLICT`` cannot touch a row twice."""
+    groups: list[list[CachePipelineOp]] = []
+    group_keys: set[str] = set()
+    for op in ops:
+        if (
+            groups
+            and groups[-1][0].kind == op.kind
+            and groups[-1][0].seconds == op.seconds
+            and not (op.kind == "set" and op.key in group_keys)
+        ):
+            groups[-1].append(op)
+        else:
+            groups.append([op])
+            group_keys = set()
+        group_keys.add(op.key)
+    return groups
+
+
 # ------------------------------------------------------------------
 # Backend
 # ------------------------------------------------------------------
@@ -193,11 +307,7 @@ class PostgresCacheBackend(CacheBackend):
         from onyx.db.engine.sql_engine import get_session_with_tenant
 
         value_bytes = _to_bytes(value)
-        expires_at = (
-            datetime.now(timezone.utc) + timedelta(seconds=ex)
-            if ex is not None
-            else None
-        )
+        expires_at = _expires_at(ex)
         stmt = (
             pg_insert(CacheStore)
             .values(key=key, value=value_bytes, expires_at=expires_at)
@@ -219,11 +329,7 @@ class PostgresCacheBackend(CacheBackend):
         from onyx.db.engine.sql_engine import get_session_with_tenant
 
         value_bytes = _to_bytes(value)
-        expires_at = (
-            datetime.now(timezone.utc) + timedelta(seconds=ex)
-            if ex is not None
-            else None
-        )
+        expires_at = _expires_at(ex)
         stmt = (
             pg_insert(CacheStore)
             .values(key=key, value=value_bytes, expires_at=expires_at)
@@ -271,9 +377,10 @@ class PostgresCacheBackend(CacheBackend):
     def expire(self, key: str, seconds: int) -> None:
         from onyx.db.engine.sql_engine import get_session_with_tenant
 
-        new_exp = datetime.now(timezone.utc) + timedelta(seconds=seconds)
         stmt = (
-            update(CacheStore).where(CacheStore.key == key).values(expires_at=new_exp)
+            update(CacheStore)
+            .where(CacheStore.key == key)
+            .values(expires_at=_expires_at(seconds))
         )
         with get_session_with_tenant(tenant_id=self._tenant_id) as session:
             session.execute(stmt)
@@ -295,6 +402,45 @@ class PostgresCacheBackend(CacheBackend):
             return TTL_KEY_NOT_FOUND
         return int(remaining)
 
+    # -- multi-key ---------------------------------------------------------
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        from onyx.db.engine.sql_engine import get_session_with_tenant
+
+        if not keys:
+            return []
+        stmt = select(CacheStore.key, CacheStore.value).where(
+            _key_in(keys),
+            or_(CacheStore.expires_at.is_(None), CacheStore.expires_at > func.now()),
+        )
+        with get_session_with_tenant(tenant_id=self._tenant_id) as session:
+            found = {
+                key: bytes(value) if value is not None else None
+                for key, value in session.execute(stmt)
+            }
+        return [found.get(key) for key in keys]
+
+    def mset(self, mapping: Mapping[str, CacheValue], ex: int | None = None) -> None:
+        from onyx.db.engine.sql_engine import get_session_with_tenant
+
+        if not mapping:
+            return
+        with get_session_with_tenant(tenant_id=self._tenant_id) as session:
+            session.execute(_upsert_many_stmt(mapping, ex))
+            session.commit()
+
+    def mexpire(self, keys: list[str], seconds: int) -> None:
+        from onyx.db.engine.sql_engine import get_session_with_tenant
+
+        if not keys:
+            return
+        with get_session_with_tenant(tenant_id=self._tenant_id) as session:
+            session.execute(_expire_many_stmt(keys, seconds))
+            session.commit()
+
+    def _new_pipeline(self) -> CachePipeline:
+        return PostgresCachePipeline(self, self._tenant_id)
+
     # -- distributed lock --------------------------------------------------
 
     def lock(self, name: str, timeout: float | None = None) -> CacheLock:
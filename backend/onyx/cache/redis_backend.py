@@ -1,10 +1,17 @@
 import math
+from collections.abc import Mapping
 
 from redis.exceptions import LockNotOwnedError
 from redis.lock import Lock as RedisLock
 
-from onyx.cache.interface import CacheBackend, CacheLock, CacheLockLostError
-from onyx.redis.tenant_redis_client import TenantRedisClient
+from onyx.cache.interface import (
+    CacheBackend,
+    CacheLock,
+    CacheLockLostError,
+    CachePipeline,
+    CacheValue,
+)
+from onyx.redis.tenant_redis_client import TenantRedisClient, TenantRedisPipeline
 
 
 class RedisCacheLock(CacheLock):
@@ -39,6 +46,30 @@ class RedisCacheLock(CacheLock):
         return bool(self._lock.owned())
 
 
+class RedisCachePipeline(CachePipeline):
+    """Queues commands straight onto a non-transactional Redis pipeline, so
+    the whole batch is a single round trip."""
+
+    def __init__(self, backend: CacheBackend, pipeline: TenantRedisPipeline) -> None:
+        super().__init__(backend)
+        self._p = pipeline
+
+    def set(self, key: str, value: CacheValue, ex: int | None = None) -> None:
+        self._p.set(key, value, ex=ex)
+
+    def delete(self, key: str) -> None:
+        self._p.delete(key)
+
+    def expire(self, key: str, seconds: int) -> None:
+        self._p.expire(key, seconds)
+
+    def reset(self) -> None:
+        self._p.reset()
+
+    def execute(self) -> None:
+        self._p.execute()
+
+
 class RedisCacheBackend(CacheBackend):
     """``CacheBackend`` implementation that delegates to a tenant Redis client.
 
@@ -88,6 +119,25 @@ class RedisCacheBackend(CacheBackend):
     def ttl(self, key: str) -> int:
         return self._r.ttl(key)
 
+    # -- multi-key ---------------------------------------------------------
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return self._r.mget(keys)
+
+    def mset(self, mapping: Mapping[str, CacheValue], ex: int | None = None) -> None:
+        # MSET cannot attach a TTL, so pipeline one SET per key instead.
+        with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex)
+
+    def mexpire(self, keys: list[str], seconds: int) -> None:
+        with self.pipeline() as pipe:
+            for key in keys:
+                pipe.expire(key, seconds)
+
+    def _new_pipeline(self) -> CachePipeline:
+        return RedisCachePipeline(self, self._r.pipeline(transaction=False))
+
     # -- distributed lock --------------------------------------------------
 
     def lock(self, name: str, timeout: float | None = None) -> CacheLock:
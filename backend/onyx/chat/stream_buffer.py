@@ -124,14 +124,26 @@ class StreamBufferWriter:
                     CHAT_STREAM_BUFFER_MAX_BYTES,
                 )
                 return
-            self._cache.set(
-                _chunk_key(self._chat_session_id, self._run_id, self._meta.chunk_count),
-                payload,
-                ex=CHAT_STREAM_BUFFER_TTL_S,
+            next_meta = self._meta.model_copy(
+                update={"chunk_count": self._meta.chunk_count + 1}
             )
+            # Chunk and meta go out in one round trip; the meta only advances
+            # locally once both writes succeeded.
+            with self._cache.pipeline() as pipe:
+                pipe.set(
+                    _chunk_key(
+                        self._chat_session_id, self._run_id, self._meta.chunk_count
+                    ),
+                    payload,
+                    ex=CHAT_STREAM_BUFFER_TTL_S,
+                )
+                pipe.set(
+                    _meta_key(self._chat_session_id, self._run_id),
+                    next_meta.model_dump_json(),
+                    ex=CHAT_STREAM_BUFFER_TTL_S,
+                )
             self._compressed_total += len(payload)
-            self._meta.chunk_count += 1
-            self._write_meta(CHAT_STREAM_BUFFER_TTL_S)
+            self._meta = next_meta
         except Exception:
             logger.exception(
                 "stream buffer flush failed for session %s run %d; "
@@ -155,11 +167,10 @@ class StreamBufferWriter:
                 return
             self._meta.done = True
             try:
-                self._cache.delete(_meta_key(self._chat_session_id, self._run_id))
-                for chunk_n in range(self._meta.chunk_count):
-                    self._cache.delete(
-                        _chunk_key(self._chat_session_id, self._run_id, chunk_n)
-                    )
+                with self._cache.pipeline() as pipe:
+                    pipe.delete(_meta_key(self._chat_session_id, self._run_id))
+                    for chunk_key in self._chunk_keys():
+                        pipe.delete(chunk_key)
             except Exception:
                 logger.exception(
                     "stream buffer deletion failed for session %s run %d",
@@ -173,11 +184,7 @@ class StreamBufferWriter:
         self._meta.done = True
         try:
             self._write_meta(CHAT_STREAM_BUFFER_DONE_TTL_S)
-            for chunk_n in range(self._meta.chunk_count):
-                self._cache.expire(
-                    _chunk_key(self._chat_session_id, self._run_id, chunk_n),
-                    CHAT_STREAM_BUFFER_DONE_TTL_S,
-                )
+            self._cache.mexpire(self._chunk_keys(), CHAT_STREAM_BUFFER_DONE_TTL_S)
         except Exception:
             logger.exception(
                 "stream buffer done-marking failed for session %s run %d",
@@ -185,6 +192,12 @@ class StreamBufferWriter:
                 self._run_id,
             )
 
+    def _chunk_keys(self) -> list[str]:
+        return [
+            _chunk_key(self._chat_session_id, self._run_id, chunk_n)
+            for chunk_n in range(self._meta.chunk_count)
+        ]
+
     def _write_meta(self, ttl: int) -> None:
         self._cache.set(
             _meta_key(self._chat_session_id, self._run_id),
@@ -224,13 +237,17 @@ def read_stream_chunks(
         )
         return None
 
+    end = meta.chunk_count
+    if max_chunks is not None:
+        end = min(end, cursor + max_chunks)
+    raw_chunks = cache.mget(
+        [_chunk_key(chat_session_id, run_id, n) for n in range(cursor, end)]
+    )
+
     blocks: list[str] = []
     chunk_n = cursor
     gap = meta.truncated
-    while chunk_n < meta.chunk_count:
-        if max_chunks is not None and len(blocks) >= max_chunks:
-            break
-        raw = cache.get(_chunk_key(chat_session_id, run_id, chunk_n))
+    for raw in raw_chunks:
         if raw is None or not isinstance(raw, bytes):
             gap = True
             break
@@ -107,6 +107,32 @@ assert (
     )
 ) > 0, "QUERY_EMBEDDING_CACHE_TTL_S must be positive."
 
+# Cache passage embeddings by their exact input text so re-indexing unchanged
+# chunks (and titles) doesn't re-hit the embedding provider. Entries are about
+# 4 * dim bytes each, the TTL is refreshed whenever an entry is reused. Off by
+# default since every chunk, mini-chunk and title vector is kept in the cache
+# backend (Redis memory on most deployments) for the TTL; size the TTL to the
+# re-indexing cadence and the cache to the corpus before enabling it.
+PASSAGE_EMBEDDING_CACHE_ENABLED = (
+    os.environ.get("PASSAGE_EMBEDDING_CACHE_ENABLED", "").lower() == "true"
+)
+assert (
+    PASSAGE_EMBEDDING_CACHE_TTL_S := int(
+        os.environ.get("PASSAGE_EMBEDDING_CACHE_TTL_S", str(60 * 60 * 24 * 7))
+    )
+) > 0, "PASSAGE_EMBEDDING_CACHE_TTL_S must be positive."
+
+# Cache vision-LLM image summaries by image content, vision model and prompt so
+# re-indexing the same logos, diagrams and screenshots doesn't re-summarize them.
+IMAGE_SUMMARY_CACHE_ENABLED = (
+    os.environ.get("IMAGE_SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+)
+assert (
+    IMAGE_SUMMARY_CACHE_TTL_S := int(
+        os.environ.get("IMAGE_SUMMARY_CACHE_TTL_S", str(60 * 60 * 24 * 30))
+    )
+) > 0, "IMAGE_SUMMARY_CACHE_TTL_S must be positive."
+
 # If set to true, will show extra/uncommon connectors in the "Other" category
 SHOW_EXTRA_CONNECTORS = os.environ.get("SHOW_EXTRA_CONNECTORS", "").lower() == "true"
 
@@ -560,6 +586,12 @@ DISABLE_OPENSEARCH_MIGRATION_TASK = (
     os.environ.get("DISABLE_OPENSEARCH_MIGRATION_TASK", "").lower() == "true"
 )
 ONYX_DISABLE_VESPA = os.environ.get("ONYX_DISABLE_VESPA", "true").lower() == "true"
+# If set, all indexing and retrieval goes to the in-process embedded document
+# index stored under this directory instead of Vespa/OpenSearch. Meant for
+# single-node deployments and CI; see onyx/document_index/embedded. The API
+# server and background workers must all see this directory on the same local
+# disk, since they coordinate through file locks.
+EMBEDDED_DOCUMENT_INDEX_DIR = os.environ.get("EMBEDDED_DOCUMENT_INDEX_DIR") or None
 # Whether we should check for and create an index if necessary every time we
 # instantiate an OpenSearchDocumentIndex on multitenant cloud. Defaults to True.
 VERIFY_CREATE_OPENSEARCH_INDEX_ON_INIT_MT = (
@@ -605,6 +637,15 @@ VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
+# Docfetching stages batches for docprocessing as zstd-compressed msgpack. Set to
+# true to keep writing the legacy JSON format, e.g. while docprocessing workers
+# from an older release are still draining batches during a rolling upgrade.
+# Readers accept both formats either way. The format changes the staged size and
+# decode cost only: docprocessing still holds each whole batch in memory.
+DOCUMENT_BATCH_LEGACY_JSON_FORMAT = (
+    os.environ.get("DOCUMENT_BATCH_LEGACY_JSON_FORMAT", "").lower() == "true"
+)
+
 MAX_DRIVE_WORKERS = int(os.environ.get("MAX_DRIVE_WORKERS", 4))
 
 # Below are intended to match the env variables names used by the official postgres docker image
@@ -1161,8 +1202,29 @@ CELERY_WORKER_SCHEDULED_TASKS_CONCURRENCY = int(
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 8192
 
+# Number of documents handled by each metadata sync task. 1 keeps the original
+# one-task-per-document behavior; larger values send a single batched task per
+# group of documents so big permission/document set changes don't flood the broker
+DOCUMENT_SYNC_BATCH_SIZE = max(1, int(os.environ.get("DOCUMENT_SYNC_BATCH_SIZE") or 1))
+
 DB_YIELD_PER_DEFAULT = 64
 
+# Sizes of the named, process-wide thread pools in
+# onyx.utils.threadpool_concurrency. These bound the total number of threads a
+# process spends on each kind of work, regardless of how many requests fan out
+SEARCH_IO_EXECUTOR_MAX_WORKERS = int(
+    os.environ.get("SEARCH_IO_EXECUTOR_MAX_WORKERS") or 64
+)
+LLM_IO_EXECUTOR_MAX_WORKERS = int(os.environ.get("LLM_IO_EXECUTOR_MAX_WORKERS") or 128)
+# Processes used to chunk large indexing batches in parallel. 0 (the default)
+# chunks every batch serially in the indexing thread.
+INDEXING_CHUNKING_PROCESSES = int(os.environ.get("INDEXING_CHUNKING_PROCESSES") or 0)
+# Batches with fewer documents than this are chunked serially, since shipping
+# them to the pool costs more than it saves.
+INDEXING_PARALLEL_CHUNKING_MIN_DOCS = int(
+    os.environ.get("INDEXING_PARALLEL_CHUNKING_MIN_DOCS") or 16
+)
+
 #####
 # Connector Configs
 #####
@@ -1264,6 +1326,18 @@ CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD = int(
     os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD", 200_000)
 )
 
+# Number of upcoming pages whose comments and attachments are fetched in the
+# background while the current page is being yielded. 1 = fully sequential.
+CONFLUENCE_CONNECTOR_PAGE_ENRICHMENT_CONCURRENCY = max(
+    1, int(os.environ.get("CONFLUENCE_CONNECTOR_PAGE_ENRICHMENT_CONCURRENCY") or 4)
+)
+# Requests per second shared by all threads of one connector run (bursts of up
+# to one second's worth are allowed). 0 disables the limit and relies solely on
+# backing off when Confluence returns 429s.
+CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND = float(
+    os.environ.get("CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND") or 10
+)
+
 # A JSON-formatted array. Each item in the array should have the following structure:
 # {
 #     "user_id": "1234567890",
@@ -1377,6 +1451,33 @@ JIRA_SLIM_PAGE_SIZE = int(os.environ.get("JIRA_SLIM_PAGE_SIZE", 500))
 GONG_CONNECTOR_START_TIME = os.environ.get("GONG_CONNECTOR_START_TIME")
 
 GITHUB_CONNECTOR_BASE_URL = os.environ.get("GITHUB_CONNECTOR_BASE_URL") or None
+# Repos with at least this many files to fetch are read from one repo tarball
+# instead of one contents request per file. 0 always fetches file by file.
+GITHUB_CONNECTOR_ARCHIVE_MIN_FILES = int(
+    os.environ.get("GITHUB_CONNECTOR_ARCHIVE_MIN_FILES") or 50
+)
+
+# Budgets for the rate limiter shared by every worker that calls a source with
+# the same credential. JSON keyed by source, merged over the defaults below,
+# e.g. {"github": {"requests_per_second": 1.0, "burst": 500}}. A configured
+# budget applies to every credential of its source; without one, GitHub only
+# paces github.com personal access tokens, at their 5,000 requests per hour.
+CONNECTOR_RATE_LIMITER_ENABLED = (
+    os.environ.get("CONNECTOR_RATE_LIMITER_ENABLED", "true").lower() == "true"
+)
+CONNECTOR_RATE_LIMITS: dict[str, dict[str, float]] = {
+    **(
+        {
+            "confluence": {
+                "requests_per_second": CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND,
+                "burst": CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND,
+            }
+        }
+        if CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND > 0
+        else {}
+    ),
+    **json.loads(os.environ.get("CONNECTOR_RATE_LIMITS") or "{}"),
+}
 
 GITLAB_CONNECTOR_INCLUDE_CODE_FILES = (
     os.environ.get("GITLAB_CONNECTOR_INCLUDE_CODE_FILES", "").lower() == "true"
@@ -1472,6 +1573,16 @@ ENABLE_MULTIPASS_INDEXING = (
 )
 # Enable contextual retrieval
 ENABLE_CONTEXTUAL_RAG = os.environ.get("ENABLE_CONTEXTUAL_RAG", "").lower() == "true"
+# Reuse contextual RAG document summaries and chunk contexts across indexing runs
+# when the text they were generated from has not changed
+CONTEXTUAL_RAG_SUMMARY_CACHE_ENABLED = (
+    os.environ.get("CONTEXTUAL_RAG_SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+)
+assert (
+    CONTEXTUAL_RAG_SUMMARY_CACHE_TTL_S := int(
+        os.environ.get("CONTEXTUAL_RAG_SUMMARY_CACHE_TTL_S", str(60 * 60 * 24 * 30))
+    )
+) > 0, "CONTEXTUAL_RAG_SUMMARY_CACHE_TTL_S must be positive."
 
 # Finer grained chunking for more detail retention
 # Slightly larger since the sentence aware split is a max cutoff so most minichunks will be under MINI_CHUNK_SIZE
@@ -54,6 +54,15 @@ KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT: int = int(
     os.environ.get("KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT", "100")
 )
 
+# How often normalization checks kg_entity for changes to fold into the
+# in-memory trigram index, and how many tenants' indexes a process keeps.
+KG_ENTITY_INDEX_REFRESH_INTERVAL_SECONDS: float = float(
+    os.environ.get("KG_ENTITY_INDEX_REFRESH_INTERVAL_SECONDS", "10")
+)
+KG_ENTITY_INDEX_MAX_TENANTS: int = max(
+    1, int(os.environ.get("KG_ENTITY_INDEX_MAX_TENANTS", "16"))
+)
+
 KG_FILTERED_SEARCH_TIMEOUT: int = int(
     os.environ.get("KG_FILTERED_SEARCH_TIMEOUT", "30")
 )
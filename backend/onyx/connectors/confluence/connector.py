@@ -1,6 +1,9 @@
 import copy
 import re
+from collections import deque
 from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from urllib.parse import quote
@@ -12,6 +15,8 @@ from typing_extensions import override
 from onyx.access.models import ExternalAccess
 from onyx.configs.app_configs import (
     CONFLUENCE_CONNECTOR_LABELS_TO_SKIP,
+    CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND,
+    CONFLUENCE_CONNECTOR_PAGE_ENRICHMENT_CONCURRENCY,
     CONFLUENCE_TIMEZONE_OFFSET,
     CONTINUE_ON_CONNECTOR_FAILURE,
     INDEX_BATCH_SIZE,
@@ -35,9 +40,16 @@ from onyx.connectors.confluence.utils import (
     validate_attachment_filetype,
 )
 from onyx.connectors.credentials_provider import OnyxStaticCredentialsProvider
+from onyx.connectors.cross_connector_utils.distributed_rate_limiter import (
+    build_connector_rate_limiter,
+)
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     is_atlassian_date_error,
 )
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    RequestRateLimiter,
+    TokenBucket,
+)
 from onyx.connectors.exceptions import (
     ConnectorValidationError,
     CredentialExpiredError,
@@ -70,6 +82,7 @@ from onyx.connectors.models import (
 from onyx.db.enums import HierarchyNodeType
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import submit_with_context
 
 logger = setup_logger()
 # Potential Improvements
@@ -138,6 +151,15 @@ ONE_DAY = ONE_HOUR * 24
 MAX_CACHED_IDS = 100
 
 
+@dataclass
+class _PrefetchedPage:
+    page: dict[str, Any]
+    comments: Future[str]
+    attachments: Future[tuple[list[Document | HierarchyNode], list[ConnectorFailure]]]
+    # the last page of an API response: the checkpoint already points past it
+    ends_batch: bool
+
+
 def _get_page_id(page: dict[str, Any], allow_missing: bool = False) -> str:
     if allow_missing and "id" not in page:
         return "unknown"
@@ -187,6 +209,7 @@ class ConfluenceConnector(
         # default True: configs stored before this option existed must keep
         # indexing attachments
         include_attachments: bool = True,
+        page_enrichment_concurrency: int = CONFLUENCE_CONNECTOR_PAGE_ENRICHMENT_CONCURRENCY,
     ) -> None:
         self.wiki_base = wiki_base
         self.is_cloud = is_cloud
@@ -199,6 +222,7 @@ class ConfluenceConnector(
         self.timezone_offset = timezone_offset
         self.scoped_token = scoped_token
         self.include_attachments = include_attachments
+        self.page_enrichment_concurrency = max(1, page_enrichment_concurrency)
         self._confluence_client: OnyxConfluence | None = None
         self._low_timeout_confluence_client: OnyxConfluence | None = None
         self._fetched_titles: set[str] = set()
@@ -431,12 +455,23 @@ class ConfluenceConnector(
     ) -> None:
         self.credentials_provider = credentials_provider
 
+        # both clients and every enrichment thread draw from one budget, which
+        # is shared with other workers using this credential when possible
+        rate_limiter: RequestRateLimiter | None = build_connector_rate_limiter(
+            DocumentSource.CONFLUENCE, credentials_provider.get_provider_key()
+        )
+        if rate_limiter is None and CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND > 0:
+            rate_limiter = TokenBucket(
+                rate=CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_SECOND
+            )
+
         # raises exception if there's a problem
         confluence_client = OnyxConfluence(
             is_cloud=self.is_cloud,
             url=self.wiki_base,
             credentials_provider=credentials_provider,
             scoped_token=self.scoped_token,
+            rate_limiter=rate_limiter,
         )
         confluence_client._probe_connection(**self.probe_kwargs)
         confluence_client._initialize_connection(**self.final_kwargs)
@@ -450,6 +485,7 @@ class ConfluenceConnector(
             credentials_provider=credentials_provider,
             timeout=3,
             scoped_token=self.scoped_token,
+            rate_limiter=rate_limiter,
         )
         low_timeout_confluence_client._probe_connection(**self.probe_kwargs)
         low_timeout_confluence_client._initialize_connection(**self.final_kwargs)
@@ -527,11 +563,14 @@ class ConfluenceConnector(
         return comment_string
 
     def _convert_page_to_document(
-        self, page: dict[str, Any]
+        self, page: dict[str, Any], comments: Future[str] | None = None
     ) -> Document | ConnectorFailure:
         """
         Converts a Confluence page to a Document object.
         Includes the page content, comments, and attachments.
+
+        `comments` is the page's comment string when it was already fetched in
+        the background; errors from that fetch are handled like any other.
         """
         page_id = page_url = ""
         try:
@@ -554,7 +593,11 @@ class ConfluenceConnector(
             ]
 
             # Process comments if available
-            comment_text = self._get_comment_string_for_page_id(page_id)
+            comment_text = (
+                comments.result()
+                if comments is not None
+                else self._get_comment_string_for_page_id(page_id)
+            )
             if comment_text:
                 sections.append(
                     TextSection(text=comment_text, link=f"{page_url}#comments")
@@ -620,6 +663,7 @@ class ConfluenceConnector(
         page: dict[str, Any],
         start: SecondsSinceUnixEpoch | None = None,
         end: SecondsSinceUnixEpoch | None = None,
+        include_page_hierarchy_node: bool = True,
     ) -> tuple[list[Document | HierarchyNode], list[ConnectorFailure]]:
         """
         Inline attachments are added directly to the document as text or image sections by
@@ -627,7 +671,9 @@ class ConfluenceConnector(
         and those at the end of the page.
 
         If there are valid attachments, the page itself is yielded as a hierarchy node
-        (since attachments are children of the page in the hierarchy).
+        (since attachments are children of the page in the hierarchy). Background
+        callers pass include_page_hierarchy_node=False and emit that node themselves,
+        since seen_hierarchy_node_raw_ids is only touched from the yielding thread.
         """
         if not self.include_attachments:
             return [], []
@@ -771,7 +817,7 @@ class ConfluenceConnector(
 
                     # If this is the first valid attachment, yield the page as a
                     # hierarchy node (attachments are children of the page)
-                    if not page_hierarchy_node_yielded:
+                    if include_page_hierarchy_node and not page_hierarchy_node_yielded:
                         page_hierarchy_node = self._maybe_yield_page_hierarchy_node(
                             page
                         )
@@ -885,35 +931,98 @@ class ConfluenceConnector(
         def store_next_page_url(next_page_url: str) -> None:
             checkpoint.next_page_url = next_page_url
 
-        for page in self.confluence_client.paginated_page_retrieval(
-            cql_url=page_query_url,
-            limit=self.batch_size,
-            next_page_callback=store_next_page_url,
-        ):
-            # Yield hierarchy nodes for all ancestors (parent-before-child ordering)
-            yield from self._yield_ancestor_hierarchy_nodes(page)
+        pages = iter(
+            self.confluence_client.paginated_page_retrieval(
+                cql_url=page_query_url,
+                limit=self.batch_size,
+                next_page_callback=store_next_page_url,
+            )
+        )
 
-            # Build doc from page
-            doc_or_failure = self._convert_page_to_document(page)
+        # Comments and attachments for the next few pages are fetched in the
+        # background while the current page is yielded. Pages themselves, their
+        # hierarchy nodes and the page body conversion (which shares
+        # _fetched_titles) stay on this thread and in API order.
+        executor = ThreadPoolExecutor(
+            max_workers=self.page_enrichment_concurrency,
+            thread_name_prefix="confluence_page_enrichment",
+        )
+        prefetched: deque[_PrefetchedPage] = deque()
+        batch_fully_fetched = False
+        try:
+            while True:
+                # Never read past the last page of the current API response:
+                # its checkpoint must be returned before the next one is fetched.
+                while (
+                    not batch_fully_fetched
+                    and len(prefetched) < self.page_enrichment_concurrency
+                ):
+                    page = next(pages, None)
+                    if page is None:
+                        break
+                    # Create checkpoint once a full page of results is returned
+                    batch_fully_fetched = bool(
+                        checkpoint.next_page_url
+                        and checkpoint.next_page_url != page_query_url
+                    )
+                    prefetched.append(
+                        _PrefetchedPage(
+                            page=page,
+                            comments=submit_with_context(
+                                executor,
+                                self._get_comment_string_for_page_id,
+                                _get_page_id(page, allow_missing=True),
+                            ),
+                            attachments=submit_with_context(
+                                executor,
+                                self._fetch_page_attachments,
+                                page,
+                                start,
+                                end,
+                                include_page_hierarchy_node=False,
+                            ),
+                            ends_batch=batch_fully_fetched,
+                        )
+                    )
 
-            if isinstance(doc_or_failure, ConnectorFailure):
-                yield doc_or_failure
-                continue
+                if not prefetched:
+                    break
 
-            # yield completed document (or failure)
-            yield doc_or_failure
+                current = prefetched.popleft()
+                page = current.page
 
-            # Now get attachments for that page:
-            attachment_docs, attachment_failures = self._fetch_page_attachments(
-                page, start, end
-            )
-            # yield attached docs and failures
-            yield from attachment_docs
-            yield from attachment_failures
+                # Yield hierarchy nodes for all ancestors (parent-before-child ordering)
+                yield from self._yield_ancestor_hierarchy_nodes(page)
+
+                # Build doc from page
+                doc_or_failure = self._convert_page_to_document(page, current.comments)
+
+                # yield completed document (or failure)
+                yield doc_or_failure
 
-            # Create checkpoint once a full page of results is returned
-            if checkpoint.next_page_url and checkpoint.next_page_url != page_query_url:
-                return checkpoint
+                # attachments of a page that failed to convert are dropped, as before
+                if not isinstance(doc_or_failure, ConnectorFailure):
+                    attachment_docs, attachment_failures = current.attachments.result()
+                    # attachments are children of the page in the hierarchy
+                    if any(isinstance(doc, Document) for doc in attachment_docs):
+                        page_hierarchy_node = self._maybe_yield_page_hierarchy_node(
+                            page
+                        )
+                        if page_hierarchy_node:
+                            yield page_hierarchy_node
+                    # yield attached docs and failures
+                    yield from attachment_docs
+                    yield from attachment_failures
+
+                if current.ends_batch:
+                    if isinstance(doc_or_failure, ConnectorFailure):
+                        # as before, a failed page doesn't end the checkpoint:
+                        # carry on until the next page that converts
+                        batch_fully_fetched = False
+                    else:
+                        return checkpoint
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
         checkpoint.has_more = False
         return checkpoint
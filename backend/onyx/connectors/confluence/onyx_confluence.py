@@ -40,6 +40,9 @@ from onyx.connectors.confluence.utils import (
     update_param_in_path,
 )
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import scoped_url
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    RequestRateLimiter,
+)
 from onyx.connectors.exceptions import (
     ConnectorValidationError,
     InsufficientPermissionsError,
@@ -177,6 +180,9 @@ class OnyxConfluence:
         confluence_user_profiles_override: list[dict[str, str]] | None = (
             CONFLUENCE_CONNECTOR_USER_PROFILES_OVERRIDE
         ),
+        # shared by every client (and thread) working against the same site
+        # so concurrent callers stay within one request budget
+        rate_limiter: RequestRateLimiter | None = None,
     ) -> None:
         self.base_url = url  #'/'.join(url.rstrip("/").split("/")[:-1])
         url = scoped_url(url, "confluence") if scoped_token else url
@@ -195,6 +201,7 @@ class OnyxConfluence:
             self.static_credentials = self._credentials_provider.get_credentials()
 
         self._confluence = Confluence(url)
+        self._rate_limiter = rate_limiter
         self.credential_key: str = (
             self.CREDENTIAL_PREFIX
             + f":credential_{self._credentials_provider.get_provider_key()}"
@@ -506,6 +513,12 @@ class OnyxConfluence:
 
         return confluence
 
+    def wait_for_request_budget(self) -> None:
+        """For requests made outside the wrapped methods, e.g. raw `_session`
+        downloads, so they count against the same budget."""
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+
     # https://developer.atlassian.com/cloud/confluence/rate-limiting/
     # This uses the native rate limiting option provided by the
     # confluence client and otherwise applies a simpler set of error handling.
@@ -526,34 +539,33 @@ class OnyxConfluence:
 
                 # we're relying more on the client to rate limit itself
                 # and applying our own retries in a more specific set of circumstances
+                self.wait_for_request_budget()
                 try:
                     if credential_provider:
+                        # The provider's lock only guards renewing the
+                        # credentials; holding it for the call itself would
+                        # serialize every thread sharing this client.
                         with credential_provider:
                             credentials, renewed = self._renew_credentials()
                             if renewed:
                                 self._confluence = self._initialize_connection_helper(
                                     credentials, **self._kwargs
                                 )
-                            attr = getattr(self._confluence, name, None)
-                            if attr is None:
-                                # The underlying Confluence client doesn't have this attribute
-                                raise AttributeError(
-                                    f"'{type(self).__name__}' object has no attribute '{name}'"
-                                )
 
-                            return attr(*args, **kwargs)
-                    else:
-                        attr = getattr(self._confluence, name, None)
-                        if attr is None:
-                            # The underlying Confluence client doesn't have this attribute
-                            raise AttributeError(
-                                f"'{type(self).__name__}' object has no attribute '{name}'"
-                            )
+                    attr = getattr(self._confluence, name, None)
+                    if attr is None:
+                        # The underlying Confluence client doesn't have this attribute
+                        raise AttributeError(
+                            f"'{type(self).__name__}' object has no attribute '{name}'"
+                        )
 
-                        return attr(*args, **kwargs)
+                    return attr(*args, **kwargs)
 
                 except HTTPError as e:
                     delay_until = _handle_http_error(e, attempt, MAX_RETRIES)
+                    if self._rate_limiter is not None:
+                        # back off every thread sharing the budget, not just this one
+                        self._rate_limiter.pause_until(delay_until)
                     logger.warning(
                         "HTTPError in confluence call. Retrying in %s seconds...",
                         delay_until,
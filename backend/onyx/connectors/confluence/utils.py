@@ -158,6 +158,7 @@ def process_attachment(
         )
 
         # Download the attachment
+        confluence_client.wait_for_request_budget()
         resp: requests.Response = confluence_client._session.get(attachment_link)
         if resp.status_code != 200:
             logger.warning(
@@ -0,0 +1,163 @@
+"""Token-bucket rate limiter shared by every worker using one provider credential.
+
+Docfetching, pruning and permission-sync workers calling the same source with
+the same credential draw from one budget instead of each discovering the
+provider's limit on its own and backing off in lockstep.
+
+The bucket is kept as GCRA state: a single "theoretical arrival time" per
+(source, credential) in the tenant cache, updated under a short cache lock so
+it works on both the Redis and the Postgres backends. A caller reserves its
+slot under the lock and sleeps outside it. When a provider answers with a
+rate-limit response, `pause_until` pushes the arrival time past the
+`Retry-After` deadline, so every worker waits it out rather than just the one
+that was told.
+
+Fails open: if the cache is unavailable, calls go ahead unthrottled and rely on
+the connector's own rate-limit handling.
+"""
+
+import hashlib
+import math
+import time
+from collections.abc import Callable
+
+from onyx.cache.factory import get_cache_backend
+from onyx.cache.interface import CACHE_TRANSIENT_ERRORS
+from onyx.configs.app_configs import (
+    CONNECTOR_RATE_LIMITER_ENABLED,
+    CONNECTOR_RATE_LIMITS,
+)
+from onyx.configs.constants import DocumentSource
+from onyx.server.metrics.connector_rate_limit_metrics import (
+    inc_connector_rate_limit_pause,
+    observe_connector_rate_limit_wait,
+)
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+_RATE_LIMIT_KEY_PREFIX = "connector_rate_limit"
+# the lock only guards a get + set, so these are generous
+_LOCK_TIMEOUT_S = 5
+_LOCK_WAIT_S = 5
+
+
+class DistributedRateLimiter:
+    """Paces calls to `source` made with one credential across all workers.
+
+    Allows `burst` calls back to back, then one every 1 / `requests_per_second`
+    seconds. Interchangeable with `TokenBucket` for callers that only need
+    `acquire` and `pause_until`.
+    """
+
+    def __init__(
+        self,
+        source: DocumentSource,
+        credential_key: str,
+        requests_per_second: float,
+        burst: float = 1,
+        tenant_id: str | None = None,
+    ) -> None:
+        if requests_per_second <= 0:
+            raise ValueError(
+                f"requests_per_second must be positive, got {requests_per_second}"
+            )
+
+        self.source = source
+        self._emission_interval = 1 / requests_per_second
+        self._tolerance = max(burst, 1) * self._emission_interval
+        # never put a raw token into a cache key
+        credential_hash = hashlib.sha256(credential_key.encode("utf-8")).hexdigest()
+        self._key = f"{_RATE_LIMIT_KEY_PREFIX}:{source.value}:{credential_hash[:16]}"
+        self._tenant_id = tenant_id
+
+    def _update_arrival_time(
+        self, update: Callable[[float, float], float]
+    ) -> float | None:
+        """Replaces the stored arrival time with `update(now, arrival_time)`
+        under the lock. Returns `now`, or None if the cache was unavailable."""
+        try:
+            cache_backend = get_cache_backend(tenant_id=self._tenant_id)
+            lock = cache_backend.lock(f"{self._key}:lock", timeout=_LOCK_TIMEOUT_S)
+            if not lock.acquire(blocking=True, blocking_timeout=_LOCK_WAIT_S):
+                logger.debug("Timed out waiting for rate limit lock %s", self._key)
+                return None
+            try:
+                now = time.time()
+                raw = cache_backend.get(self._key)
+                arrival_time = update(now, float(raw) if raw else now)
+                cache_backend.set(
+                    self._key,
+                    repr(arrival_time),
+                    # expire once the bucket would be full again
+                    ex=math.ceil(arrival_time - now + self._tolerance) + 1,
+                )
+                return now
+            finally:
+                if lock.owned():
+                    lock.release()
+        except CACHE_TRANSIENT_ERRORS:
+            logger.debug(
+                "Shared rate limiter unavailable for %s; not waiting.",
+                self.source.value,
+                exc_info=True,
+            )
+            return None
+
+    def acquire(self) -> None:
+        """Blocks until this worker's reserved slot comes up."""
+        allowed_at = 0.0
+
+        def _reserve(now: float, arrival_time: float) -> float:
+            nonlocal allowed_at
+            new_arrival_time = max(arrival_time, now) + self._emission_interval
+            allowed_at = new_arrival_time - self._tolerance
+            return new_arrival_time
+
+        now = self._update_arrival_time(_reserve)
+        if now is None:
+            return
+
+        wait_time = max(0.0, allowed_at - now)
+        observe_connector_rate_limit_wait(self.source.value, wait_time)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def pause_until(self, deadline: float) -> None:
+        """Holds back every worker until the `time.monotonic()` based
+        `deadline`, e.g. one derived from a `Retry-After` header."""
+        delay = deadline - time.monotonic()
+        if delay <= 0:
+            return
+
+        def _pause(now: float, arrival_time: float) -> float:
+            # the next reservation after this is allowed at now + delay
+            return max(
+                arrival_time, now + delay + self._tolerance - self._emission_interval
+            )
+
+        if self._update_arrival_time(_pause) is not None:
+            inc_connector_rate_limit_pause(self.source.value)
+
+
+def build_connector_rate_limiter(
+    source: DocumentSource,
+    credential_key: str,
+    default_budget: dict[str, float] | None = None,
+) -> DistributedRateLimiter | None:
+    """Returns the shared limiter for `source`, or None if it has no budget.
+
+    A budget configured for `source` takes precedence over `default_budget`,
+    which callers pass when they know the credential's own limit.
+    """
+    budget = CONNECTOR_RATE_LIMITS.get(source.value, default_budget)
+    if not CONNECTOR_RATE_LIMITER_ENABLED or budget is None:
+        return None
+
+    return DistributedRateLimiter(
+        source=source,
+        credential_key=credential_key,
+        requests_per_second=budget["requests_per_second"],
+        burst=budget.get("burst", 1),
+    )
@@ -1,7 +1,8 @@
+import threading
 import time
 from collections.abc import Callable
 from functools import wraps
-from typing import Any, TypeVar, cast
+from typing import Any, Protocol, TypeVar, cast
 
 import requests
 
@@ -129,3 +130,58 @@ class _RateLimitedRequest:
 
 
 rl_requests = _RateLimitedRequest
+
+
+class RequestRateLimiter(Protocol):
+    """What an API client needs from a rate limiter: a process-local
+    `TokenBucket` or a cross-worker `DistributedRateLimiter`."""
+
+    def acquire(self) -> None: ...
+
+    def pause_until(self, deadline: float) -> None: ...
+
+
+class TokenBucket:
+    """Thread-safe request budget shared by every thread talking to one API.
+
+    Refills at `rate` tokens per second up to `capacity`; `acquire` blocks
+    until a token is available. `pause_until` holds back every caller until a
+    `time.monotonic()` deadline, for when the API has already told one of them
+    to back off.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._refilled_at) * self.rate,
+                )
+                self._refilled_at = now
+
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_time = max(
+                    self._paused_until - now, (1 - self._tokens) / self.rate
+                )
+
+            time.sleep(wait_time)
+
+    def pause_until(self, deadline: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, deadline)
@@ -1,11 +1,15 @@
 import copy
 import os
+import tarfile
+import tempfile
+import time
 from collections.abc import Callable, Generator
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from io import BytesIO
-from typing import Any, cast
+from typing import IO, Any, cast
 
+import requests
 from github import Github, RateLimitExceededException, Repository
 from github.GithubException import GithubException, UnknownObjectException
 from github.Issue import Issue
@@ -16,9 +20,18 @@ from pydantic import BaseModel
 from typing_extensions import override
 
 from onyx.access.models import ExternalAccess
-from onyx.configs.app_configs import GITHUB_CONNECTOR_BASE_URL
+from onyx.configs.app_configs import (
+    GITHUB_CONNECTOR_ARCHIVE_MIN_FILES,
+    GITHUB_CONNECTOR_BASE_URL,
+)
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.connector_runner import CheckpointOutputWrapper, ConnectorRunner
+from onyx.connectors.cross_connector_utils.distributed_rate_limiter import (
+    build_connector_rate_limiter,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    RequestRateLimiter,
+)
 from onyx.connectors.exceptions import (
     ConnectorValidationError,
     CredentialExpiredError,
@@ -26,6 +39,13 @@ from onyx.connectors.exceptions import (
     UnexpectedValidationError,
     ValidationError,
 )
+from onyx.connectors.github.file_tree_snapshot import (
+    forget_file_tree_paths,
+    load_file_tree_snapshot,
+    mark_file_tree_snapshot_unchanged,
+    store_file_tree_snapshot,
+    update_file_tree_snapshot,
+)
 from onyx.connectors.github.models import SerializedRepository
 from onyx.connectors.github.rate_limit_utils import sleep_after_rate_limit_exception
 from onyx.connectors.github.utils import (
@@ -52,8 +72,11 @@ from onyx.connectors.models import (
     SlimDocument,
     TextSection,
 )
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.index_attempt import get_index_attempt
 from onyx.file_processing.extract_file_text import file_io_to_text, is_text_file
 from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import INDEX_ATTEMPT_INFO_CONTEXTVAR
 
 logger = setup_logger()
 
@@ -107,6 +130,19 @@ GITHUB_PATH_DENYLIST = {
 GITHUB_MAX_FILE_SIZE_BYTES = 1_000_000
 # Number of files emitted per checkpoint batch in the FILES stage.
 FILE_BATCH_SIZE = 100
+# Archive steps read their files from a local spool, so they can be larger than
+# the per-file batches.
+ARCHIVE_FILE_BATCH_SIZE = 10 * FILE_BATCH_SIZE
+# Most file content spooled from one tarball download; files past it are read
+# from a later download once the spool has been emitted.
+ARCHIVE_SPOOL_MAX_BYTES = 512 * 1024 * 1024
+# GitHub's primary REST limit for a personal access token on github.com.
+# Enterprise servers and GitHub App tokens have limits of their own, so they
+# are only paced when a budget is configured.
+_GITHUB_PAT_RATE_LIMIT = {"requests_per_second": 5000 / 3600, "burst": 1000}
+_GITHUB_PAT_PREFIXES = ("ghp_", "github_pat_")
+# (connect, read) timeouts for streaming a repo tarball.
+_ARCHIVE_REQUEST_TIMEOUT = (10, 60)
 
 _GITHUB_EMPTY_REPOSITORY_TREE_STATUS = 409
 _GITHUB_EMPTY_REPOSITORY_TREE_MESSAGE = "Git Repository is empty."
@@ -256,6 +292,7 @@ def _get_batch_rate_limited(
     cursor_url_callback: Callable[[str | None, int], None],
     github_client: Github,
     attempt_num: int = 0,
+    rate_limiter: RequestRateLimiter | None = None,
 ) -> Generator[PullRequest | Issue, None, None]:
     if attempt_num > _MAX_NUM_RATE_LIMIT_RETRIES:
         raise RuntimeError(
@@ -269,6 +306,8 @@ def _get_batch_rate_limited(
                 git_objs, cursor_url, prev_num_objs, cursor_url_callback
             )
             return
+        if rate_limiter is not None:
+            rate_limiter.acquire()
         objs = list(git_objs().get_page(page_num))
         # fetch all data here to disable lazy loading later
         # this is needed to capture the rate limit exception here (if one occurs)
@@ -277,7 +316,7 @@ def _get_batch_rate_limited(
                 _ = obj.raw_data
         yield from objs
     except RateLimitExceededException:
-        sleep_after_rate_limit_exception(github_client)
+        sleep_after_rate_limit_exception(github_client, rate_limiter)
         yield from _get_batch_rate_limited(
             git_objs,
             page_num,
@@ -286,6 +325,7 @@ def _get_batch_rate_limited(
             cursor_url_callback,
             github_client,
             attempt_num + 1,
+            rate_limiter=rate_limiter,
         )
     except UnknownObjectException:
         # 404 on the listing endpoint means the collection is unavailable for
@@ -503,6 +543,68 @@ def _decode_file_content(raw: bytes) -> str | None:
     return file_io_to_text(buf)
 
 
+def _iter_archive_files(
+    archive: IO[bytes], wanted_paths: set[str]
+) -> Generator[tuple[str, bytes], None, None]:
+    """Stream a GitHub tarball, yielding (path, content) for wanted files.
+
+    GitHub nests every entry under one `<owner>-<repo>-<sha>/` directory, which
+    is stripped. Members are read one at a time in stream mode, so memory stays
+    bounded by the largest wanted file.
+    """
+    with tarfile.open(fileobj=archive, mode="r|*") as tar:
+        for member in tar:
+            if not member.isfile() or member.size > GITHUB_MAX_FILE_SIZE_BYTES:
+                continue
+            _, _, path = member.name.partition("/")
+            if path not in wanted_paths:
+                continue
+            extracted = tar.extractfile(member)
+            if extracted is not None:
+                yield path, extracted.read()
+
+
+class _ArchiveSpool:
+    """Wanted files from one tarball download, kept in a temporary file.
+
+    The tarball is downloaded once per run and later checkpoint steps read their
+    batch back from the spool. `more` is set when the download stopped at
+    ARCHIVE_SPOOL_MAX_BYTES before reaching the end of the tarball.
+    """
+
+    def __init__(self, repo_id: int, commit_sha: str) -> None:
+        self.repo_id = repo_id
+        self.commit_sha = commit_sha
+        self.more = False
+        self._file = tempfile.TemporaryFile()
+        self._size = 0
+        # path -> (offset, length) of the files not read back yet, in tar order
+        self._entries: dict[str, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, path: str, content: bytes) -> bool:
+        """Spools `content`, or returns False if the spool is full."""
+        if self._entries and self._size + len(content) > ARCHIVE_SPOOL_MAX_BYTES:
+            return False
+        self._file.seek(self._size)
+        self._file.write(content)
+        self._entries[path] = (self._size, len(content))
+        self._size += len(content)
+        return True
+
+    def pop(self) -> tuple[str, bytes]:
+        """Reads back the earliest spooled file."""
+        path = next(iter(self._entries))
+        offset, length = self._entries.pop(path)
+        self._file.seek(offset)
+        return path, self._file.read(length)
+
+    def close(self) -> None:
+        self._file.close()
+
+
 def _convert_file_to_document(
     repo: Repository.Repository,
     path: str,
@@ -551,6 +653,44 @@ def _convert_file_to_document(
     )
 
 
+def _file_failure(html_url: str, path: str, e: Exception) -> ConnectorFailure:
+    error_msg = f"Error converting file {path} to document: {e}"
+    logger.exception(error_msg)
+    return ConnectorFailure(
+        failed_document=DocumentFailure(
+            document_id=html_url,
+            document_link=html_url,
+        ),
+        failure_message=error_msg,
+        exception=e,
+    )
+
+
+def _file_to_document_or_failure(
+    repo: Repository.Repository,
+    path: str,
+    raw: bytes,
+    repo_external_access: ExternalAccess | None,
+    branch: str,
+) -> Document | ConnectorFailure:
+    html_url = f"{repo.html_url}/blob/{branch}/{path}"
+    try:
+        content_text = _decode_file_content(raw)
+        if content_text is None:
+            return ConnectorFailure(
+                failed_document=DocumentFailure(
+                    document_id=html_url,
+                    document_link=html_url,
+                ),
+                failure_message=f"Skipping non-text/undecodable file: {path}",
+            )
+        return _convert_file_to_document(
+            repo, path, content_text, repo_external_access, branch
+        )
+    except Exception as e:
+        return _file_failure(html_url, path, e)
+
+
 class GithubConnectorStage(Enum):
     START = "start"
     PRS = "prs"
@@ -571,6 +711,13 @@ class GithubConnectorCheckpoint(ConnectorCheckpoint):
     # Branch file_paths was listed from; a resumed checkpoint whose branch no
     # longer matches (connector edited, default branch changed) is re-listed.
     file_paths_branch: str | None = None
+    # file_paths are read from the tarball of the listed commit before falling
+    # back to the per-file batches for anything the tarball did not provide.
+    files_from_archive: bool = False
+    archive_commit_sha: str | None = None
+    # Scope of the file tree snapshot file_paths was filtered with; None when
+    # no snapshot is kept for this run.
+    file_tree_snapshot_scope: str | None = None
 
     # Used for the fallback cursor-based pagination strategy
     num_retrieved: int
@@ -578,14 +725,19 @@ class GithubConnectorCheckpoint(ConnectorCheckpoint):
 
     def reset(self) -> None:
         """
-        Resets curr_page, num_retrieved, cursor_url, file_paths, and
-        file_paths_branch to their initial values (0, 0, None, None, None)
+        Resets curr_page, num_retrieved, cursor_url, file_paths,
+        file_paths_branch, files_from_archive, archive_commit_sha, and
+        file_tree_snapshot_scope to their initial values
+        (0, 0, None, None, None, False, None, None)
         """
         self.curr_page = 0
         self.num_retrieved = 0
         self.cursor_url = None
         self.file_paths = None
         self.file_paths_branch = None
+        self.files_from_archive = False
+        self.archive_commit_sha = None
+        self.file_tree_snapshot_scope = None
 
 
 def make_cursor_url_callback(
@@ -625,6 +777,8 @@ class GithubConnector(
         # Branch to index files from; None means each repo's default branch.
         self.branch = (branch or "").strip() or None
         self.github_client: Github | None = None
+        self._rate_limiter: RequestRateLimiter | None = None
+        self._archive_spool: _ArchiveSpool | None = None
 
     def load_credentials(self, credentials: dict[str, Any]) -> dict[str, Any] | None:
         # defaults to 30 items per page, can be set to as high as 100
@@ -637,8 +791,23 @@ class GithubConnector(
             if GITHUB_CONNECTOR_BASE_URL
             else Github(credentials["github_access_token"], per_page=ITEMS_PER_PAGE)
         )
+        access_token: str = credentials["github_access_token"]
+        self._rate_limiter = build_connector_rate_limiter(
+            DocumentSource.GITHUB,
+            access_token,
+            default_budget=(
+                _GITHUB_PAT_RATE_LIMIT
+                if not GITHUB_CONNECTOR_BASE_URL
+                and access_token.startswith(_GITHUB_PAT_PREFIXES)
+                else None
+            ),
+        )
         return None
 
+    def _wait_for_rate_limit(self) -> None:
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+
     def get_github_repo(
         self, github_client: Github, attempt_num: int = 0
     ) -> Repository.Repository:
@@ -648,9 +817,10 @@ class GithubConnector(
             )
 
         try:
+            self._wait_for_rate_limit()
             return github_client.get_repo(f"{self.repo_owner}/{self.repositories}")
         except RateLimitExceededException:
-            sleep_after_rate_limit_exception(github_client)
+            sleep_after_rate_limit_exception(github_client, self._rate_limiter)
             return self.get_github_repo(github_client, attempt_num + 1)
 
     def get_github_repos(
@@ -672,6 +842,7 @@ class GithubConnector(
             for repo_name in repo_names:
                 if repo_name:  # Skip empty strings
                     try:
+                        self._wait_for_rate_limit()
                         repo = github_client.get_repo(f"{self.repo_owner}/{repo_name}")
                         repos.append(repo)
                     except GithubException as e:
@@ -684,7 +855,7 @@ class GithubConnector(
 
             return repos
         except RateLimitExceededException:
-            sleep_after_rate_limit_exception(github_client)
+            sleep_after_rate_limit_exception(github_client, self._rate_limiter)
             return self.get_github_repos(github_client, attempt_num + 1)
 
     def get_all_repos(
@@ -706,7 +877,7 @@ class GithubConnector(
                 user = github_client.get_user(self.repo_owner)
                 return list(user.get_repos())
         except RateLimitExceededException:
-            sleep_after_rate_limit_exception(github_client)
+            sleep_after_rate_limit_exception(github_client, self._rate_limiter)
             return self.get_all_repos(github_client, attempt_num + 1)
 
     def fetch_configured_repos(self) -> list[Repository.Repository]:
@@ -742,14 +913,43 @@ class GithubConnector(
     def _resolve_branch(self, repo: Repository.Repository) -> str:
         return self.branch or repo.default_branch
 
+    def _get_file_tree_snapshot_scope(self) -> tuple[str | None, bool]:
+        """Returns the scope the file tree snapshot is kept under for this
+        index attempt (None outside of one) and whether unchanged files may be
+        skipped.
+
+        Snapshots are kept per cc-pair and search settings: a file is only
+        skipped if the index its document goes to already has it.
+        From-beginning runs fetch everything.
+        """
+        attempt_info = INDEX_ATTEMPT_INFO_CONTEXTVAR.get()
+        if attempt_info is None:
+            logger.info("Not indexing for a cc-pair, no file tree snapshot is kept")
+            return None, False
+
+        cc_pair_id, index_attempt_id = attempt_info
+        try:
+            with get_session_with_current_tenant() as db_session:
+                index_attempt = get_index_attempt(db_session, index_attempt_id)
+                if index_attempt is None:
+                    return None, False
+                search_settings_id = index_attempt.search_settings_id
+                from_beginning = index_attempt.from_beginning
+        except Exception:
+            logger.exception("Unable to look up the index attempt's search settings")
+            return None, False
+
+        return f"{cc_pair_id}:{search_settings_id}", not from_beginning
+
     def _list_indexable_files(
         self, repo: Repository.Repository, attempt_num: int = 0
-    ) -> tuple[list[str], bool]:
-        """Resolve the configured (or default) branch tree and return indexable file paths.
+    ) -> tuple[dict[str, str], bool, str | None]:
+        """Resolve the configured (or default) branch tree and return indexable files.
 
-        Returns (sorted paths, truncated) where `truncated` is True when GitHub
-        capped the recursive tree (>100k entries or >7MB), meaning some files
-        could not be enumerated and will be missing from the index.
+        Returns ({path: blob sha} sorted by path, truncated, tree sha) where
+        `truncated` is True when GitHub capped the recursive tree (>100k entries
+        or >7MB), meaning some files could not be enumerated and will be missing
+        from the index. The tree sha is None for an empty repository.
         """
         if attempt_num > _MAX_NUM_RATE_LIMIT_RETRIES:
             raise RuntimeError(
@@ -758,6 +958,7 @@ class GithubConnector(
             )
         assert self.github_client is not None  # for type-checking
         try:
+            self._wait_for_rate_limit()
             git_tree = repo.get_git_tree(self._resolve_branch(repo), recursive=True)
             truncated = bool(git_tree.raw_data.get("truncated"))
             if truncated:
@@ -766,16 +967,15 @@ class GithubConnector(
                     "some files will not be indexed",
                     repo.full_name,
                 )
-            paths = [
-                element.path
-                for element in git_tree.tree
+            blob_shas = {
+                element.path: element.sha
+                for element in sorted(git_tree.tree, key=lambda e: e.path)
                 if element.type == "blob"
                 and _is_indexable_path(element.path, element.size)
-            ]
-            paths.sort()
-            return paths, truncated
+            }
+            return blob_shas, truncated, git_tree.sha
         except RateLimitExceededException:
-            sleep_after_rate_limit_exception(self.github_client)
+            sleep_after_rate_limit_exception(self.github_client, self._rate_limiter)
             return self._list_indexable_files(repo, attempt_num + 1)
         except GithubException as e:
             if e.status == 404 and self.branch:
@@ -798,7 +998,47 @@ class GithubConnector(
                 "Skipping files for empty repo: %s",
                 repo.full_name,
             )
-            return [], False
+            return {}, False, None
+
+    def _get_listed_commit_sha(
+        self,
+        repo: Repository.Repository,
+        branch: str,
+        tree_sha: str,
+        attempt_num: int = 0,
+    ) -> str | None:
+        """Returns the sha of the branch's head commit if its tree is the listed
+        one, so its tarball holds exactly the listed blobs. None if the branch
+        moved since it was listed."""
+        if attempt_num > _MAX_NUM_RATE_LIMIT_RETRIES:
+            raise RuntimeError(
+                "Re-tried fetching the branch head too many times. "
+                "Something is going wrong with fetching objects from Github"
+            )
+        assert self.github_client is not None  # for type-checking
+        try:
+            self._wait_for_rate_limit()
+            commit = repo.get_branch(branch).commit
+        except RateLimitExceededException:
+            sleep_after_rate_limit_exception(self.github_client, self._rate_limiter)
+            return self._get_listed_commit_sha(repo, branch, tree_sha, attempt_num + 1)
+        except GithubException:
+            logger.warning(
+                "Failed to resolve the head of branch %s in repo %s",
+                branch,
+                repo.full_name,
+                exc_info=True,
+            )
+            return None
+
+        if commit.commit.tree.sha != tree_sha:
+            logger.info(
+                "Branch %s of repo %s moved after it was listed",
+                branch,
+                repo.full_name,
+            )
+            return None
+        return commit.sha
 
     def _fetch_file_content(
         self, repo: Repository.Repository, path: str, attempt_num: int = 0
@@ -810,6 +1050,7 @@ class GithubConnector(
             )
         assert self.github_client is not None  # for type-checking
         try:
+            self._wait_for_rate_limit()
             content = repo.get_contents(path, ref=self._resolve_branch(repo))
             if isinstance(content, list):
                 raise ValueError(f"Expected a file at {path}, got a directory")
@@ -820,9 +1061,132 @@ class GithubConnector(
                 )
             return content.decoded_content
         except RateLimitExceededException:
-            sleep_after_rate_limit_exception(self.github_client)
+            sleep_after_rate_limit_exception(self.github_client, self._rate_limiter)
             return self._fetch_file_content(repo, path, attempt_num + 1)
 
+    def _get_archive_link(
+        self, repo: Repository.Repository, ref: str, attempt_num: int = 0
+    ) -> str:
+        if attempt_num > _MAX_NUM_RATE_LIMIT_RETRIES:
+            raise RuntimeError(
+                "Re-tried fetching the repo archive link too many times. "
+                "Something is going wrong with fetching objects from Github"
+            )
+        assert self.github_client is not None  # for type-checking
+        try:
+            self._wait_for_rate_limit()
+            return repo.get_archive_link("tarball", ref=ref)
+        except RateLimitExceededException:
+            sleep_after_rate_limit_exception(self.github_client, self._rate_limiter)
+            return self._get_archive_link(repo, ref, attempt_num + 1)
+
+    def _spool_archive_files(
+        self, repo: Repository.Repository, commit_sha: str, paths: set[str]
+    ) -> _ArchiveSpool:
+        """One API call for the tarball link, then a single streamed download
+        spooling the wanted files until the spool is full. A failed download
+        keeps the files read before it."""
+        spool = _ArchiveSpool(repo.id, commit_sha)
+        try:
+            with requests.get(
+                self._get_archive_link(repo, commit_sha),
+                stream=True,
+                timeout=_ARCHIVE_REQUEST_TIMEOUT,
+            ) as response:
+                response.raise_for_status()
+                archive = cast(IO[bytes], response.raw)
+                for path, raw in _iter_archive_files(archive, paths):
+                    if not spool.add(path, raw):
+                        spool.more = True
+                        break
+        except Exception:
+            logger.exception(
+                "Failed to read the archive of repo %s at %s; "
+                "fetching the files it did not provide one by one",
+                repo.name,
+                commit_sha,
+            )
+        return spool
+
+    def _fetch_repo_files_from_archive(
+        self,
+        repo: Repository.Repository,
+        checkpoint: GithubConnectorCheckpoint,
+        branch: str,
+        repo_external_access: ExternalAccess | None,
+    ) -> Generator[Document | ConnectorFailure, None, bool]:
+        """Emit up to ARCHIVE_FILE_BATCH_SIZE listed files from the tarball of the
+        listed commit, advancing the checkpoint.
+
+        The tarball is spooled once per run and later steps read from the spool;
+        a step resumed without it (e.g. on another worker) downloads it again.
+        Files the tarball did not provide (download failed midway, or not in the
+        tarball) stay in file_paths for the per-file batches. Returns True if
+        any remain.
+        """
+        commit_sha = checkpoint.archive_commit_sha
+        assert commit_sha is not None  # set whenever files_from_archive is
+        remaining = dict.fromkeys(checkpoint.file_paths or [])
+
+        spool = self._archive_spool
+        if (
+            spool is None
+            or (spool.repo_id, spool.commit_sha) != (repo.id, commit_sha)
+            or (not spool and spool.more)
+        ):
+            if spool is not None:
+                spool.close()
+            logger.info(
+                "Reading %s files for repo %s from the archive at %s",
+                len(remaining),
+                repo.name,
+                commit_sha,
+            )
+            spool = self._spool_archive_files(repo, commit_sha, set(remaining))
+            self._archive_spool = spool
+
+        failed_paths: list[str] = []
+        try:
+            num_emitted = 0
+            while spool and num_emitted < ARCHIVE_FILE_BATCH_SIZE:
+                path, raw = spool.pop()
+                if path not in remaining:
+                    continue
+                del remaining[path]
+                result = _file_to_document_or_failure(
+                    repo, path, raw, repo_external_access, branch
+                )
+                if isinstance(result, ConnectorFailure):
+                    failed_paths.append(path)
+                yield result
+                num_emitted += 1
+        finally:
+            self._forget_file_tree_paths(repo, checkpoint, branch, failed_paths)
+
+        checkpoint.file_paths = list(remaining)
+        if spool or spool.more:
+            return len(remaining) > 0
+
+        # The whole tarball was read; fetch what it did not provide one by one
+        spool.close()
+        self._archive_spool = None
+        checkpoint.files_from_archive = False
+        checkpoint.archive_commit_sha = None
+        checkpoint.curr_page = 0
+        return len(remaining) > 0
+
+    @staticmethod
+    def _forget_file_tree_paths(
+        repo: Repository.Repository,
+        checkpoint: GithubConnectorCheckpoint,
+        branch: str,
+        paths: list[str],
+    ) -> None:
+        if checkpoint.file_tree_snapshot_scope is not None:
+            forget_file_tree_paths(
+                checkpoint.file_tree_snapshot_scope, repo.id, branch, paths
+            )
+
     def _fetch_repo_files(
         self,
         repo: Repository.Repository,
@@ -835,7 +1199,9 @@ class GithubConnector(
 
         On first entry for a repo (file_paths is None) it resolves and caches the
         filtered file list, applying the pushed_at gate and surfacing tree
-        truncation as a failure. Returns True if more file batches remain (the
+        truncation as a failure. On poll runs only files whose blob changed since
+        the window started are listed, and large listings are first read from the
+        tarball of the listed commit. Returns True if more file batches remain (the
         caller should return the checkpoint to resume), False once drained.
         """
         branch = self._resolve_branch(repo)
@@ -866,14 +1232,60 @@ class GithubConnector(
                 logger.info("Skipping files for repo %s (pushed_at < start)", repo.name)
                 checkpoint.file_paths = []
                 checkpoint.file_paths_branch = branch
+                if not is_slim:
+                    scope, _ = self._get_file_tree_snapshot_scope()
+                    if scope is not None:
+                        mark_file_tree_snapshot_unchanged(
+                            scope, repo.id, branch, time.time(), since=start
+                        )
             else:
                 logger.info("Listing files for repo: %s", repo.name)
-                paths, truncated = self._list_indexable_files(repo)
-                checkpoint.file_paths = paths
-                checkpoint.file_paths_branch = branch
+                listed_at = time.time()
+                blob_shas, truncated, tree_sha = self._list_indexable_files(repo)
+                paths = list(blob_shas)
                 logger.info(
                     "Found %s indexable files for repo: %s", len(paths), repo.name
                 )
+                scope, may_skip = (
+                    (None, False) if is_slim else self._get_file_tree_snapshot_scope()
+                )
+                if scope is not None:
+                    previous = load_file_tree_snapshot(scope, repo.id, branch)
+                    snapshot = update_file_tree_snapshot(previous, blob_shas, listed_at)
+                    store_file_tree_snapshot(scope, repo.id, branch, snapshot)
+                    if (
+                        may_skip
+                        and start is not None
+                        and previous is not None
+                        and previous.listed_at >= start.timestamp()
+                    ):
+                        # This index's previous successful run listed the
+                        # branch after this window started, so it fetched
+                        # every blob listed before the window.
+                        paths = [
+                            path
+                            for path, (_, first_seen) in snapshot.files.items()
+                            if first_seen > start.timestamp()
+                        ]
+                        logger.info(
+                            "%s files changed since the last run for repo: %s",
+                            len(paths),
+                            repo.name,
+                        )
+                checkpoint.file_paths = paths
+                checkpoint.file_tree_snapshot_scope = scope
+                checkpoint.file_paths_branch = branch
+                checkpoint.archive_commit_sha = (
+                    self._get_listed_commit_sha(repo, branch, tree_sha)
+                    if not is_slim
+                    and tree_sha is not None
+                    and GITHUB_CONNECTOR_ARCHIVE_MIN_FILES > 0
+                    and len(paths) >= GITHUB_CONNECTOR_ARCHIVE_MIN_FILES
+                    else None
+                )
+                checkpoint.files_from_archive = (
+                    checkpoint.archive_commit_sha is not None
+                )
                 # Surface truncation as a failure so the incomplete index is
                 # visible in the connector UI, not just buried in logs.
                 if truncated and not is_slim:
@@ -888,11 +1300,19 @@ class GithubConnector(
                         ),
                     )
 
+        if checkpoint.files_from_archive:
+            return (
+                yield from self._fetch_repo_files_from_archive(
+                    repo, checkpoint, branch, repo_external_access
+                )
+            )
+
         file_paths = checkpoint.file_paths
         page = checkpoint.curr_page
         batch = file_paths[page * FILE_BATCH_SIZE : (page + 1) * FILE_BATCH_SIZE]
         checkpoint.curr_page += 1
 
+        failed_paths: list[str] = []
         for path in batch:
             html_url = f"{repo.html_url}/blob/{branch}/{path}"
             if is_slim:
@@ -907,31 +1327,17 @@ class GithubConnector(
                 continue
             try:
                 raw = self._fetch_file_content(repo, path)
-                content_text = _decode_file_content(raw)
-                if content_text is None:
-                    yield ConnectorFailure(
-                        failed_document=DocumentFailure(
-                            document_id=html_url,
-                            document_link=html_url,
-                        ),
-                        failure_message=f"Skipping non-text/undecodable file: {path}",
-                    )
-                    continue
-                yield _convert_file_to_document(
-                    repo, path, content_text, repo_external_access, branch
+                result = _file_to_document_or_failure(
+                    repo, path, raw, repo_external_access, branch
                 )
             except Exception as e:
-                error_msg = f"Error converting file {path} to document: {e}"
-                logger.exception(error_msg)
-                yield ConnectorFailure(
-                    failed_document=DocumentFailure(
-                        document_id=html_url,
-                        document_link=html_url,
-                    ),
-                    failure_message=error_msg,
-                    exception=e,
-                )
-                continue
+                result = _file_failure(html_url, path, e)
+            if isinstance(result, ConnectorFailure):
+                failed_paths.append(path)
+            yield result
+
+        # Failed files are fetched again by the next run
+        self._forget_file_tree_paths(repo, checkpoint, branch, failed_paths)
 
         # True if more file batches remain for this repo.
         return (page + 1) * FILE_BATCH_SIZE < len(file_paths)
@@ -990,6 +1396,7 @@ class GithubConnector(
                 checkpoint.num_retrieved,
                 cursor_url_callback,
                 self.github_client,
+                rate_limiter=self._rate_limiter,
             )
             checkpoint.curr_page += 1  # NOTE: not used for cursor-based fallback
             done_with_prs = False
@@ -1082,6 +1489,7 @@ class GithubConnector(
                     checkpoint.num_retrieved,
                     cursor_url_callback,
                     self.github_client,
+                    rate_limiter=self._rate_limiter,
                 )
             )
             logger.info("Fetched %s issues for repo: %s", len(issue_batch), repo.name)
@@ -0,0 +1,127 @@
+"""Per-branch record of when each indexable file's current blob was first seen.
+
+GitHub's tree API returns every file's blob SHA in one call but no
+modification time, and connector checkpoints only survive retries of the same
+poll window. Each listing of a branch is therefore folded into a snapshot kept
+in the tenant cache: path -> (blob SHA, time that SHA was first listed).
+
+Snapshots are kept per indexing target (cc-pair and search settings), since a
+file may only be skipped once the index it is going to already has it. A poll
+run may skip a file whose blob was listed before its window started, as long
+as the snapshot was also listed after that window started: the previous
+successful run of the same target then fetched every blob in it. A missing or
+expired snapshot just means every file is fetched again.
+
+A file that could not be fetched or converted is dropped from the snapshot, so
+the next listing treats its blob as new and fetches it again. Documents that
+fail later, in docprocessing, leave the attempt completed with errors, which
+keeps the next poll window from moving past them.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel, ValidationError
+
+from onyx.cache.factory import get_cache_backend
+from onyx.cache.interface import CACHE_TRANSIENT_ERRORS
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+_FILE_TREE_SNAPSHOT_KEY_PREFIX = "github_file_tree"
+_FILE_TREE_SNAPSHOT_TTL_S = 30 * 24 * 60 * 60
+
+
+class FileTreeSnapshot(BaseModel):
+    # unix time of the last run that listed the branch (or found it unchanged)
+    listed_at: float
+    # path -> (blob sha, unix time the sha was first listed)
+    files: dict[str, tuple[str, float]]
+
+
+def _build_key(scope: str, repo_id: int, branch: str) -> str:
+    return f"{_FILE_TREE_SNAPSHOT_KEY_PREFIX}:{scope}:{repo_id}:{branch}"
+
+
+def load_file_tree_snapshot(
+    scope: str, repo_id: int, branch: str
+) -> FileTreeSnapshot | None:
+    """Returns None when no snapshot is cached or the cache is unavailable."""
+    try:
+        raw = get_cache_backend().get(_build_key(scope, repo_id, branch))
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "Failed to read the file tree snapshot for repo %s; fetching every file.",
+            repo_id,
+            exc_info=True,
+        )
+        return None
+
+    if not raw:
+        return None
+    try:
+        return FileTreeSnapshot.model_validate_json(raw)
+    except ValidationError:
+        logger.warning(
+            "Discarding an unreadable file tree snapshot for repo %s.", repo_id
+        )
+        return None
+
+
+def update_file_tree_snapshot(
+    previous: FileTreeSnapshot | None, blob_shas: dict[str, str], listed_at: float
+) -> FileTreeSnapshot:
+    """Folds a fresh listing into the snapshot. Files whose blob is unchanged
+    keep their first-seen time; new and changed files get `listed_at`, and
+    files no longer listed are dropped."""
+    previous_files = previous.files if previous else {}
+    files: dict[str, tuple[str, float]] = {}
+    for path, sha in blob_shas.items():
+        previous_sha, first_seen = previous_files.get(path, (None, listed_at))
+        files[path] = (sha, first_seen if previous_sha == sha else listed_at)
+    return FileTreeSnapshot(listed_at=listed_at, files=files)
+
+
+def store_file_tree_snapshot(
+    scope: str, repo_id: int, branch: str, snapshot: FileTreeSnapshot
+) -> None:
+    try:
+        get_cache_backend().set(
+            _build_key(scope, repo_id, branch),
+            snapshot.model_dump_json(),
+            ex=_FILE_TREE_SNAPSHOT_TTL_S,
+        )
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "Failed to store the file tree snapshot for repo %s; continuing.",
+            repo_id,
+            exc_info=True,
+        )
+
+
+def mark_file_tree_snapshot_unchanged(
+    scope: str, repo_id: int, branch: str, checked_at: float, since: datetime
+) -> None:
+    """Records a run that found the branch unchanged since `since` without
+    listing it. The snapshot only stays usable if it was listed after `since`
+    too, as nothing was fetched in between."""
+    snapshot = load_file_tree_snapshot(scope, repo_id, branch)
+    if snapshot is None or snapshot.listed_at < since.timestamp():
+        return
+    snapshot.listed_at = checked_at
+    store_file_tree_snapshot(scope, repo_id, branch, snapshot)
+
+
+def forget_file_tree_paths(
+    scope: str, repo_id: int, branch: str, paths: list[str]
+) -> None:
+    """Drops `paths` from the snapshot so the next run fetches them again."""
+    if not paths:
+        return
+    snapshot = load_file_tree_snapshot(scope, repo_id, branch)
+    if snapshot is None:
+        return
+    for path in paths:
+        snapshot.files.pop(path, None)
+    store_file_tree_snapshot(scope, repo_id, branch, snapshot)
@@ -3,17 +3,24 @@ from datetime import datetime, timedelta, timezone
 
 from github import Github
 
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    RequestRateLimiter,
+)
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
 
-def sleep_after_rate_limit_exception(github_client: Github) -> None:
+def sleep_after_rate_limit_exception(
+    github_client: Github, rate_limiter: RequestRateLimiter | None = None
+) -> None:
     """
     Sleep until the GitHub rate limit resets.
 
     Args:
         github_client: The GitHub client that hit the rate limit
+        rate_limiter: Limiter shared with other workers using the same token;
+            they are held back until the reset as well
     """
     sleep_time = github_client.get_rate_limit().core.reset.replace(
         tzinfo=timezone.utc
@@ -22,4 +29,6 @@ def sleep_after_rate_limit_exception(github_client: Github) -> None:
     logger.notice(
         "Ran into Github rate-limit. Sleeping %s seconds.", sleep_time.seconds
     )
+    if rate_limiter is not None:
+        rate_limiter.pause_until(time.monotonic() + sleep_time.total_seconds())
     time.sleep(sleep_time.total_seconds())
@@ -1,7 +1,11 @@
+import hashlib
 import ipaddress
+import json
 import random
 import socket
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from enum import Enum
 from typing import Any, cast
 from urllib.parse import urljoin, urlparse
@@ -29,11 +33,22 @@ from onyx.connectors.interfaces import (
     SlimConnector,
 )
 from onyx.connectors.models import Document, HierarchyNode, SlimDocument, TextSection
+from onyx.connectors.web.crawler import (
+    CrawlFrontier,
+    HostThrottle,
+    PageValidators,
+    load_page_validators,
+    normalize_url,
+    save_page_validators,
+)
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.index_attempt import get_index_attempt
+from onyx.db.search_settings import get_current_search_settings
 from onyx.file_processing.html_utils import web_html_cleanup
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.server.security.models import web_connector_ssrf_enforced
 from onyx.server.security.store import get_security_settings
-from onyx.utils.logger import setup_logger
+from onyx.utils.logger import pruning_ctx, setup_logger
 
 # Re-exported for backwards compatibility with existing tests/callers that
 # patch these names on `onyx.connectors.web.connector`.
@@ -43,8 +58,10 @@ from onyx.utils.playwright_fetch import (
     start_playwright,
 )
 from onyx.utils.sitemap import list_pages_for_site
+from onyx.utils.threadpool_concurrency import submit_with_context
 from onyx.utils.web_content import extract_pdf_text, is_pdf_resource
 from shared_configs.configs import MULTI_TENANT
+from shared_configs.contextvars import INDEX_ATTEMPT_INFO_CONTEXTVAR
 
 logger = setup_logger()
 
@@ -129,6 +146,23 @@ class ScrapeResult:
     retry: bool = False
 
 
+class HttpFetchResult(BaseModel):
+    """Outcome of fetching one page over plain HTTP in concurrent crawl mode."""
+
+    url: str
+    final_url: str
+    doc: Document | None = None
+    content_hash: int | None = None
+    links: list[str] = []
+    # Validators to remember for the next crawl
+    validators: PageValidators | None = None
+    # 304: the page is unchanged since the previous crawl
+    not_modified: bool = False
+    # The page has to be rendered with Playwright
+    needs_browser: bool = False
+    error: str | None = None
+
+
 WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
 # Threshold for determining when to replace vs append iframe content
 IFRAME_TEXT_LENGTH_THRESHOLD = 700
@@ -137,6 +171,11 @@ JAVASCRIPT_DISABLED_MESSAGE = "You have JavaScript disabled in your browser"
 # Grace period after page navigation to allow bot-detection challenges
 # and SPA content rendering to complete
 PAGE_RENDER_TIMEOUT_MS = 5000
+# Redirects followed by hand in concurrent crawl mode, so each hop is SSRF-checked
+WEB_CRAWL_MAX_REDIRECTS = 5
+# A page with scripts and less visible text than this is assumed to be a
+# client-rendered shell and is handed to Playwright
+JAVASCRIPT_SHELL_TEXT_THRESHOLD = 200
 
 
 class WEB_CONNECTOR_VALID_SETTINGS(str, Enum):
@@ -186,6 +225,12 @@ def protected_url_check(url: str) -> None:
             )
 
 
+def _looks_like_javascript_shell(has_scripts: bool, cleaned_text: str) -> bool:
+    if JAVASCRIPT_DISABLED_MESSAGE in cleaned_text:
+        return True
+    return has_scripts and len(cleaned_text.strip()) < JAVASCRIPT_SHELL_TEXT_THRESHOLD
+
+
 def check_internet_connection(url: str) -> None:
     # SSRF guard on the fetch primitive itself, so no call site can reach an
     # internal target. No-op unless SSRF protection is at its strictest level.
@@ -397,9 +442,13 @@ class WebConnector(LoadConnector, SlimConnector):
         batch_size: int = INDEX_BATCH_SIZE,
         scroll_before_scraping: bool = False,
         url_rewrites: list[UrlRewriteRule] | None = None,
+        # >1 fetches pages over plain HTTP on a worker pool, revalidating pages
+        # seen by the previous crawl, and only renders pages that need JS
+        crawl_concurrency: int = 1,
         **kwargs: Any,  # noqa: ARG002
     ) -> None:
         self.mintlify_cleanup = mintlify_cleanup
+        self.crawl_concurrency = max(1, int(crawl_concurrency))
         self.batch_size = batch_size
         self.recursive = False
         self.scroll_before_scraping = scroll_before_scraping
@@ -407,6 +456,20 @@ class WebConnector(LoadConnector, SlimConnector):
         # Config arrives as raw JSON (list[dict]); validate into rule models.
         rules = _URL_REWRITES_ADAPTER.validate_python(url_rewrites or [])
         self.url_rewrites = _parse_url_rewrites(rules)
+        # Anything that changes which pages are crawled or what their documents
+        # look like invalidates the crawl cache
+        self._crawl_config_hash = hashlib.sha256(
+            json.dumps(
+                {
+                    "base_url": base_url,
+                    "web_connector_type": web_connector_type,
+                    "mintlify_cleanup": mintlify_cleanup,
+                    "scroll_before_scraping": scroll_before_scraping,
+                    "url_rewrites": [rule.model_dump() for rule in rules],
+                },
+                sort_keys=True,
+            ).encode("utf-8")
+        ).hexdigest()[:32]
         if web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value:
             self.recursive = True
             self.to_visit_list = [_ensure_valid_url(base_url)]
@@ -676,6 +739,417 @@ class WebConnector(LoadConnector, SlimConnector):
 
         return result
 
+    def _scrape_with_retries(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        slim: bool,
+    ) -> Document | None:
+        """Scrapes a page with Playwright, retrying with exponential backoff."""
+        retry_count = 0
+
+        while retry_count < self.MAX_RETRIES:
+            if retry_count > 0:
+                # Add a random delay between retries (exponential backoff)
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    "Retry %s/%s for %s after %ss delay",
+                    retry_count,
+                    self.MAX_RETRIES,
+                    initial_url,
+                    format(delay, ".2f"),
+                )
+                time.sleep(delay)
+
+            try:
+                result = self._do_scrape(index, initial_url, session_ctx, slim=slim)
+                if result.retry:
+                    continue
+                return result.doc
+            except Exception as e:
+                session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
+                logger.exception(session_ctx.last_error)
+                session_ctx.initialize()
+                continue
+            finally:
+                retry_count += 1
+
+        return None
+
+    def _add_to_batch(
+        self,
+        doc: Document,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        batch: list[Document | SlimDocument | HierarchyNode],
+        slim: bool,
+    ) -> bool:
+        """Returns whether the document was added."""
+        if doc.id in session_ctx.emitted_doc_ids:
+            logger.warning(
+                "Skipping %s: rewritten document id %s was "
+                "already emitted by another URL this run",
+                initial_url,
+                doc.id,
+            )
+            return False
+        session_ctx.emitted_doc_ids.add(doc.id)
+        batch.append(SlimDocument(id=doc.id) if slim else doc)
+        return True
+
+    def _get_crawl_cache_settings(self, slim: bool) -> tuple[str | None, bool]:
+        """Returns the file id the crawl's validators are stored under (None if
+        they can't be stored) and whether the stored ones may be sent.
+
+        Validators are kept per cc-pair, search settings and connector config: a
+        304 means the page is skipped, which is only safe if the index the
+        documents go to already has the page as this config produced it.
+        From-beginning runs fetch everything.
+        """
+        index_attempt_id: int | None = None
+        if slim:
+            cc_pair_id = pruning_ctx.get().get("cc_pair_id")
+        else:
+            attempt_info = INDEX_ATTEMPT_INFO_CONTEXTVAR.get()
+            cc_pair_id, index_attempt_id = attempt_info or (None, None)
+        if cc_pair_id is None:
+            logger.info("Not crawling for a cc-pair, the crawl cache is not used")
+            return None, False
+
+        from_beginning = False
+        try:
+            with get_session_with_current_tenant() as db_session:
+                if index_attempt_id is None:
+                    search_settings_id = get_current_search_settings(db_session).id
+                else:
+                    index_attempt = get_index_attempt(db_session, index_attempt_id)
+                    if index_attempt is None:
+                        return None, False
+                    search_settings_id = index_attempt.search_settings_id
+                    from_beginning = index_attempt.from_beginning
+        except Exception:
+            logger.exception("Unable to look up search settings for the crawl cache")
+            return None, False
+
+        file_id = (
+            f"web_crawl_cache_{cc_pair_id}_{search_settings_id}_"
+            f"{self._crawl_config_hash}"
+        )
+        return file_id, not from_beginning
+
+    def _get_following_redirects(
+        self,
+        http_session: requests.Session,
+        url: str,
+        headers: dict[str, str],
+        throttle: HostThrottle,
+    ) -> requests.Response:
+        for _ in range(WEB_CRAWL_MAX_REDIRECTS + 1):
+            protected_url_check(url)
+            with throttle.slot(url):
+                response = http_session.get(
+                    url,
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT_SECONDS,
+                    allow_redirects=False,
+                )
+            if not response.is_redirect:
+                return response
+            url = urljoin(url, response.headers["location"])
+        raise RuntimeError(f"Too many redirects for {url}")
+
+    def _fetch_over_http(
+        self,
+        url: str,
+        base_url: str,
+        validators: PageValidators | None,
+        throttle: HostThrottle,
+        http_sessions: threading.local,
+        slim: bool,
+    ) -> HttpFetchResult:
+        """Fetches and parses one page without a browser. Runs on a worker thread,
+        so it only reports what it found and leaves crawl state to the caller.
+        """
+        result = HttpFetchResult(url=url, final_url=url)
+        try:
+            http_session = getattr(http_sessions, "session", None)
+            if http_session is None:
+                http_session = requests.Session()
+                http_session.headers.update(DEFAULT_HEADERS)
+                http_sessions.session = http_session
+
+            headers = validators.conditional_headers() if validators else {}
+            response: requests.Response | None = None
+            for retry_count in range(self.MAX_RETRIES):
+                if retry_count > 0:
+                    time.sleep(min(2**retry_count + random.uniform(0, 1), 10))
+                try:
+                    response = self._get_following_redirects(
+                        http_session, url, headers, throttle
+                    )
+                except ValueError as e:
+                    # SSRF check failed, retrying won't help
+                    result.error = f"Invalid URL {url} due to {e}"
+                    return result
+                except Exception as e:
+                    result.error = f"Failed to fetch '{url}': {e}"
+                    continue
+                if response.status_code == 429 or response.status_code >= 500:
+                    result.error = f"Skipped indexing {url} due to HTTP {response.status_code} response"
+                    continue
+                result.error = None
+                break
+
+            if response is None or result.error:
+                return result
+
+            if response.status_code == 304 and validators is not None:
+                result.not_modified = True
+                result.final_url = validators.final_url
+                result.links = validators.links
+                result.validators = validators
+                return result
+
+            result.final_url = response.url
+            if response.status_code == 403:
+                # Usually bot detection, which a real browser tends to get past
+                result.needs_browser = True
+                return result
+            if response.status_code >= 400:
+                result.error = f"Skipped indexing {url} due to HTTP {response.status_code} response"
+                return result
+
+            storage_url = _rewrite_url(result.final_url, self.url_rewrites)
+            if is_pdf_resource(result.final_url, response.headers.get("content-type")):
+                if slim:
+                    result.doc = Document(
+                        id=storage_url,
+                        sections=[],
+                        source=DocumentSource.WEB,
+                        semantic_identifier=storage_url,
+                        metadata={},
+                    )
+                else:
+                    page_text, metadata = extract_pdf_text(response.content)
+                    # doc_updated_at is left unset, see _do_scrape
+                    result.doc = Document(
+                        id=storage_url,
+                        sections=[TextSection(link=storage_url, text=page_text)],
+                        source=DocumentSource.WEB,
+                        semantic_identifier=storage_url.rstrip("/").split("/")[-1]
+                        or storage_url,
+                        metadata=metadata,
+                    )
+            else:
+                if self.scroll_before_scraping and not slim:
+                    result.needs_browser = True
+                    return result
+
+                soup = BeautifulSoup(response.content, "html.parser")
+                if self.recursive:
+                    result.links = sorted(
+                        get_internal_links(base_url, result.final_url, soup)
+                    )
+                has_scripts = soup.find("script") is not None
+                parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+                if _looks_like_javascript_shell(has_scripts, parsed_html.cleaned_text):
+                    # Rendered pages can change while the shell's validators
+                    # don't, so none are recorded for them
+                    result.needs_browser = True
+                    result.links = []
+                    return result
+
+                if slim:
+                    result.doc = Document(
+                        id=storage_url,
+                        sections=[],
+                        source=DocumentSource.WEB,
+                        semantic_identifier=storage_url,
+                        metadata={},
+                    )
+                else:
+                    result.content_hash = hash(
+                        (parsed_html.title, parsed_html.cleaned_text)
+                    )
+                    result.doc = Document(
+                        id=storage_url,
+                        sections=[
+                            TextSection(link=storage_url, text=parsed_html.cleaned_text)
+                        ],
+                        source=DocumentSource.WEB,
+                        semantic_identifier=parsed_html.title or storage_url,
+                        metadata={},
+                    )
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                result.validators = PageValidators(
+                    etag=etag,
+                    last_modified=last_modified,
+                    final_url=result.final_url,
+                    links=result.links,
+                    fetched_at=time.time(),
+                )
+        except Exception as e:
+            result.doc = None
+            result.error = f"Failed to fetch '{url}': {e}"
+        return result
+
+    def _load_concurrently(self, slim: bool) -> GenerateDocumentsOutput:
+        """Concurrent crawl mode: pages are fetched over plain HTTP on a pool of
+        crawl_concurrency workers, politely per host, and de-duplicated by
+        normalized URL. Pages seen by the previous crawl are revalidated with
+        If-None-Match/If-Modified-Since; a 304 skips the page (slim runs still
+        report it). Only pages that need JavaScript are rendered with Playwright,
+        one at a time on this thread, since the sync Playwright API is not
+        thread-safe.
+        """
+        base_url = self.to_visit_list[0]
+        check_internet_connection(base_url)
+
+        session_ctx = ScrapeSessionContext(base_url, [], self.url_rewrites)
+        cache_file_id, use_validators = self._get_crawl_cache_settings(slim)
+        previous_validators = (
+            load_page_validators(cache_file_id)
+            if cache_file_id and use_validators
+            else {}
+        )
+        # Validators are only kept once the page's document has been handed
+        # off, so an interrupted crawl never skips pages it didn't deliver
+        crawl_validators: dict[str, PageValidators] = {}
+        batch_validators: dict[str, PageValidators] = {}
+
+        frontier = CrawlFrontier(self.to_visit_list)
+        throttle = HostThrottle()
+        http_sessions = threading.local()
+        in_flight: dict[Future[HttpFetchResult], str] = {}
+        batch: list[Document | SlimDocument | HierarchyNode] = []
+        unchanged_pages = 0
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.crawl_concurrency, thread_name_prefix="web_crawl"
+            ) as executor:
+                while frontier or in_flight:
+                    while frontier and len(in_flight) < self.crawl_concurrency:
+                        url = frontier.pop()
+                        session_ctx.visited_links.add(url)
+                        # Workers need the tenant for the SSRF settings lookup
+                        future = submit_with_context(
+                            executor,
+                            self._fetch_over_http,
+                            url,
+                            base_url,
+                            previous_validators.get(url),
+                            throttle,
+                            http_sessions,
+                            slim,
+                        )
+                        in_flight[future] = url
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url = in_flight.pop(future)
+                        result = future.result()
+                        index = len(session_ctx.visited_links)
+
+                        if result.error:
+                            session_ctx.last_error = result.error
+                            logger.warning(result.error)
+                            continue
+
+                        if normalize_url(result.final_url) != normalize_url(url):
+                            if not frontier.mark_seen(result.final_url):
+                                logger.info(
+                                    "%s: %s redirected to %s - already indexed",
+                                    index,
+                                    url,
+                                    result.final_url,
+                                )
+                                continue
+                            session_ctx.visited_links.add(result.final_url)
+
+                        for link in result.links:
+                            frontier.add(link)
+
+                        if result.not_modified:
+                            logger.info("%s: %s not modified", index, url)
+                            if result.validators:
+                                crawl_validators[url] = result.validators
+                            if slim:
+                                self._add_to_batch(
+                                    Document(
+                                        id=_rewrite_url(
+                                            result.final_url, self.url_rewrites
+                                        ),
+                                        sections=[],
+                                        source=DocumentSource.WEB,
+                                        semantic_identifier=result.final_url,
+                                        metadata={},
+                                    ),
+                                    url,
+                                    session_ctx,
+                                    batch,
+                                    slim,
+                                )
+                            else:
+                                unchanged_pages += 1
+                            continue
+
+                        doc = result.doc
+                        if result.needs_browser:
+                            logger.info("%s: Rendering %s in a browser", index, url)
+                            if session_ctx.playwright is None:
+                                session_ctx.initialize()
+                            doc = self._scrape_with_retries(
+                                index, url, session_ctx, slim
+                            )
+                            while session_ctx.to_visit:
+                                frontier.add(session_ctx.to_visit.pop())
+                        elif result.content_hash is not None:
+                            # Sometimes pages with #! will serve duplicate content
+                            if result.content_hash in session_ctx.content_hashes:
+                                logger.info(
+                                    "%s: Skipping duplicate title + content for %s",
+                                    index,
+                                    url,
+                                )
+                                continue
+                            session_ctx.content_hashes.add(result.content_hash)
+
+                        if (
+                            doc
+                            and self._add_to_batch(doc, url, session_ctx, batch, slim)
+                            and result.validators
+                        ):
+                            batch_validators[url] = result.validators
+
+                    if len(batch) >= self.batch_size:
+                        session_ctx.at_least_one_doc = True
+                        yield batch  # ty: ignore[invalid-yield]
+                        batch = []
+                        crawl_validators.update(batch_validators)
+                        batch_validators = {}
+        finally:
+            session_ctx.stop()
+
+        if batch:
+            session_ctx.at_least_one_doc = True
+            yield batch  # ty: ignore[invalid-yield]
+            crawl_validators.update(batch_validators)
+
+        # Slim runs don't index what they fetch, so their validators would let
+        # the next indexing run skip changed pages
+        if cache_file_id and not slim:
+            save_page_validators(cache_file_id, crawl_validators)
+
+        if not session_ctx.at_least_one_doc and not unchanged_pages:
+            if session_ctx.last_error:
+                raise RuntimeError(session_ctx.last_error)
+            raise RuntimeError("No valid pages found.")
+
     def load_from_state(self, slim: bool = False) -> GenerateDocumentsOutput:
         """Traverses through all pages found on the website and converts them into
         documents.
@@ -687,6 +1161,10 @@ class WebConnector(LoadConnector, SlimConnector):
         if not self.to_visit_list:
             raise ValueError("No URLs to visit")
 
+        if self.crawl_concurrency > 1:
+            yield from self._load_concurrently(slim)
+            return
+
         base_url = self.to_visit_list[0]  # For the recursive case
         check_internet_connection(base_url)  # make sure we can connect to the base url
 
@@ -715,51 +1193,9 @@ class WebConnector(LoadConnector, SlimConnector):
                 "%s: %s %s", index, "Slim-visiting" if slim else "Visiting", initial_url
             )
 
-            # Add retry mechanism with exponential backoff
-            retry_count = 0
-
-            while retry_count < self.MAX_RETRIES:
-                if retry_count > 0:
-                    # Add a random delay between retries (exponential backoff)
-                    delay = min(2**retry_count + random.uniform(0, 1), 10)
-                    logger.info(
-                        "Retry %s/%s for %s after %ss delay",
-                        retry_count,
-                        self.MAX_RETRIES,
-                        initial_url,
-                        format(delay, ".2f"),
-                    )
-                    time.sleep(delay)
-
-                try:
-                    result = self._do_scrape(index, initial_url, session_ctx, slim=slim)
-                    if result.retry:
-                        continue
-
-                    if result.doc:
-                        if result.doc.id in session_ctx.emitted_doc_ids:
-                            logger.warning(
-                                "Skipping %s: rewritten document id %s was "
-                                "already emitted by another URL this run",
-                                initial_url,
-                                result.doc.id,
-                            )
-                            # Skip-and-move-on, not a transient failure: don't
-                            # burn the remaining retries re-scraping this URL.
-                            break
-                        session_ctx.emitted_doc_ids.add(result.doc.id)
-                        batch.append(
-                            SlimDocument(id=result.doc.id) if slim else result.doc
-                        )
-                except Exception as e:
-                    session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
-                    logger.exception(session_ctx.last_error)
-                    session_ctx.initialize()
-                    continue
-                finally:
-                    retry_count += 1
-
-                break  # success / don't retry
+            doc = self._scrape_with_retries(index, initial_url, session_ctx, slim)
+            if doc:
+                self._add_to_batch(doc, initial_url, session_ctx, batch, slim)
 
             if len(batch) >= self.batch_size:
                 session_ctx.initialize()
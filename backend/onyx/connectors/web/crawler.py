@@ -0,0 +1,223 @@
+"""Building blocks for the web connector's concurrent crawl mode.
+
+The crawl itself lives in WebConnector; this module holds the pieces that do not
+depend on how a page is scraped: URL normalization, the de-duplicating
+frontier, per-host politeness limits, and the ETag/Last-Modified validators
+persisted between crawls so unchanged pages can be revalidated with a 304.
+"""
+
+import gzip
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from io import BytesIO
+from urllib.parse import urlparse, urlunparse
+
+from pydantic import BaseModel
+
+from onyx.configs.constants import FileOrigin
+from onyx.file_store.file_store import get_default_file_store
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Concurrent requests allowed against a single host
+WEB_CRAWL_MAX_REQUESTS_PER_HOST = 4
+# Minimum spacing between the starts of two requests to the same host
+WEB_CRAWL_MIN_REQUEST_INTERVAL_SECONDS = 0.1
+# Validators older than this are not sent, so every page is re-downloaded
+# (and re-yielded) at least this often even if the server keeps answering 304
+WEB_CRAWL_VALIDATOR_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used to de-duplicate the frontier.
+
+    Scheme and host are case-insensitive and default ports are implied. The
+    fragment is dropped unless it is a hashbang route ("#!"), which selects
+    different content on client-routed sites.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    if port is not None and _DEFAULT_PORTS.get(scheme) == port:
+        netloc = netloc.rsplit(":", 1)[0]
+    fragment = parsed.fragment if parsed.fragment.startswith("!") else ""
+    return urlunparse(
+        (scheme, netloc, parsed.path or "/", parsed.params, parsed.query, fragment)
+    )
+
+
+class CrawlFrontier:
+    """FIFO of URLs still to fetch; each normalized URL is handed out once.
+
+    Only touched from the thread driving the crawl, so it is not locked.
+    """
+
+    def __init__(self, seeds: Iterable[str] = ()) -> None:
+        self._queue: deque[str] = deque()
+        self._seen: set[str] = set()
+        for url in seeds:
+            self.add(url)
+
+    def add(self, url: str) -> bool:
+        normalized = normalize_url(url)
+        if normalized in self._seen:
+            return False
+        self._seen.add(normalized)
+        self._queue.append(url)
+        return True
+
+    def mark_seen(self, url: str) -> bool:
+        """Records a URL reached some other way (e.g. as a redirect target).
+
+        Returns False if it was already seen.
+        """
+        normalized = normalize_url(url)
+        if normalized in self._seen:
+            return False
+        self._seen.add(normalized)
+        return True
+
+    def pop(self) -> str:
+        return self._queue.popleft()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+class HostThrottle:
+    """Caps concurrent requests per host and spaces out their starts."""
+
+    def __init__(
+        self,
+        max_requests_per_host: int = WEB_CRAWL_MAX_REQUESTS_PER_HOST,
+        min_interval_seconds: float = WEB_CRAWL_MIN_REQUEST_INTERVAL_SECONDS,
+    ) -> None:
+        self._max_requests_per_host = max_requests_per_host
+        self._min_interval_seconds = min_interval_seconds
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                host, threading.BoundedSemaphore(self._max_requests_per_host)
+            )
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self._min_interval_seconds
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class PageValidators(BaseModel):
+    """What a crawl remembers about a page to revalidate it next time."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+    # Where the URL redirected to, which is what the document is stored under
+    final_url: str
+    # Same-site links found on the page, to keep crawling past a 304
+    links: list[str] = []
+    fetched_at: float
+
+    def conditional_headers(self) -> dict[str, str]:
+        if time.time() - self.fetched_at > WEB_CRAWL_VALIDATOR_MAX_AGE_SECONDS:
+            return {}
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class _StoredPage(BaseModel):
+    etag: str | None
+    last_modified: str | None
+    final_url: str
+    # Indices into _StoredValidators.links; navigation links repeat on
+    # nearly every page, so they are stored once
+    link_ids: list[int]
+    fetched_at: float
+
+
+class _StoredValidators(BaseModel):
+    links: list[str]
+    pages: dict[str, _StoredPage]
+
+
+def load_page_validators(file_id: str) -> dict[str, PageValidators]:
+    """Validators saved by the previous crawl, keyed by requested URL.
+
+    Anything unreadable is treated as no validators, i.e. a full crawl.
+    """
+    file_store = get_default_file_store()
+    try:
+        if not file_store.has_file(
+            file_id=file_id,
+            file_origin=FileOrigin.CONNECTOR,
+            file_type="application/gzip",
+        ):
+            return {}
+        with file_store.read_file(file_id, mode="b") as f:
+            stored = _StoredValidators.model_validate_json(gzip.decompress(f.read()))
+    except Exception:
+        logger.exception("Failed to load web crawl validators %s", file_id)
+        return {}
+
+    return {
+        url: PageValidators(
+            etag=page.etag,
+            last_modified=page.last_modified,
+            final_url=page.final_url,
+            links=[stored.links[link_id] for link_id in page.link_ids],
+            fetched_at=page.fetched_at,
+        )
+        for url, page in stored.pages.items()
+    }
+
+
+def save_page_validators(
+    file_id: str, validators_by_url: dict[str, PageValidators]
+) -> None:
+    link_ids: dict[str, int] = {}
+    pages = {
+        url: _StoredPage(
+            etag=validators.etag,
+            last_modified=validators.last_modified,
+            final_url=validators.final_url,
+            link_ids=[
+                link_ids.setdefault(link, len(link_ids)) for link in validators.links
+            ],
+            fetched_at=validators.fetched_at,
+        )
+        for url, validators in validators_by_url.items()
+    }
+    stored = _StoredValidators(links=list(link_ids), pages=pages)
+    try:
+        get_default_file_store().save_file(
+            content=BytesIO(gzip.compress(stored.model_dump_json().encode("utf-8"))),
+            display_name=file_id,
+            file_origin=FileOrigin.CONNECTOR,
+            file_type="application/gzip",
+            file_id=file_id,
+        )
+    except Exception:
+        # Only costs the next crawl its 304s
+        logger.exception("Failed to save web crawl validators %s", file_id)
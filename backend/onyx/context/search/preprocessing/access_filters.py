@@ -1,13 +1,27 @@
 from sqlalchemy.orm import Session
 
 from onyx.access.access import get_acl_for_user
+from onyx.access.acl_cache import cache_user_acl, get_cached_user_acl
 from onyx.context.search.models import IndexFilters
 from onyx.db.models import User
+from onyx.utils.variable_functionality import global_version
 
 
 def build_access_filters_for_user(user: User, session: Session) -> list[str]:
-    user_acl = get_acl_for_user(user, session)
-    return list(user_acl)
+    """The user's ACL, sorted so identical ACLs build identical index queries.
+
+    Only the EE ACL needs the database (group memberships), so only it is cached.
+    """
+    if user.is_anonymous or not global_version.is_ee_version():
+        return sorted(get_acl_for_user(user, session))
+
+    lookup = get_cached_user_acl(user.id)
+    if lookup.acl is not None:
+        return lookup.acl
+
+    user_acl = sorted(get_acl_for_user(user, session))
+    cache_user_acl(user.id, user_acl, lookup.generation)
+    return user_acl
 
 
 def build_user_only_filters(user: User, db_session: Session) -> IndexFilters:
@@ -19,7 +19,10 @@ from onyx.federated_connectors.federated_retrieval import (
 )
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
-from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import (
+    SEARCH_IO_EXECUTOR,
+    run_functions_tuples_in_parallel,
+)
 
 logger = setup_logger()
 
@@ -150,7 +153,9 @@ def search_chunks(
                 )
             )
 
-    parallel_search_results = run_functions_tuples_in_parallel(run_queries)
+    parallel_search_results = run_functions_tuples_in_parallel(
+        run_queries, executor_name=SEARCH_IO_EXECUTOR
+    )
     top_chunks = combine_retrieval_results(parallel_search_results)
 
     if not top_chunks:
@@ -133,6 +133,35 @@ def document_has_indexable_cc_pair(db_session: Session, document_id: str) -> boo
     )
 
 
+def filter_document_ids_with_indexable_cc_pair(
+    db_session: Session, document_ids: list[str]
+) -> set[str]:
+    """Bulk form of document_has_indexable_cc_pair: the subset of document_ids
+    owned by at least one indexable cc_pair."""
+    if not document_ids:
+        return set()
+    return set(
+        db_session.scalars(
+            select(distinct(DocumentByConnectorCredentialPair.id))
+            .join(
+                ConnectorCredentialPair,
+                and_(
+                    DocumentByConnectorCredentialPair.connector_id
+                    == ConnectorCredentialPair.connector_id,
+                    DocumentByConnectorCredentialPair.credential_id
+                    == ConnectorCredentialPair.credential_id,
+                ),
+            )
+            .where(
+                DocumentByConnectorCredentialPair.id.in_(document_ids),
+                ConnectorCredentialPair.status.in_(
+                    ConnectorCredentialPairStatus.indexable_statuses()
+                ),
+            )
+        ).all()
+    )
+
+
 def count_secondary_only_sync_pending_documents_for_cc_pairs(
     db_session: Session, cc_pair_ids: list[int]
 ) -> int:
@@ -1129,6 +1158,53 @@ def mark_document_synced_secondary_pending(
     db_session.commit()
 
 
+def _mark_documents_synced(
+    document_id_to_synced_as_of: dict[str, datetime | None],
+    db_session: Session,
+    secondary_only_sync_pending: bool,
+) -> None:
+    if not document_id_to_synced_as_of:
+        return
+    now = datetime.now(timezone.utc)
+    # ORM bulk UPDATE by primary key; one executemany round trip for the batch.
+    # Ids that no longer exist are simply not matched.
+    db_session.execute(
+        update(DbDocument),
+        [
+            {
+                "id": document_id,
+                "last_synced": synced_as_of if synced_as_of is not None else now,
+                "secondary_only_sync_pending": secondary_only_sync_pending,
+            }
+            for document_id, synced_as_of in document_id_to_synced_as_of.items()
+        ],
+    )
+    db_session.commit()
+
+
+def mark_documents_as_synced(
+    document_id_to_synced_as_of: dict[str, datetime | None],
+    db_session: Session,
+) -> None:
+    """Bulk form of mark_document_as_synced, with a watermark per document.
+    Unlike the single-document form, missing documents are skipped rather than
+    raising, since a batch may race with document deletion."""
+    _mark_documents_synced(
+        document_id_to_synced_as_of, db_session, secondary_only_sync_pending=False
+    )
+
+
+def mark_documents_synced_secondary_pending(
+    document_id_to_synced_as_of: dict[str, datetime | None],
+    db_session: Session,
+) -> None:
+    """Bulk form of mark_document_synced_secondary_pending. See
+    mark_documents_as_synced."""
+    _mark_documents_synced(
+        document_id_to_synced_as_of, db_session, secondary_only_sync_pending=True
+    )
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
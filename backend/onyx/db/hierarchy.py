@@ -1,9 +1,11 @@
 """CRUD operations for HierarchyNode."""
 
 from collections import defaultdict
+from typing import NamedTuple
 from uuid import UUID
 
-from sqlalchemy import delete, select
+from sqlalchemy import Integer, cast, delete, func, select, update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.engine import CursorResult
 from sqlalchemy.exc import IntegrityError
@@ -40,6 +42,59 @@ def _get_source_display_name(source: DocumentSource) -> str:
     return source.value.replace("_", " ").title()
 
 
+def _ancestor_ids_below(parent: HierarchyNode) -> list[int] | None:
+    """Materialized path of a child of ``parent``, or None if the parent's own
+    path is unknown or the child would close a cycle."""
+    if parent.ancestor_ids is None:
+        return None
+    return [parent.id, *parent.ancestor_ids]
+
+
+def _set_ancestor_ids(
+    db_session: Session,
+    node: HierarchyNode,
+    ancestor_ids: list[int] | None,
+) -> None:
+    """Set ``node``'s materialized path and re-root its descendants' paths.
+
+    Descendants are found through the path itself (GIN-indexed), so a move
+    costs one UPDATE however deep the subtree is.
+    """
+    if node.id is not None and ancestor_ids is not None and node.id in ancestor_ids:
+        logger.warning(
+            "Cycle detected in hierarchy for source=%s at node id=%s; "
+            "clearing its materialized ancestor path.",
+            node.source,
+            node.id,
+        )
+        ancestor_ids = None
+
+    previous_ancestor_ids = node.ancestor_ids
+    node.ancestor_ids = ancestor_ids
+    if node.id is None or previous_ancestor_ids == ancestor_ids:
+        return
+
+    db_session.flush()
+    if ancestor_ids is None:
+        new_descendant_ancestor_ids = None
+    else:
+        new_descendant_ancestor_ids = func.array_cat(
+            HierarchyNode.ancestor_ids[
+                1 : func.array_position(HierarchyNode.ancestor_ids, node.id)
+            ],
+            cast(ancestor_ids, postgresql.ARRAY(Integer)),
+        )
+    db_session.execute(
+        update(HierarchyNode)
+        .where(
+            HierarchyNode.source == node.source,
+            HierarchyNode.ancestor_ids.contains([node.id]),
+        )
+        .values(ancestor_ids=new_descendant_ancestor_ids)
+        .execution_options(synchronize_session="fetch")
+    )
+
+
 def get_hierarchy_node_by_raw_id(
     db_session: Session,
     raw_node_id: str,
@@ -117,6 +172,7 @@ def ensure_source_node_exists(
         node_type=HierarchyNodeType.SOURCE,
         document_id=None,
         parent_id=None,  # SOURCE nodes have no parent
+        ancestor_ids=[],
         is_public=True,
     )
 
@@ -166,6 +222,7 @@ def _create_stub_hierarchy_node(
         source=source,
         node_type=HierarchyNodeType.STUB,
         parent_id=source_node_id,
+        ancestor_ids=[source_node_id],
         is_public=False,
     )
     db_session.add(stub)
@@ -277,21 +334,26 @@ def upsert_hierarchy_node(
             detect and replace the fallback with a STUB for missing cross-batch parents.
     """
     ret: list[HierarchyNode] = []
+    ancestor_ids: list[int] | None
     if node.node_type == HierarchyNodeType.SOURCE:
         parent_id: int | None = None
+        ancestor_ids = []
     elif node.raw_parent_id is None:
         parent_id = source_node_id
+        ancestor_ids = [source_node_id]
     else:
         parent_node = get_hierarchy_node_by_raw_id(
             db_session, node.raw_parent_id, source
         )
         if parent_node is not None:
             parent_id = parent_node.id
+            ancestor_ids = _ancestor_ids_below(parent_node)
         else:
             stub = _create_stub_hierarchy_node(
                 db_session, node.raw_parent_id, source, source_node_id
             )
             parent_id = stub.id
+            ancestor_ids = _ancestor_ids_below(stub)
             ret.append(stub)
 
     # For public connectors, all nodes are public
@@ -326,6 +388,7 @@ def upsert_hierarchy_node(
         existing_node.link = node.link
         existing_node.node_type = node.node_type
         existing_node.parent_id = parent_id
+        _set_ancestor_ids(db_session, existing_node, ancestor_ids)
         if is_connector_public or node.external_access is not None:
             existing_node.is_public = is_public
             existing_node.external_user_emails = external_user_emails
@@ -340,6 +403,7 @@ def upsert_hierarchy_node(
             source=source,
             node_type=node.node_type,
             parent_id=parent_id,
+            ancestor_ids=ancestor_ids,
             is_public=is_public,
             external_user_emails=external_user_emails,
             external_user_group_ids=external_user_group_ids,
@@ -788,6 +852,62 @@ def update_hierarchy_node_permissions(
     return True
 
 
+class HierarchyNodePermissions(NamedTuple):
+    is_public: bool
+    external_user_emails: list[str] | None
+    external_user_group_ids: list[str] | None
+
+
+def update_hierarchy_node_permissions_batch(
+    db_session: Session,
+    source: DocumentSource,
+    node_permissions: dict[str, HierarchyNodePermissions],
+) -> tuple[int, int]:
+    """Batched update_hierarchy_node_permissions, keyed by raw node id.
+
+    Nodes whose permissions already match are not written. Commits.
+
+    Returns:
+        (number of nodes updated, number of nodes already up to date)
+    """
+    if not node_permissions:
+        return 0, 0
+
+    nodes = db_session.scalars(
+        select(HierarchyNode).where(
+            HierarchyNode.source == source,
+            HierarchyNode.raw_node_id.in_(list(node_permissions)),
+        )
+    ).all()
+
+    num_missing = len(node_permissions) - len(nodes)
+    if num_missing:
+        logger.warning(
+            "%s hierarchy nodes not found for permission update: source=%s",
+            num_missing,
+            source,
+        )
+
+    num_updated = 0
+    for node in nodes:
+        permissions = node_permissions[node.raw_node_id]
+        if (
+            node.is_public == permissions.is_public
+            and set(node.external_user_emails or [])
+            == set(permissions.external_user_emails or [])
+            and set(node.external_user_group_ids or [])
+            == set(permissions.external_user_group_ids or [])
+        ):
+            continue
+        node.is_public = permissions.is_public
+        node.external_user_emails = permissions.external_user_emails
+        node.external_user_group_ids = permissions.external_user_group_ids
+        num_updated += 1
+
+    db_session.commit()
+    return num_updated, len(nodes) - num_updated
+
+
 def upsert_hierarchy_node_cc_pair_entries(
     db_session: Session,
     hierarchy_node_ids: list[int],
@@ -967,6 +1087,7 @@ def reparent_orphaned_hierarchy_nodes(
 
     for node in orphans:
         node.parent_id = source_node.id
+        _set_ancestor_ids(db_session, node, [source_node.id])
 
     if commit:
         db_session.commit()
@@ -45,12 +45,14 @@ from sqlalchemy.orm import (
     Mapped,
     Mapper,
     mapped_column,
+    object_session,
     relationship,
     validates,
 )
 from sqlalchemy.types import LargeBinary, TypeDecorator
 from typing_extensions import TypedDict  # noreorder
 
+from onyx.access.acl_cache import invalidate_user_acl_cache_on_commit
 from onyx.auth.schemas import UserRole
 from onyx.configs.constants import (
     ANONYMOUS_USER_UUID,
@@ -1060,6 +1062,13 @@ class HierarchyNode(Base):
     parent_id: Mapped[int | None] = mapped_column(
         ForeignKey("hierarchy_node.id", ondelete="SET NULL"), nullable=True, index=True
     )
+    # Materialized path: ancestor ids from the parent up to the root, so
+    # resolving ancestors is one read instead of one per level. Kept in step
+    # with parent_id by onyx.db.hierarchy. NULL when it could not be derived
+    # (e.g. a cycle); readers then walk parent_id instead.
+    ancestor_ids: Mapped[list[int] | None] = mapped_column(
+        postgresql.ARRAY(Integer), nullable=True
+    )
 
     # Relationships
     document: Mapped["Document | None"] = relationship(
@@ -1091,6 +1100,8 @@ class HierarchyNode(Base):
             "raw_node_id", "source", name="uq_hierarchy_node_raw_id_source"
         ),
         Index("ix_hierarchy_node_source_type", source, node_type),
+        # Finds the descendants of a node when its path changes
+        Index("ix_hierarchy_node_ancestor_ids", ancestor_ids, postgresql_using="gin"),
     )
 
 
@@ -4666,11 +4677,12 @@ class KVStore(Base):
 
 def _release_prior_email_claim(
     email: str, connection: Connection, *, user_id: UUID | None = None
-) -> None:
+) -> bool:
     """Revoke the alias grant when a different identity takes the address.
 
     A prior address keeps granting its former holder access, so it has to stop
-    the moment it legitimately belongs to someone else.
+    the moment it legitimately belongs to someone else. Returns whether any
+    user lost the alias.
     """
     normalized_email = email.lower()
     release = (
@@ -4681,7 +4693,14 @@ def _release_prior_email_claim(
     if user_id is not None:
         release = release.where(User.id != user_id)  # ty: ignore[invalid-argument-type]
 
-    connection.execute(release)
+    return bool(connection.execute(release).rowcount)
+
+
+def _invalidate_released_alias_acls(target: User) -> None:
+    # The former holder's cached ACL still grants the released alias
+    db_session = object_session(target)
+    if db_session is not None:
+        invalidate_user_acl_cache_on_commit(db_session)
 
 
 # Claiming an address anywhere revokes it as anyone else's alias.
@@ -4691,7 +4710,8 @@ def _release_inserted_user_email(
     connection: Connection,
     target: User,
 ) -> None:
-    _release_prior_email_claim(target.email, connection)
+    if _release_prior_email_claim(target.email, connection):
+        _invalidate_released_alias_acls(target)
 
 
 @event.listens_for(User, "before_update")
@@ -4700,8 +4720,10 @@ def _release_updated_user_email(
     connection: Connection,
     target: User,
 ) -> None:
-    if inspect(target).attrs.email.history.has_changes():
+    if inspect(target).attrs.email.history.has_changes() and (
         _release_prior_email_claim(target.email, connection, user_id=target.id)
+    ):
+        _invalidate_released_alias_acls(target)
 
 
 class EncryptedKeyValueStore(Base):
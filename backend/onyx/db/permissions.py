@@ -14,6 +14,7 @@ from uuid import UUID
 from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
+from onyx.access.acl_cache import invalidate_user_acl_cache_on_commit
 from onyx.db.enums import AccountType, Permission
 from onyx.db.models import PermissionGrant, User, User__UserGroup
 from onyx.utils.logger import setup_logger
@@ -62,7 +63,8 @@ def recompute_user_permissions__no_commit(
     Stores only directly granted permissions — implication expansion
     happens at read time via get_effective_permissions().
 
-    Also refreshes the cached ``is_group_manager`` flag in the same write.
+    Also refreshes the cached ``is_group_manager`` flag in the same write, and
+    invalidates the ACL cache on commit since group memberships changed.
 
     Does NOT commit — caller must commit the session.
     """
@@ -74,6 +76,8 @@ def recompute_user_permissions__no_commit(
     if not raw_ids:
         return
 
+    invalidate_user_acl_cache_on_commit(db_session)
+
     # Normalize up front: the lookups below key on str(id), so a valid but non-canonical
     # string ("6F89..." / unhyphenated) would miss them even though Postgres matches it.
     uid_list: list[UUID] = [
@@ -13,6 +13,7 @@ from sqlalchemy.sql import expression
 from sqlalchemy.sql.elements import ColumnElement, KeyedColumnElement
 from sqlalchemy.sql.expression import or_
 
+from onyx.access.acl_cache import invalidate_user_acl_cache_on_commit
 from onyx.auth.invited_users import remove_user_from_invited_users
 from onyx.configs.constants import (
     ANONYMOUS_USER_EMAIL,
@@ -642,6 +643,7 @@ def reconcile_user_email__no_commit(
         )
         db_session.delete(shadow_user)
         db_session.flush()
+        invalidate_user_acl_cache_on_commit(db_session)
         logger.info(
             "Merged external-permission shadow user %s into user %s",
             shadow_user.id,
@@ -657,6 +659,7 @@ def reconcile_user_email__no_commit(
 
     user.email = normalized_new_email
     user.prior_emails = prior_emails
+    invalidate_user_acl_cache_on_commit(db_session)
     db_session.execute(
         update(MCPServer)
         .where(MCPServer.owner == old_email)
@@ -0,0 +1,117 @@
+"""In-process BM25 inverted index used by the embedded document index.
+
+Chunks are addressed by integer slot, the same slot that addresses their row in
+the vector blocks and filter columns, so scoring returns a dense array that can
+be combined directly with vector scores and filter masks.
+"""
+
+import re
+
+import numpy as np
+
+# Standard Okapi BM25 parameters, matching the Lucene defaults OpenSearch uses.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens. Deliberately simple; there is no stemming or
+    stopword removal, the IDF term handles very common words well enough for
+    the deployments this index targets."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Term -> {slot: term frequency} postings plus per-slot document lengths.
+
+    Not thread safe, callers are expected to hold the owning store's lock.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[int, int]] = {}
+        # Needed to remove a slot's postings without scanning every term.
+        self._slot_terms: dict[int, list[str]] = {}
+        self._slot_lengths: dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_lengths)
+
+    def add(self, slot: int, text: str) -> None:
+        if slot in self._slot_lengths:
+            self.remove(slot)
+
+        tokens = tokenize(text)
+        term_frequencies: dict[str, int] = {}
+        for token in tokens:
+            term_frequencies[token] = term_frequencies.get(token, 0) + 1
+
+        for term, frequency in term_frequencies.items():
+            self._postings.setdefault(term, {})[slot] = frequency
+        self._slot_terms[slot] = list(term_frequencies)
+        self._slot_lengths[slot] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, slot: int) -> None:
+        terms = self._slot_terms.pop(slot, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(slot, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._slot_lengths.pop(slot)
+
+    def score(self, query: str, num_slots: int) -> np.ndarray:
+        """Scores every slot against the query.
+
+        Args:
+            query: Raw query text, tokenized the same way as indexed text.
+            num_slots: Length of the returned array; slots at or beyond this
+                value are ignored.
+
+        Returns:
+            A float32 array of length num_slots. Slots that match no query term
+                score exactly 0.
+        """
+        scores = np.zeros(num_slots, dtype=np.float32)
+        num_docs = len(self._slot_lengths)
+        if num_docs == 0 or num_slots == 0:
+            return scores
+
+        average_length = self._total_length / num_docs or 1.0
+        # Duplicate query terms should not count twice.
+        for term in dict.fromkeys(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            frequencies = np.fromiter(
+                postings.values(), dtype=np.float32, count=len(postings)
+            )
+            lengths = np.fromiter(
+                (self._slot_lengths[slot] for slot in postings),
+                dtype=np.float32,
+                count=len(postings),
+            )
+            in_range = slots < num_slots
+            slots, frequencies, lengths = (
+                slots[in_range],
+                frequencies[in_range],
+                lengths[in_range],
+            )
+
+            document_frequency = len(postings)
+            idf = np.log(
+                1.0 + (num_docs - document_frequency + 0.5) / (document_frequency + 0.5)
+            )
+            normalization = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / average_length)
+            scores[slots] += (
+                idf * frequencies * (BM25_K1 + 1.0) / (frequencies + normalization)
+            )
+        return scores
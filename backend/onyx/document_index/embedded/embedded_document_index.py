@@ -0,0 +1,1331 @@
+"""An in-process DocumentIndex backed by local files.
+
+Intended for single-node deployments and for tests/benchmarks that should not
+need a running Vespa or OpenSearch cluster. Data layout per index:
+
+- content_vectors.f32 / title_vectors.f32: memory-mapped float32 vector blocks,
+  one row per chunk slot.
+- oplog.jsonl: append-only log of chunk records (everything except vectors),
+  replayed on startup and compacted when it grows too far past the live data.
+- meta.json: the embedding dimension the index was created with.
+- .lock: flock target shared by every process that opens the index.
+
+On load the log is replayed into an in-memory BM25 inverted index and a set of
+filter columns (numpy arrays for flags and timestamps, slot sets for ACL,
+document set and other term filters), so filtering is a handful of vectorized
+mask operations rather than a per-chunk scan.
+
+Every process that opens the index (the API server and each background worker)
+keeps its own in-memory copy. Before each operation it takes the directory's
+file lock and applies the log entries written by the others since it last
+looked, so documents indexed by a worker are searchable from the API server.
+The directory has to be on a local disk: flock is not reliable over network
+filesystems, so this does not extend to several nodes.
+
+Filter semantics follow document_index/FILTER_SEMANTICS.md (the OpenSearch
+behavior).
+"""
+
+import json
+import os
+import re
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel
+
+from onyx.access.models import DocumentAccess
+from onyx.configs.constants import INDEX_SEPARATOR, PUBLIC_DOC_PAT, DocumentSource
+from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
+    get_experts_stores_representations,
+)
+from onyx.connectors.models import convert_metadata_list_of_strings_to_dict
+from onyx.context.search.enums import QueryType
+from onyx.context.search.models import (
+    IndexFilters,
+    InferenceChunk,
+    InferenceChunkUncleaned,
+    TimeRange,
+)
+from onyx.db.enums import EmbeddingPrecision
+from onyx.document_index.chunk_content_enrichment import (
+    cleanup_content_for_chunks,
+    generate_enriched_content_for_chunk_text,
+)
+from onyx.document_index.embedded.bm25 import BM25Index, tokenize
+from onyx.document_index.embedded.storage import (
+    IndexFileLock,
+    OperationLog,
+    VectorBlock,
+)
+from onyx.document_index.interfaces_new import (
+    DocumentIndex,
+    DocumentInsertionRecord,
+    DocumentSectionRequest,
+    IndexingMetadata,
+    MetadataUpdateRequest,
+    TenantState,
+)
+from onyx.document_index.opensearch.constants import (
+    ASSUMED_DOCUMENT_AGE_DAYS,
+    DEFAULT_MAX_CHUNK_SIZE,
+    DEFAULT_NUM_HYBRID_SUBQUERY_CANDIDATES,
+)
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.utils.datetime import datetime_to_utc
+from onyx.utils.logger import setup_logger
+from onyx.utils.text_processing import remove_invalid_unicode_chars
+from shared_configs.model_server_models import Embedding, embedding_to_list
+
+logger = setup_logger(__name__)
+
+
+CONTENT_VECTORS_FILE_NAME = "content_vectors.f32"
+TITLE_VECTORS_FILE_NAME = "title_vectors.f32"
+OPLOG_FILE_NAME = "oplog.jsonl"
+META_FILE_NAME = "meta.json"
+LOCK_FILE_NAME = ".lock"
+
+# Compact the operation log once it holds this many times more entries than
+# there are live chunks (plus a floor so small indices don't compact
+# constantly).
+OPLOG_COMPACTION_FACTOR = 3
+OPLOG_COMPACTION_MIN_ENTRIES = 10_000
+
+# Weights for the hybrid subqueries, in the same proportions as the default
+# OpenSearch hybrid configuration (title vector, content vector, keyword).
+HYBRID_TITLE_VECTOR_WEIGHT = 0.1
+HYBRID_CONTENT_VECTOR_WEIGHT = 0.45
+HYBRID_KEYWORD_WEIGHT = 0.45
+
+# Match highlight snippets are a window of roughly this many characters around
+# the first matched term.
+MAX_HIGHLIGHT_CHARS = 400
+HIGHLIGHT_LEADING_CONTEXT_CHARS = 100
+
+_UNDATED = np.iinfo(np.int64).min
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddedChunkRecord(BaseModel):
+    """Everything stored for a chunk other than its vectors."""
+
+    document_id: str
+    chunk_index: int
+    tenant_id: str
+    max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE
+    title: str | None
+    # Includes extra content prepended/appended during indexing, stripped on
+    # the way out by cleanup_content_for_chunks.
+    content: str
+    blurb: str
+    semantic_identifier: str
+    source_type: str
+    metadata_list: list[str]
+    metadata_suffix: str | None
+    source_links: dict[int, str] | None
+    image_file_id: str | None
+    doc_summary: str
+    chunk_context: str
+    last_updated: datetime | None
+    created_at: datetime | None
+    hidden: bool = False
+    public: bool
+    # Never contains PUBLIC_DOC_PAT, that is represented by public.
+    access_control_list: list[str]
+    document_sets: list[str]
+    user_projects: list[int]
+    personas: list[int]
+    ancestor_hierarchy_node_ids: list[int]
+    global_boost: int
+    primary_owners: list[str] | None
+    secondary_owners: list[str] | None
+
+
+# Record fields that can be filtered on by value. Each gets a value -> slots
+# inverted index.
+_TERM_FILTER_FIELDS = (
+    "document_id",
+    "tenant_id",
+    "source_type",
+    "access_control_list",
+    "document_sets",
+    "user_projects",
+    "personas",
+    "metadata_list",
+    "ancestor_hierarchy_node_ids",
+)
+
+
+def _filtered_access_control_list(access: DocumentAccess) -> list[str]:
+    access_control_list = access.to_acl()
+    access_control_list.discard(PUBLIC_DOC_PAT)
+    return sorted(access_control_list)
+
+
+def _to_epoch_seconds(value: datetime | None) -> int:
+    if value is None:
+        return _UNDATED
+    return int(datetime_to_utc(value).timestamp())
+
+
+def _convert_onyx_chunk_to_record(
+    chunk: DocMetadataAwareIndexChunk,
+) -> EmbeddedChunkRecord:
+    title = chunk.source_document.get_title_for_document_index()
+    return EmbeddedChunkRecord(
+        document_id=chunk.source_document.id,
+        chunk_index=chunk.chunk_id,
+        tenant_id=chunk.tenant_id,
+        title=remove_invalid_unicode_chars(title) if title else None,
+        content=remove_invalid_unicode_chars(
+            generate_enriched_content_for_chunk_text(chunk)
+        ),
+        blurb=remove_invalid_unicode_chars(chunk.blurb),
+        semantic_identifier=remove_invalid_unicode_chars(
+            chunk.source_document.semantic_identifier
+        ),
+        source_type=chunk.source_document.source.value,
+        metadata_list=[
+            remove_invalid_unicode_chars(metadata)
+            for metadata in chunk.source_document.get_metadata_str_attributes() or []
+        ],
+        metadata_suffix=remove_invalid_unicode_chars(chunk.metadata_suffix_keyword),
+        source_links=chunk.source_links or None,
+        image_file_id=chunk.image_file_id,
+        doc_summary=chunk.doc_summary,
+        chunk_context=chunk.chunk_context,
+        last_updated=chunk.source_document.doc_updated_at,
+        created_at=chunk.source_document.doc_created_at,
+        public=chunk.access.is_public,
+        access_control_list=_filtered_access_control_list(chunk.access),
+        document_sets=sorted(chunk.document_sets),
+        user_projects=list(chunk.user_project),
+        personas=list(chunk.personas),
+        ancestor_hierarchy_node_ids=list(chunk.ancestor_hierarchy_node_ids),
+        global_boost=chunk.boost,
+        primary_owners=get_experts_stores_representations(
+            chunk.source_document.primary_owners
+        ),
+        secondary_owners=get_experts_stores_representations(
+            chunk.source_document.secondary_owners
+        ),
+    )
+
+
+def _get_match_highlights(content: str, query: str) -> list[str]:
+    """Returns at most one snippet of content around the first query term
+    match, with matched terms wrapped in <hi></hi> like Vespa/OpenSearch."""
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return []
+    matches = [
+        match
+        for match in _WORD_PATTERN.finditer(content)
+        if match.group().lower() in query_terms
+    ]
+    if not matches:
+        return []
+
+    window_start = max(0, matches[0].start() - HIGHLIGHT_LEADING_CONTEXT_CHARS)
+    window_end = min(len(content), window_start + MAX_HIGHLIGHT_CHARS)
+    pieces: list[str] = []
+    cursor = window_start
+    for match in matches:
+        if match.start() < window_start:
+            continue
+        if match.end() > window_end:
+            break
+        pieces.append(content[cursor : match.start()])
+        pieces.append(f"<hi>{match.group()}</hi>")
+        cursor = match.end()
+    pieces.append(content[cursor:window_end])
+    return ["".join(pieces).strip()]
+
+
+def _record_to_inference_chunk_uncleaned(
+    record: EmbeddedChunkRecord,
+    score: float | None,
+    match_highlights: list[str],
+) -> InferenceChunkUncleaned:
+    return InferenceChunkUncleaned(
+        chunk_id=record.chunk_index,
+        blurb=record.blurb,
+        content=record.content,
+        source_links=record.source_links,
+        image_file_id=record.image_file_id,
+        # Deprecated. Fill in some reasonable default.
+        section_continuation=False,
+        document_id=record.document_id,
+        source_type=DocumentSource(record.source_type),
+        semantic_identifier=record.semantic_identifier,
+        title=record.title,
+        boost=record.global_boost,
+        score=score,
+        hidden=record.hidden,
+        metadata=(
+            convert_metadata_list_of_strings_to_dict(record.metadata_list)
+            if record.metadata_list
+            else {}
+        ),
+        match_highlights=match_highlights,
+        doc_summary=record.doc_summary,
+        chunk_context=record.chunk_context,
+        updated_at=record.last_updated,
+        primary_owners=record.primary_owners,
+        secondary_owners=record.secondary_owners,
+        metadata_suffix=record.metadata_suffix,
+    )
+
+
+def _top_k(scores: np.ndarray, mask: np.ndarray, k: int) -> np.ndarray:
+    """Slots of the k highest scores among masked-in slots, best first."""
+    candidates = np.flatnonzero(mask)
+    if k <= 0 or len(candidates) == 0:
+        return np.empty(0, dtype=np.int64)
+    candidate_scores = scores[candidates]
+    if len(candidates) > k:
+        partition = np.argpartition(-candidate_scores, k - 1)[:k]
+        candidates = candidates[partition]
+        candidate_scores = candidate_scores[partition]
+    order = np.argsort(-candidate_scores, kind="stable")
+    return candidates[order]
+
+
+class _FilterColumns:
+    """Column arrays for flag / timestamp filters plus per-field inverted
+    indices (value -> slots) for term filters."""
+
+    def __init__(self) -> None:
+        self._capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.hidden = np.zeros(0, dtype=bool)
+        self.public = np.zeros(0, dtype=bool)
+        self.last_updated = np.zeros(0, dtype=np.int64)
+        self.created_at = np.zeros(0, dtype=np.int64)
+        self.max_chunk_size = np.zeros(0, dtype=np.int32)
+        self.content_norm = np.zeros(0, dtype=np.float32)
+        self.title_norm = np.zeros(0, dtype=np.float32)
+        self._terms: dict[str, dict[Any, set[int]]] = {
+            field: {} for field in _TERM_FILTER_FIELDS
+        }
+
+    def ensure_capacity(self, num_slots: int) -> None:
+        if num_slots <= self._capacity:
+            return
+        new_capacity = max(num_slots, self._capacity * 2, 1024)
+        for name in (
+            "alive",
+            "hidden",
+            "public",
+            "last_updated",
+            "created_at",
+            "max_chunk_size",
+            "content_norm",
+            "title_norm",
+        ):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[: self._capacity] = old
+            setattr(self, name, grown)
+        self._capacity = new_capacity
+
+    @staticmethod
+    def _term_values(record: EmbeddedChunkRecord, field: str) -> list[Any]:
+        value = getattr(record, field)
+        return value if isinstance(value, list) else [value]
+
+    def set_row(
+        self,
+        slot: int,
+        record: EmbeddedChunkRecord,
+        content_norm: float,
+        title_norm: float,
+    ) -> None:
+        self.ensure_capacity(slot + 1)
+        self.alive[slot] = True
+        self.hidden[slot] = record.hidden
+        self.public[slot] = record.public
+        self.last_updated[slot] = _to_epoch_seconds(record.last_updated)
+        self.created_at[slot] = _to_epoch_seconds(record.created_at)
+        self.max_chunk_size[slot] = record.max_chunk_size
+        self.content_norm[slot] = content_norm
+        self.title_norm[slot] = title_norm
+        for field in _TERM_FILTER_FIELDS:
+            postings = self._terms[field]
+            for value in self._term_values(record, field):
+                postings.setdefault(value, set()).add(slot)
+
+    def clear_row(self, slot: int, record: EmbeddedChunkRecord) -> None:
+        self.alive[slot] = False
+        for field in _TERM_FILTER_FIELDS:
+            postings = self._terms[field]
+            for value in self._term_values(record, field):
+                slots = postings.get(value)
+                if slots is None:
+                    continue
+                slots.discard(slot)
+                if not slots:
+                    del postings[value]
+
+    def term_mask(
+        self, field: str, values: Iterable[Any], num_slots: int
+    ) -> np.ndarray:
+        """Slots whose field contains any of values."""
+        mask = np.zeros(num_slots, dtype=bool)
+        postings = self._terms[field]
+        for value in values:
+            slots = postings.get(value)
+            if slots:
+                mask[np.fromiter(slots, dtype=np.int64, count=len(slots))] = True
+        return mask
+
+
+def _time_range_mask(
+    column: np.ndarray, time_range: TimeRange, include_undated: bool
+) -> np.ndarray:
+    dated = column != _UNDATED
+    mask = dated.copy()
+    if time_range.start is not None:
+        mask &= column >= _to_epoch_seconds(time_range.start)
+    if time_range.end is not None:
+        mask &= column <= _to_epoch_seconds(time_range.end)
+    if include_undated:
+        mask |= ~dated
+    return mask
+
+
+class _EmbeddedIndexStore:
+    """Storage and query engine for a single embedded index.
+
+    Shared by every EmbeddedDocumentIndex handle in a process pointing at the
+    same directory. Processes sharing the directory (API server and background
+    workers) coordinate through a file lock: every operation first catches up
+    on log entries the other processes appended, reads under a shared lock and
+    writes under an exclusive one.
+    """
+
+    def __init__(self, index_dir: str | None) -> None:
+        self._lock = threading.RLock()
+        self._index_dir = index_dir
+        self._embedding_dim: int | None = None
+        self._content_vectors: VectorBlock | None = None
+        self._title_vectors: VectorBlock | None = None
+        self._reset_records()
+        self._oplog: OperationLog | None = None
+        self._file_lock: IndexFileLock | None = None
+
+        if index_dir is not None:
+            os.makedirs(index_dir, exist_ok=True)
+            self._oplog = OperationLog(os.path.join(index_dir, OPLOG_FILE_NAME))
+            self._file_lock = IndexFileLock(os.path.join(index_dir, LOCK_FILE_NAME))
+            with self._locked(exclusive=False):
+                logger.info(
+                    "[EmbeddedDocumentIndex] Loaded %s chunks from %s.",
+                    self.num_live_chunks(),
+                    index_dir,
+                )
+
+    def _reset_records(self) -> None:
+        self._records: list[EmbeddedChunkRecord | None] = []
+        self._free_slots: list[int] = []
+        # (tenant key, document ID) -> chunk index -> slot
+        self._document_slots: dict[tuple[str, str], dict[int, int]] = {}
+        self._columns = _FilterColumns()
+        self._bm25 = BM25Index()
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Serializes access within the process and, for an on-disk index,
+        across processes, after applying what other processes wrote. Not
+        reentrant for on-disk indices."""
+        with self._lock:
+            if self._file_lock is None:
+                yield
+                return
+            self._file_lock.acquire(exclusive)
+            try:
+                self._sync_from_disk()
+                yield
+            finally:
+                self._file_lock.release()
+
+    @property
+    def embedding_dim(self) -> int | None:
+        return self._embedding_dim
+
+    def _open_vector_blocks(self, embedding_dim: int) -> None:
+        self._embedding_dim = embedding_dim
+        self._content_vectors = VectorBlock(
+            (
+                os.path.join(self._index_dir, CONTENT_VECTORS_FILE_NAME)
+                if self._index_dir
+                else None
+            ),
+            embedding_dim,
+        )
+        self._title_vectors = VectorBlock(
+            (
+                os.path.join(self._index_dir, TITLE_VECTORS_FILE_NAME)
+                if self._index_dir
+                else None
+            ),
+            embedding_dim,
+        )
+
+    def ensure_embedding_dim(self, embedding_dim: int) -> None:
+        with self._locked(exclusive=True):
+            if self._embedding_dim is not None:
+                if self._embedding_dim != embedding_dim:
+                    raise ValueError(
+                        f"Embedded index was created with embedding dimension "
+                        f"{self._embedding_dim} but {embedding_dim} was requested. "
+                        "Changing the embedding dimension requires a new index."
+                    )
+                return
+            self._open_vector_blocks(embedding_dim)
+            if self._index_dir is not None:
+                with open(
+                    os.path.join(self._index_dir, META_FILE_NAME),
+                    "w",
+                    encoding="utf-8",
+                ) as f:
+                    json.dump({"embedding_dim": embedding_dim}, f)
+
+    @property
+    def num_slots(self) -> int:
+        return len(self._records)
+
+    def num_live_chunks(self) -> int:
+        return len(self._records) - len(self._free_slots)
+
+    # -- Mutation ---------------------------------------------------------------
+
+    def _allocate_slot(self) -> int:
+        if self._free_slots:
+            return self._free_slots.pop()
+        self._records.append(None)
+        return len(self._records) - 1
+
+    def _put(self, slot: int, record: EmbeddedChunkRecord, tenant_key: str) -> None:
+        """Sets the record at a slot. Vectors must already be written."""
+        assert self._content_vectors is not None and self._title_vectors is not None
+        previous = self._records[slot]
+        if previous is not None:
+            self._columns.clear_row(slot, previous)
+        self._records[slot] = record
+        self._columns.set_row(
+            slot,
+            record,
+            content_norm=float(
+                np.linalg.norm(self._content_vectors.view(slot + 1)[slot])
+            ),
+            title_norm=float(np.linalg.norm(self._title_vectors.view(slot + 1)[slot])),
+        )
+        self._bm25.add(slot, f"{record.title or ''} {record.content}")
+        self._document_slots.setdefault((tenant_key, record.document_id), {})[
+            record.chunk_index
+        ] = slot
+
+    def _remove(self, slot: int, tenant_key: str) -> None:
+        record = self._records[slot]
+        if record is None:
+            return
+        self._columns.clear_row(slot, record)
+        self._bm25.remove(slot)
+        self._records[slot] = None
+        self._free_slots.append(slot)
+        key = (tenant_key, record.document_id)
+        chunk_slots = self._document_slots.get(key)
+        if chunk_slots is not None:
+            chunk_slots.pop(record.chunk_index, None)
+            if not chunk_slots:
+                del self._document_slots[key]
+
+    def _delete_document_locked(
+        self, tenant_key: str, document_id: str, log: list[dict[str, Any]]
+    ) -> int:
+        chunk_slots = self._document_slots.get((tenant_key, document_id))
+        if not chunk_slots:
+            return 0
+        slots = list(chunk_slots.values())
+        for slot in slots:
+            self._remove(slot, tenant_key)
+            log.append({"op": "del", "slot": slot, "tenant_key": tenant_key})
+        return len(slots)
+
+    def replace_documents(
+        self,
+        tenant_key: str,
+        documents: dict[
+            str, list[tuple[EmbeddedChunkRecord, Embedding, Embedding | None]]
+        ],
+    ) -> dict[str, int]:
+        """Deletes any existing chunks of each document and writes the new ones.
+
+        Returns:
+            Document ID -> number of chunks that existed before the write.
+        """
+        previous_chunk_counts: dict[str, int] = {}
+        with self._locked(exclusive=True):
+            assert self._content_vectors is not None and self._title_vectors is not None
+            log: list[dict[str, Any]] = []
+            for document_id, chunks in documents.items():
+                previous_chunk_counts[document_id] = self._delete_document_locked(
+                    tenant_key, document_id, log
+                )
+                for record, content_vector, title_vector in chunks:
+                    slot = self._allocate_slot()
+                    self._content_vectors.write(slot, content_vector)
+                    self._title_vectors.write(slot, title_vector)
+                    self._put(slot, record, tenant_key)
+                    log.append(
+                        {
+                            "op": "put",
+                            "slot": slot,
+                            "tenant_key": tenant_key,
+                            "record": record.model_dump(mode="json"),
+                        }
+                    )
+            self._content_vectors.flush()
+            self._title_vectors.flush()
+            self._persist(log)
+        return previous_chunk_counts
+
+    def delete_document(self, tenant_key: str, document_id: str) -> int:
+        with self._locked(exclusive=True):
+            log: list[dict[str, Any]] = []
+            num_deleted = self._delete_document_locked(tenant_key, document_id, log)
+            self._persist(log)
+            return num_deleted
+
+    def update_documents(
+        self,
+        tenant_key: str,
+        document_ids: list[str],
+        record_updates: dict[str, Any],
+    ) -> None:
+        with self._locked(exclusive=True):
+            log: list[dict[str, Any]] = []
+            for document_id in document_ids:
+                chunk_slots = self._document_slots.get((tenant_key, document_id))
+                if not chunk_slots:
+                    # Same tolerance as the other backends: the doc may not be
+                    # indexed yet, indexing will write the latest metadata.
+                    continue
+                for slot in list(chunk_slots.values()):
+                    record = self._records[slot]
+                    assert record is not None
+                    updated = record.model_copy(update=record_updates)
+                    self._put(slot, updated, tenant_key)
+                    log.append(
+                        {
+                            "op": "put",
+                            "slot": slot,
+                            "tenant_key": tenant_key,
+                            "record": updated.model_dump(mode="json"),
+                        }
+                    )
+            self._persist(log)
+
+    # -- Persistence ------------------------------------------------------------
+
+    def _persist(self, log: list[dict[str, Any]]) -> None:
+        if self._oplog is None or not log:
+            return
+        self._oplog.append(log)
+        num_live = len(self._records) - len(self._free_slots)
+        if (
+            self._oplog.num_entries
+            > OPLOG_COMPACTION_FACTOR * num_live + OPLOG_COMPACTION_MIN_ENTRIES
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        assert self._oplog is not None
+        tenant_key_by_slot: dict[int, str] = {
+            slot: tenant_key
+            for (tenant_key, _), chunk_slots in self._document_slots.items()
+            for slot in chunk_slots.values()
+        }
+        self._oplog.rewrite(
+            [
+                {
+                    "op": "put",
+                    "slot": slot,
+                    "tenant_key": tenant_key_by_slot[slot],
+                    "record": record.model_dump(mode="json"),
+                }
+                for slot, record in enumerate(self._records)
+                if record is not None
+            ]
+        )
+
+    def _sync_from_disk(self) -> None:
+        """Applies whatever other processes wrote since this one last looked:
+        a newly created index, new log entries, or a compacted log (which is
+        replayed from scratch)."""
+        assert self._oplog is not None and self._index_dir is not None
+        if self._embedding_dim is None:
+            meta_path = os.path.join(self._index_dir, META_FILE_NAME)
+            if not os.path.exists(meta_path):
+                return
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self._open_vector_blocks(json.load(f)["embedding_dim"])
+
+        if self._oplog.was_replaced():
+            self._oplog.reset()
+            self._reset_records()
+        entries = self._oplog.read_new()
+        if not entries:
+            return
+
+        assert self._content_vectors is not None and self._title_vectors is not None
+        self._content_vectors.refresh()
+        self._title_vectors.refresh()
+        for entry in entries:
+            slot: int = entry["slot"]
+            while len(self._records) <= slot:
+                self._records.append(None)
+            if entry["op"] == "put":
+                self._put(
+                    slot,
+                    EmbeddedChunkRecord.model_validate(entry["record"]),
+                    entry["tenant_key"],
+                )
+            elif entry["op"] == "del":
+                self._remove(slot, entry["tenant_key"])
+        self._free_slots = [
+            slot for slot, record in enumerate(self._records) if record is None
+        ]
+
+    # -- Retrieval --------------------------------------------------------------
+
+    def _build_filter_mask(
+        self,
+        tenant_state: TenantState,
+        filters: IndexFilters,
+        include_hidden: bool,
+    ) -> np.ndarray:
+        num_slots = self.num_slots
+        columns = self._columns
+        columns.ensure_capacity(num_slots)
+        mask = columns.alive[:num_slots].copy()
+
+        if not include_hidden:
+            mask &= ~columns.hidden[:num_slots]
+
+        if filters.access_control_list is not None:
+            mask &= columns.public[:num_slots] | columns.term_mask(
+                "access_control_list", filters.access_control_list, num_slots
+            )
+
+        if filters.forced_document_set:
+            mask &= columns.term_mask(
+                "document_sets", filters.forced_document_set, num_slots
+            )
+
+        if filters.source_type:
+            mask &= columns.term_mask(
+                "source_type",
+                [source_type.value for source_type in filters.source_type],
+                num_slots,
+            )
+
+        if filters.tags:
+            mask &= columns.term_mask(
+                "metadata_list",
+                [
+                    f"{tag.tag_key}{INDEX_SEPARATOR}{tag.tag_value}"
+                    for tag in filters.tags
+                ],
+                num_slots,
+            )
+
+        # Knowledge scope, OR'd within and AND'd with the rest. See
+        # FILTER_SEMANTICS.md for why persona and project filters are primary
+        # triggers.
+        knowledge_masks: list[np.ndarray] = []
+        if filters.attached_document_ids:
+            knowledge_masks.append(
+                columns.term_mask(
+                    "document_id", filters.attached_document_ids, num_slots
+                )
+            )
+        if filters.hierarchy_node_ids:
+            knowledge_masks.append(
+                columns.term_mask(
+                    "ancestor_hierarchy_node_ids", filters.hierarchy_node_ids, num_slots
+                )
+            )
+        if filters.document_set:
+            knowledge_masks.append(
+                columns.term_mask("document_sets", filters.document_set, num_slots)
+            )
+        if filters.persona_id_filter is not None:
+            knowledge_masks.append(
+                columns.term_mask("personas", [filters.persona_id_filter], num_slots)
+            )
+        if filters.project_id_filter is not None:
+            knowledge_masks.append(
+                columns.term_mask(
+                    "user_projects", [filters.project_id_filter], num_slots
+                )
+            )
+        if knowledge_masks:
+            mask &= np.logical_or.reduce(knowledge_masks)
+
+        if (
+            filters.created_at_range is not None
+            and filters.created_at_range.has_bounds()
+        ):
+            mask &= _time_range_mask(
+                columns.created_at[:num_slots],
+                filters.created_at_range,
+                include_undated=True,
+            )
+        updated_at_range = filters.updated_at_range
+        if updated_at_range is not None and updated_at_range.has_bounds():
+            include_undated = (
+                updated_at_range.start is not None
+                and updated_at_range.end is None
+                and updated_at_range.start
+                < datetime.now(timezone.utc) - timedelta(days=ASSUMED_DOCUMENT_AGE_DAYS)
+            )
+            mask &= _time_range_mask(
+                columns.last_updated[:num_slots],
+                updated_at_range,
+                include_undated=include_undated,
+            )
+
+        if tenant_state.multitenant:
+            mask &= columns.term_mask("tenant_id", [tenant_state.tenant_id], num_slots)
+
+        return mask
+
+    def _cosine_scores(
+        self, block: VectorBlock, norms: np.ndarray, query_vector: np.ndarray
+    ) -> np.ndarray:
+        num_slots = self.num_slots
+        query_norm = float(np.linalg.norm(query_vector))
+        if num_slots == 0 or query_norm == 0.0:
+            return np.zeros(num_slots, dtype=np.float32)
+        dots = block.view(num_slots) @ query_vector
+        denominators = norms[:num_slots] * query_norm
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(denominators > 0, dots / denominators, 0.0)
+        return scores.astype(np.float32, copy=False)
+
+    def _query_vector(self, query_embedding: Embedding) -> np.ndarray:
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        if self._embedding_dim is not None and len(query_vector) != self._embedding_dim:
+            raise ValueError(
+                f"Query embedding has dimension {len(query_vector)} but the index "
+                f"has dimension {self._embedding_dim}."
+            )
+        return query_vector
+
+    def _to_inference_chunks(
+        self,
+        slots: Iterable[int],
+        scores: np.ndarray | None,
+        highlight_query: str | None,
+    ) -> list[InferenceChunk]:
+        uncleaned: list[InferenceChunkUncleaned] = []
+        for slot in slots:
+            record = self._records[slot]
+            assert record is not None
+            uncleaned.append(
+                _record_to_inference_chunk_uncleaned(
+                    record,
+                    float(scores[slot]) if scores is not None else None,
+                    (
+                        _get_match_highlights(record.content, highlight_query)
+                        if highlight_query
+                        else []
+                    ),
+                )
+            )
+        return cleanup_content_for_chunks(uncleaned)
+
+    def id_based_retrieval(
+        self,
+        tenant_state: TenantState,
+        tenant_key: str,
+        chunk_requests: list[DocumentSectionRequest],
+        filters: IndexFilters,
+    ) -> list[InferenceChunk]:
+        with self._locked(exclusive=False):
+            # The filters are shared by every request so the mask is built
+            # once for the whole batch.
+            mask = self._build_filter_mask(tenant_state, filters, include_hidden=False)
+            slots: list[int] = []
+            for chunk_request in chunk_requests:
+                chunk_slots = self._document_slots.get(
+                    (tenant_key, chunk_request.document_id), {}
+                )
+                for chunk_index in sorted(chunk_slots):
+                    if (
+                        chunk_request.min_chunk_ind is not None
+                        and chunk_index < chunk_request.min_chunk_ind
+                    ):
+                        continue
+                    if (
+                        chunk_request.max_chunk_ind is not None
+                        and chunk_index > chunk_request.max_chunk_ind
+                    ):
+                        break
+                    slot = chunk_slots[chunk_index]
+                    if (
+                        mask[slot]
+                        and self._columns.max_chunk_size[slot]
+                        == chunk_request.max_chunk_size
+                    ):
+                        slots.append(slot)
+            return self._to_inference_chunks(slots, None, None)
+
+    def semantic_retrieval(
+        self,
+        tenant_state: TenantState,
+        query_embedding: Embedding,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+    ) -> list[InferenceChunk]:
+        with self._locked(exclusive=False):
+            if self._content_vectors is None:
+                return []
+            mask = self._build_filter_mask(tenant_state, filters, include_hidden=False)
+            scores = self._cosine_scores(
+                self._content_vectors,
+                self._columns.content_norm,
+                self._query_vector(query_embedding),
+            )
+            top_slots = _top_k(scores, mask, num_to_retrieve)
+            return self._to_inference_chunks(top_slots, scores, None)
+
+    def keyword_retrieval(
+        self,
+        tenant_state: TenantState,
+        query: str,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+        include_hidden: bool,
+    ) -> list[InferenceChunk]:
+        with self._locked(exclusive=False):
+            mask = self._build_filter_mask(tenant_state, filters, include_hidden)
+            scores = self._bm25.score(query, self.num_slots)
+            top_slots = _top_k(scores, mask & (scores > 0), num_to_retrieve)
+            return self._to_inference_chunks(top_slots, scores, query)
+
+    def hybrid_retrieval(
+        self,
+        tenant_state: TenantState,
+        query: str,
+        query_embedding: Embedding,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+    ) -> list[InferenceChunk]:
+        """Same shape as the OpenSearch hybrid query: each subquery picks its
+        top candidates, each subquery's candidate scores are min-max
+        normalized, and the final score is their weighted sum."""
+        with self._locked(exclusive=False):
+            if self._content_vectors is None or self._title_vectors is None:
+                return []
+            num_slots = self.num_slots
+            mask = self._build_filter_mask(tenant_state, filters, include_hidden=False)
+            query_vector = self._query_vector(query_embedding)
+            keyword_scores = self._bm25.score(query, num_slots)
+            subqueries: list[tuple[np.ndarray, np.ndarray, float]] = [
+                (
+                    self._cosine_scores(
+                        self._title_vectors, self._columns.title_norm, query_vector
+                    ),
+                    mask & (self._columns.title_norm[:num_slots] > 0),
+                    HYBRID_TITLE_VECTOR_WEIGHT,
+                ),
+                (
+                    self._cosine_scores(
+                        self._content_vectors, self._columns.content_norm, query_vector
+                    ),
+                    mask,
+                    HYBRID_CONTENT_VECTOR_WEIGHT,
+                ),
+                (keyword_scores, mask & (keyword_scores > 0), HYBRID_KEYWORD_WEIGHT),
+            ]
+
+            combined = np.zeros(num_slots, dtype=np.float32)
+            matched = np.zeros(num_slots, dtype=bool)
+            for scores, subquery_mask, weight in subqueries:
+                candidates = _top_k(
+                    scores, subquery_mask, DEFAULT_NUM_HYBRID_SUBQUERY_CANDIDATES
+                )
+                if len(candidates) == 0:
+                    continue
+                candidate_scores = scores[candidates]
+                low, high = candidate_scores.min(), candidate_scores.max()
+                normalized = (
+                    (candidate_scores - low) / (high - low)
+                    if high > low
+                    else np.ones_like(candidate_scores)
+                )
+                combined[candidates] += weight * normalized
+                matched[candidates] = True
+
+            top_slots = _top_k(combined, matched, num_to_retrieve)
+            return self._to_inference_chunks(top_slots, combined, query)
+
+    def random_retrieval(
+        self,
+        tenant_state: TenantState,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+    ) -> list[InferenceChunk]:
+        with self._locked(exclusive=False):
+            candidates = np.flatnonzero(
+                self._build_filter_mask(tenant_state, filters, include_hidden=False)
+            )
+            if len(candidates) == 0 or num_to_retrieve <= 0:
+                return []
+            chosen = np.random.default_rng().choice(
+                candidates, size=min(num_to_retrieve, len(candidates)), replace=False
+            )
+            return self._to_inference_chunks(chosen, None, None)
+
+
+# Stores are shared per directory so every handle the factory creates for an
+# index sees the same data and lock.
+_stores: dict[str, _EmbeddedIndexStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _get_store(root_dir: str, index_name: str) -> _EmbeddedIndexStore:
+    index_dir = os.path.abspath(os.path.join(root_dir, index_name))
+    with _stores_lock:
+        store = _stores.get(index_dir)
+        if store is None:
+            store = _EmbeddedIndexStore(index_dir)
+            _stores[index_dir] = store
+        return store
+
+
+class EmbeddedDocumentIndex(DocumentIndex):
+    """In-process implementation of the DocumentIndex interface.
+
+    Keeps all data in local files under root_dir/index_name (or purely in
+    memory when root_dir is None, which is what tests use). Meant for
+    single-node deployments and CI, not as a replacement for a search cluster
+    at scale: every query is a brute-force scan over the vector blocks.
+
+    Args:
+        tenant_state: The tenant state of the caller.
+        index_name: The name of the index to interact with.
+        root_dir: Directory holding one subdirectory per index. If None the
+            index lives only in this object's memory.
+    """
+
+    def __init__(
+        self,
+        tenant_state: TenantState,
+        index_name: str,
+        root_dir: str | None,
+    ) -> None:
+        self._tenant_state = tenant_state
+        self._index_name = index_name
+        self._store = (
+            _get_store(root_dir, index_name)
+            if root_dir is not None
+            else _EmbeddedIndexStore(None)
+        )
+
+    @property
+    def _tenant_key(self) -> str:
+        return self._tenant_state.tenant_id if self._tenant_state.multitenant else ""
+
+    def verify_and_create_index_if_necessary(
+        self,
+        embedding_dim: int,
+        embedding_precision: EmbeddingPrecision,  # noqa: ARG002
+    ) -> None:
+        """Creates the index files if they do not exist.
+
+        Vectors are always stored as float32 regardless of embedding_precision.
+
+        Raises:
+            ValueError: The index already exists with a different embedding
+                dimension.
+        """
+        logger.debug(
+            "[EmbeddedDocumentIndex] Verifying index %s with embedding dimension %s.",
+            self._index_name,
+            embedding_dim,
+        )
+        self._store.ensure_embedding_dim(embedding_dim)
+
+    def index(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentInsertionRecord]:
+        """Replaces all chunks of every document in the batch.
+
+        Existing chunks of each document are always deleted first, so there is
+        no need to use the chunk count diff to clean up tail chunks.
+        """
+        documents: dict[
+            str, list[tuple[EmbeddedChunkRecord, Embedding, Embedding | None]]
+        ] = {}
+        for chunk in chunks:
+            if self._store.embedding_dim is None:
+                self._store.ensure_embedding_dim(len(chunk.embeddings.full_embedding))
+            documents.setdefault(chunk.source_document.id, []).append(
+                (
+                    _convert_onyx_chunk_to_record(chunk),
+                    embedding_to_list(chunk.embeddings.full_embedding),
+                    chunk.title_embedding,
+                )
+            )
+        logger.debug(
+            "[EmbeddedDocumentIndex] Indexing %s chunks from %s documents for index %s.",
+            sum(len(doc_chunks) for doc_chunks in documents.values()),
+            len(indexing_metadata.doc_id_to_chunk_cnt_diff),
+            self._index_name,
+        )
+        if not documents:
+            return []
+
+        previous_chunk_counts = self._store.replace_documents(
+            self._tenant_key, documents
+        )
+        return [
+            DocumentInsertionRecord(
+                document_id=document_id, already_existed=previous_count > 0
+            )
+            for document_id, previous_count in previous_chunk_counts.items()
+        ]
+
+    def delete(
+        self,
+        document_id: str,
+        chunk_count: int | None = None,  # noqa: ARG002
+    ) -> int:
+        logger.debug(
+            "[EmbeddedDocumentIndex] Deleting document %s from index %s.",
+            document_id,
+            self._index_name,
+        )
+        return self._store.delete_document(self._tenant_key, document_id)
+
+    def update(self, update_requests: list[MetadataUpdateRequest]) -> None:
+        """Updates metadata on every stored chunk of the specified documents.
+
+        Documents that are not in the index are skipped, the indexing pipeline
+        writes the latest metadata when it indexes them.
+        """
+        for update_request in update_requests:
+            record_updates: dict[str, Any] = {}
+            if update_request.access is not None:
+                record_updates["public"] = update_request.access.is_public
+                record_updates["access_control_list"] = _filtered_access_control_list(
+                    update_request.access
+                )
+            if update_request.document_sets is not None:
+                record_updates["document_sets"] = sorted(update_request.document_sets)
+            if update_request.boost is not None:
+                record_updates["global_boost"] = int(update_request.boost)
+            if update_request.hidden is not None:
+                record_updates["hidden"] = update_request.hidden
+            if update_request.project_ids is not None:
+                record_updates["user_projects"] = sorted(update_request.project_ids)
+            if update_request.persona_ids is not None:
+                record_updates["personas"] = sorted(update_request.persona_ids)
+            if update_request.created_at is not None:
+                record_updates["created_at"] = update_request.created_at
+
+            if not record_updates:
+                logger.warning(
+                    "[EmbeddedDocumentIndex] Tried to update %s documents with no specified update fields. This will be a no-op.",
+                    len(update_request.document_ids),
+                )
+                continue
+            self._store.update_documents(
+                self._tenant_key, update_request.document_ids, record_updates
+            )
+
+    def id_based_retrieval(
+        self,
+        chunk_requests: list[DocumentSectionRequest],
+        filters: IndexFilters,
+        batch_retrieval: bool = False,  # noqa: ARG002
+    ) -> list[InferenceChunk]:
+        return self._store.id_based_retrieval(
+            self._tenant_state, self._tenant_key, chunk_requests, filters
+        )
+
+    def hybrid_retrieval(
+        self,
+        query: str,
+        query_embedding: Embedding,
+        final_keywords: list[str] | None,
+        query_type: QueryType,  # noqa: ARG002
+        filters: IndexFilters,
+        num_to_retrieve: int,
+    ) -> list[InferenceChunk]:
+        final_query = " ".join(final_keywords) if final_keywords else query
+        return self._store.hybrid_retrieval(
+            self._tenant_state, final_query, query_embedding, filters, num_to_retrieve
+        )
+
+    def keyword_retrieval(
+        self,
+        query: str,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+        include_hidden: bool = False,
+    ) -> list[InferenceChunk]:
+        return self._store.keyword_retrieval(
+            self._tenant_state, query, filters, num_to_retrieve, include_hidden
+        )
+
+    def semantic_retrieval(
+        self,
+        query_embedding: Embedding,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+    ) -> list[InferenceChunk]:
+        return self._store.semantic_retrieval(
+            self._tenant_state, query_embedding, filters, num_to_retrieve
+        )
+
+    def random_retrieval(
+        self,
+        filters: IndexFilters,
+        num_to_retrieve: int = 10,
+        dirty: bool | None = None,  # noqa: ARG002
+    ) -> list[InferenceChunk]:
+        # There is no secondary-index port for this backend, so no chunk is
+        # ever dirty and the flag is ignored.
+        return self._store.random_retrieval(
+            self._tenant_state, filters, num_to_retrieve
+        )
+
+
+class EmbeddedIndexPair(DocumentIndex):
+    """Primary + optional secondary embedded index, with the same fan-out
+    rules as OpenSearchIndexPair: index writes only to primary, delete /
+    update / verify fan out to both, retrieval goes to primary."""
+
+    def __init__(
+        self,
+        primary: EmbeddedDocumentIndex,
+        secondary: EmbeddedDocumentIndex | None,
+        secondary_embedding_dim: int | None = None,
+    ) -> None:
+        if (secondary is None) != (secondary_embedding_dim is None):
+            raise ValueError(
+                "Bug: Secondary EmbeddedDocumentIndex and secondary_embedding_dim "
+                "must be set together or both be None."
+            )
+        self._primary = primary
+        self._secondary = secondary
+        self._secondary_embedding_dim = secondary_embedding_dim
+
+    def verify_and_create_index_if_necessary(
+        self,
+        embedding_dim: int,
+        embedding_precision: EmbeddingPrecision,
+    ) -> None:
+        self._primary.verify_and_create_index_if_necessary(
+            embedding_dim, embedding_precision
+        )
+        if self._secondary is not None:
+            assert self._secondary_embedding_dim is not None
+            self._secondary.verify_and_create_index_if_necessary(
+                self._secondary_embedding_dim, embedding_precision
+            )
+
+    def index(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentInsertionRecord]:
+        return self._primary.index(chunks, indexing_metadata)
+
+    def delete(self, document_id: str, chunk_count: int | None = None) -> int:
+        total = self._primary.delete(document_id, chunk_count)
+        if self._secondary is not None:
+            total += self._secondary.delete(document_id, chunk_count)
+        return total
+
+    def update(self, update_requests: list[MetadataUpdateRequest]) -> None:
+        self._primary.update(update_requests)
+        if self._secondary is not None:
+            self._secondary.update(update_requests)
+
+    def id_based_retrieval(
+        self,
+        chunk_requests: list[DocumentSectionRequest],
+        filters: IndexFilters,
+        batch_retrieval: bool = False,
+    ) -> list[InferenceChunk]:
+        return self._primary.id_based_retrieval(
+            chunk_requests, filters, batch_retrieval
+        )
+
+    def hybrid_retrieval(
+        self,
+        query: str,
+        query_embedding: Embedding,
+        final_keywords: list[str] | None,
+        query_type: QueryType,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+    ) -> list[InferenceChunk]:
+        return self._primary.hybrid_retrieval(
+            query,
+            query_embedding,
+            final_keywords,
+            query_type,
+            filters,
+            num_to_retrieve,
+        )
+
+    def keyword_retrieval(
+        self,
+        query: str,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+        include_hidden: bool = False,
+    ) -> list[InferenceChunk]:
+        return self._primary.keyword_retrieval(
+            query, filters, num_to_retrieve, include_hidden=include_hidden
+        )
+
+    def semantic_retrieval(
+        self,
+        query_embedding: Embedding,
+        filters: IndexFilters,
+        num_to_retrieve: int,
+    ) -> list[InferenceChunk]:
+        return self._primary.semantic_retrieval(
+            query_embedding, filters, num_to_retrieve
+        )
+
+    def random_retrieval(
+        self,
+        filters: IndexFilters,
+        num_to_retrieve: int = 10,
+        dirty: bool | None = None,
+    ) -> list[InferenceChunk]:
+        return self._primary.random_retrieval(filters, num_to_retrieve, dirty)
+
+    @property
+    def primary(self) -> EmbeddedDocumentIndex:
+        return self._primary
+
+    @property
+    def secondary(self) -> EmbeddedDocumentIndex | None:
+        return self._secondary
@@ -0,0 +1,227 @@
+"""Local file storage primitives for the embedded document index.
+
+Vectors live in fixed-width float32 blocks that are memory-mapped from disk, so
+a large index does not need to be resident in process memory. Everything else
+about a chunk is persisted in an append-only JSON-lines operation log which is
+replayed on startup and periodically compacted.
+
+Several processes may open the same files. Callers serialize access with
+`IndexFileLock` and pick up each other's writes by reading the log from where
+they last stopped.
+"""
+
+import fcntl
+import json
+import os
+from typing import Any
+
+import numpy as np
+
+FLOAT32_NUM_BYTES = 4
+DEFAULT_INITIAL_VECTOR_CAPACITY = 1024
+
+
+class VectorBlock:
+    """A growable (capacity, dim) float32 matrix addressed by slot.
+
+    If path is None the block is held in anonymous memory, which is what tests
+    and throwaway indices use. Otherwise the file at path is memory-mapped and
+    grown in place by doubling.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        dim: int,
+        initial_capacity: int = DEFAULT_INITIAL_VECTOR_CAPACITY,
+    ) -> None:
+        if dim <= 0:
+            raise ValueError(f"Vector dimension must be positive, got {dim}.")
+        self._path = path
+        self._dim = dim
+
+        self._capacity = 0
+        self._array: np.ndarray
+        self._memmap: np.memmap | None = None
+        self._map(max(initial_capacity, self._rows_on_disk()))
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def _rows_on_disk(self) -> int:
+        if self._path is None or not os.path.exists(self._path):
+            return 0
+        return os.path.getsize(self._path) // (self._dim * FLOAT32_NUM_BYTES)
+
+    def _map(self, capacity: int) -> None:
+        """Maps the first `capacity` rows of the file, growing it if needed."""
+        if self._path is None:
+            self._array = np.zeros((capacity, self._dim), dtype=np.float32)
+        else:
+            # Extending with truncate zero-fills the new region without
+            # writing it. Another process may already have grown the file
+            # further, so never shrink it.
+            with open(self._path, "a+b") as f:
+                f.truncate(
+                    max(capacity, self._rows_on_disk()) * self._dim * FLOAT32_NUM_BYTES
+                )
+            self._memmap = np.memmap(
+                self._path, dtype=np.float32, mode="r+", shape=(capacity, self._dim)
+            )
+            self._array = self._memmap
+        self._capacity = capacity
+
+    def refresh(self) -> None:
+        """Remaps the file if another process has grown it past this mapping."""
+        rows_on_disk = self._rows_on_disk()
+        if rows_on_disk > self._capacity:
+            self._map(rows_on_disk)
+
+    def ensure_capacity(self, num_rows: int) -> None:
+        if num_rows <= self._capacity:
+            return
+        new_capacity = max(num_rows, self._capacity * 2)
+        if self._path is None:
+            grown = np.zeros((new_capacity, self._dim), dtype=np.float32)
+            grown[: self._capacity] = self._array
+            self._array = grown
+            self._capacity = new_capacity
+        else:
+            self.flush()
+            self._map(new_capacity)
+
+    def write(self, slot: int, vector: list[float] | np.ndarray | None) -> None:
+        """Writes a vector to a slot. A None vector is stored as all zeros,
+        which scores 0 for cosine similarity."""
+        self.ensure_capacity(slot + 1)
+        if vector is None:
+            self._array[slot] = 0.0
+            return
+        if len(vector) != self._dim:
+            raise ValueError(
+                f"Expected a vector of dimension {self._dim}, got {len(vector)}."
+            )
+        self._array[slot] = vector
+
+    def view(self, num_rows: int) -> np.ndarray:
+        return self._array[:num_rows]
+
+    def flush(self) -> None:
+        if self._memmap is not None:
+            self._memmap.flush()
+
+
+class OperationLog:
+    """Append-only JSON-lines log of chunk record operations.
+
+    Tracks how far into the file it has read, so entries appended by other
+    processes can be picked up with `read_new`, and notices when another
+    process has compacted the log into a new file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._num_entries = 0
+        # Bytes of complete lines read so far, and the inode they were read
+        # from.
+        self._offset = 0
+        self._inode: int | None = None
+
+    @property
+    def num_entries(self) -> int:
+        return self._num_entries
+
+    def was_replaced(self) -> bool:
+        """Whether the file read so far has since been rewritten or removed, in
+        which case the caller must start over with `reset`."""
+        if self._inode is None:
+            return False
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return True
+        return stat.st_ino != self._inode or stat.st_size < self._offset
+
+    def reset(self) -> None:
+        self._offset = 0
+        self._num_entries = 0
+        self._inode = None
+
+    def read_new(self) -> list[dict[str, Any]]:
+        """Returns the complete entries appended since the last call.
+
+        A final line without a newline, or one that isn't valid JSON, is a torn
+        write from a crash mid-append. It is left unread and is cut off by the
+        next `append`.
+        """
+        if not os.path.exists(self._path):
+            return []
+        entries: list[dict[str, Any]] = []
+        with open(self._path, "rb") as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+                self._offset += len(line)
+        self._num_entries += len(entries)
+        return entries
+
+    def append(self, entries: list[dict[str, Any]]) -> None:
+        """Appends entries. The caller must hold the exclusive file lock and
+        have read every complete entry first."""
+        if not entries:
+            return
+        data = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+        with open(self._path, "ab") as f:
+            # Drop a torn tail left by a crash so the new entries start on a
+            # line boundary and are not lost on the next replay.
+            if os.fstat(f.fileno()).st_size != self._offset:
+                f.truncate(self._offset)
+            f.write(data)
+            self._inode = os.fstat(f.fileno()).st_ino
+        self._offset += len(data)
+        self._num_entries += len(entries)
+
+    def rewrite(self, entries: list[dict[str, Any]]) -> None:
+        """Atomically replaces the log with the given entries."""
+        data = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            inode = os.fstat(f.fileno()).st_ino
+        os.replace(tmp_path, self._path)
+        self._offset = len(data)
+        self._num_entries = len(entries)
+        self._inode = inode
+
+
+class IndexFileLock:
+    """Cross-process lock over one index directory.
+
+    Readers share it and writers hold it exclusively. Uses flock, so the
+    directory must be on a local filesystem. Not reentrant, and separate
+    instances on the same directory exclude each other even within one
+    process.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def acquire(self, exclusive: bool) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def release(self) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
@@ -3,12 +3,17 @@ from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import (
     DISABLE_VECTOR_DB,
+    EMBEDDED_DOCUMENT_INDEX_DIR,
     ENABLE_OPENSEARCH_INDEXING_FOR_ONYX,
     ONYX_DISABLE_VESPA,
 )
 from onyx.db.models import SearchSettings
 from onyx.db.opensearch_migration import get_opensearch_retrieval_state
 from onyx.document_index.disabled import DisabledDocumentIndex
+from onyx.document_index.embedded.embedded_document_index import (
+    EmbeddedDocumentIndex,
+    EmbeddedIndexPair,
+)
 from onyx.document_index.interfaces_new import DocumentIndex, TenantState
 from onyx.document_index.opensearch.opensearch_document_index import (
     OpenSearchDocumentIndex,
@@ -108,6 +113,33 @@ def _build_vespa_pair(
     )
 
 
+def _build_embedded_pair(
+    root_dir: str,
+    search_settings: SearchSettings,
+    secondary_search_settings: SearchSettings | None,
+) -> EmbeddedIndexPair:
+    tenant_state = _build_tenant_state()
+    primary = EmbeddedDocumentIndex(
+        tenant_state=tenant_state,
+        index_name=search_settings.index_name,
+        root_dir=root_dir,
+    )
+    if secondary_search_settings is None:
+        return EmbeddedIndexPair(primary=primary, secondary=None)
+    secondary = EmbeddedDocumentIndex(
+        tenant_state=tenant_state,
+        index_name=secondary_search_settings.index_name,
+        root_dir=root_dir,
+    )
+    return EmbeddedIndexPair(
+        primary=primary,
+        secondary=secondary,
+        secondary_embedding_dim=IndexingSetting.from_db_model(
+            secondary_search_settings
+        ).final_embedding_dim,
+    )
+
+
 def get_default_document_index(
     search_settings: SearchSettings,
     secondary_search_settings: SearchSettings | None,
@@ -123,6 +155,11 @@ def get_default_document_index(
     if DISABLE_VECTOR_DB:
         return DisabledDocumentIndex()
 
+    if EMBEDDED_DOCUMENT_INDEX_DIR:
+        return _build_embedded_pair(
+            EMBEDDED_DOCUMENT_INDEX_DIR, search_settings, secondary_search_settings
+        )
+
     opensearch_retrieval_enabled = get_opensearch_retrieval_state(db_session)
     if ONYX_DISABLE_VESPA and not opensearch_retrieval_enabled:
         raise ValueError(
@@ -153,6 +190,13 @@ def get_all_document_indices(
     if DISABLE_VECTOR_DB:
         return [DisabledDocumentIndex()]
 
+    if EMBEDDED_DOCUMENT_INDEX_DIR:
+        return [
+            _build_embedded_pair(
+                EMBEDDED_DOCUMENT_INDEX_DIR, search_settings, secondary_search_settings
+            )
+        ]
+
     if ONYX_DISABLE_VESPA and not ENABLE_OPENSEARCH_INDEXING_FOR_ONYX:
         raise ValueError(
             "Bug: ONYX_DISABLE_VESPA is set but ENABLE_OPENSEARCH_INDEXING_FOR_ONYX is not set."
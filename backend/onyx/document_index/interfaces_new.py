@@ -26,6 +26,7 @@ __all__ = [
     "DocumentIndex",
     # Data models - used in method signatures
     "DocumentInsertionRecord",
+    "DocumentReplaceResult",
     "DocumentSectionRequest",
     "IndexingMetadata",
     "MetadataUpdateRequest",
@@ -75,6 +76,28 @@ class DocumentInsertionRecord(BaseModel):
     already_existed: bool
 
 
+class DocumentReplaceResult(BaseModel):
+    """
+    Result of replacing a single document in Indexable.replace_documents.
+    """
+
+    model_config = {"frozen": True}
+
+    document_id: str
+    already_existed: bool
+    # Set if some or all of the document's new chunks could not be written.
+    failure_message: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.failure_message is None
+
+    def to_insertion_record(self) -> DocumentInsertionRecord:
+        return DocumentInsertionRecord(
+            document_id=self.document_id, already_existed=self.already_existed
+        )
+
+
 class DocumentSectionRequest(BaseModel):
     """Request for a document section or whole document.
 
@@ -255,6 +278,47 @@ class Indexable(abc.ABC):
         """
         raise NotImplementedError
 
+    def replace_documents(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentReplaceResult]:
+        """Replaces a batch of documents with their new chunks.
+
+        Same contract as index(), but meant for large batches of changed
+        documents: implementations should remove the stale chunks of every
+        document in indexing_metadata with as few delete requests as possible
+        (ideally one delete-by-query for the whole batch), then bulk-write the
+        new chunks.
+
+        A failure to write some document's chunks does not fail the batch, it
+        is reported in that document's result so the caller only has to retry
+        those documents.
+
+        The default implementation is index(), which reports the batch as a
+        whole.
+
+        Args:
+            chunks: Document chunks with all of the information needed for
+                indexing to the document index.
+            indexing_metadata: Information about chunk counts for efficient
+                cleaning / updating.
+
+        Raises:
+            Exception: Failed to delete the stale chunks, or failed in a way
+                that cannot be attributed to specific documents.
+
+        Returns:
+            One result per document in chunks.
+        """
+        return [
+            DocumentReplaceResult(
+                document_id=record.document_id,
+                already_existed=record.already_existed,
+            )
+            for record in self.index(chunks, indexing_metadata)
+        ]
+
 
 class Deletable(abc.ABC):
     """
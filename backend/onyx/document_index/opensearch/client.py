@@ -14,7 +14,7 @@ from opensearchpy import (
     TransportError,
     Urllib3AWSV4SignerAuth,
 )
-from opensearchpy.helpers import bulk
+from opensearchpy.helpers import bulk, streaming_bulk
 from pydantic import BaseModel
 
 from onyx.configs.app_configs import (
@@ -120,6 +120,21 @@ class IndexInfo(BaseModel):
     primary_shards_size: str
 
 
+class BulkWriteOutcome(BaseModel):
+    """
+    Result of writing a single document chunk in a bulk request.
+    """
+
+    model_config = {"frozen": True}
+
+    document_id: str
+    chunk_index: int
+    # False if the write overwrote an existing document chunk.
+    created: bool
+    # Summary of the error if the write failed. Free of document content.
+    error: str | None = None
+
+
 class OpenSearchUpdateError(Exception):
     """
     An error occurred when updating one or more OpenSearch document chunks which
@@ -1087,6 +1102,85 @@ class OpenSearchIndexClient(OpenSearchClient):
             benign_conflicts,
         )
 
+    def bulk_overwrite_documents(
+        self,
+        documents: list[DocumentChunk],
+        tenant_state: TenantState,
+    ) -> list[BulkWriteOutcome]:
+        """Bulk writes documents, overwriting any that already exist.
+
+        Unlike bulk_index_documents, an error on some documents does not raise;
+        the outcome of every document is returned instead, including whether it
+        was created or overwrote an existing one.
+
+        Retries on 429 too many requests.
+
+        Args:
+            documents: The documents to write. In Onyx this is a chunk of a
+                document, OpenSearch simply refers to this as a document as
+                well.
+            tenant_state: The tenant state of the caller.
+
+        Raises:
+            Exception: The bulk request itself failed.
+            OpenSearchIndexError: OpenSearch did not report an outcome for every
+                document.
+
+        Returns:
+            One outcome per document, not necessarily in input order.
+        """
+        if not documents:
+            return []
+        logger.debug(
+            "Bulk overwriting %s documents for tenant %s.",
+            len(documents),
+            tenant_state.tenant_id,
+        )
+        document_chunk_id_to_document: dict[str, DocumentChunk] = {}
+        data = []
+        for document in documents:
+            document_chunk_id: str = get_opensearch_doc_chunk_id(
+                tenant_state=tenant_state,
+                document_id=document.document_id,
+                chunk_index=document.chunk_index,
+                max_chunk_size=document.max_chunk_size,
+            )
+            document_chunk_id_to_document[document_chunk_id] = document
+            data.append(
+                {
+                    "_index": self._index_name,
+                    "_id": document_chunk_id,
+                    "_op_type": "index",
+                    "_source": document.model_dump(exclude_none=True),
+                }
+            )
+
+        outcomes: list[BulkWriteOutcome] = []
+        for ok, result in streaming_bulk(
+            self._client,
+            data,
+            max_retries=3,
+            raise_on_error=False,
+            raise_on_exception=True,
+        ):
+            item = result.get("index") or {}
+            document = document_chunk_id_to_document[item["_id"]]
+            outcomes.append(
+                BulkWriteOutcome(
+                    document_id=document.document_id,
+                    chunk_index=document.chunk_index,
+                    created=item.get("result") == "created",
+                    error=None if ok else _summarize_bulk_errors([result]),
+                )
+            )
+
+        if len(outcomes) != len(documents):
+            raise OpenSearchIndexError(
+                f"Bulk overwrite for index {self._index_name}: got {len(outcomes)} "
+                f"outcomes for {len(documents)} documents."
+            )
+        return outcomes
+
     def _benign_create_conflict_count(self, errors: list[dict[str, Any]]) -> int:
         """Count benign 409s from create-only writes (the chunk already exists,
         so a live/forward writer owns it and the port yields); raise
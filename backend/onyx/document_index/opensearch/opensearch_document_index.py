@@ -29,6 +29,7 @@ from onyx.document_index.chunk_content_enrichment import (
 from onyx.document_index.interfaces_new import (
     DocumentIndex,
     DocumentInsertionRecord,
+    DocumentReplaceResult,
     DocumentSectionRequest,
     IndexingMetadata,
     MetadataUpdateRequest,
@@ -67,11 +68,12 @@ from onyx.document_index.opensearch.search import (
 )
 from onyx.indexing.models import DocMetadataAwareIndexChunk, Document
 from onyx.redis.lock_context import redis_shared_lock
+from onyx.utils.batching import batch_generator
 from onyx.utils.datetime import datetime_to_utc
 from onyx.utils.logger import setup_logger
 from onyx.utils.text_processing import remove_invalid_unicode_chars
 from shared_configs.configs import MULTI_TENANT
-from shared_configs.model_server_models import Embedding
+from shared_configs.model_server_models import Embedding, embedding_to_list
 
 logger = setup_logger(__name__)
 
@@ -83,6 +85,10 @@ VERIFY_INDEX_LOCK_BLOCKING_TIMEOUT_S = 60
 # OpenSearch terms cap (65536) so a large mid-port purge can't build an oversized query.
 _PORT_ORPHAN_DELETE_BATCH_SIZE = 1000
 
+# Documents per stale-chunk delete-by-query. Each adds 3 leaf clauses, this keeps
+# a request under OpenSearch's default max_clause_count (1024).
+_STALE_CHUNK_DELETE_BATCH_SIZE = 256
+
 
 # Per-process cache of indices we've already verified/created/applied the
 # mapping for. Used for the multi-tenant cloud codepath, which attempts to
@@ -226,7 +232,7 @@ def _convert_onyx_chunk_to_opensearch_document(
         title=filtered_title,
         title_vector=chunk.title_embedding,
         content=filtered_content,
-        content_vector=chunk.embeddings.full_embedding,
+        content_vector=embedding_to_list(chunk.embeddings.full_embedding),
         source_type=chunk.source_document.source.value,
         metadata_list=filtered_metadata_list,
         metadata_suffix=filtered_metadata_suffix,
@@ -531,6 +537,92 @@ class OpenSearchDocumentIndex(DocumentIndex):
 
         return document_indexing_results
 
+    def replace_documents(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentReplaceResult]:
+        """Replaces a batch of documents with one delete-by-query for the stale
+        chunks of all of them, then bulk overwrites of the new chunks.
+
+        Unlike index(), the documents are not deleted first. Chunk IDs are
+        deterministic, so the new chunks overwrite the old ones in place and
+        only chunks the new version does not have are deleted. Documents also
+        stay searchable while they are replaced, and there is no version
+        conflict to wait out. Whether a document already existed comes from the
+        bulk response, as its chunk 0 is overwritten rather than created.
+
+        Args:
+            chunks: Document chunks with all of the information needed for
+                indexing to the document index.
+            indexing_metadata: Information about chunk counts for efficient
+                cleaning / updating.
+
+        Raises:
+            Exception: Failed to delete the stale chunks, or the bulk request
+                itself failed.
+
+        Returns:
+            One result per document in chunks. Documents some of whose chunks
+                were rejected are reported with the error instead of raising.
+        """
+        doc_id_to_chunk_cnt_diff = indexing_metadata.doc_id_to_chunk_cnt_diff
+        doc_id_to_new_chunk_cnt = {
+            doc_id: chunk_cnt_diff.new_chunk_cnt
+            for doc_id, chunk_cnt_diff in doc_id_to_chunk_cnt_diff.items()
+        }
+        logger.debug(
+            "[OpenSearchDocumentIndex] Replacing %s documents in index %s.",
+            len(doc_id_to_new_chunk_cnt),
+            self._index_name,
+        )
+
+        # The old chunk counts are not used to skip documents: they are 0 both
+        # for new documents and for ones indexed before chunk counts were
+        # tracked, and the clauses cost nothing next to the request itself.
+        for doc_id_batch in batch_generator(
+            doc_id_to_new_chunk_cnt, _STALE_CHUNK_DELETE_BATCH_SIZE
+        ):
+            self._client.delete_by_query(
+                DocumentQuery.delete_stale_chunks_query(
+                    document_id_to_new_chunk_count={
+                        doc_id: doc_id_to_new_chunk_cnt[doc_id]
+                        for doc_id in doc_id_batch
+                    },
+                    tenant_state=self._tenant_state,
+                )
+            )
+
+        already_existed: dict[str, bool] = {}
+        doc_id_to_error: dict[str, str] = {}
+        for chunk_batch in batch_generator(chunks, MAX_CHUNKS_PER_DOC_BATCH):
+            outcomes = self._client.bulk_overwrite_documents(
+                documents=[
+                    _convert_onyx_chunk_to_opensearch_document(chunk)
+                    for chunk in chunk_batch
+                ],
+                tenant_state=self._tenant_state,
+            )
+            for outcome in outcomes:
+                already_existed[outcome.document_id] = (
+                    already_existed.get(outcome.document_id, False)
+                    or not outcome.created
+                )
+                if outcome.error is not None:
+                    doc_id_to_error.setdefault(
+                        outcome.document_id,
+                        f"Failed to index chunk {outcome.chunk_index}: {outcome.error}",
+                    )
+
+        return [
+            DocumentReplaceResult(
+                document_id=doc_id,
+                already_existed=existed,
+                failure_message=doc_id_to_error.get(doc_id),
+            )
+            for doc_id, existed in already_existed.items()
+        ]
+
     def delete(
         self,
         document_id: str,
@@ -1065,6 +1157,13 @@ class OpenSearchIndexPair(DocumentIndex):
     ) -> list[DocumentInsertionRecord]:
         return self._primary.index(chunks, indexing_metadata)
 
+    def replace_documents(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentReplaceResult]:
+        return self._primary.replace_documents(chunks, indexing_metadata)
+
     def delete(self, document_id: str, chunk_count: int | None = None) -> int:
         total = self._primary.delete(document_id, chunk_count)
         if self._secondary is not None:
@@ -13,6 +13,7 @@ from onyx.context.search.models import IndexFilters, Tag, TimeRange
 from onyx.document_index.interfaces_new import TenantState
 from onyx.document_index.opensearch.constants import (
     ASSUMED_DOCUMENT_AGE_DAYS,
+    DEFAULT_MAX_CHUNK_SIZE,
     DEFAULT_NUM_HYBRID_SUBQUERY_CANDIDATES,
     DEFAULT_OPENSEARCH_MAX_RESULT_WINDOW,
     HYBRID_SEARCH_NORMALIZATION_PIPELINE,
@@ -335,6 +336,70 @@ class DocumentQuery:
 
         return final_delete_query
 
+    @staticmethod
+    def delete_stale_chunks_query(
+        document_id_to_new_chunk_count: dict[str, int],
+        tenant_state: TenantState,
+    ) -> dict[str, Any]:
+        """Delete-by-query matching, for each given document, every chunk that
+        writing its new chunks 0..new_chunk_count-1 would not overwrite. These
+        are the chunks past the new end, and chunks of any other
+        max_chunk_size.
+
+        Covers a whole batch of documents in one request. Each document adds a
+        few clauses, so callers should keep batches well under the cluster's
+        max_clause_count.
+        """
+        per_document_clauses: list[dict[str, Any]] = [
+            {
+                "bool": {
+                    "filter": [
+                        {"term": {DOCUMENT_ID_FIELD_NAME: {"value": document_id}}}
+                    ],
+                    "must_not": [
+                        {
+                            "bool": {
+                                "filter": [
+                                    {
+                                        "range": {
+                                            CHUNK_INDEX_FIELD_NAME: {
+                                                "lt": new_chunk_count
+                                            }
+                                        }
+                                    },
+                                    {
+                                        "term": {
+                                            MAX_CHUNK_SIZE_FIELD_NAME: {
+                                                "value": DEFAULT_MAX_CHUNK_SIZE
+                                            }
+                                        }
+                                    },
+                                ]
+                            }
+                        }
+                    ],
+                }
+            }
+            for document_id, new_chunk_count in document_id_to_new_chunk_count.items()
+        ]
+        filter_clauses: list[dict[str, Any]] = [
+            {"bool": {"should": per_document_clauses, "minimum_should_match": 1}}
+        ]
+        # Single-tenant indices have no tenant_id field (added only in multitenant mode);
+        # a term on the unmapped field would match zero docs. Mirror _get_search_filters.
+        if tenant_state.multitenant:
+            filter_clauses.append(
+                {"term": {TENANT_ID_FIELD_NAME: {"value": tenant_state.tenant_id}}}
+            )
+        final_delete_query: dict[str, Any] = {
+            "query": {"bool": {"filter": filter_clauses}},
+            "timeout": f"{DEFAULT_OPENSEARCH_QUERY_TIMEOUT_S}s",
+        }
+        if not OPENSEARCH_PROFILING_DISABLED:
+            final_delete_query["profile"] = True
+
+        return final_delete_query
+
     @staticmethod
     def get_hybrid_search_query(
         query_text: str,
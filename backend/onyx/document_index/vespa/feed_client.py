@@ -0,0 +1,224 @@
+"""Streams chunk documents to Vespa's /document/v1 API.
+
+Vespa has no batch insert endpoint, so throughput comes from keeping many
+requests in flight on the same persistent (HTTP/2 by default, see
+get_vespa_http_client) connection. The feed client bounds the number of
+in-flight requests with a window that grows by one on every success and halves
+whenever Vespa pushes back with 429 or 503, so feeding settles just below what
+the content nodes can absorb. Each chunk is retried on its own and failures are
+reported per chunk instead of aborting the batch on the first error.
+"""
+
+import concurrent.futures
+import random
+import threading
+import time
+from collections.abc import Iterable
+from http import HTTPStatus
+
+import httpx
+from pydantic import BaseModel
+
+from onyx.document_index.vespa_constants import NUM_THREADS
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Retry configuration constants
+INDEXING_MAX_RETRIES = 5
+INDEXING_BASE_DELAY = 1.0
+INDEXING_MAX_DELAY = 60.0
+
+# Vespa asks the client to slow down with these.
+_THROTTLE_STATUSES = frozenset(
+    {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+)
+_NON_RETRYABLE_STATUSES = frozenset(
+    {
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.UNAUTHORIZED,
+        HTTPStatus.FORBIDDEN,
+        HTTPStatus.NOT_FOUND,
+        HTTPStatus.INSUFFICIENT_STORAGE,
+    }
+)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class VespaFeedOperation(BaseModel):
+    """One document put. ``body`` is the serialized ``{"fields": ...}`` JSON."""
+
+    document_id: str
+    chunk_id: int
+    url: str
+    body: bytes
+
+
+class VespaFeedFailure(BaseModel):
+    document_id: str
+    chunk_id: int
+    status_code: int | None
+    error: str
+
+
+class VespaFeedError(RuntimeError):
+    """Raised when some chunks of a batch could not be fed."""
+
+    def __init__(self, failures: list[VespaFeedFailure]) -> None:
+        self.failures = failures
+        failed_docs = sorted({failure.document_id for failure in failures})
+        super().__init__(
+            f"Failed to index {len(failures)} chunk(s) of {len(failed_docs)} "
+            f"document(s) into Vespa: {failures[0].error}. "
+            f"Documents: {failed_docs[:10]}"
+        )
+
+
+class AdaptiveWindow:
+    """Bounds in-flight requests with additive increase / multiplicative
+    decrease, like TCP congestion control."""
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1) -> None:
+        self._minimum = minimum
+        self._maximum = maximum
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            # +1 per full window of successes
+            self._limit = min(self._maximum, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def on_throttled(self) -> None:
+        with self._condition:
+            self._limit = max(self._minimum, self._limit / 2)
+
+
+class VespaFeedClient:
+    """Feeds operations through ``http_client`` using threads from
+    ``executor``. The window (and so the learned concurrency) is kept for the
+    lifetime of the client, so reuse one client across the batches of a feed."""
+
+    def __init__(
+        self,
+        http_client: httpx.Client,
+        executor: concurrent.futures.Executor,
+        max_in_flight: int = NUM_THREADS,
+        initial_in_flight: int | None = None,
+    ) -> None:
+        self._http_client = http_client
+        self._executor = executor
+        self._window = AdaptiveWindow(
+            initial=initial_in_flight or max(1, max_in_flight // 4),
+            maximum=max_in_flight,
+        )
+
+    @property
+    def in_flight_limit(self) -> int:
+        return self._window.limit
+
+    def feed(self, operations: Iterable[VespaFeedOperation]) -> list[VespaFeedFailure]:
+        """Feeds every operation and returns the ones that failed after
+        retries. Blocks until all operations are done."""
+        futures: list[concurrent.futures.Future[VespaFeedFailure | None]] = []
+        for operation in operations:
+            self._window.acquire()
+            try:
+                futures.append(self._executor.submit(self._put, operation))
+            except BaseException:
+                self._window.release()
+                raise
+
+        failures: list[VespaFeedFailure] = []
+        for future in futures:
+            failure = future.result()
+            if failure is not None:
+                failures.append(failure)
+        return failures
+
+    def _put(self, operation: VespaFeedOperation) -> VespaFeedFailure | None:
+        try:
+            return self._put_with_retries(operation)
+        finally:
+            self._window.release()
+
+    def _put_with_retries(
+        self, operation: VespaFeedOperation
+    ) -> VespaFeedFailure | None:
+        status_code: int | None = None
+        error = ""
+        for attempt in range(INDEXING_MAX_RETRIES):
+            try:
+                response = self._http_client.post(
+                    operation.url, headers=_JSON_HEADERS, content=operation.body
+                )
+            except httpx.HTTPError as e:
+                status_code, error = None, str(e)
+                delay = INDEXING_BASE_DELAY * (1.5**attempt)
+            else:
+                if response.is_success:
+                    self._window.on_success()
+                    return None
+
+                status_code, error = response.status_code, response.text
+                if status_code in _NON_RETRYABLE_STATUSES:
+                    if status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+                        logger.error(
+                            "NOTE: HTTP Status 507 Insufficient Storage usually "
+                            "means you need to allocate more memory or disk space "
+                            "to the Vespa/index container."
+                        )
+                    break
+
+                if status_code in _THROTTLE_STATUSES:
+                    self._window.on_throttled()
+                    delay = min(
+                        INDEXING_BASE_DELAY * (2**attempt), INDEXING_MAX_DELAY
+                    ) * random.uniform(0.5, 1.0)
+                else:
+                    delay = INDEXING_BASE_DELAY * (1.5**attempt)
+
+            if attempt < INDEXING_MAX_RETRIES - 1:
+                logger.warning(
+                    "Error %s while indexing chunk %s of document '%s' "
+                    "(attempt %s/%s, in-flight limit %s). Retrying in %ss.",
+                    status_code if status_code is not None else error,
+                    operation.chunk_id,
+                    operation.document_id,
+                    attempt + 1,
+                    INDEXING_MAX_RETRIES,
+                    self._window.limit,
+                    format(delay, ".2f"),
+                )
+                time.sleep(delay)
+
+        logger.error(
+            "Failed to index chunk %s of document '%s'. Status: %s. Response: '%s'",
+            operation.chunk_id,
+            operation.document_id,
+            status_code,
+            error,
+        )
+        return VespaFeedFailure(
+            document_id=operation.document_id,
+            chunk_id=operation.chunk_id,
+            status_code=status_code,
+            error=error,
+        )
@@ -1,18 +1,17 @@
 import concurrent.futures
 import json
-import random
-import time
 import uuid
 from abc import ABC, abstractmethod
 from collections.abc import Callable
 from datetime import datetime, timezone
-from http import HTTPStatus
+from typing import Any
 
 import httpx
 
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     get_experts_stores_representations,
 )
+from onyx.connectors.models import Document
 from onyx.document_index.chunk_content_enrichment import (
     generate_enriched_content_for_chunk_text,
 )
@@ -20,6 +19,11 @@ from onyx.document_index.document_index_utils import (
     get_uuid_from_chunk,
     get_uuid_from_chunk_info_old,
 )
+from onyx.document_index.vespa.feed_client import (
+    VespaFeedClient,
+    VespaFeedError,
+    VespaFeedOperation,
+)
 from onyx.document_index.vespa.internal_types import MinimalDocumentIndexingInfo
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -63,14 +67,10 @@ from onyx.indexing.models import DocMetadataAwareIndexChunk
 from onyx.utils.logger import setup_logger
 from onyx.utils.retry_wrapper import retry_builder
 from onyx.utils.text_processing import remove_invalid_unicode_chars
+from shared_configs.model_server_models import embedding_to_list
 
 logger = setup_logger()
 
-# Retry configuration constants
-INDEXING_MAX_RETRIES = 5
-INDEXING_BASE_DELAY = 1.0
-INDEXING_MAX_DELAY = 60.0
-
 
 @retry_builder(tries=3, delay=1, backoff=2)
 def _does_doc_chunk_exist(
@@ -138,41 +138,24 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-def _index_vespa_chunk(
-    chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
-    multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
-    document = chunk.source_document
-
-    # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
-
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
-    embeddings = chunk.embeddings
-
-    embeddings_name_vector_map = {FULL_CHUNK_EMBEDDING_KEY: embeddings.full_embedding}
-
-    if embeddings.mini_chunk_embeddings:
-        for ind, m_c_embed in enumerate(embeddings.mini_chunk_embeddings):
-            embeddings_name_vector_map[f"mini_chunk_{ind}"] = m_c_embed
-
-    title = document.get_title_for_document_index()
-
-    metadata_json = document.metadata
-    cleaned_metadata_json: dict[str, str | list[str]] = {}
-    for key, value in metadata_json.items():
+def _clean_metadata(
+    metadata: dict[str, str | list[str]],
+) -> dict[str, str | list[str]]:
+    cleaned_metadata: dict[str, str | list[str]] = {}
+    for key, value in metadata.items():
         cleaned_key = remove_invalid_unicode_chars(key)
         if isinstance(value, list):
-            cleaned_metadata_json[cleaned_key] = [
+            cleaned_metadata[cleaned_key] = [
                 remove_invalid_unicode_chars(item) for item in value
             ]
         else:
-            cleaned_metadata_json[cleaned_key] = remove_invalid_unicode_chars(value)
+            cleaned_metadata[cleaned_key] = remove_invalid_unicode_chars(value)
+    return cleaned_metadata
+
+
+def _build_document_fields(document: Document) -> dict[str, Any]:
+    """Fields shared by every chunk of a document."""
+    title = document.get_title_for_document_index()
 
     metadata_list = document.get_metadata_str_attributes()
     if metadata_list:
@@ -180,12 +163,36 @@ def _index_vespa_chunk(
             remove_invalid_unicode_chars(metadata) for metadata in metadata_list
         ]
 
-    vespa_document_fields = {
+    return {
         DOCUMENT_ID: document.id,
-        CHUNK_ID: chunk.chunk_id,
-        BLURB: remove_invalid_unicode_chars(chunk.blurb),
         TITLE: remove_invalid_unicode_chars(title) if title else None,
         SKIP_TITLE_EMBEDDING: not title,
+        SOURCE_TYPE: str(document.source.value),
+        SEMANTIC_IDENTIFIER: remove_invalid_unicode_chars(document.semantic_identifier),
+        METADATA: json.dumps(_clean_metadata(document.metadata)),
+        # Save as a list for efficient extraction as an Attribute
+        METADATA_LIST: metadata_list,
+        DOC_UPDATED_AT: _vespa_get_updated_at_attribute(document.doc_updated_at),
+        PRIMARY_OWNERS: get_experts_stores_representations(document.primary_owners),
+        SECONDARY_OWNERS: get_experts_stores_representations(document.secondary_owners),
+    }
+
+
+def _build_chunk_fields(chunk: DocMetadataAwareIndexChunk) -> dict[str, Any]:
+    # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
+    embeddings = chunk.embeddings
+    embeddings_name_vector_map = {
+        FULL_CHUNK_EMBEDDING_KEY: embedding_to_list(embeddings.full_embedding)
+    }
+    if embeddings.mini_chunk_embeddings:
+        for ind, m_c_embed in enumerate(embeddings.mini_chunk_embeddings):
+            embeddings_name_vector_map[f"mini_chunk_{ind}"] = embedding_to_list(
+                m_c_embed
+            )
+
+    return {
+        CHUNK_ID: chunk.chunk_id,
+        BLURB: remove_invalid_unicode_chars(chunk.blurb),
         # For the BM25 index, the keyword suffix is used, the vector is already generated with the more
         # natural language representation of the metadata section
         CONTENT: remove_invalid_unicode_chars(
@@ -195,22 +202,14 @@ def _index_vespa_chunk(
         # Note that it's not exactly the same as the actual content
         # which contains the title prefix and metadata suffix
         CONTENT_SUMMARY: remove_invalid_unicode_chars(chunk.content),
-        SOURCE_TYPE: str(document.source.value),
         SOURCE_LINKS: json.dumps(chunk.source_links),
-        SEMANTIC_IDENTIFIER: remove_invalid_unicode_chars(document.semantic_identifier),
         SECTION_CONTINUATION: chunk.section_continuation,
         LARGE_CHUNK_REFERENCE_IDS: chunk.large_chunk_reference_ids,
-        METADATA: json.dumps(cleaned_metadata_json),
-        # Save as a list for efficient extraction as an Attribute
-        METADATA_LIST: metadata_list,
         METADATA_SUFFIX: remove_invalid_unicode_chars(chunk.metadata_suffix_keyword),
         CHUNK_CONTEXT: chunk.chunk_context,
         DOC_SUMMARY: chunk.doc_summary,
         EMBEDDINGS: embeddings_name_vector_map,
         TITLE_EMBEDDING: chunk.title_embedding,
-        DOC_UPDATED_AT: _vespa_get_updated_at_attribute(document.doc_updated_at),
-        PRIMARY_OWNERS: get_experts_stores_representations(document.primary_owners),
-        SECONDARY_OWNERS: get_experts_stores_representations(document.secondary_owners),
         # the only `set` vespa has is `weightedset`, so we have to give each
         # element an arbitrary weight
         # rkuo: acl, docset and boost metadata are also updated through the metadata sync queue
@@ -225,106 +224,38 @@ def _index_vespa_chunk(
         AGGREGATED_CHUNK_BOOST_FACTOR: chunk.aggregated_chunk_boost_factor,
     }
 
-    if multitenant:
-        if chunk.tenant_id:
+
+def build_vespa_feed_operations(
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_name: str,
+    multitenant: bool,
+) -> list[VespaFeedOperation]:
+    """Builds the put operation of every chunk. Document-level fields are
+    cleaned once per document rather than once per chunk."""
+    endpoint = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+    document_fields: dict[str, dict[str, Any]] = {}
+    operations: list[VespaFeedOperation] = []
+    for chunk in chunks:
+        document = chunk.source_document
+        if document.id not in document_fields:
+            document_fields[document.id] = _build_document_fields(document)
+
+        vespa_document_fields = {
+            **document_fields[document.id],
+            **_build_chunk_fields(chunk),
+        }
+        if multitenant and chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
-    vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
-    logger.debug('Indexing to URL "%s"', vespa_url)
-
-    # Retry logic with exponential backoff for rate limiting
-    for attempt in range(INDEXING_MAX_RETRIES):
-        try:
-            res = http_client.post(
-                vespa_url, headers=json_header, json={"fields": vespa_document_fields}
+
+        operations.append(
+            VespaFeedOperation(
+                document_id=document.id,
+                chunk_id=chunk.chunk_id,
+                url=f"{endpoint}/{get_uuid_from_chunk(chunk)}",
+                body=json.dumps({"fields": vespa_document_fields}).encode(),
             )
-            res.raise_for_status()
-            return  # Success, exit the function
-        except httpx.HTTPStatusError as e:
-            # Handle 429 rate limiting specifically
-            if e.response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
-                if attempt < INDEXING_MAX_RETRIES - 1:
-                    # Calculate exponential backoff with jitter
-                    delay = min(
-                        INDEXING_BASE_DELAY * (2**attempt), INDEXING_MAX_DELAY
-                    ) * random.uniform(0.5, 1.0)
-                    logger.warning(
-                        "Rate limited while indexing document '%s' (attempt %s/%s). Vespa response: '%s'. Backing off for %s seconds.",
-                        document.id,
-                        attempt + 1,
-                        INDEXING_MAX_RETRIES,
-                        e.response.text,
-                        format(delay, ".2f"),
-                    )
-                    time.sleep(delay)
-                    continue
-                else:
-                    raise RuntimeError(
-                        f"Failed to index document '{document.id}' after {INDEXING_MAX_RETRIES} attempts due to rate limiting"
-                    ) from e
-            elif e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
-                logger.error(
-                    "Failed to index document: '%s'. Got response: '%s'",
-                    document.id,
-                    e.response.text,
-                )
-                logger.error(
-                    "NOTE: HTTP Status 507 Insufficient Storage usually means "
-                    "you need to allocate more memory or disk space to the "
-                    "Vespa/index container."
-                )
-                raise
-            else:
-                # For other HTTP errors, check if retryable
-                if e.response.status_code in (
-                    HTTPStatus.BAD_REQUEST,
-                    HTTPStatus.UNAUTHORIZED,
-                    HTTPStatus.FORBIDDEN,
-                    HTTPStatus.NOT_FOUND,
-                ):
-                    # Non-retryable errors - fail immediately
-                    logger.error(
-                        "Non-retryable HTTP %s error for document '%s'",
-                        e.response.status_code,
-                        document.id,
-                    )
-                    raise
-                # Retry other errors with shorter backoff
-                if attempt < INDEXING_MAX_RETRIES - 1:
-                    delay = INDEXING_BASE_DELAY * (1.5**attempt)
-                    logger.warning(
-                        "HTTP error %s while indexing document '%s' (attempt %s/%s). Retrying in %s seconds.",
-                        e.response.status_code,
-                        document.id,
-                        attempt + 1,
-                        INDEXING_MAX_RETRIES,
-                        format(delay, ".2f"),
-                    )
-                    time.sleep(delay)
-                    continue
-                else:
-                    logger.exception(
-                        "Failed to index document: '%s'. Got response: '%s'",
-                        document.id,
-                        e.response.text,
-                    )
-                    raise
-        except Exception as e:
-            # For non-HTTP errors, use simple retry logic
-            if attempt < INDEXING_MAX_RETRIES - 1:
-                delay = INDEXING_BASE_DELAY * (1.5**attempt)
-                logger.warning(
-                    "Error while indexing document '%s' (attempt %s/%s): %s. Retrying in %s seconds.",
-                    document.id,
-                    attempt + 1,
-                    INDEXING_MAX_RETRIES,
-                    str(e),
-                    format(delay, ".2f"),
-                )
-                time.sleep(delay)
-                continue
-            else:
-                logger.exception("Failed to index document: '%s'", document.id)
-                raise
+        )
+    return operations
 
 
 def batch_index_vespa_chunks(
@@ -333,6 +264,7 @@ def batch_index_vespa_chunks(
     http_client: httpx.Client,
     multitenant: bool,
     executor: concurrent.futures.ThreadPoolExecutor | None = None,
+    feed_client: VespaFeedClient | None = None,
 ) -> None:
     """Indexes a list of chunks in a Vespa index in parallel.
 
@@ -342,6 +274,12 @@ def batch_index_vespa_chunks(
         http_client: HTTP client to use for the request.
         multitenant: Whether the index is multitenant.
         executor: Executor to use for the request.
+        feed_client: Feed client to reuse across batches, so that the learned
+            in-flight limit carries over. Built from http_client and executor
+            if not provided.
+
+    Raises:
+        VespaFeedError: if any chunk could not be indexed after retries.
     """
     external_executor = True
 
@@ -350,15 +288,12 @@ def batch_index_vespa_chunks(
         executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
 
     try:
-        chunk_index_future = {
-            executor.submit(
-                _index_vespa_chunk, chunk, index_name, http_client, multitenant
-            ): chunk
-            for chunk in chunks
-        }
-        for future in concurrent.futures.as_completed(chunk_index_future):
-            # Will raise exception if any indexing raised an exception
-            future.result()
+        feed_client = feed_client or VespaFeedClient(http_client, executor)
+        failures = feed_client.feed(
+            build_vespa_feed_operations(chunks, index_name, multitenant)
+        )
+        if failures:
+            raise VespaFeedError(failures)
 
     finally:
         if not external_executor:
@@ -40,6 +40,7 @@ from onyx.document_index.document_index_utils import (
 from onyx.document_index.interfaces_new import (
     DocumentIndex,
     DocumentInsertionRecord,
+    DocumentReplaceResult,
     DocumentSectionRequest,
     IndexingMetadata,
     MetadataUpdateRequest,
@@ -53,11 +54,13 @@ from onyx.document_index.vespa.chunk_retrieval import (
     query_vespa,
 )
 from onyx.document_index.vespa.deletion import delete_vespa_chunks
+from onyx.document_index.vespa.feed_client import VespaFeedClient, VespaFeedFailure
 from onyx.document_index.vespa.indexing_utils import (
     BaseHTTPXClientContext,
     GlobalHTTPXClientContext,
     TemporaryHTTPXClientContext,
     batch_index_vespa_chunks,
+    build_vespa_feed_operations,
     check_for_final_chunk_existence,
     clean_chunk_id_copy,
 )
@@ -450,6 +453,26 @@ def _enrich_basic_chunk_info(
     return enriched_doc_info
 
 
+def _clean_and_track(
+    chunks_iter: Iterable[DocMetadataAwareIndexChunk],
+    id_map: dict[str, str],
+    seen_ids: set[str],
+) -> Generator[DocMetadataAwareIndexChunk, None, None]:
+    """Cleans chunk IDs and builds the original-ID mapping
+    incrementally as chunks flow through, avoiding a separate
+    materialization pass."""
+    for chunk in chunks_iter:
+        original_id = chunk.source_document.id
+        cleaned = clean_chunk_id_copy(chunk)
+        cleaned_id = cleaned.source_document.id
+        # Needed so the final DocumentInsertionRecord returned can have
+        # the original document ID. cleaned_chunks might not contain IDs
+        # exactly as callers supplied them.
+        id_map[cleaned_id] = original_id
+        seen_ids.add(cleaned_id)
+        yield cleaned
+
+
 @retry_builder(
     tries=3,
     delay=1,
@@ -651,11 +674,15 @@ class VespaDocumentIndex(DocumentIndex):
             secondary_embedding_precision=None,
         )
 
-    def index(
+    def _delete_stale_chunks(
         self,
-        chunks: Iterable[DocMetadataAwareIndexChunk],
         indexing_metadata: IndexingMetadata,
-    ) -> list[DocumentInsertionRecord]:
+        http_client: httpx.Client,
+        executor: concurrent.futures.ThreadPoolExecutor,
+    ) -> set[str]:
+        """Deletes the chunks past the new end of every document in
+        indexing_metadata. Returns the IDs of the documents that had chunks
+        before."""
         doc_id_to_chunk_cnt_diff = indexing_metadata.doc_id_to_chunk_cnt_diff
         doc_id_to_previous_chunk_cnt = {
             doc_id: chunk_cnt_diff.old_chunk_cnt
@@ -671,88 +698,80 @@ class VespaDocumentIndex(DocumentIndex):
             == len(doc_id_to_new_chunk_cnt)
         ), "Bug: Doc ID to chunk maps have different lengths."
 
+        existing_docs: set[str] = set()
+
+        # We require the start and end index for each document in order to
+        # know precisely which chunks to delete. This information exists for
+        # documents that have `chunk_count` in the database, but not for
+        # `old_version` documents.
+        enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
+            _enrich_basic_chunk_info(
+                index_name=self._index_name,
+                http_client=http_client,
+                document_id=doc_id,
+                previous_chunk_count=doc_id_to_previous_chunk_cnt[doc_id],
+                new_chunk_count=doc_id_to_new_chunk_cnt[doc_id],
+            )
+            for doc_id in doc_id_to_chunk_cnt_diff.keys()
+            # TODO(andrei), WARNING: Don't we need to sanitize these doc IDs?
+        ]
+
+        for enriched_doc_info in enriched_doc_infos:
+            # If the document has previously indexed chunks, we know it
+            # previously existed and this is a reindex.
+            if enriched_doc_info.chunk_end_index:
+                existing_docs.add(enriched_doc_info.doc_id)
+
+        # Now, for each doc, we know exactly where to start and end our
+        # deletion. So let's generate the chunk IDs for each chunk to
+        # delete.
+        # WARNING: This code seems to use
+        # indexing_metadata.doc_id_to_chunk_cnt_diff as the source of truth
+        # for which chunks to delete. This implies that the onus is on the
+        # caller to ensure doc_id_to_chunk_cnt_diff only contains docs
+        # relevant to the chunks argument to this method. This should not be
+        # the contract of DocumentIndex; and this code is only a refactor
+        # from old code. It would seem we should use all_cleaned_doc_ids as
+        # the source of truth.
+        chunks_to_delete = get_document_chunk_ids(
+            enriched_document_info_list=enriched_doc_infos,
+            tenant_id=self._tenant_id,
+            large_chunks_enabled=self._large_chunks_enabled,
+        )
+
+        # Delete old Vespa documents.
+        for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
+            delete_vespa_chunks(
+                doc_chunk_ids=doc_chunk_ids_batch,
+                index_name=self._index_name,
+                http_client=http_client,
+                executor=executor,
+            )
+
+        return existing_docs
+
+    def index(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentInsertionRecord]:
         # Vespa has restrictions on valid characters, yet document IDs come from
         # external w.r.t. this class. We need to sanitize them.
         #
         # Instead of materializing all cleaned chunks upfront, we stream them
         # through a generator that cleans IDs and builds the original-ID mapping
         # incrementally as chunks flow into Vespa.
-        def _clean_and_track(
-            chunks_iter: Iterable[DocMetadataAwareIndexChunk],
-            id_map: dict[str, str],
-            seen_ids: set[str],
-        ) -> Generator[DocMetadataAwareIndexChunk, None, None]:
-            """Cleans chunk IDs and builds the original-ID mapping
-            incrementally as chunks flow through, avoiding a separate
-            materialization pass."""
-            for chunk in chunks_iter:
-                original_id = chunk.source_document.id
-                cleaned = clean_chunk_id_copy(chunk)
-                cleaned_id = cleaned.source_document.id
-                # Needed so the final DocumentInsertionRecord returned can have
-                # the original document ID. cleaned_chunks might not contain IDs
-                # exactly as callers supplied them.
-                id_map[cleaned_id] = original_id
-                seen_ids.add(cleaned_id)
-                yield cleaned
-
         new_document_id_to_original_document_id: dict[str, str] = {}
         all_cleaned_doc_ids: set[str] = set()
 
-        existing_docs: set[str] = set()
-
         with (
             concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
             self._httpx_client_context as http_client,
         ):
-            # We require the start and end index for each document in order to
-            # know precisely which chunks to delete. This information exists for
-            # documents that have `chunk_count` in the database, but not for
-            # `old_version` documents.
-            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
-                _enrich_basic_chunk_info(
-                    index_name=self._index_name,
-                    http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=doc_id_to_previous_chunk_cnt[doc_id],
-                    new_chunk_count=doc_id_to_new_chunk_cnt[doc_id],
-                )
-                for doc_id in doc_id_to_chunk_cnt_diff.keys()
-                # TODO(andrei), WARNING: Don't we need to sanitize these doc IDs?
-            ]
-
-            for enriched_doc_info in enriched_doc_infos:
-                # If the document has previously indexed chunks, we know it
-                # previously existed and this is a reindex.
-                if enriched_doc_info.chunk_end_index:
-                    existing_docs.add(enriched_doc_info.doc_id)
-
-            # Now, for each doc, we know exactly where to start and end our
-            # deletion. So let's generate the chunk IDs for each chunk to
-            # delete.
-            # WARNING: This code seems to use
-            # indexing_metadata.doc_id_to_chunk_cnt_diff as the source of truth
-            # for which chunks to delete. This implies that the onus is on the
-            # caller to ensure doc_id_to_chunk_cnt_diff only contains docs
-            # relevant to the chunks argument to this method. This should not be
-            # the contract of DocumentIndex; and this code is only a refactor
-            # from old code. It would seem we should use all_cleaned_doc_ids as
-            # the source of truth.
-            chunks_to_delete = get_document_chunk_ids(
-                enriched_document_info_list=enriched_doc_infos,
-                tenant_id=self._tenant_id,
-                large_chunks_enabled=self._large_chunks_enabled,
+            existing_docs = self._delete_stale_chunks(
+                indexing_metadata, http_client, executor
             )
 
-            # Delete old Vespa documents.
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
-                    index_name=self._index_name,
-                    http_client=http_client,
-                    executor=executor,
-                )
-
             # Insert new Vespa documents, streaming through the cleaning
             # pipeline so chunks are never fully materialized.
             cleaned_chunks = _clean_and_track(
@@ -760,6 +779,9 @@ class VespaDocumentIndex(DocumentIndex):
                 new_document_id_to_original_document_id,
                 all_cleaned_doc_ids,
             )
+            # One feed client for the whole call so the in-flight limit it
+            # learns from Vespa's backpressure carries across batches.
+            feed_client = VespaFeedClient(http_client, executor)
             for chunk_batch in batch_generator(
                 cleaned_chunks, min(BATCH_SIZE, MAX_CHUNKS_PER_DOC_BATCH)
             ):
@@ -769,6 +791,7 @@ class VespaDocumentIndex(DocumentIndex):
                     http_client=http_client,
                     multitenant=self._multitenant,
                     executor=executor,
+                    feed_client=feed_client,
                 )
 
         return [
@@ -779,6 +802,67 @@ class VespaDocumentIndex(DocumentIndex):
             for cleaned_doc_id in all_cleaned_doc_ids
         ]
 
+    def replace_documents(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentReplaceResult]:
+        """Like index(), but chunks Vespa still rejects after the feed client's
+        retries fail only their own document.
+
+        Stale chunks are deleted by ID, concurrently, rather than with one
+        selection delete. Vespa evaluates a document selection by visiting every
+        chunk in the content cluster, which on a large index costs far more than
+        deleting the few chunks past each shortened document's new end.
+        """
+        new_document_id_to_original_document_id: dict[str, str] = {}
+        all_cleaned_doc_ids: set[str] = set()
+        feed_failures: list[VespaFeedFailure] = []
+
+        with (
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+            self._httpx_client_context as http_client,
+        ):
+            existing_docs = self._delete_stale_chunks(
+                indexing_metadata, http_client, executor
+            )
+
+            cleaned_chunks = _clean_and_track(
+                chunks,
+                new_document_id_to_original_document_id,
+                all_cleaned_doc_ids,
+            )
+            feed_client = VespaFeedClient(http_client, executor)
+            for chunk_batch in batch_generator(
+                cleaned_chunks, min(BATCH_SIZE, MAX_CHUNKS_PER_DOC_BATCH)
+            ):
+                feed_failures.extend(
+                    feed_client.feed(
+                        build_vespa_feed_operations(
+                            chunk_batch, self._index_name, self._multitenant
+                        )
+                    )
+                )
+
+        cleaned_doc_id_to_error: dict[str, str] = {}
+        for failure in feed_failures:
+            cleaned_doc_id_to_error.setdefault(
+                failure.document_id,
+                f"Failed to index chunk {failure.chunk_id}: {failure.error}",
+            )
+
+        results: list[DocumentReplaceResult] = []
+        for cleaned_doc_id in all_cleaned_doc_ids:
+            original_doc_id = new_document_id_to_original_document_id[cleaned_doc_id]
+            results.append(
+                DocumentReplaceResult(
+                    document_id=original_doc_id,
+                    already_existed=original_doc_id in existing_docs,
+                    failure_message=cleaned_doc_id_to_error.get(cleaned_doc_id),
+                )
+            )
+        return results
+
     def delete(self, document_id: str, chunk_count: int | None = None) -> int:
         total_chunks_deleted = 0
 
@@ -1291,6 +1375,13 @@ class VespaIndexPair(DocumentIndex):
         # Secondary is filled by a separate pipeline; primary only here.
         return self._primary.index(chunks, indexing_metadata)
 
+    def replace_documents(
+        self,
+        chunks: Iterable[DocMetadataAwareIndexChunk],
+        indexing_metadata: IndexingMetadata,
+    ) -> list[DocumentReplaceResult]:
+        return self._primary.replace_documents(chunks, indexing_metadata)
+
     def delete(self, document_id: str, chunk_count: int | None = None) -> int:
         total = self._primary.delete(document_id, chunk_count)
         if self._secondary is not None:
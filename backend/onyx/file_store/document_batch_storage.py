@@ -1,11 +1,15 @@
 import json
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from enum import Enum
-from io import StringIO
-from typing import List, Optional, TypeAlias
+from io import BytesIO
+from typing import IO, List, Optional, TypeAlias
 
+import msgpack
+import zstandard
 from pydantic import BaseModel
 
+from onyx.configs.app_configs import DOCUMENT_BATCH_LEGACY_JSON_FORMAT
 from onyx.configs.constants import FileOrigin
 from onyx.connectors.models import DocExtractionContext, DocIndexingContext, Document
 from onyx.file_store.file_store import FileStore, get_default_file_store
@@ -13,6 +17,14 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Batch format v1: this header, then a single zstd frame holding a stream of
+# msgpack maps, one per document, so readers can decode a document at a time.
+# Legacy batches are a bare JSON array and never start with the magic.
+_BATCH_FORMAT_MAGIC = b"ONYXDB"
+_BATCH_FORMAT_VERSION = 1
+_BATCH_HEADER = _BATCH_FORMAT_MAGIC + bytes([_BATCH_FORMAT_VERSION])
+_BATCH_ZSTD_LEVEL = 3
+
 
 def _has_legacy_tabular_section(doc_dict: dict) -> bool:
     """True if a section is a pre-`csv_file_id` tabular section (inline text only).
@@ -60,8 +72,10 @@ class DocumentBatchStorage(ABC):
         """Store a batch of documents."""
 
     @abstractmethod
-    def get_batch(self, batch_num: int) -> Optional[List[Document]]:
-        """Retrieve a batch of documents."""
+    def get_batch(self, batch_num: int) -> Optional[Iterator[Document]]:
+        """Retrieve a batch of documents. Batches in the current format are
+        decoded one document at a time as the returned iterator is consumed;
+        legacy JSON batches are parsed whole on first access."""
 
     @abstractmethod
     def delete_batch_by_name(self, batch_file_name: str) -> None:
@@ -91,15 +105,34 @@ class DocumentBatchStorage(ABC):
     def extract_path_info(self, path: str) -> BatchStoragePathInfo | None:
         """Extract path info from a path."""
 
-    def _serialize_documents(self, documents: list[Document]) -> str:
-        """Serialize documents to JSON string."""
+    def _serialize_documents(self, documents: list[Document]) -> bytes:
+        """Serialize documents to the batch format."""
         # Use mode='json' to properly serialize datetime and other complex types
-        return json.dumps([doc.model_dump(mode="json") for doc in documents], indent=2)
+        if DOCUMENT_BATCH_LEGACY_JSON_FORMAT:
+            return json.dumps(
+                [doc.model_dump(mode="json") for doc in documents]
+            ).encode("utf-8")
+
+        buffer = BytesIO()
+        buffer.write(_BATCH_HEADER)
+        packer = msgpack.Packer()
+        compressor = zstandard.ZstdCompressor(level=_BATCH_ZSTD_LEVEL)
+        with compressor.stream_writer(buffer, closefd=False) as writer:
+            for doc in documents:
+                writer.write(packer.pack(doc.model_dump(mode="json")))
+        return buffer.getvalue()
+
+    def _deserialize_documents(self, content: IO[bytes]) -> Iterator[Document]:
+        """Deserialize documents from either batch format, one at a time."""
+        header = content.read(len(_BATCH_HEADER))
+        if not header.startswith(_BATCH_FORMAT_MAGIC):
+            doc_dicts = json.loads(header + content.read())
+        elif header == _BATCH_HEADER:
+            reader = zstandard.ZstdDecompressor().stream_reader(content)
+            doc_dicts = msgpack.Unpacker(reader, raw=False)
+        else:
+            raise ValueError(f"Unsupported document batch format version {header[-1]}")
 
-    def _deserialize_documents(self, data: str) -> list[Document]:
-        """Deserialize documents from JSON string."""
-        doc_dicts = json.loads(data)
-        documents: list[Document] = []
         for doc_dict in doc_dicts:
             if _has_legacy_tabular_section(doc_dict):
                 logger.warning(
@@ -108,10 +141,7 @@ class DocumentBatchStorage(ABC):
                     doc_dict.get("id", "unknown"),
                 )
                 continue
-            documents.append(
-                Document.model_validate(self._normalize_doc_dict(doc_dict))
-            )
-        return documents
+            yield Document.model_validate(self._normalize_doc_dict(doc_dict))
 
     def _normalize_doc_dict(self, doc_dict: dict) -> dict:
         """Normalize document dict to handle legacy data with non-string metadata values.
@@ -168,14 +198,15 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         """Store a batch of documents using FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
-            data = self._serialize_documents(documents)
-            content = StringIO(data)
+            content = BytesIO(self._serialize_documents(documents))
 
             self.file_store.save_file(
                 file_id=file_name,
                 content=content,
                 display_name=f"Document Batch {batch_num}",
                 file_origin=FileOrigin.OTHER,
+                # Kept for both formats: the record type is part of the
+                # has_file lookup, and the format is sniffed from the content.
                 file_type="application/json",
                 file_metadata={
                     "batch_num": batch_num,
@@ -193,8 +224,14 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
             logger.error("Failed to store batch %s: %s", batch_num, e)
             raise
 
-    def get_batch(self, batch_num: int) -> list[Document] | None:
-        """Retrieve a batch of documents from FileStore."""
+    def get_batch(self, batch_num: int) -> Iterator[Document] | None:
+        """Retrieve a batch of documents from FileStore.
+
+        The blob is spooled to a temp file instead of being read into memory.
+        Whether the documents themselves are held at once is up to the caller:
+        docprocessing collects the whole batch into a list for the indexing
+        pipeline.
+        """
         file_name = self._get_batch_file_name(batch_num)
         try:
             # Check if file exists
@@ -208,20 +245,29 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
                 )
                 return None
 
-            content_io = self.file_store.read_file(file_name)
-            data = content_io.read().decode("utf-8")
-
-            documents = self._deserialize_documents(data)
-            logger.debug(
-                "Retrieved batch %s with %s documents from FileStore",
-                batch_num,
-                len(documents),
-            )
-            return documents
+            content_io = self.file_store.read_file(file_name, use_tempfile=True)
         except Exception as e:
             logger.error("Failed to retrieve batch %s: %s", batch_num, e)
             raise
 
+        return self._iter_batch(batch_num, content_io)
+
+    def _iter_batch(self, batch_num: int, content_io: IO[bytes]) -> Iterator[Document]:
+        num_documents = 0
+        try:
+            with content_io:
+                for document in self._deserialize_documents(content_io):
+                    num_documents += 1
+                    yield document
+        except Exception as e:
+            logger.error("Failed to read batch %s: %s", batch_num, e)
+            raise
+        logger.debug(
+            "Retrieved batch %s with %s documents from FileStore",
+            batch_num,
+            num_documents,
+        )
+
     def delete_batch_by_name(self, batch_file_name: str) -> None:
         """Delete a specific batch from FileStore."""
         self.file_store.delete_file(batch_file_name, error_on_missing=False)
@@ -1,9 +1,11 @@
+import base64
 import hashlib
 import tempfile
 import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from io import BytesIO
-from typing import IO, TYPE_CHECKING, Any, NotRequired, TypedDict, cast
+from typing import IO, TYPE_CHECKING, Any, Literal, NotRequired, TypedDict, cast
 
 import boto3
 import puremagic
@@ -42,6 +44,7 @@ from shared_configs.contextvars import get_current_tenant_id
 
 if TYPE_CHECKING:
     from mypy_boto3_s3 import S3Client
+    from mypy_boto3_s3.type_defs import CompletedPartTypeDef
 
     from onyx.file_store.azure_blob_file_store import AzureBlobBackedFileStore
     from onyx.file_store.gcs_file_store import GCSBackedFileStore
@@ -54,6 +57,11 @@ logger = setup_logger()
 # "unknown" (None) in API responses.
 FILE_SIZE_MISSING_SENTINEL = -1
 
+# S3 rejects multipart parts under 5 MiB except the last one.
+S3_MULTIPART_PART_SIZE_BYTES = 8 * 1024 * 1024
+# How much of a chunked save is buffered in memory before spilling to disk.
+CHUNKED_SAVE_SPOOL_MAX_MEMORY_BYTES = 8 * 1024 * 1024
+
 
 def content_byte_size(file_content: object) -> int | None:
     """Stored size in bytes of save_file content. str content is uploaded
@@ -69,6 +77,25 @@ class S3PutKwargs(TypedDict):
     ChecksumSHA256: NotRequired[str]
 
 
+class S3CreateMultipartUploadKwargs(TypedDict):
+    ChecksumAlgorithm: NotRequired[Literal["SHA256"]]
+
+
+def _iter_multipart_parts(chunks: Iterable[bytes], part_size: int) -> Iterator[bytes]:
+    """Regroups chunks into parts of at least `part_size` bytes. The last part
+    may be smaller, and an empty input still yields one (empty) part."""
+    buffer = bytearray()
+    yielded_any = False
+    for chunk in chunks:
+        buffer.extend(chunk)
+        if len(buffer) >= part_size:
+            yield bytes(buffer)
+            buffer.clear()
+            yielded_any = True
+    if buffer or not yielded_any:
+        yield bytes(buffer)
+
+
 class FileStore(ABC):
     """
     An abstraction for storing files and large binary objects.
@@ -129,6 +156,42 @@ class FileStore(ABC):
         """
         raise NotImplementedError
 
+    def save_file_from_chunks(
+        self,
+        chunks: Iterable[bytes],
+        display_name: str | None,
+        file_origin: FileOrigin,
+        file_type: str,
+        file_metadata: dict[str, Any] | None = None,
+        file_id: str | None = None,
+    ) -> str:
+        """
+        Save a file whose content is produced incrementally, e.g. a large export.
+
+        The default spools the chunks to a temporary file, which only stays in
+        memory while small, and hands that to save_file. Backends that can
+        upload in parts override this to skip the spool.
+
+        Parameters are the same as save_file, with chunks replacing content.
+
+        Returns:
+            The unique ID of the file that was saved.
+        """
+        with tempfile.SpooledTemporaryFile(
+            max_size=CHUNKED_SAVE_SPOOL_MAX_MEMORY_BYTES
+        ) as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+            spool.seek(0)
+            return self.save_file(
+                content=spool,
+                display_name=display_name,
+                file_origin=file_origin,
+                file_type=file_type,
+                file_metadata=file_metadata,
+                file_id=file_id,
+            )
+
     @abstractmethod
     def read_file(
         self, file_id: str, mode: str | None = None, use_tempfile: bool = False
@@ -414,6 +477,93 @@ class S3BackedFileStore(FileStore):
 
         return file_id
 
+    def save_file_from_chunks(
+        self,
+        chunks: Iterable[bytes],
+        display_name: str | None,
+        file_origin: FileOrigin,
+        file_type: str,
+        file_metadata: dict[str, Any] | None = None,
+        file_id: str | None = None,
+        db_session: Session | None = None,
+    ) -> str:
+        """Multipart upload, so at most one part is held in memory at a time."""
+        if file_id is None:
+            file_id = str(uuid.uuid4())
+
+        s3_client = self._get_s3_client()
+        bucket_name = self._get_bucket_name()
+        s3_key = self._get_s3_key(file_id)
+
+        upload_kwargs: S3CreateMultipartUploadKwargs = {}
+        if S3_GENERATE_LOCAL_CHECKSUM:
+            upload_kwargs["ChecksumAlgorithm"] = "SHA256"
+        upload_id = s3_client.create_multipart_upload(
+            Bucket=bucket_name, Key=s3_key, ContentType=file_type, **upload_kwargs
+        )["UploadId"]
+        completed_parts: list["CompletedPartTypeDef"] = []
+        file_size = 0
+        try:
+            for part_number, part in enumerate(
+                _iter_multipart_parts(chunks, S3_MULTIPART_PART_SIZE_BYTES), start=1
+            ):
+                part_kwargs: S3PutKwargs = {}
+                if S3_GENERATE_LOCAL_CHECKSUM:
+                    # Multipart checksums are sent per part, base64 encoded
+                    part_kwargs["ChecksumSHA256"] = base64.b64encode(
+                        hashlib.sha256(part).digest()
+                    ).decode("ascii")
+                response = s3_client.upload_part(
+                    Bucket=bucket_name,
+                    Key=s3_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=part,
+                    **part_kwargs,
+                )
+                completed_part: "CompletedPartTypeDef" = {
+                    "ETag": response["ETag"],
+                    "PartNumber": part_number,
+                }
+                if "ChecksumSHA256" in part_kwargs:
+                    completed_part["ChecksumSHA256"] = part_kwargs["ChecksumSHA256"]
+                completed_parts.append(completed_part)
+                file_size += len(part)
+
+            s3_client.complete_multipart_upload(
+                Bucket=bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": completed_parts},
+            )
+        except Exception:
+            # Uploaded parts are billed until the upload is aborted
+            try:
+                s3_client.abort_multipart_upload(
+                    Bucket=bucket_name, Key=s3_key, UploadId=upload_id
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to abort multipart upload for file_id=%r", file_id
+                )
+            raise
+
+        with get_session_with_current_tenant_if_none(db_session) as db_session:
+            upsert_filerecord(
+                file_id=file_id,
+                display_name=display_name or file_id,
+                file_origin=file_origin,
+                file_type=file_type,
+                bucket_name=bucket_name,
+                object_key=s3_key,
+                db_session=db_session,
+                file_metadata=file_metadata,
+                file_size=file_size,
+            )
+            db_session.commit()
+
+        return file_id
+
     def read_file(
         self,
         file_id: str,
@@ -1,12 +1,13 @@
 import contextlib
 import time
+from collections import defaultdict
 from collections.abc import Generator
 
 from sqlalchemy.orm import Session
 
 from onyx.access.access import get_access_for_documents
 from onyx.access.models import DocumentAccess
-from onyx.configs.constants import DEFAULT_BOOST
+from onyx.configs.constants import DEFAULT_BOOST, DocumentSource
 from onyx.connectors.models import Document, IndexAttemptMetadata
 from onyx.db.chunk import update_chunk_boost_components__no_commit
 from onyx.db.document import (
@@ -34,7 +35,7 @@ from onyx.indexing.models import (
     IndexingBatchAdapter,
     UpdatableChunkData,
 )
-from onyx.redis.redis_hierarchy import get_ancestors_from_raw_id
+from onyx.redis.redis_hierarchy import get_ancestors_for_raw_ids
 from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
 
@@ -179,9 +180,9 @@ class DocumentIndexingBatchAdapter(IndexingBatchAdapter):
         """
         Get ancestor hierarchy node IDs for a batch of documents.
 
-        Uses Redis cache for fast lookups - no DB calls are made unless
-        there's a cache miss. Documents provide parent_hierarchy_raw_node_id
-        directly from the connector.
+        Uses Redis cache for fast lookups - one pipelined read per source, and
+        no DB calls unless there's a cache miss. Documents provide
+        parent_hierarchy_raw_node_id directly from the connector.
 
         Returns a mapping from document_id to list of ancestor node IDs.
         """
@@ -189,18 +190,23 @@ class DocumentIndexingBatchAdapter(IndexingBatchAdapter):
             return {}
 
         redis_client = get_redis_client(tenant_id=tenant_id)
-        result: dict[str, list[int]] = {}
-
+        documents_by_source: dict[DocumentSource, list[Document]] = defaultdict(list)
         for doc in documents:
-            # Use parent_hierarchy_raw_node_id directly from the document
-            # If None, get_ancestors_from_raw_id will return just the SOURCE node
-            ancestors = get_ancestors_from_raw_id(
+            documents_by_source[doc.source].append(doc)
+
+        result: dict[str, list[int]] = {}
+        for source, source_documents in documents_by_source.items():
+            # A None parent resolves to just the SOURCE node
+            ancestors_by_raw_id = get_ancestors_for_raw_ids(
                 redis_client=redis_client,
-                source=doc.source,
-                parent_hierarchy_raw_node_id=doc.parent_hierarchy_raw_node_id,
+                source=source,
+                parent_hierarchy_raw_node_ids=[
+                    doc.parent_hierarchy_raw_node_id for doc in source_documents
+                ],
                 db_session=db_session,
             )
-            result[doc.id] = ancestors
+            for doc in source_documents:
+                result[doc.id] = ancestors_by_raw_id[doc.parent_hierarchy_raw_node_id]
 
         return result
 
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from chonkie import SentenceChunker
 
 from onyx.configs.app_configs import (
@@ -18,7 +20,7 @@ from onyx.indexing.chunking import DocumentChunker, extract_blurb
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import DocAwareChunk
 from onyx.llm.utils import MAX_CONTEXT_TOKENS
-from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import BaseTokenizer, count_tokens
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import DOC_EMBEDDING_CONTEXT_SIZE
 
@@ -29,6 +31,7 @@ CHUNK_OVERLAP = 0
 # overwhelm the actual contents of the chunk
 MAX_METADATA_PERCENTAGE = 0.25
 CHUNK_MIN_CONTENT = 256
+_METADATA_TOKEN_CACHE_SIZE = 1024
 # Tokens reserved per chunk for the contextual-RAG doc summary + chunk context.
 # Single source of truth — the reindex port reuses it to mirror indexing budgets.
 DEFAULT_CONTEXTUAL_RAG_RESERVED_TOKENS = MAX_CONTEXT_TOKENS * (
@@ -140,7 +143,10 @@ class Chunker:
         callback: IndexingHeartbeatInterface | None = None,
     ) -> None:
         self.include_metadata = include_metadata
+        self.blurb_size = blurb_size
         self.chunk_token_limit = chunk_token_limit
+        self.chunk_overlap = chunk_overlap
+        self.mini_chunk_size = mini_chunk_size
         self.enable_multipass = enable_multipass
         self.enable_large_chunks = enable_large_chunks
         self.enable_contextual_rag = enable_contextual_rag
@@ -183,6 +189,12 @@ class Chunker:
             else None
         )
 
+        # Documents from one connector often share the same metadata, so the
+        # suffix token count is memoized across the documents of a batch.
+        self._count_metadata_tokens = lru_cache(maxsize=_METADATA_TOKEN_CACHE_SIZE)(
+            token_counter
+        )
+
         self._document_chunker = DocumentChunker(
             tokenizer=tokenizer,
             blurb_splitter=self.blurb_splitter,
@@ -216,7 +228,7 @@ class Chunker:
             ) = get_metadata_suffix_for_document_index(
                 document.metadata, include_separator=True
             )
-            metadata_tokens = len(self.tokenizer.encode(metadata_suffix_semantic))
+            metadata_tokens = self._count_metadata_tokens(metadata_suffix_semantic)
 
         # If metadata is too large, skip it in the semantic content
         if metadata_tokens >= self.chunk_token_limit * MAX_METADATA_PERCENTAGE:
@@ -226,9 +238,13 @@ class Chunker:
         single_chunk_fits = True
         doc_token_count = 0
         if self.enable_contextual_rag:
-            doc_content = document.get_text_content()
-            tokenized_doc = self.tokenizer.tokenize(doc_content)
-            doc_token_count = len(tokenized_doc)
+            # Only compared against the chunk limit, so the count may stop early
+            # on very large documents.
+            doc_token_count = count_tokens(
+                document.get_text_content(),
+                self.tokenizer,
+                token_limit=self.chunk_token_limit,
+            )
 
             # check if doc + title + metadata fits in a single chunk. If so, no need for contextual RAG
             single_chunk_fits = (
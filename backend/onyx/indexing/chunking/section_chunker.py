@@ -72,6 +72,9 @@ class AccumulatorState(BaseModel):
 
     text: str = ""
     link_offsets: dict[int, str] = Field(default_factory=dict)
+    # Running token count of `text`, kept in step with it so each section is
+    # tokenized once instead of re-tokenizing the whole buffer per section.
+    token_count: int = 0
 
     def is_empty(self) -> bool:
         return not self.text.strip()
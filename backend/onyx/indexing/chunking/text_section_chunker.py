@@ -52,21 +52,23 @@ class TextChunker(SectionChunker):
                 content_token_limit=content_token_limit,
             )
 
-        current_token_count = count_tokens(accumulator.text, self.tokenizer)
         next_section_tokens = self.section_separator_token_count + section_token_count
 
         # Fits — extend the accumulator
-        if next_section_tokens + current_token_count <= content_token_limit:
+        if next_section_tokens + accumulator.token_count <= content_token_limit:
             offset = len(shared_precompare_cleanup(accumulator.text))
             new_text = accumulator.text
+            new_token_count = accumulator.token_count + section_token_count
             if new_text:
                 new_text += SECTION_SEPARATOR
+                new_token_count += self.section_separator_token_count
             new_text += section_text
             return SectionChunkerOutput(
                 payloads=[],
                 accumulator=AccumulatorState(
                     text=new_text,
                     link_offsets={**accumulator.link_offsets, offset: section_link},
+                    token_count=new_token_count,
                 ),
             )
 
@@ -76,6 +78,7 @@ class TextChunker(SectionChunker):
             accumulator=AccumulatorState(
                 text=section_text,
                 link_offsets={0: section_link},
+                token_count=section_token_count,
             ),
         )
 
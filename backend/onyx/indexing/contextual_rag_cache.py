@@ -0,0 +1,150 @@
+"""Tenant-scoped Redis/Postgres cache for contextual RAG summaries.
+
+With contextual RAG on, indexing makes one LLM call per document summary and
+one per chunk context. A document that is re-indexed with the same text (a
+touched timestamp, a from-beginning run, a secondary index build) would pay
+for all of them again.
+
+Document summaries are keyed by a hash of the document text the summary
+prompt sees. Chunk contexts are keyed by a hash of the document context the
+prompt sees (the document text, or its summary for long documents) plus a hash
+of the chunk text. Both live under a namespace derived from the LLM and the
+contextual RAG prompts, so switching the LLM or editing a prompt starts a fresh
+namespace.
+
+Cache failures are non-fatal: they count as misses and the LLM is called.
+"""
+
+import hashlib
+from enum import Enum
+
+from onyx.cache.factory import get_cache_backend
+from onyx.cache.interface import CACHE_TRANSIENT_ERRORS
+from onyx.llm.interfaces import LLM
+from onyx.prompts.contextual_retrieval import (
+    CONTEXTUAL_RAG_PROMPT1,
+    CONTEXTUAL_RAG_PROMPT2,
+    DOCUMENT_SUMMARY_PROMPT,
+)
+from onyx.server.metrics.contextual_rag_metrics import (
+    inc_contextual_rag_summary_cache_lookups,
+)
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_CONTEXTUAL_RAG_CACHE_KEY_PREFIX = "ctx_rag"
+
+
+class ContextualRagSummaryKind(str, Enum):
+    DOC_SUMMARY = "doc_summary"
+    CHUNK_CONTEXT = "chunk_context"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()[:32]
+
+
+def _namespace(llm: LLM) -> str:
+    fingerprint = "\n".join(
+        [
+            llm.config.model_provider,
+            llm.config.model_name,
+            DOCUMENT_SUMMARY_PROMPT,
+            CONTEXTUAL_RAG_PROMPT1,
+            CONTEXTUAL_RAG_PROMPT2,
+        ]
+    )
+    return _text_hash(fingerprint)[:16]
+
+
+class ContextualRagSummaryCache:
+    """Reads and writes the summaries of one indexing batch, and counts the
+    LLM calls they saved."""
+
+    def __init__(
+        self, llm: LLM, ttl_seconds: int, tenant_id: str | None = None
+    ) -> None:
+        self.namespace = _namespace(llm)
+        self.ttl_seconds = ttl_seconds
+        self.tenant_id = tenant_id
+        self.llm_calls_saved = 0
+
+    def _key(self, kind: ContextualRagSummaryKind, *texts: str) -> str:
+        return ":".join(
+            [_CONTEXTUAL_RAG_CACHE_KEY_PREFIX, kind.value, self.namespace]
+            + [_text_hash(text) for text in texts]
+        )
+
+    def _mget(
+        self, kind: ContextualRagSummaryKind, keys: list[str]
+    ) -> list[str | None]:
+        try:
+            raw_values = get_cache_backend(tenant_id=self.tenant_id).mget(keys)
+        except CACHE_TRANSIENT_ERRORS:
+            logger.warning(
+                "Contextual RAG summary cache get failed; calling the LLM.",
+                exc_info=True,
+            )
+            return [None] * len(keys)
+
+        values = [
+            raw.decode("utf-8", errors="replace") if raw else None for raw in raw_values
+        ]
+        num_hits = sum(1 for value in values if value is not None)
+        self.llm_calls_saved += num_hits
+        inc_contextual_rag_summary_cache_lookups(
+            kind.value, num_hits=num_hits, num_misses=len(values) - num_hits
+        )
+        return values
+
+    def _mset(self, values_by_key: dict[str, str]) -> None:
+        # Empty summaries come from failed or truncated calls; retry them next time
+        to_write = {key: value for key, value in values_by_key.items() if value}
+        if not to_write:
+            return
+        try:
+            get_cache_backend(tenant_id=self.tenant_id).mset(
+                to_write, ex=self.ttl_seconds
+            )
+        except CACHE_TRANSIENT_ERRORS:
+            logger.warning(
+                "Contextual RAG summary cache set failed; continuing.", exc_info=True
+            )
+
+    def get_doc_summary(self, doc_content: str) -> str | None:
+        return self._mget(
+            ContextualRagSummaryKind.DOC_SUMMARY,
+            [self._key(ContextualRagSummaryKind.DOC_SUMMARY, doc_content)],
+        )[0]
+
+    def put_doc_summary(self, doc_content: str, summary: str) -> None:
+        self._mset(
+            {self._key(ContextualRagSummaryKind.DOC_SUMMARY, doc_content): summary}
+        )
+
+    def get_chunk_contexts(
+        self, doc_info: str, chunk_texts: list[str]
+    ) -> list[str | None]:
+        """Returns a list aligned with ``chunk_texts``, ``None`` for misses."""
+        if not chunk_texts:
+            return []
+        return self._mget(
+            ContextualRagSummaryKind.CHUNK_CONTEXT,
+            [
+                self._key(ContextualRagSummaryKind.CHUNK_CONTEXT, doc_info, text)
+                for text in chunk_texts
+            ],
+        )
+
+    def put_chunk_contexts(
+        self, doc_info: str, contexts_by_chunk_text: dict[str, str]
+    ) -> None:
+        self._mset(
+            {
+                self._key(
+                    ContextualRagSummaryKind.CHUNK_CONTEXT, doc_info, text
+                ): context
+                for text, context in contexts_by_chunk_text.items()
+            }
+        )
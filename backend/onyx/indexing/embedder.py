@@ -4,6 +4,10 @@ from collections import defaultdict
 
 import sentry_sdk
 
+from onyx.configs.app_configs import (
+    PASSAGE_EMBEDDING_CACHE_ENABLED,
+    PASSAGE_EMBEDDING_CACHE_TTL_S,
+)
 from onyx.connectors.models import (
     ConnectorFailure,
     ConnectorStopSignal,
@@ -15,6 +19,7 @@ from onyx.document_index.chunk_content_enrichment import (
 )
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding, DocAwareChunk, IndexChunk
+from onyx.indexing.passage_embedding_cache import embed_passages_with_cache
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
 from onyx.utils.pydantic_util import shallow_model_dump
@@ -24,7 +29,11 @@ from shared_configs.configs import (
     INDEXING_MODEL_SERVER_PORT,
 )
 from shared_configs.enums import EmbeddingProvider, EmbedTextType
-from shared_configs.model_server_models import Embedding
+from shared_configs.model_server_models import (
+    Embedding,
+    EmbeddingVector,
+    embedding_to_list,
+)
 
 logger = setup_logger()
 
@@ -99,6 +108,8 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
         callback: IndexingHeartbeatInterface | None = None,
+        # Enables the passage embedding cache, which is keyed by it
+        search_settings_id: int | None = None,
     ):
         super().__init__(
             model_name,
@@ -113,6 +124,35 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             reduced_dimension,
             callback,
         )
+        self.search_settings_id = search_settings_id
+
+    def _encode_passages(
+        self,
+        texts: list[str],
+        large_chunks_present: bool = False,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[EmbeddingVector]:
+        def _encode(texts_to_embed: list[str]) -> list[EmbeddingVector]:
+            return self.embedding_model.encode_vectors(
+                texts=texts_to_embed,
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+
+        if not PASSAGE_EMBEDDING_CACHE_ENABLED or self.search_settings_id is None:
+            return _encode(texts)
+
+        return embed_passages_with_cache(
+            texts=texts,
+            encode=_encode,
+            search_settings_id=self.search_settings_id,
+            provider_type=self.provider_type,
+            ttl_seconds=PASSAGE_EMBEDDING_CACHE_TTL_S,
+            tenant_id=tenant_id,
+        )
 
     @log_function_time()
     def embed_chunks(
@@ -149,9 +189,10 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
-            texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
+        # Chunk vectors are only passed on to the document index, so they are
+        # kept array-backed until they are serialized there
+        embeddings = self._encode_passages(
+            flat_chunk_texts,
             large_chunks_present=large_chunks_present,
             tenant_id=tenant_id,
             request_id=request_id,
@@ -169,15 +210,12 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # Cache the Title embeddings to only have to do it once
         title_embed_dict: dict[str, Embedding] = {}
         if chunk_titles_list:
-            title_embeddings = self.embedding_model.encode(
-                chunk_titles_list,
-                text_type=EmbedTextType.PASSAGE,
-                tenant_id=tenant_id,
-                request_id=request_id,
+            title_embeddings = self._encode_passages(
+                chunk_titles_list, tenant_id=tenant_id, request_id=request_id
             )
             title_embed_dict.update(
                 {
-                    title: vector
+                    title: embedding_to_list(vector)
                     for title, vector in zip(
                         chunk_titles_list, title_embeddings, strict=True
                     )
@@ -245,6 +283,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             deployment_name=search_settings.deployment_name,
             reduced_dimension=search_settings.reduced_dimension,
             callback=callback,
+            search_settings_id=search_settings.id,
         )
 
 
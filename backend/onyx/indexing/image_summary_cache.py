@@ -0,0 +1,155 @@
+"""Tenant-scoped Redis/Postgres cache for vision-LLM image summaries.
+
+Sits in front of ``summarize_image_with_error_handling`` for the image sections
+of an indexing batch. Re-indexing a Confluence space or a Drive folder then
+only sends images the vision model has not already described, instead of the
+same logos, diagrams and screenshots on every run.
+
+Keys are a sha256 of the image bytes under a namespace derived from the vision
+model and the summarization prompts, so switching the default vision model or
+editing either prompt starts a fresh namespace. The image's file name is only
+context for the LLM and is left out of the key: the same image attached to
+different pages, under different names, is a hit.
+"""
+
+import hashlib
+
+from onyx.cache.factory import get_cache_backend
+from onyx.cache.interface import CACHE_TRANSIENT_ERRORS, CacheBackend
+from onyx.llm.interfaces import LLM
+from onyx.server.metrics.image_processing import (
+    ImageSummaryCacheOutcome,
+    observe_image_summary_cache_lookup,
+)
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+_IMAGE_SUMMARY_CACHE_KEY_PREFIX = "image_summary"
+
+
+def image_content_hash(image_data: bytes) -> str:
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def image_summary_cache_namespace(
+    llm: LLM, system_prompt: str, user_prompt_template: str
+) -> str:
+    """Identifies everything besides the image that shapes a summary."""
+    fingerprint = "\n".join(
+        [
+            llm.config.model_provider,
+            llm.config.model_name,
+            system_prompt,
+            user_prompt_template,
+        ]
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+def _build_key(content_hash: str, namespace: str) -> str:
+    return f"{_IMAGE_SUMMARY_CACHE_KEY_PREFIX}:{namespace}:{content_hash}"
+
+
+def _get_cache_backend_or_none(tenant_id: str | None) -> CacheBackend | None:
+    try:
+        return get_cache_backend(tenant_id=tenant_id)
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "Failed to obtain cache backend for image summary cache.", exc_info=True
+        )
+        return None
+
+
+def get_cached_image_summaries(
+    content_hashes: list[str],
+    namespace: str,
+    ttl_seconds: int,
+    tenant_id: str | None = None,
+) -> list[str | None]:
+    """Looks up every image hash with one ``mget``.
+
+    Returns a list aligned with ``content_hashes``: the summary for hits,
+    ``None`` for misses. Hits get their TTL refreshed.
+
+    Fails open: any ``CACHE_TRANSIENT_ERRORS`` is logged and treated as a miss
+    for every image.
+    """
+    if not content_hashes:
+        return []
+
+    results: list[str | None] = [None] * len(content_hashes)
+    cache_backend = _get_cache_backend_or_none(tenant_id)
+    if cache_backend is None:
+        observe_image_summary_cache_lookup(
+            ImageSummaryCacheOutcome.ERROR, count=len(content_hashes)
+        )
+        return results
+
+    keys = [_build_key(content_hash, namespace) for content_hash in content_hashes]
+    try:
+        raw_values = cache_backend.mget(keys)
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "Image summary cache get failed; treating all images as misses.",
+            exc_info=True,
+        )
+        observe_image_summary_cache_lookup(
+            ImageSummaryCacheOutcome.ERROR, count=len(content_hashes)
+        )
+        return results
+
+    hit_keys: list[str] = []
+    for i, (key, raw) in enumerate(zip(keys, raw_values, strict=True)):
+        if not raw:
+            continue
+        results[i] = raw.decode("utf-8", errors="replace")
+        hit_keys.append(key)
+
+    if hit_keys:
+        try:
+            cache_backend.mexpire(hit_keys, ttl_seconds)
+        except CACHE_TRANSIENT_ERRORS:
+            logger.debug(
+                "Failed to refresh TTL for %d image summaries.",
+                len(hit_keys),
+                exc_info=True,
+            )
+
+    observe_image_summary_cache_lookup(
+        ImageSummaryCacheOutcome.HIT, count=len(hit_keys)
+    )
+    observe_image_summary_cache_lookup(
+        ImageSummaryCacheOutcome.MISS, count=len(content_hashes) - len(hit_keys)
+    )
+    return results
+
+
+def cache_image_summaries(
+    summaries_by_hash: dict[str, str],
+    namespace: str,
+    ttl_seconds: int,
+    tenant_id: str | None = None,
+) -> None:
+    """Writes every (image hash, summary) pair into the cache with one ``mset``.
+
+    Fails open: cache write errors are logged and never fail indexing.
+    """
+    if not summaries_by_hash:
+        return
+
+    cache_backend = _get_cache_backend_or_none(tenant_id)
+    if cache_backend is None:
+        return
+
+    try:
+        cache_backend.mset(
+            {
+                _build_key(content_hash, namespace): summary
+                for content_hash, summary in summaries_by_hash.items()
+            },
+            ex=ttl_seconds,
+        )
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning("Image summary cache set failed; continuing.", exc_info=True)
@@ -9,7 +9,13 @@ from pydantic import BaseModel, ConfigDict
 from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import (
+    CONTEXTUAL_RAG_SUMMARY_CACHE_ENABLED,
+    CONTEXTUAL_RAG_SUMMARY_CACHE_TTL_S,
     ENABLE_CONTEXTUAL_RAG,
+    IMAGE_SUMMARIZATION_SYSTEM_PROMPT,
+    IMAGE_SUMMARIZATION_USER_PROMPT,
+    IMAGE_SUMMARY_CACHE_ENABLED,
+    IMAGE_SUMMARY_CACHE_TTL_S,
     MAX_CHUNKS_PER_DOC_BATCH,
     MAX_DOCUMENT_CHARS,
     MAX_TOKENS_FOR_FULL_INCLUSION,
@@ -71,6 +77,7 @@ from onyx.hooks.points.document_ingestion import (
 )
 from onyx.indexing.chunk_batch_store import ChunkBatchStore
 from onyx.indexing.chunker import Chunker
+from onyx.indexing.contextual_rag_cache import ContextualRagSummaryCache
 from onyx.indexing.document_push import (
     DocumentPushPayload,
     DocumentPushResponse,
@@ -78,12 +85,19 @@ from onyx.indexing.document_push import (
     push_document_via_config,
 )
 from onyx.indexing.embedder import IndexingEmbedder, embed_chunks_with_failure_handling
+from onyx.indexing.image_summary_cache import (
+    cache_image_summaries,
+    get_cached_image_summaries,
+    image_content_hash,
+    image_summary_cache_namespace,
+)
 from onyx.indexing.models import (
     DocAwareChunk,
     DocMetadataAwareIndexChunk,
     IndexingBatchAdapter,
     UpdatableChunkData,
 )
+from onyx.indexing.parallel_chunking import chunk_documents
 from onyx.indexing.vector_db_insertion import write_chunks_to_vector_db_with_backoff
 from onyx.llm.factory import (
     get_contextual_rag_llm_for_search_settings,
@@ -108,7 +122,10 @@ from onyx.tracing.llm_utils import llm_generation_span, record_llm_response
 from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
 from onyx.utils.postgres_sanitization import sanitize_documents_for_postgres
-from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import (
+    LLM_IO_EXECUTOR,
+    run_functions_tuples_in_parallel,
+)
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import MULTI_TENANT
 
@@ -116,6 +133,9 @@ logger = setup_logger()
 
 MAX_CONTEXTUAL_RAG_WORKERS = 128  # Assume 8mb of memory per worker
 MAX_IMAGE_WORKERS = 16
+# Each read briefly holds a DB session for the file record lookup
+MAX_IMAGE_READ_WORKERS = 8
+_IMAGE_NOT_SUMMARIZED_TEXT = "[Image could not be summarized]"
 
 # Contextual-RAG doc/chunk summaries are a short, non-reasoning task. On a reasoning
 # model the hidden reasoning tokens consume the small MAX_CONTEXT_TOKENS budget and the
@@ -134,6 +154,7 @@ class _PendingImageSummarization(BaseModel):
     section: Section
     image_data: bytes
     context_name: str
+    content_hash: str
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -155,6 +176,8 @@ class IndexingPipelineResult(BaseModel):
     total_docs: int
     # number of chunks that were inserted into Vespa
     total_chunks: int
+    # contextual RAG summaries reused from earlier runs instead of an LLM call
+    contextual_rag_llm_calls_saved: int = 0
 
     failures: list[ConnectorFailure]
 
@@ -725,7 +748,8 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     """
     Process all sections in documents by:
     1. Converting both TextSection and ImageSection objects to base Section objects
-    2. Processing ImageSections to generate text summaries using a vision-capable LLM
+    2. Processing ImageSections to generate text summaries using a vision-capable LLM,
+       reusing cached summaries of images it has already described
     3. Returning IndexingDocument objects with both original and processed sections
 
     Args:
@@ -778,10 +802,10 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
         ]
 
     indexed_documents: list[IndexingDocument] = []
-    # Sections that need LLM summarization, paired with their image data.
     # Each Section is already placed in its document's processed_sections
-    # list — we just fill in .text after the parallel run.
-    pending: list[_PendingImageSummarization] = []
+    # list — we just fill in .text once its image is read and summarized.
+    # (section, its image's file id)
+    image_sections: list[tuple[Section, str]] = []
     file_store = get_default_file_store()
 
     for document in documents:
@@ -802,27 +826,7 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
                 heading=section.heading,
             )
             processed_sections.append(processed_section)
-
-            try:
-                file_record = file_store.read_file_record(file_id=section.image_file_id)
-                if not file_record:
-                    logger.warning(
-                        "Image file %s not found in FileStore", section.image_file_id
-                    )
-                    processed_section.text = "[Image could not be processed]"
-                    continue
-
-                image_data = file_store.read_file(file_id=section.image_file_id).read()
-                pending.append(
-                    _PendingImageSummarization(
-                        section=processed_section,
-                        image_data=image_data,
-                        context_name=file_record.display_name or "Image",
-                    )
-                )
-            except Exception as e:
-                logger.error("Error reading image section: %s", e)
-                processed_section.text = "[Error processing image]"
+            image_sections.append((processed_section, section.image_file_id))
 
         indexed_documents.append(
             IndexingDocument(
@@ -830,49 +834,116 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
             )
         )
 
-    # Summarize all images in parallel
-    if pending:
+    if not image_sections:
+        return indexed_documents
 
-        def _summarize(image_data: bytes, context_name: str) -> str:
-            return (
-                summarize_image_with_error_handling(
-                    llm=llm, image_data=image_data, context_name=context_name
-                )
-                or "[Image could not be summarized]"
-            )
+    def _read_image(
+        section: Section, image_file_id: str
+    ) -> _PendingImageSummarization | None:
+        try:
+            file_record = file_store.read_file_record(file_id=image_file_id)
+            if not file_record:
+                logger.warning("Image file %s not found in FileStore", image_file_id)
+                section.text = "[Image could not be processed]"
+                return None
+
+            image_data = file_store.read_file(file_id=image_file_id).read()
+        except Exception as e:
+            logger.error("Error reading image section: %s", e)
+            section.text = "[Error processing image]"
+            return None
 
-        results = run_functions_tuples_in_parallel(
-            [(_summarize, (p.image_data, p.context_name)) for p in pending],
-            allow_failures=True,
-            max_workers=MAX_IMAGE_WORKERS,
+        return _PendingImageSummarization(
+            section=section,
+            image_data=image_data,
+            context_name=file_record.display_name or "Image",
+            content_hash=image_content_hash(image_data),
         )
 
-        for p, result in zip(pending, results, strict=True):
-            p.section.text = result or "[Error processing image]"
+    # Read all images from the file store in parallel
+    pending: list[_PendingImageSummarization] = [
+        p
+        for p in run_functions_tuples_in_parallel(
+            [(_read_image, image_section) for image_section in image_sections],
+            max_workers=MAX_IMAGE_READ_WORKERS,
+        )
+        if p is not None
+    ]
+    if not pending:
+        return indexed_documents
 
-    return indexed_documents
+    cache_namespace = image_summary_cache_namespace(
+        llm=llm,
+        system_prompt=IMAGE_SUMMARIZATION_SYSTEM_PROMPT,
+        user_prompt_template=IMAGE_SUMMARIZATION_USER_PROMPT,
+    )
+    cached_summaries: list[str | None] = (
+        get_cached_image_summaries(
+            content_hashes=[p.content_hash for p in pending],
+            namespace=cache_namespace,
+            ttl_seconds=IMAGE_SUMMARY_CACHE_TTL_S,
+        )
+        if IMAGE_SUMMARY_CACHE_ENABLED
+        else [None] * len(pending)
+    )
 
+    # An image repeated across the batch (a logo on every page) is only sent
+    # to the LLM once
+    uncached_by_hash: dict[str, list[_PendingImageSummarization]] = defaultdict(list)
+    for p, cached_summary in zip(pending, cached_summaries, strict=True):
+        if cached_summary is not None:
+            p.section.text = cached_summary
+        else:
+            uncached_by_hash[p.content_hash].append(p)
+
+    if not uncached_by_hash:
+        return indexed_documents
+
+    def _summarize(image_data: bytes, context_name: str) -> str:
+        return (
+            summarize_image_with_error_handling(
+                llm=llm, image_data=image_data, context_name=context_name
+            )
+            or _IMAGE_NOT_SUMMARIZED_TEXT
+        )
 
-def add_document_summaries(
-    chunks_by_doc: list[DocAwareChunk],
-    llm: LLM,
-    tokenizer: BaseTokenizer,
-    trunc_doc_tokens: int,
-) -> list[int] | None:
-    """
-    Adds a document summary to a list of chunks from the same document.
-    Returns the number of tokens in the document.
-    """
+    # Summarize the remaining distinct images in parallel
+    to_summarize = [duplicates[0] for duplicates in uncached_by_hash.values()]
+    results = run_functions_tuples_in_parallel(
+        [(_summarize, (p.image_data, p.context_name)) for p in to_summarize],
+        allow_failures=True,
+        max_workers=MAX_IMAGE_WORKERS,
+        executor_name=LLM_IO_EXECUTOR,
+    )
 
-    doc_tokens = []
-    # this is value is the same for each chunk in the document; 0 indicates
-    # There is not enough space for contextual RAG (the chunk content
-    # and possibly metadata took up too much space)
-    if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
-        return None
+    new_summaries: dict[str, str] = {}
+    for p, result in zip(to_summarize, results, strict=True):
+        for duplicate in uncached_by_hash[p.content_hash]:
+            duplicate.section.text = result or "[Error processing image]"
+        if result and result != _IMAGE_NOT_SUMMARIZED_TEXT:
+            new_summaries[p.content_hash] = result
+
+    if IMAGE_SUMMARY_CACHE_ENABLED:
+        cache_image_summaries(
+            summaries_by_hash=new_summaries,
+            namespace=cache_namespace,
+            ttl_seconds=IMAGE_SUMMARY_CACHE_TTL_S,
+        )
 
-    doc_tokens = tokenizer.encode(chunks_by_doc[0].source_document.get_text_content())
-    doc_content = tokenizer_trim_middle(doc_tokens, trunc_doc_tokens, tokenizer)
+    return indexed_documents
+
+
+def _summarize_document(
+    llm: LLM,
+    doc_content: str,
+    summary_cache: ContextualRagSummaryCache | None,
+) -> str:
+    """Summarizes the (already truncated) document text, reusing a cached
+    summary of the same text when there is one."""
+    if summary_cache is not None:
+        cached_summary = summary_cache.get_doc_summary(doc_content)
+        if cached_summary is not None:
+            return cached_summary
 
     # Apply prompt caching: cache the static prompt, document content is the suffix
     # Note: For document summarization, there's no cacheable prefix since the document changes
@@ -894,6 +965,34 @@ def add_document_summaries(
         record_llm_response(span_generation, response)
     doc_summary = llm_response_to_string(response)
 
+    if summary_cache is not None:
+        summary_cache.put_doc_summary(doc_content, doc_summary)
+    return doc_summary
+
+
+def add_document_summaries(
+    chunks_by_doc: list[DocAwareChunk],
+    llm: LLM,
+    tokenizer: BaseTokenizer,
+    trunc_doc_tokens: int,
+    summary_cache: ContextualRagSummaryCache | None = None,
+) -> list[int] | None:
+    """
+    Adds a document summary to a list of chunks from the same document.
+    Returns the number of tokens in the document.
+    """
+
+    doc_tokens = []
+    # this is value is the same for each chunk in the document; 0 indicates
+    # There is not enough space for contextual RAG (the chunk content
+    # and possibly metadata took up too much space)
+    if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
+        return None
+
+    doc_tokens = tokenizer.encode(chunks_by_doc[0].source_document.get_text_content())
+    doc_content = tokenizer_trim_middle(doc_tokens, trunc_doc_tokens, tokenizer)
+    doc_summary = _summarize_document(llm, doc_content, summary_cache)
+
     for chunk in chunks_by_doc:
         chunk.doc_summary = doc_summary
 
@@ -906,11 +1005,13 @@ def add_chunk_summaries(
     tokenizer: BaseTokenizer,
     trunc_doc_chunk_tokens: int,
     doc_tokens: list[int] | None,
+    summary_cache: ContextualRagSummaryCache | None = None,
 ) -> None:
     """
     Adds chunk summaries to the chunks grouped by document id.
     Chunk summaries look at the chunk as well as the entire document (or a summary,
     if the document is too long) and describe how the chunk relates to the document.
+    Only chunks without a cached summary for the same document context go to the LLM.
     """
     # all chunks within a document have the same contextual_rag_reserved_tokens
     if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
@@ -931,22 +1032,21 @@ def add_chunk_summaries(
     if not doc_info:
         # This happens if the document is too long AND document summaries are turned off
         # In this case we compute a doc summary using the LLM
-        fallback_prompt = UserMessage(
-            content=DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
+        doc_info = _summarize_document(llm, doc_content, summary_cache)
+
+    chunks_to_summarize = chunks_by_doc
+    if summary_cache is not None:
+        cached_contexts = summary_cache.get_chunk_contexts(
+            doc_info, [chunk.content for chunk in chunks_by_doc]
         )
-        with llm_generation_span(
-            llm=llm,
-            flow=LLMFlow.CONTEXTUAL_RAG_DOC_SUMMARY,
-            input_messages=[fallback_prompt],
-        ) as span_generation:
-            response = llm.invoke(
-                fallback_prompt,
-                max_tokens=MAX_CONTEXT_TOKENS,
-                reasoning_effort=CONTEXTUAL_RAG_REASONING_EFFORT,
-                total_timeout_override=CONTEXTUAL_RAG_LLM_TIMEOUT,
-            )
-            record_llm_response(span_generation, response)
-        doc_info = llm_response_to_string(response)
+        chunks_to_summarize = []
+        for chunk, cached_context in zip(chunks_by_doc, cached_contexts, strict=True):
+            if cached_context is not None:
+                chunk.chunk_context = cached_context
+            else:
+                chunks_to_summarize.append(chunk)
+        if not chunks_to_summarize:
+            return
 
     from onyx.llm.prompt_cache.processor import process_with_prompt_cache
 
@@ -988,20 +1088,31 @@ def add_chunk_summaries(
             chunk.chunk_context = ""
 
     run_functions_tuples_in_parallel(
-        functions_with_args=[(assign_context, (chunk,)) for chunk in chunks_by_doc],
+        functions_with_args=[
+            (assign_context, (chunk,)) for chunk in chunks_to_summarize
+        ],
         max_workers=MAX_CONTEXTUAL_RAG_WORKERS,
+        executor_name=LLM_IO_EXECUTOR,
     )
 
+    if summary_cache is not None:
+        summary_cache.put_chunk_contexts(
+            doc_info,
+            {chunk.content: chunk.chunk_context for chunk in chunks_to_summarize},
+        )
+
 
 def add_contextual_summaries(
     chunks: list[DocAwareChunk],
     llm: LLM,
     tokenizer: BaseTokenizer,
     chunk_token_limit: int,
+    summary_cache: ContextualRagSummaryCache | None = None,
 ) -> list[DocAwareChunk]:
     """
     Adds Document summary and chunk-within-document context to the chunks
-    based on which environment variables are set.
+    based on which environment variables are set. With a summary_cache, summaries
+    from earlier runs are reused and new ones are stored.
     """
     doc2chunks = defaultdict(list)
     for chunk in chunks:
@@ -1024,12 +1135,21 @@ def add_contextual_summaries(
         doc_tokens = None
         if USE_DOCUMENT_SUMMARY:
             doc_tokens = add_document_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_summary_tokens
+                chunks_by_doc,
+                llm,
+                tokenizer,
+                trunc_doc_summary_tokens,
+                summary_cache=summary_cache,
             )
 
         if USE_CHUNK_SUMMARY:
             add_chunk_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_chunk_tokens, doc_tokens
+                chunks_by_doc,
+                llm,
+                tokenizer,
+                trunc_doc_chunk_tokens,
+                doc_tokens,
+                summary_cache=summary_cache,
             )
 
     return chunks
@@ -1353,12 +1473,24 @@ def index_doc_batch(
     # NOTE: no special handling for failures here, since the chunker is not
     # a common source of failure for the indexing pipeline
     with time_stage_if_set(IndexAttemptStage.CHUNKING, attempt_id):
-        chunks: list[DocAwareChunk] = chunker.chunk(context.indexable_docs)
+        chunks: list[DocAwareChunk] = chunk_documents(
+            chunker,
+            context.indexable_docs,
+            model_name=embedder.model_name,
+            provider_type=embedder.provider_type,
+        )
     llm_tokenizer: BaseTokenizer | None = None
+    summary_cache: ContextualRagSummaryCache | None = None
 
     # contextual RAG
     if enable_contextual_rag:
         assert llm is not None, "must provide an LLM for contextual RAG"
+        if CONTEXTUAL_RAG_SUMMARY_CACHE_ENABLED:
+            summary_cache = ContextualRagSummaryCache(
+                llm=llm,
+                ttl_seconds=CONTEXTUAL_RAG_SUMMARY_CACHE_TTL_S,
+                tenant_id=tenant_id,
+            )
         llm_tokenizer = get_tokenizer(
             model_name=llm.config.model_name,
             provider_type=llm.config.model_provider,
@@ -1372,6 +1504,7 @@ def index_doc_batch(
                 llm=llm,
                 tokenizer=llm_tokenizer,
                 chunk_token_limit=chunker.chunk_token_limit * 2,
+                summary_cache=summary_cache,
             )
 
     logger.debug("Starting embedding")
@@ -1523,6 +1656,9 @@ def index_doc_batch(
         ),
         total_docs=len(filtered_documents),
         total_chunks=len(embedding_result.successful_chunk_ids),
+        contextual_rag_llm_calls_saved=(
+            summary_cache.llm_calls_saved if summary_cache is not None else 0
+        ),
         failures=primary_doc_idx_vector_db_write_failures
         + embedding_result.connector_failures
         + filter_failures,
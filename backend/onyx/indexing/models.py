@@ -10,7 +10,7 @@ from onyx.db.enums import EmbeddingPrecision, SwitchoverType
 from onyx.utils.logger import setup_logger
 from onyx.utils.pydantic_util import shallow_model_dump
 from shared_configs.enums import EmbeddingProvider
-from shared_configs.model_server_models import Embedding
+from shared_configs.model_server_models import Embedding, EmbeddingVector
 
 if TYPE_CHECKING:
     from onyx.indexing.indexing_pipeline import DocumentBatchPrepareContext
@@ -24,8 +24,10 @@ logger = setup_logger()
 
 
 class ChunkEmbedding(BaseModel):
-    full_embedding: Embedding
-    mini_chunk_embeddings: list[Embedding]
+    # May be float32 NumPy rows straight from the model server response, use
+    # embedding_to_list where a list of floats is needed
+    full_embedding: EmbeddingVector
+    mini_chunk_embeddings: list[EmbeddingVector]
 
 
 class BaseChunk(BaseModel):
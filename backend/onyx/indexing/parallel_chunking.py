@@ -0,0 +1,226 @@
+"""Chunks large indexing batches across a pool of worker processes.
+
+Chunking is pure CPU work (tokenizing and sentence splitting), so docprocessing
+threads serialize on the GIL while doing it. When INDEXING_CHUNKING_PROCESSES is
+set, batches of at least INDEXING_PARALLEL_CHUNKING_MIN_DOCS documents are split
+into contiguous shards that are chunked in a shared process pool. Each worker
+keeps a warm Chunker (tokenizer and sentence splitters) per configuration, so
+only the documents and chunks cross the process boundary.
+
+Output order matches Chunker.chunk: shards are collected in submission order.
+"""
+
+import math
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict
+
+from onyx.configs.app_configs import (
+    INDEXING_CHUNKING_PROCESSES,
+    INDEXING_PARALLEL_CHUNKING_MIN_DOCS,
+)
+from onyx.connectors.models import IndexingDocument
+from onyx.indexing.chunker import Chunker
+from onyx.indexing.models import DocAwareChunk
+from onyx.natural_language_processing.utils import get_tokenizer
+from onyx.utils.logger import setup_logger
+from shared_configs.enums import EmbeddingProvider
+
+logger = setup_logger()
+
+# More shards than processes so that one slow shard (a very long document)
+# does not leave the other workers idle, and so progress is reported often.
+_SHARDS_PER_PROCESS = 4
+# How often the parent re-checks the stop signal while waiting on a shard.
+_STOP_CHECK_INTERVAL_SECONDS = 1.0
+# Distinct chunker configurations kept warm in each worker.
+_WORKER_CHUNKER_CACHE_SIZE = 4
+
+
+class ChunkerSpec(BaseModel):
+    """Everything a worker process needs to rebuild an equivalent Chunker.
+
+    The tokenizer is identified by the embedding model it belongs to rather
+    than pickled, so workers load it once through get_tokenizer's cache.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    model_name: str | None
+    provider_type: EmbeddingProvider | None
+    enable_multipass: bool
+    enable_large_chunks: bool
+    enable_contextual_rag: bool
+    blurb_size: int
+    include_metadata: bool
+    chunk_token_limit: int
+    chunk_overlap: int
+    mini_chunk_size: int
+
+    @classmethod
+    def from_chunker(
+        cls,
+        chunker: Chunker,
+        model_name: str | None,
+        provider_type: EmbeddingProvider | None,
+    ) -> "ChunkerSpec":
+        return cls(
+            model_name=model_name,
+            provider_type=provider_type,
+            enable_multipass=chunker.enable_multipass,
+            enable_large_chunks=chunker.enable_large_chunks,
+            enable_contextual_rag=chunker.enable_contextual_rag,
+            blurb_size=chunker.blurb_size,
+            include_metadata=chunker.include_metadata,
+            chunk_token_limit=chunker.chunk_token_limit,
+            chunk_overlap=chunker.chunk_overlap,
+            mini_chunk_size=chunker.mini_chunk_size,
+        )
+
+
+@lru_cache(maxsize=_WORKER_CHUNKER_CACHE_SIZE)
+def _get_worker_chunker(spec: ChunkerSpec) -> Chunker:
+    return Chunker(
+        tokenizer=get_tokenizer(
+            model_name=spec.model_name, provider_type=spec.provider_type
+        ),
+        enable_multipass=spec.enable_multipass,
+        enable_large_chunks=spec.enable_large_chunks,
+        enable_contextual_rag=spec.enable_contextual_rag,
+        blurb_size=spec.blurb_size,
+        include_metadata=spec.include_metadata,
+        chunk_token_limit=spec.chunk_token_limit,
+        chunk_overlap=spec.chunk_overlap,
+        mini_chunk_size=spec.mini_chunk_size,
+    )
+
+
+def _chunk_shard(
+    spec: ChunkerSpec, documents: list[IndexingDocument]
+) -> list[DocAwareChunk]:
+    """Runs in a worker process."""
+    return _get_worker_chunker(spec).chunk(documents)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _reset_pool_after_fork() -> None:
+    # The parent's worker processes and management thread do not exist in a
+    # forked child; it builds its own pool on first use.
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the indexing worker holds threads, DB
+            # connections and model clients that are unsafe to fork.
+            _pool = ProcessPoolExecutor(
+                max_workers=INDEXING_CHUNKING_PROCESSES,
+                mp_context=mp.get_context("spawn"),
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _shard(
+    documents: list[IndexingDocument], num_shards: int
+) -> list[list[IndexingDocument]]:
+    shard_size = math.ceil(len(documents) / num_shards)
+    return [
+        documents[start : start + shard_size]
+        for start in range(0, len(documents), shard_size)
+    ]
+
+
+def _wait_for_shard(
+    future: Future[list[DocAwareChunk]], chunker: Chunker
+) -> list[DocAwareChunk]:
+    while True:
+        if chunker.callback and chunker.callback.should_stop():
+            raise RuntimeError("Chunker.chunk: Stop signal detected")
+        done, _ = wait(
+            [future], timeout=_STOP_CHECK_INTERVAL_SECONDS, return_when=FIRST_COMPLETED
+        )
+        if done:
+            return future.result()
+
+
+def _chunk_in_pool(
+    pool: ProcessPoolExecutor,
+    chunker: Chunker,
+    spec: ChunkerSpec,
+    documents: list[IndexingDocument],
+) -> list[DocAwareChunk]:
+    shards = _shard(documents, INDEXING_CHUNKING_PROCESSES * _SHARDS_PER_PROCESS)
+    futures = [pool.submit(_chunk_shard, spec, shard) for shard in shards]
+
+    final_chunks: list[DocAwareChunk] = []
+    try:
+        for shard, future in zip(shards, futures, strict=True):
+            chunks = _wait_for_shard(future, chunker)
+            # Point chunks back at the caller's documents instead of the copies
+            # unpickled from the worker.
+            documents_by_id = {document.id: document for document in shard}
+            for chunk in chunks:
+                chunk.source_document = documents_by_id.get(
+                    chunk.source_document.id, chunk.source_document
+                )
+            final_chunks.extend(chunks)
+
+            if chunker.callback:
+                chunker.callback.progress("Chunker.chunk", len(chunks))
+    finally:
+        for future in futures:
+            future.cancel()
+
+    return final_chunks
+
+
+def chunk_documents(
+    chunker: Chunker,
+    documents: list[IndexingDocument],
+    model_name: str | None,
+    provider_type: EmbeddingProvider | None,
+) -> list[DocAwareChunk]:
+    """Chunks documents like ``chunker.chunk``, using the shared process pool
+    for large batches when it is enabled.
+
+    ``model_name`` and ``provider_type`` identify the chunker's tokenizer so
+    workers can load the same one.
+    """
+    if INDEXING_CHUNKING_PROCESSES <= 0 or len(documents) < max(
+        INDEXING_PARALLEL_CHUNKING_MIN_DOCS, 2
+    ):
+        return chunker.chunk(documents)
+
+    spec = ChunkerSpec.from_chunker(chunker, model_name, provider_type)
+    pool = _get_pool()
+    try:
+        return _chunk_in_pool(pool, chunker, spec, documents)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed). Rebuild the pool for the next batch
+        # and finish this one in-process.
+        logger.exception("Chunking process pool broke, chunking batch serially")
+        _discard_pool(pool)
+        return chunker.chunk(documents)
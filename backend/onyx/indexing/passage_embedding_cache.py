@@ -0,0 +1,245 @@
+"""Tenant-scoped Redis/Postgres cache for passage embeddings.
+
+Sits in front of ``EmbeddingModel.encode_vectors`` for the chunk and title
+texts of an indexing batch. Re-indexing a document whose chunks did not change
+(poll windows that re-fetch it, from-beginning runs, edits elsewhere in the
+document) then only sends the changed chunks to the embedding provider.
+
+Keys are ``search_settings.id`` plus a hash of the exact text passed to the
+embedding model, so the same content in another document is a hit too. Like
+the query-embedding cache, this relies on ``PRESERVED_SEARCH_FIELDS`` making
+every field that affects the vector (model, prefixes, normalization, reduced
+dimension) immutable for a given id, and on the cache backend being scoped to
+the tenant.
+
+Vectors are stored as packed little-endian ``float32`` (``4 * dim`` bytes) and
+come back as NumPy rows, the same as vectors decoded from the model server.
+
+Off by default: on the Redis backend every cached chunk, mini-chunk and title
+vector lives in Redis memory for the TTL, which for a large corpus is a copy of
+a good part of the vector index.
+"""
+
+import hashlib
+from collections.abc import Callable
+
+import numpy as np
+
+from onyx.cache.factory import get_cache_backend
+from onyx.cache.interface import CACHE_TRANSIENT_ERRORS, CacheBackend
+from onyx.server.metrics.embedding import (
+    PassageEmbeddingCacheLookupOutcome,
+    PassageEmbeddingCacheWriteOutcome,
+    observe_passage_embedding_cache_lookup,
+    observe_passage_embedding_cache_write,
+)
+from onyx.utils.logger import setup_logger
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.model_server_models import EmbeddingVector
+
+logger = setup_logger()
+
+
+_EMBEDDING_CACHE_KEY_PREFIX = "passage_emb"
+_FLOAT32_LE = np.dtype("<f4")
+
+
+def _build_key(text: str, search_settings_id: int) -> str:
+    digest = hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+    return f"{_EMBEDDING_CACHE_KEY_PREFIX}:{search_settings_id}:{digest}"
+
+
+def _unpack_or_none(buf: bytes) -> EmbeddingVector | None:
+    if len(buf) % _FLOAT32_LE.itemsize != 0 or len(buf) == 0:
+        logger.warning("Invalid embedding buffer length: %d bytes.", len(buf))
+        return None
+    # astype is a no-op on little-endian hosts and byte swaps on the others
+    return np.frombuffer(buf, dtype=_FLOAT32_LE).astype(np.float32, copy=False)
+
+
+def _get_cache_backend_or_none(tenant_id: str | None) -> CacheBackend | None:
+    try:
+        return get_cache_backend(tenant_id=tenant_id)
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "Failed to obtain cache backend for passage embedding cache.",
+            exc_info=True,
+        )
+        return None
+
+
+def get_cached_passage_embeddings(
+    texts: list[str],
+    search_settings_id: int,
+    provider_type: EmbeddingProvider | None,
+    ttl_seconds: int,
+    tenant_id: str | None = None,
+) -> list[EmbeddingVector | None]:
+    """Looks up each text in the cache.
+
+    Returns a list aligned with ``texts``: the embedding for hits, ``None`` for
+    misses. Hits get their TTL refreshed, so content that keeps being
+    re-indexed stays resident. One ``mget`` plus one ``mexpire`` per call.
+
+    Fails open: any ``CACHE_TRANSIENT_ERRORS`` is logged and treated as a miss
+    for every text.
+    """
+    if not texts:
+        return []
+
+    results: list[EmbeddingVector | None] = [None] * len(texts)
+    cache_backend = _get_cache_backend_or_none(tenant_id)
+    if cache_backend is None:
+        observe_passage_embedding_cache_lookup(
+            provider_type,
+            outcome=PassageEmbeddingCacheLookupOutcome.ERROR,
+            count=len(texts),
+        )
+        return results
+
+    keys = [_build_key(text, search_settings_id) for text in texts]
+    try:
+        raw_values = cache_backend.mget(keys)
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "Passage embedding cache get failed; treating all texts as misses.",
+            exc_info=True,
+        )
+        observe_passage_embedding_cache_lookup(
+            provider_type,
+            outcome=PassageEmbeddingCacheLookupOutcome.ERROR,
+            count=len(texts),
+        )
+        return results
+
+    hit_keys: list[str] = []
+    for i, (key, raw) in enumerate(zip(keys, raw_values, strict=True)):
+        if raw is None:
+            continue
+        results[i] = _unpack_or_none(raw)
+        if results[i] is not None:
+            hit_keys.append(key)
+
+    if hit_keys:
+        try:
+            cache_backend.mexpire(hit_keys, ttl_seconds)
+        except CACHE_TRANSIENT_ERRORS:
+            logger.debug(
+                "Failed to refresh TTL for %d passage embeddings.",
+                len(hit_keys),
+                exc_info=True,
+            )
+
+    observe_passage_embedding_cache_lookup(
+        provider_type,
+        outcome=PassageEmbeddingCacheLookupOutcome.HIT,
+        count=len(hit_keys),
+    )
+    observe_passage_embedding_cache_lookup(
+        provider_type,
+        outcome=PassageEmbeddingCacheLookupOutcome.MISS,
+        count=len(texts) - len(hit_keys),
+    )
+    return results
+
+
+def cache_passage_embeddings(
+    texts: list[str],
+    embeddings: list[EmbeddingVector],
+    search_settings_id: int,
+    provider_type: EmbeddingProvider | None,
+    ttl_seconds: int,
+    tenant_id: str | None = None,
+) -> None:
+    """Writes every (text, embedding) pair into the cache with one ``mset``.
+
+    Fails open: cache write errors are logged and never fail indexing.
+    """
+    if not texts:
+        return
+
+    if len(texts) != len(embeddings):
+        raise ValueError(
+            f"texts ({len(texts)}) and embeddings ({len(embeddings)}) "
+            "must be the same length."
+        )
+
+    cache_backend = _get_cache_backend_or_none(tenant_id)
+    if cache_backend is None:
+        observe_passage_embedding_cache_write(
+            provider_type,
+            outcome=PassageEmbeddingCacheWriteOutcome.ERROR,
+            count=len(texts),
+        )
+        return
+
+    to_write = {
+        _build_key(text, search_settings_id): np.asarray(
+            embedding, dtype=_FLOAT32_LE
+        ).tobytes()
+        for text, embedding in zip(texts, embeddings, strict=True)
+    }
+    try:
+        cache_backend.mset(to_write, ex=ttl_seconds)
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning("Passage embedding cache set failed; continuing.", exc_info=True)
+        observe_passage_embedding_cache_write(
+            provider_type,
+            outcome=PassageEmbeddingCacheWriteOutcome.ERROR,
+            count=len(to_write),
+        )
+        return
+
+    observe_passage_embedding_cache_write(
+        provider_type,
+        outcome=PassageEmbeddingCacheWriteOutcome.SUCCESS,
+        count=len(to_write),
+    )
+
+
+def embed_passages_with_cache(
+    texts: list[str],
+    encode: Callable[[list[str]], list[EmbeddingVector]],
+    search_settings_id: int,
+    provider_type: EmbeddingProvider | None,
+    ttl_seconds: int,
+    tenant_id: str | None = None,
+) -> list[EmbeddingVector]:
+    """Returns an embedding for every text, calling ``encode`` only for the
+    distinct texts that are not cached, then caches those."""
+    cached = get_cached_passage_embeddings(
+        texts=texts,
+        search_settings_id=search_settings_id,
+        provider_type=provider_type,
+        ttl_seconds=ttl_seconds,
+        tenant_id=tenant_id,
+    )
+
+    # Repeated boilerplate chunks and shared titles are only embedded once
+    miss_texts = list(
+        dict.fromkeys(
+            text for text, value in zip(texts, cached, strict=True) if value is None
+        )
+    )
+    if not miss_texts:
+        return [value for value in cached if value is not None]
+
+    fresh_embeddings = encode(miss_texts)
+    if len(fresh_embeddings) != len(miss_texts):
+        raise RuntimeError(
+            f"Bug: got {len(fresh_embeddings)} embeddings for {len(miss_texts)} texts."
+        )
+    cache_passage_embeddings(
+        texts=miss_texts,
+        embeddings=fresh_embeddings,
+        search_settings_id=search_settings_id,
+        provider_type=provider_type,
+        ttl_seconds=ttl_seconds,
+        tenant_id=tenant_id,
+    )
+
+    fresh_by_text = dict(zip(miss_texts, fresh_embeddings, strict=True))
+    return [
+        value if value is not None else fresh_by_text[text]
+        for text, value in zip(texts, cached, strict=True)
+    ]
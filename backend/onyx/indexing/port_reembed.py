@@ -59,6 +59,7 @@ from onyx.indexing.chunker import (
 )
 from onyx.indexing.embedder import IndexingEmbedder
 from onyx.indexing.models import DocAwareChunk, IndexChunk
+from shared_configs.model_server_models import embedding_to_list
 
 if TYPE_CHECKING:
     from onyx.llm.interfaces import LLM
@@ -309,7 +310,7 @@ def re_embed_chunks(
     return [
         DocumentChunk(
             **dict(stored),
-            content_vector=index_chunk.embeddings.full_embedding,
+            content_vector=embedding_to_list(index_chunk.embeddings.full_embedding),
             title_vector=index_chunk.title_embedding,
         )
         for stored, index_chunk in zip(stored_chunks, matched, strict=True)
@@ -453,7 +454,7 @@ def _augmentation_reembed(
         results.append(
             DocumentChunk(
                 **fields,
-                content_vector=index_chunk.embeddings.full_embedding,
+                content_vector=embedding_to_list(index_chunk.embeddings.full_embedding),
                 title_vector=index_chunk.title_embedding,
             )
         )
@@ -34,21 +34,23 @@ def write_chunks_to_vector_db_with_backoff(
     indexing_metadata: IndexingMetadata,
     tenant_id: str,
 ) -> tuple[list[DocumentInsertionRecord], list[ConnectorFailure]]:
-    """Tries to insert all chunks in one large batch. If that batch fails for any reason,
-    goes document by document to isolate the failure(s).
+    """Tries to replace all documents in one large batch. Documents whose chunks
+    could not be written, or all of them if the batch fails as a whole, are then
+    retried document by document to isolate the failure(s).
 
     IMPORTANT: must pass in whole documents at a time not individual chunks, since the
     vector DB interface assumes that all chunks for a single document are present. The
     chunks must also be in contiguous batches
     """
+    insertion_records: list[DocumentInsertionRecord] = []
+    # None means the whole batch has to be retried.
+    retry_doc_ids: set[str] | None = None
+
     # first try to write the chunks to the vector db
     try:
-        return (
-            document_index.index(
-                chunks=make_chunks(),
-                indexing_metadata=indexing_metadata,
-            ),
-            [],
+        replace_results = document_index.replace_documents(
+            chunks=make_chunks(),
+            indexing_metadata=indexing_metadata,
         )
     except Exception as e:
         # The batch write failing just means we fall back to the per-doc
@@ -69,11 +71,27 @@ def write_chunks_to_vector_db_with_backoff(
 
         # give some specific logging on this common failure case.
         _log_insufficient_storage_error(e)
+    else:
+        insertion_records = [
+            result.to_insertion_record()
+            for result in replace_results
+            if result.succeeded
+        ]
+        failed_results = [result for result in replace_results if not result.succeeded]
+        if not failed_results:
+            return insertion_records, []
+
+        retry_doc_ids = {result.document_id for result in failed_results}
+        logger.warning(
+            "Failed to write %s of %s documents to vector db. Trying them individually. First error: %s",
+            len(failed_results),
+            len(replace_results),
+            failed_results[0].failure_message,
+        )
 
-        # wait a couple seconds just to give the vector db a chance to recover
-        time.sleep(2)
+    # wait a couple seconds just to give the vector db a chance to recover
+    time.sleep(2)
 
-    insertion_records: list[DocumentInsertionRecord] = []
     failures: list[ConnectorFailure] = []
 
     def key(chunk: DocMetadataAwareIndexChunk) -> str:
@@ -86,6 +104,8 @@ def write_chunks_to_vector_db_with_backoff(
                 f"Doc chunks are not arriving in order. Current doc_id={doc_id}, seen_doc_ids={list(seen_doc_ids)}"
             )
         seen_doc_ids.add(doc_id)
+        if retry_doc_ids is not None and doc_id not in retry_doc_ids:
+            continue
 
         first_chunk = next(chunks_for_doc)
         chunks_for_doc = chain([first_chunk], chunks_for_doc)
@@ -35,6 +35,7 @@ from onyx.document_index.vespa.kg_interactions import (
     get_kg_vespa_info_update_requests_for_document,
     update_kg_chunks_vespa_info,
 )
+from onyx.kg.clustering.entity_index import refresh_loaded_entity_index
 from onyx.kg.models import KGGroundingType
 from onyx.kg.utils.formatting_utils import make_relationship_id
 from onyx.kg.utils.lock_utils import extend_lock
@@ -468,3 +469,11 @@ def kg_clustering(
     except Exception as e:
         logger.error("Error deleting entities: %s", e)
     logger.info("Finished deleting all transferred staging entries")
+
+    # Pick up the newly transferred entities in this process's normalization
+    # index; other processes catch up on their next lookup.
+    try:
+        with get_session_with_current_tenant() as db_session:
+            refresh_loaded_entity_index(tenant_id, db_session)
+    except Exception as e:
+        logger.error("Error refreshing the entity trigram index: %s", e)
@@ -0,0 +1,404 @@
+"""In-memory trigram index over kg_entity names, used for entity normalization.
+
+Normalizing a KG query used to run one trigram-intersection SQL query per
+entity. Instead, each process keeps a per-tenant, per-entity-type inverted index
+from trigram to entity. It is loaded once, then brought up to date with only the
+rows whose time_updated moved, falling back to a full reload when the table's
+row count or time_updated checksum shows the delta missed something (deletes,
+or rows written with an older time_updated). Candidate scoring for a whole batch of query
+entities happens in numpy, and the allowed-docs filter is one lookup for the
+union of all candidate documents.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import (
+    BigInteger,
+    String,
+    any_,
+    bindparam,
+    column,
+    func,
+    select,
+    table,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from onyx.configs.kg_configs import (
+    KG_ENTITY_INDEX_MAX_TENANTS,
+    KG_ENTITY_INDEX_REFRESH_INTERVAL_SECONDS,
+    KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT,
+)
+from onyx.db.models import KGEntity
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Rows written by transactions that committed after an earlier refresh can carry
+# a time_updated older than that refresh's watermark, so each incremental
+# refresh re-reads this much history. Re-applying a row is idempotent.
+_REFRESH_OVERLAP = timedelta(minutes=1)
+
+_TRIGRAM_WORD_RE = re.compile(r"[^\W_]+")
+# Entities without trigrams can never match, so they are left out of the index.
+_INDEXED_ENTITIES = KGEntity.name_trigrams.isnot(None)
+# Whole seconds, so the per-table sum is exact and comparable with the index's.
+_UPDATED_EPOCH = func.floor(func.extract("epoch", KGEntity.time_updated)).cast(
+    BigInteger
+)
+
+
+def name_trigrams(text: str) -> set[str]:
+    """Trigrams of *text* as produced by pg_trgm's ``show_trgm``, which fills
+    ``kg_entity.name_trigrams``: each word is lowercased and padded with two
+    leading spaces and one trailing space."""
+    trigrams: set[str] = set()
+    for word in _TRIGRAM_WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class EntityQuery(NamedTuple):
+    entity_type: str
+    cleaned_name: str
+    subtype: str | None = None
+
+
+class EntityCandidate(NamedTuple):
+    id_name: str
+    name: str
+    # | Q ∩ E | / min(|Q|, |E|) over name trigrams
+    score: float
+
+
+class _EntityRow(NamedTuple):
+    id_name: str
+    name: str
+    entity_type: str
+    document_id: str | None
+    subtype: str | None
+    trigrams: list[str]
+    updated_epoch: int = 0
+
+
+class _DbState(NamedTuple):
+    max_time_updated: datetime | None
+    count: int
+    # Sum of every row's _UPDATED_EPOCH. Moves on any insert, update or delete,
+    # even one that leaves the max and the count unchanged.
+    epoch_sum: int
+
+
+class _FrozenTypeIndex(NamedTuple):
+    """Array view of an _EntityTypeIndex, rebuilt lazily after changes."""
+
+    # Appends do not move existing positions and compaction builds new lists,
+    # so a snapshot stays valid while the index keeps changing.
+    rows: list[_EntityRow]
+    postings: dict[str, npt.NDArray[np.int64]]
+    trigram_counts: npt.NDArray[np.int64]
+    alive: npt.NDArray[np.bool_]
+    document_ids: npt.NDArray[np.object_]
+    subtypes: npt.NDArray[np.object_]
+
+
+class _EntityTypeIndex:
+    """Append-only store of one entity type's rows. Updated rows are appended
+    and their old position marked dead; compacted once dead rows dominate."""
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self.rows: list[_EntityRow] = []
+        self.alive: list[bool] = []
+        self.positions: dict[str, int] = {}
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        self._frozen: _FrozenTypeIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def remove(self, id_name: str) -> None:
+        position = self.positions.pop(id_name, None)
+        if position is not None:
+            self.alive[position] = False
+            self._frozen = None
+
+    def upsert(self, row: _EntityRow) -> None:
+        old_position = self.positions.get(row.id_name)
+        if old_position is not None:
+            self.alive[old_position] = False
+        position = len(self.rows)
+        self.rows.append(row)
+        self.alive.append(True)
+        self.positions[row.id_name] = position
+        for trigram in set(row.trigrams):
+            self._postings[trigram].append(position)
+        self._frozen = None
+
+        if len(self.rows) > 2 * len(self.positions) + 1024:
+            self._compact()
+
+    def _compact(self) -> None:
+        live_rows = [self.rows[position] for position in self.positions.values()]
+        self._reset()
+        for row in live_rows:
+            self.upsert(row)
+
+    def frozen(self) -> _FrozenTypeIndex:
+        if self._frozen is None:
+            self._frozen = _FrozenTypeIndex(
+                rows=self.rows,
+                postings={
+                    trigram: np.asarray(positions, dtype=np.int64)
+                    for trigram, positions in self._postings.items()
+                },
+                trigram_counts=np.fromiter(
+                    (len(set(row.trigrams)) for row in self.rows),
+                    dtype=np.int64,
+                    count=len(self.rows),
+                ),
+                alive=np.asarray(self.alive, dtype=np.bool_),
+                document_ids=np.asarray(
+                    [row.document_id for row in self.rows], dtype=object
+                ),
+                subtypes=np.asarray([row.subtype for row in self.rows], dtype=object),
+            )
+        return self._frozen
+
+
+class _ScoredMatches(NamedTuple):
+    positions: npt.NDArray[np.int64]
+    scores: npt.NDArray[np.float64]
+
+
+class EntityTrigramIndex:
+    """Trigram index over every kg_entity of one tenant."""
+
+    def __init__(self) -> None:
+        self._types: dict[str, _EntityTypeIndex] = {}
+        self._rows: dict[str, _EntityRow] = {}
+        self._epoch_sum = 0
+        self._watermark: datetime | None = None
+        self._db_state: _DbState | None = None
+        self._checked_at: float | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self, db_session: Session, force: bool = False) -> None:
+        """Apply kg_entity rows changed since the last refresh. A full reload
+        happens on first use and whenever the delta doesn't add up to the
+        table. Unless forced, the table is checked at most once per
+        KG_ENTITY_INDEX_REFRESH_INTERVAL_SECONDS."""
+        checked_at = time.monotonic()
+        with self._lock:
+            if (
+                not force
+                and self._checked_at is not None
+                and checked_at - self._checked_at
+                < KG_ENTITY_INDEX_REFRESH_INTERVAL_SECONDS
+            ):
+                return
+
+        max_time_updated, count, epoch_sum = db_session.execute(
+            select(
+                func.max(KGEntity.time_updated),
+                func.count(),
+                func.coalesce(func.sum(_UPDATED_EPOCH), 0),
+            ).where(_INDEXED_ENTITIES)
+        ).one()
+        db_state = _DbState(max_time_updated, count, int(epoch_sum))
+        with self._lock:
+            self._checked_at = checked_at
+            if self._db_state == db_state:
+                return
+
+            if self._watermark is not None:
+                self._apply(
+                    _load_rows(
+                        db_session,
+                        KGEntity.time_updated >= self._watermark - _REFRESH_OVERLAP,
+                    )
+                )
+            if self._watermark is None or (len(self._rows), self._epoch_sum) != (
+                db_state.count,
+                db_state.epoch_sum,
+            ):
+                self._types = {}
+                self._rows = {}
+                self._epoch_sum = 0
+                self._apply(_load_rows(db_session))
+                logger.debug("Loaded KG entity trigram index with %s entities", count)
+
+            self._watermark = max_time_updated
+            self._db_state = db_state
+
+    def _apply(self, rows: Iterable[_EntityRow]) -> None:
+        for row in rows:
+            previous = self._rows.get(row.id_name)
+            if previous is not None:
+                self._epoch_sum -= previous.updated_epoch
+                if previous.entity_type != row.entity_type:
+                    self._types[previous.entity_type].remove(row.id_name)
+            self._rows[row.id_name] = row
+            self._epoch_sum += row.updated_epoch
+
+            type_index = self._types.get(row.entity_type)
+            if type_index is None:
+                type_index = self._types[row.entity_type] = _EntityTypeIndex()
+            type_index.upsert(row)
+
+    def search(
+        self,
+        queries: list[EntityQuery],
+        db_session: Session,
+        allowed_docs_view_name: str,
+        limit: int = KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT,
+    ) -> list[list[EntityCandidate]]:
+        """Best *limit* candidates of the same type (and subtype, if given)
+        for each query, best first. Entities tied to a document are only
+        returned if the document is in the allowed-docs view."""
+        with self._lock:
+            type_indexes = {
+                entity_type: self._types[entity_type].frozen()
+                for entity_type in {query.entity_type for query in queries}
+                if entity_type in self._types
+            }
+
+        matches: list[_ScoredMatches | None] = []
+        candidate_doc_ids: set[str] = set()
+        for query in queries:
+            if query.entity_type not in type_indexes:
+                matches.append(None)
+                continue
+            frozen = type_indexes[query.entity_type]
+            match = _score(frozen, name_trigrams(query.cleaned_name), query.subtype)
+            matches.append(match)
+            candidate_doc_ids.update(
+                doc_id for doc_id in frozen.document_ids[match.positions] if doc_id
+            )
+
+        allowed_doc_ids = _get_allowed_doc_ids(
+            db_session, allowed_docs_view_name, candidate_doc_ids
+        )
+
+        results: list[list[EntityCandidate]] = []
+        for query, match in zip(queries, matches, strict=True):
+            if match is None:
+                results.append([])
+                continue
+            frozen = type_indexes[query.entity_type]
+            document_ids = frozen.document_ids[match.positions]
+            allowed = np.fromiter(
+                (
+                    doc_id is None or doc_id in allowed_doc_ids
+                    for doc_id in document_ids
+                ),
+                dtype=np.bool_,
+                count=len(document_ids),
+            )
+            positions, scores = match.positions[allowed], match.scores[allowed]
+            top = np.argsort(-scores, kind="stable")[:limit]
+            results.append(
+                [
+                    EntityCandidate(
+                        frozen.rows[position].id_name,
+                        frozen.rows[position].name,
+                        float(score),
+                    )
+                    for position, score in zip(positions[top], scores[top], strict=True)
+                ]
+            )
+        return results
+
+
+def _score(
+    frozen: _FrozenTypeIndex, query_trigrams: set[str], subtype: str | None
+) -> _ScoredMatches:
+    postings = [
+        frozen.postings[trigram]
+        for trigram in query_trigrams
+        if trigram in frozen.postings
+    ]
+    if not postings:
+        return _ScoredMatches(
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        )
+
+    overlap = np.bincount(np.concatenate(postings), minlength=len(frozen.alive))
+    mask = (overlap > 0) & frozen.alive
+    if subtype is not None:
+        mask &= frozen.subtypes == subtype
+    positions = np.flatnonzero(mask)
+    scores = overlap[positions] / np.minimum(
+        len(query_trigrams), frozen.trigram_counts[positions]
+    )
+    return _ScoredMatches(positions, scores)
+
+
+def _load_rows(db_session: Session, *filters: ColumnElement[bool]) -> list[_EntityRow]:
+    stmt = select(
+        KGEntity.id_name,
+        KGEntity.name,
+        KGEntity.entity_type_id_name,
+        KGEntity.document_id,
+        KGEntity.attributes["subtype"].astext,
+        KGEntity.name_trigrams,
+        _UPDATED_EPOCH,
+    ).where(_INDEXED_ENTITIES, *filters)
+    return [_EntityRow(*row) for row in db_session.execute(stmt)]
+
+
+def _get_allowed_doc_ids(
+    db_session: Session, allowed_docs_view_name: str, doc_ids: set[str]
+) -> set[str]:
+    if not doc_ids:
+        return set()
+    allowed_docs_view = table(
+        allowed_docs_view_name.split(".")[-1], column("allowed_doc_id")
+    )
+    return set(
+        db_session.execute(
+            select(allowed_docs_view.c.allowed_doc_id).where(
+                allowed_docs_view.c.allowed_doc_id
+                == any_(bindparam("doc_ids", list(doc_ids), type_=ARRAY(String)))
+            )
+        ).scalars()
+    )
+
+
+# Least recently used last, so idle tenants' indexes are dropped first.
+_indexes: OrderedDict[str, EntityTrigramIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_entity_index(tenant_id: str) -> EntityTrigramIndex:
+    with _indexes_lock:
+        index = _indexes.get(tenant_id)
+        if index is None:
+            index = _indexes[tenant_id] = EntityTrigramIndex()
+            while len(_indexes) > KG_ENTITY_INDEX_MAX_TENANTS:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(tenant_id)
+        return index
+
+
+def refresh_loaded_entity_index(tenant_id: str, db_session: Session) -> None:
+    """Refresh the tenant's index if this process has one. Processes that never
+    normalize entities do not pay for loading it."""
+    with _indexes_lock:
+        index = _indexes.get(tenant_id)
+    if index is not None:
+        index.refresh(db_session, force=True)
@@ -1,21 +1,21 @@
 import re
 from collections import defaultdict
-from typing import cast
 
 import numpy as np
 from rapidfuzz.distance.DamerauLevenshtein import normalized_similarity
-from sqlalchemy import Float, MetaData, String, Table, desc, func, select
-from sqlalchemy.dialects.postgresql import ARRAY
 
 from onyx.configs.kg_configs import (
     KG_NORMALIZATION_RERANK_LEVENSHTEIN_WEIGHT,
     KG_NORMALIZATION_RERANK_NGRAM_WEIGHTS,
     KG_NORMALIZATION_RERANK_THRESHOLD,
-    KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT,
 )
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
-from onyx.db.models import KGEntity
 from onyx.db.relationships import get_relationships_for_entity_type_pairs
+from onyx.kg.clustering.entity_index import (
+    EntityCandidate,
+    EntityQuery,
+    get_entity_index,
+)
 from onyx.kg.models import NormalizedEntities, NormalizedRelationships
 from onyx.kg.utils.embeddings import encode_string_batch
 from onyx.kg.utils.formatting_utils import (
@@ -28,8 +28,7 @@ from onyx.kg.utils.formatting_utils import (
     split_relationship_id,
 )
 from onyx.utils.logger import setup_logger
-from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
-from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -55,106 +54,33 @@ def _clean_name(entity_name: str) -> str:
     )
 
 
-def _normalize_one_entity(
-    entity: str,
-    attributes: dict[str, str],
-    allowed_docs_temp_view_name: str | None = None,
+def _rerank_candidates(
+    cleaned_entity: str, candidates: list[EntityCandidate]
 ) -> str | None:
     """
-    Matches a single entity to the best matching entity of the same type.
+    Reranks trigram candidates with a weighted ngram analysis and damerau
+    levenshtein distance, returning the best candidate above the threshold.
     """
-    entity_type, entity_name = split_entity_id(entity)
-    if entity_name == "*":
-        return entity
-
-    cleaned_entity = _clean_name(entity_name)
-
-    # narrow filter to subtype if requested
-    type_filters = [KGEntity.entity_type_id_name == entity_type]
-    if "subtype" in attributes:
-        type_filters.append(
-            KGEntity.attributes.op("@>")({"subtype": attributes["subtype"]})
-        )
-
-    # step 1: find entities containing the entity_name or something similar
-    with get_session_with_current_tenant() as db_session:
-        # get allowed documents
-        metadata = MetaData()
-        if allowed_docs_temp_view_name is None:
-            raise ValueError("allowed_docs_temp_view_name is not available")
-
-        effective_schema_allowed_docs_temp_view_name = (
-            allowed_docs_temp_view_name.split(".")[-1]
-        )
-
-        allowed_docs_temp_view = Table(
-            effective_schema_allowed_docs_temp_view_name,
-            metadata,
-            autoload_with=db_session.get_bind(),
-        )
-
-        # generate trigrams of the queried entity Q
-        query_trigrams = db_session.query(
-            getattr(func, POSTGRES_DEFAULT_SCHEMA)
-            .show_trgm(cleaned_entity)
-            .cast(ARRAY(String(3)))
-            .label("trigrams")
-        ).cte("query")
-
-        candidates = cast(
-            list[tuple[str, str, float]],
-            db_session.query(
-                KGEntity.id_name,
-                KGEntity.name,
-                (
-                    # for each entity E, compute score = | Q ∩ E | / min(|Q|, |E|)
-                    func.cardinality(
-                        func.array(
-                            select(func.unnest(KGEntity.name_trigrams))
-                            .correlate(KGEntity)
-                            .intersect(
-                                select(
-                                    func.unnest(query_trigrams.c.trigrams)
-                                ).correlate(query_trigrams)
-                            )
-                            .scalar_subquery()
-                        )
-                    ).cast(Float)
-                    / func.least(
-                        func.cardinality(query_trigrams.c.trigrams),
-                        func.cardinality(KGEntity.name_trigrams),
-                    )
-                ).label("score"),
-            )
-            .select_from(KGEntity, query_trigrams)
-            .outerjoin(
-                allowed_docs_temp_view,
-                KGEntity.document_id == allowed_docs_temp_view.c.allowed_doc_id,
-            )
-            .filter(
-                *type_filters,
-                KGEntity.name_trigrams.overlap(query_trigrams.c.trigrams),
-                # Add filter for allowed docs - either document_id is NULL or it's in allowed_docs
-                (
-                    KGEntity.document_id.is_(None)
-                    | allowed_docs_temp_view.c.allowed_doc_id.isnot(None)
-                ),
-            )
-            .order_by(desc("score"))
-            .limit(KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT)
-            .all(),
-        )
     if not candidates:
         return None
 
-    # step 2: do a weighted ngram analysis and damerau levenshtein distance to rerank
+    cleaned_candidates = [_clean_name(candidate.name) for candidate in candidates]
+    # compute damerau levenshtein distance to fuzzy match against typos
+    leven_scores = [
+        normalized_similarity(cleaned_entity, cleaned_candidate)
+        for cleaned_candidate in cleaned_candidates
+    ]
+
     n1, n2, n3 = (
         set(_ngrams(cleaned_entity, 1)),
         set(_ngrams(cleaned_entity, 2)),
         set(_ngrams(cleaned_entity, 3)),
     )
-    for i, (candidate_id_name, candidate_name, _) in enumerate(candidates):
-        cleaned_candidate = _clean_name(candidate_name)
+    best_id_name: str | None = None
+    best_score = KG_NORMALIZATION_RERANK_THRESHOLD
+    for candidate, cleaned_candidate, leven_score in zip(
+        candidates, cleaned_candidates, leven_scores, strict=True
+    ):
         h_n1, h_n2, h_n3 = (
             set(_ngrams(cleaned_candidate, 1)),
             set(_ngrams(cleaned_candidate, 2)),
@@ -165,30 +91,67 @@ def _normalize_one_entity(
         grams_used = min(2, len(cleaned_entity) - 1, len(cleaned_candidate) - 1)
         W_n1, W_n2, W_n3 = KG_NORMALIZATION_RERANK_NGRAM_WEIGHTS
         ngram_score = (
-            # compute | Q ∩ E | / min(|Q|, |E|) for unigrams and bigrams (trigrams already computed)
+            # compute | Q ∩ E | / min(|Q|, |E|) for unigrams, bigrams and trigrams
             W_n1 * len(n1 & h_n1) / max(1, min(len(n1), len(h_n1)))
             + W_n2 * len(n2 & h_n2) / max(1, min(len(n2), len(h_n2)))
             + W_n3 * len(n3 & h_n3) / max(1, min(len(n3), len(h_n3)))
         ) / (W_n1, W_n1 + W_n2, 1.0)[grams_used]
 
-        # compute damerau levenshtein distance to fuzzy match against typos
+        # combine scores
         W_leven = KG_NORMALIZATION_RERANK_LEVENSHTEIN_WEIGHT
-        leven_score = normalized_similarity(cleaned_entity, cleaned_candidate)
+        score = (1.0 - W_leven) * ngram_score + W_leven * float(leven_score)
+        if score > best_score:
+            best_id_name, best_score = candidate.id_name, score
 
-        # combine scores
-        score = (1.0 - W_leven) * ngram_score + W_leven * leven_score
-        candidates[i] = (candidate_id_name, candidate_name, score)
-    candidates = list(
-        sorted(
-            filter(lambda x: x[2] > KG_NORMALIZATION_RERANK_THRESHOLD, candidates),
-            key=lambda x: x[2],
-            reverse=True,
+    return best_id_name
+
+
+def _normalize_entity_batch(
+    entities: list[str],
+    entity_attributes: list[dict[str, str]],
+    allowed_docs_temp_view_name: str | None = None,
+) -> list[str | None]:
+    """
+    Matches each entity to the best matching entity of the same type, using the
+    in-memory trigram index for candidate generation.
+    """
+    if allowed_docs_temp_view_name is None:
+        raise ValueError("allowed_docs_temp_view_name is not available")
+
+    mapping: list[str | None] = list(entities)
+    queries: list[EntityQuery] = []
+    query_positions: list[int] = []
+    for i, (entity, attributes) in enumerate(
+        zip(entities, entity_attributes, strict=True)
+    ):
+        entity_type, entity_name = split_entity_id(entity)
+        if entity_name == "*":
+            continue
+        # narrow filter to subtype if requested
+        queries.append(
+            EntityQuery(
+                entity_type, _clean_name(entity_name), attributes.get("subtype")
+            )
         )
-    )
-    if not candidates:
-        return None
+        query_positions.append(i)
+
+    if not queries:
+        return mapping
 
-    return candidates[0][0]
+    # step 1: find entities with a similar name through the trigram index
+    entity_index = get_entity_index(get_current_tenant_id())
+    with get_session_with_current_tenant() as db_session:
+        entity_index.refresh(db_session)
+        candidates = entity_index.search(
+            queries, db_session, allowed_docs_temp_view_name
+        )
+
+    # step 2: rerank the candidates of each entity
+    for position, query, query_candidates in zip(
+        query_positions, queries, candidates, strict=True
+    ):
+        mapping[position] = _rerank_candidates(query.cleaned_name, query_candidates)
+    return mapping
 
 
 def _get_existing_normalized_relationships(
@@ -248,11 +211,8 @@ def normalize_entities(
         get_attributes(attr_entity) for attr_entity in raw_entities_w_attributes
     ]
 
-    mapping: list[str | None] = run_functions_tuples_in_parallel(
-        [
-            (_normalize_one_entity, (entity, attributes, allowed_docs_temp_view_name))
-            for entity, attributes in zip(raw_entities, entity_attributes, strict=True)
-        ]
+    mapping = _normalize_entity_batch(
+        raw_entities, entity_attributes, allowed_docs_temp_view_name
     )
     for entity, attributes, normalized_entity in zip(
         raw_entities, entity_attributes, mapping, strict=True
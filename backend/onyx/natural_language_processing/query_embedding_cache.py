@@ -87,10 +87,11 @@ def get_cached_query_embeddings(
 
     Returns a list aligned with ``queries``: ``Embedding`` for hits, ``None``
     for misses. On a hit, the entry's TTL is refreshed so hot keys stay resident
-    and cold ones expire.
+    and cold ones expire. The lookup is one ``mget`` plus one ``mexpire`` for
+    the hits, regardless of the number of queries.
 
     Fails open: any ``CACHE_TRANSIENT_ERRORS`` is logged and treated as a miss
-    for that query.
+    for every query.
 
     Args:
         queries: The queries to look up.
@@ -123,21 +124,26 @@ def get_cached_query_embeddings(
         )
         return results
 
+    keys = [_build_key(query, search_settings_id) for query in queries]
+    try:
+        raw_values = cache_backend.mget(keys)
+    except CACHE_TRANSIENT_ERRORS:
+        logger.warning(
+            "Query embedding cache get failed; treating all queries as misses.",
+            exc_info=True,
+        )
+        observe_query_embedding_cache_lookup(
+            provider_type,
+            outcome=QueryEmbeddingCacheLookupOutcome.ERROR,
+            count=len(queries),
+        )
+        return results
+
     hits = 0
     misses = 0
-    errors = 0
-
-    for i, query in enumerate(queries):
-        key = _build_key(query, search_settings_id)
-        try:
-            raw = cache_backend.get(key)
-        except CACHE_TRANSIENT_ERRORS:
-            logger.warning(
-                "Query embedding cache get failed; treating as miss.", exc_info=True
-            )
-            errors += 1
-            continue
+    hit_keys: list[str] = []
 
+    for i, (key, raw) in enumerate(zip(keys, raw_values, strict=True)):
         if raw is None:
             misses += 1
             continue
@@ -151,10 +157,17 @@ def get_cached_query_embeddings(
             continue
 
         hits += 1
+        hit_keys.append(key)
+
+    if hit_keys:
         try:
-            cache_backend.expire(key, ttl_seconds)
+            cache_backend.mexpire(hit_keys, ttl_seconds)
         except CACHE_TRANSIENT_ERRORS:
-            logger.debug("Failed to refresh TTL for %s.", key, exc_info=True)
+            logger.debug(
+                "Failed to refresh TTL for %d query embeddings.",
+                len(hit_keys),
+                exc_info=True,
+            )
 
     observe_query_embedding_cache_lookup(
         provider_type, outcome=QueryEmbeddingCacheLookupOutcome.HIT, count=hits
@@ -162,15 +175,11 @@ def get_cached_query_embeddings(
     observe_query_embedding_cache_lookup(
         provider_type, outcome=QueryEmbeddingCacheLookupOutcome.MISS, count=misses
     )
-    observe_query_embedding_cache_lookup(
-        provider_type, outcome=QueryEmbeddingCacheLookupOutcome.ERROR, count=errors
-    )
 
     logger.debug(
-        "Query embedding cache lookup: hits=%d misses=%d errors=%d total=%d",
+        "Query embedding cache lookup: hits=%d misses=%d total=%d",
         hits,
         misses,
-        errors,
         len(queries),
     )
     return results
@@ -183,7 +192,7 @@ def cache_query_embeddings(
     provider_type: EmbeddingProvider | None,
     ttl_seconds: int,
 ) -> None:
-    """Writes each (query, embedding) pair into the cache with the given TTL.
+    """Writes every (query, embedding) pair into the cache with one ``mset``.
 
     Fails open: any ``CACHE_TRANSIENT_ERRORS`` is logged and swallowed so cache
     write errors never break a search.
@@ -225,22 +234,25 @@ def cache_query_embeddings(
         )
         return
 
-    successes = 0
+    to_write: dict[str, bytes] = {}
     errors = 0
     for query, embedding in zip(queries, embeddings, strict=True):
-        key = _build_key(query, search_settings_id)
+        packed = _safe_pack_or_none(embedding)
+        if packed is None:
+            errors += 1
+            continue
+        to_write[_build_key(query, search_settings_id)] = packed
+
+    successes = 0
+    if to_write:
         try:
-            packed = _safe_pack_or_none(embedding)
-            if packed is None:
-                errors += 1
-                continue
-            cache_backend.set(key, packed, ex=ttl_seconds)
-            successes += 1
+            cache_backend.mset(to_write, ex=ttl_seconds)
+            successes = len(to_write)
         except CACHE_TRANSIENT_ERRORS:
             logger.warning(
                 "Query embedding cache set failed; continuing.", exc_info=True
             )
-            errors += 1
+            errors += len(to_write)
 
     observe_query_embedding_cache_write(
         provider_type,
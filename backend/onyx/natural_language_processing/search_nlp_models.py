@@ -72,15 +72,24 @@ from shared_configs.configs import (
     SKIP_WARM_UP,
     VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE,
 )
-from shared_configs.enums import EmbeddingProvider, EmbedTextType, RerankerProvider
+from shared_configs.enums import (
+    EmbeddingProvider,
+    EmbeddingsEncoding,
+    EmbedTextType,
+    RerankerProvider,
+)
 from shared_configs.model_server_models import (
+    EMBEDDINGS_BINARY_MEDIA_TYPE,
     Embedding,
+    EmbeddingVector,
     EmbedRequest,
     EmbedResponse,
     IntentRequest,
     IntentResponse,
     RerankRequest,
     RerankResponse,
+    decode_embeddings_binary,
+    embedding_to_list,
 )
 from shared_configs.utils import batch_list
 
@@ -322,6 +331,18 @@ class AuthenticationError(Exception):
         super().__init__(f"{provider} authentication failed: {message}")
 
 
+def _parse_model_server_embed_response(response: Response) -> EmbedResponse:
+    """Model servers that predate EmbedRequest.response_encoding answer with JSON
+    regardless, so the format is taken from the Content-Type."""
+    content_type = response.headers.get("Content-Type", "")
+    if content_type.split(";")[0].strip() == EMBEDDINGS_BINARY_MEDIA_TYPE:
+        # Rows are views into the response body, no per-float objects are built
+        return EmbedResponse(
+            embeddings=list(decode_embeddings_binary(response.content))
+        )
+    return EmbedResponse(**response.json())
+
+
 class CloudEmbedding:
     def __init__(
         self,
@@ -938,7 +959,7 @@ class EmbeddingModel:
 
         try:
             response = final_make_request_func()
-            return EmbedResponse(**response.json())
+            return _parse_model_server_embed_response(response)
         except requests.HTTPError as e:
             if not response:
                 raise HTTPError("HTTP error occurred - response is None.") from e
@@ -960,13 +981,13 @@ class EmbeddingModel:
         num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
         tenant_id: str | None = None,
         request_id: str | None = None,
-    ) -> list[Embedding]:
+    ) -> list[EmbeddingVector]:
         text_batches = batch_list(texts, batch_size)
         num_of_batches = len(text_batches)
 
         logger.debug("Encoding %s texts in %s batches.", len(texts), num_of_batches)
 
-        embeddings: list[Embedding] = []
+        embeddings: list[EmbeddingVector] = []
 
         @_cleanup_thread_local
         def process_batch(
@@ -975,7 +996,7 @@ class EmbeddingModel:
             text_batch: list[str],
             tenant_id: str | None = None,
             request_id: str | None = None,
-        ) -> tuple[int, list[Embedding]]:
+        ) -> tuple[int, list[EmbeddingVector]]:
             if self.callback:
                 if self.callback.should_stop():
                     raise ConnectorStopSignal(
@@ -996,6 +1017,9 @@ class EmbeddingModel:
                 manual_passage_prefix=self.passage_prefix,
                 api_url=self.api_url,
                 reduced_dimension=self.reduced_dimension,
+                # Only used by the model server, it skips building and parsing
+                # JSON lists of floats for every vector
+                response_encoding=EmbeddingsEncoding.BINARY,
             )
 
             num_texts = len(text_batch)
@@ -1079,7 +1103,7 @@ class EmbeddingModel:
                 format(processing_time, ".2f"),
             )
 
-            return batch_idx, response.embeddings
+            return batch_idx, response.decoded_embeddings()
 
         # Only multi-thread if:
         #  1. num_threads is greater than 1.
@@ -1109,7 +1133,7 @@ class EmbeddingModel:
                 ]
 
                 # Collect results in order.
-                batch_results: list[tuple[int, list[Embedding]]] = []
+                batch_results: list[tuple[int, list[EmbeddingVector]]] = []
                 for future in as_completed(futures):
                     try:
                         result = future.result()
@@ -1136,7 +1160,6 @@ class EmbeddingModel:
 
         return embeddings
 
-    @log_function_time(print_only=True, debug_only=True)
     def encode(
         self,
         texts: list[str],
@@ -1148,6 +1171,35 @@ class EmbeddingModel:
         tenant_id: str | None = None,
         request_id: str | None = None,
     ) -> list[Embedding]:
+        return [
+            embedding_to_list(vector)
+            for vector in self.encode_vectors(
+                texts=texts,
+                text_type=text_type,
+                large_chunks_present=large_chunks_present,
+                local_embedding_batch_size=local_embedding_batch_size,
+                api_embedding_batch_size=api_embedding_batch_size,
+                max_seq_length=max_seq_length,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+        ]
+
+    @log_function_time(print_only=True, debug_only=True)
+    def encode_vectors(
+        self,
+        texts: list[str],
+        text_type: EmbedTextType,
+        large_chunks_present: bool = False,
+        local_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS,
+        api_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
+        max_seq_length: int = DOC_EMBEDDING_CONTEXT_SIZE,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[EmbeddingVector]:
+        """Like encode, but embeddings from the model server stay as float32
+        NumPy rows over the response buffer. Use this when the vectors are only
+        passed along, e.g. to the document index."""
         if not texts or not all(texts):
             raise ValueError(f"Empty or missing text for embedding: {texts}")
 
@@ -1,4 +1,5 @@
 import time
+from collections.abc import Callable
 from datetime import datetime
 from logging import Logger
 from typing import Any, NamedTuple, cast
@@ -15,6 +16,8 @@ from onyx.configs.constants import (
 from onyx.redis.redis_pool import SCAN_ITER_COUNT_DEFAULT
 from onyx.redis.tenant_redis_client import TenantRedisClient
 from onyx.server.metrics.perm_sync_metrics import (
+    inc_doc_perm_sync_elements,
+    observe_doc_perm_sync_batch_throughput,
     observe_doc_perm_sync_db_update_duration,
 )
 from onyx.utils.variable_functionality import fetch_versioned_implementation
@@ -26,10 +29,18 @@ class PermissionSyncResult(NamedTuple):
     Attributes:
         num_updated: Number of documents successfully updated
         num_errors: Number of documents that failed to update
+        num_changed: Number of updated documents whose permissions changed
     """
 
     num_updated: int
     num_errors: int
+    num_changed: int = 0
+
+
+def _element_id(permissions: ElementExternalAccess) -> str:
+    if isinstance(permissions, DocExternalAccess):
+        return permissions.doc_id
+    return permissions.raw_node_id
 
 
 class RedisConnectorPermissionSyncPayload(BaseModel):
@@ -66,6 +77,9 @@ class RedisConnectorPermissionSync:
     ACTIVE_PREFIX = PREFIX + "_active"
     ACTIVE_TTL = CELERY_PERMISSIONS_SYNC_LOCK_TIMEOUT * 2
 
+    # elements whose permissions are written to the DB together
+    DB_UPDATE_BATCH_SIZE = 1000
+
     def __init__(self, tenant_id: str, id: int, redis: TenantRedisClient) -> None:
         self.tenant_id: str = tenant_id
         self.id = id
@@ -178,20 +192,16 @@ class RedisConnectorPermissionSync:
     ) -> PermissionSyncResult:
         """Update permissions for documents and hierarchy nodes.
 
+        Elements are written DB_UPDATE_BATCH_SIZE at a time. A batch that fails
+        is retried one element at a time, so a bad element only fails itself.
+
         Returns:
             PermissionSyncResult containing counts of successful updates and errors
         """
         last_lock_time = time.monotonic()
 
-        element_update_permissions_fn = fetch_versioned_implementation(
-            "onyx.background.celery.tasks.doc_permission_syncing.tasks",
-            "element_update_permissions",
-        )
-
-        num_permissions = 0
-        num_errors = 0
-        cumulative_db_update_time = 0.0
-        for permissions in new_permissions:
+        def reacquire_lock_if_due() -> None:
+            nonlocal last_lock_time
             current_time = time.monotonic()
             if lock and current_time - last_lock_time >= (
                 CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
@@ -199,6 +209,13 @@ class RedisConnectorPermissionSync:
                 lock.reacquire()
                 last_lock_time = current_time
 
+        elements_update_permissions_fn = fetch_versioned_implementation(
+            "onyx.background.celery.tasks.doc_permission_syncing.tasks",
+            "elements_update_permissions",
+        )
+
+        writable_permissions: list[ElementExternalAccess] = []
+        for permissions in new_permissions:
             if (
                 permissions.external_access.num_entries
                 > permissions.external_access.MAX_NUM_ENTRIES
@@ -208,59 +225,122 @@ class RedisConnectorPermissionSync:
                     num_groups = len(
                         permissions.external_access.external_user_group_ids
                     )
-                    element_id = (
-                        permissions.doc_id
-                        if isinstance(permissions, DocExternalAccess)
-                        else permissions.raw_node_id
-                    )
                     task_logger.warning(
                         "Permissions length exceeded, skipping...: "
                         "%s "
                         "num_users=%s num_groups=%s "
                         "permissions.external_access.MAX_NUM_ENTRIES=%s",
-                        element_id,
+                        _element_id(permissions),
                         num_users,
                         num_groups,
                         permissions.external_access.MAX_NUM_ENTRIES,
                     )
                 continue
+            writable_permissions.append(permissions)
 
-            # NOTE(rkuo): this used to fire a task instead of directly writing to the DB,
-            # but the permissions can be excessively large if sent over the wire.
-            # On the other hand, the downside of doing db updates here is that we can
-            # block and fail if we can't make the calls to the DB ... but that's probably
-            # a rare enough case to be acceptable.
+        # NOTE(rkuo): this used to fire a task instead of directly writing to the DB,
+        # but the permissions can be excessively large if sent over the wire.
+        # On the other hand, the downside of doing db updates here is that we can
+        # block and fail if we can't make the calls to the DB ... but that's probably
+        # a rare enough case to be acceptable.
+        num_permissions = 0
+        num_errors = 0
+        num_changed = 0
+        num_unchanged = 0
+        cumulative_db_update_time = 0.0
+        for i in range(0, len(writable_permissions), self.DB_UPDATE_BATCH_SIZE):
+            reacquire_lock_if_due()
 
-            # This can internally exception due to db issues but still continue
-            # Catch exceptions per-element to avoid breaking the entire sync
+            batch = writable_permissions[i : i + self.DB_UPDATE_BATCH_SIZE]
             db_start = time.monotonic()
             try:
-                element_update_permissions_fn(
+                batch_changed, batch_unchanged = elements_update_permissions_fn(
                     self.tenant_id,
-                    permissions,
+                    batch,
                     source_string,
                     connector_id,
                     credential_id,
                 )
-                num_permissions += 1
+                num_permissions += len(batch)
+                num_changed += batch_changed
+                num_unchanged += batch_unchanged
             except Exception:
-                num_errors += 1
                 if task_logger:
-                    element_id = (
-                        permissions.doc_id
-                        if isinstance(permissions, DocExternalAccess)
-                        else permissions.raw_node_id
-                    )
                     task_logger.exception(
-                        "Failed to update permissions for element %s", element_id
+                        "Batched permission update failed for %s elements, "
+                        "retrying one at a time",
+                        len(batch),
                     )
+                batch_updated, batch_errors = self._update_db_per_element(
+                    batch,
+                    source_string,
+                    connector_id,
+                    credential_id,
+                    task_logger,
+                    reacquire_lock_if_due,
+                )
+                num_permissions += batch_updated
+                num_errors += batch_errors
+                # Written without change detection
+                num_changed += batch_updated
             finally:
-                cumulative_db_update_time += time.monotonic() - db_start
+                batch_duration = time.monotonic() - db_start
+                cumulative_db_update_time += batch_duration
+                observe_doc_perm_sync_batch_throughput(
+                    len(batch), batch_duration, source_string
+                )
 
         observe_doc_perm_sync_db_update_duration(
             cumulative_db_update_time, source_string
         )
-        return PermissionSyncResult(num_updated=num_permissions, num_errors=num_errors)
+        inc_doc_perm_sync_elements(source_string, num_changed, num_unchanged)
+        return PermissionSyncResult(
+            num_updated=num_permissions,
+            num_errors=num_errors,
+            num_changed=num_changed,
+        )
+
+    def _update_db_per_element(
+        self,
+        permissions_batch: list[ElementExternalAccess],
+        source_string: str,
+        connector_id: int,
+        credential_id: int,
+        task_logger: Logger | None,
+        reacquire_lock_if_due: Callable[[], None],
+    ) -> tuple[int, int]:
+        """Returns (number of elements updated, number that failed).
+
+        Each element gets its own session, so the lock is kept alive in between.
+        """
+        element_update_permissions_fn = fetch_versioned_implementation(
+            "onyx.background.celery.tasks.doc_permission_syncing.tasks",
+            "element_update_permissions",
+        )
+
+        num_updated = 0
+        num_errors = 0
+        for permissions in permissions_batch:
+            reacquire_lock_if_due()
+            # This can internally exception due to db issues but still continue
+            # Catch exceptions per-element to avoid breaking the entire sync
+            try:
+                element_update_permissions_fn(
+                    self.tenant_id,
+                    permissions,
+                    source_string,
+                    connector_id,
+                    credential_id,
+                )
+                num_updated += 1
+            except Exception:
+                num_errors += 1
+                if task_logger:
+                    task_logger.exception(
+                        "Failed to update permissions for element %s",
+                        _element_id(permissions),
+                    )
+        return num_updated, num_errors
 
     def reset(self) -> None:
         self.redis.srem(OnyxRedisConstants.ACTIVE_FENCES, self.fence_key)
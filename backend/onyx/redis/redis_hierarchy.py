@@ -4,8 +4,10 @@ This module provides a Redis-based cache for hierarchy node parent relationships
 enabling fast ancestor path resolution without repeated database queries.
 
 The cache stores node_id -> parent_id mappings for all hierarchy nodes of a given
-source type. When resolving ancestors for a document, we walk up the tree using
-Redis lookups instead of database queries.
+source type, plus each node's full ancestor chain (materialized in Postgres as
+HierarchyNode.ancestor_ids) keyed by raw_node_id. Resolving ancestors for a
+batch of documents is a single pipelined read of those chains; walking up the
+tree one parent lookup at a time is only the fallback for nodes without one.
 
 Cache Strategy:
 - Nodes are cached per source type with a 6-hour TTL
@@ -53,6 +55,8 @@ class HierarchyNodeCacheEntry(BaseModel):
     parent_id: int | None
     node_type: HierarchyNodeType
     raw_node_id: str
+    # From the parent up to the root; None when not materialized
+    ancestor_ids: list[int] | None = None
 
     @classmethod
     def from_db_model(cls, node: "DBHierarchyNode") -> "HierarchyNodeCacheEntry":
@@ -62,6 +66,7 @@ class HierarchyNodeCacheEntry(BaseModel):
             parent_id=node.parent_id,
             node_type=node.node_type,
             raw_node_id=node.raw_node_id,
+            ancestor_ids=node.ancestor_ids,
         )
 
 
@@ -81,6 +86,14 @@ def _raw_id_cache_key(source: DocumentSource) -> str:
     return f"hierarchy_cache_rawid:{source.value}"
 
 
+def _ancestors_cache_key(source: DocumentSource) -> str:
+    """Get the Redis hash key for raw_node_id -> ancestor chain mapping.
+
+    This hash stores: raw_node_id -> "node_id,parent_id,...,root_id"
+    """
+    return f"hierarchy_cache_ancestors:{source.value}"
+
+
 def _source_node_key(source: DocumentSource) -> str:
     """Get the Redis key for the SOURCE-type node ID of a given source.
 
@@ -118,6 +131,19 @@ def _unpack_parent_value(value: str) -> tuple[int | None, HierarchyNodeType | No
     return parent_id, node_type
 
 
+def _construct_ancestors_value(entry: HierarchyNodeCacheEntry) -> str | None:
+    """The chain get_ancestors_from_raw_id returns for this node, serialized."""
+    if entry.ancestor_ids is None:
+        return None
+    return ",".join(str(node_id) for node_id in [entry.node_id, *entry.ancestor_ids])
+
+
+def _unpack_ancestors_value(value: str | bytes) -> list[int]:
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return [int(node_id) for node_id in value.split(",")]
+
+
 def cache_hierarchy_node(
     redis_client: TenantRedisClient,
     source: DocumentSource,
@@ -127,33 +153,15 @@ def cache_hierarchy_node(
     Add or update a single hierarchy node in the Redis cache.
 
     Called during docfetching when nodes are upserted to Postgres.
-    Stores the parent chain mapping, raw_id -> node_id mapping, and
-    SOURCE node ID (if this is a SOURCE-type node).
+    Stores the parent chain mapping, raw_id -> node_id mapping, ancestor
+    chain, and SOURCE node ID (if this is a SOURCE-type node).
 
     Args:
         redis_client: Redis client with tenant prefixing
         source: The document source (e.g., CONFLUENCE, GOOGLE_DRIVE)
         entry: The hierarchy node cache entry
     """
-    cache_key = _cache_key(source)
-    raw_id_key = _raw_id_cache_key(source)
-
-    # Store parent chain: node_id -> "parent_id:node_type"
-    value = _construct_parent_value(entry.parent_id, entry.node_type)
-    redis_client.hset(cache_key, str(entry.node_id), value)
-
-    # Store raw_id -> node_id mapping
-    redis_client.hset(raw_id_key, entry.raw_node_id, str(entry.node_id))
-
-    # If this is the SOURCE node, store its ID in the dedicated key
-    if entry.node_type == HierarchyNodeType.SOURCE:
-        source_node_key = _source_node_key(source)
-        redis_client.set(source_node_key, str(entry.node_id))
-        redis_client.expire(source_node_key, HIERARCHY_CACHE_TTL_SECONDS)
-
-    # Refresh TTL on every write (ensures cache stays alive during long indexing)
-    redis_client.expire(cache_key, HIERARCHY_CACHE_TTL_SECONDS)
-    redis_client.expire(raw_id_key, HIERARCHY_CACHE_TTL_SECONDS)
+    cache_hierarchy_nodes_batch(redis_client, source, [entry])
 
 
 def cache_hierarchy_nodes_batch(
@@ -164,6 +172,11 @@ def cache_hierarchy_nodes_batch(
     """
     Add or update multiple hierarchy nodes in the Redis cache.
 
+    Ancestor chains are written for every entry that carries one. If a cached
+    node's chain changed (it moved), the chains of its descendants are stale
+    too, and they are not in this batch: the whole ancestor hash for the source
+    is dropped so the next lookup reloads it from Postgres.
+
     Args:
         redis_client: Redis client with tenant prefixing
         source: The document source
@@ -174,11 +187,13 @@ def cache_hierarchy_nodes_batch(
 
     cache_key = _cache_key(source)
     raw_id_key = _raw_id_cache_key(source)
+    ancestors_key = _ancestors_cache_key(source)
     source_node_key = _source_node_key(source)
 
     # Build mappings for batch insert
     parent_mapping: dict[str, str] = {}
     raw_id_mapping: dict[str, str] = {}
+    ancestors_mapping: dict[str, str] = {}
     source_node_id: int | None = None
 
     for entry in entries:
@@ -186,22 +201,45 @@ def cache_hierarchy_nodes_batch(
             entry.parent_id, entry.node_type
         )
         raw_id_mapping[entry.raw_node_id] = str(entry.node_id)
+        ancestors_value = _construct_ancestors_value(entry)
+        if ancestors_value is not None:
+            ancestors_mapping[entry.raw_node_id] = ancestors_value
 
         # Track the SOURCE node if we encounter it
         if entry.node_type == HierarchyNodeType.SOURCE:
             source_node_id = entry.node_id
 
-    # Use hset with mapping for batch insert
-    redis_client.hset(cache_key, mapping=parent_mapping)
-    redis_client.hset(raw_id_key, mapping=raw_id_mapping)
+    raw_ids = list(ancestors_mapping)
+    previous_values = (
+        cast(list[str | bytes | None], redis_client.hmget(ancestors_key, raw_ids))
+        if raw_ids
+        else []
+    )
+    moved = any(
+        previous is not None
+        and _unpack_ancestors_value(previous)
+        != _unpack_ancestors_value(ancestors_mapping[raw_id])
+        for raw_id, previous in zip(raw_ids, previous_values, strict=True)
+    )
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(cache_key, mapping=parent_mapping)
+    pipe.hset(raw_id_key, mapping=raw_id_mapping)
+    if moved:
+        pipe.delete(ancestors_key)
+    elif ancestors_mapping:
+        pipe.hset(ancestors_key, mapping=ancestors_mapping)
+        pipe.expire(ancestors_key, HIERARCHY_CACHE_TTL_SECONDS)
 
     # Cache the SOURCE node ID if found
     if source_node_id is not None:
-        redis_client.set(source_node_key, str(source_node_id))
-        redis_client.expire(source_node_key, HIERARCHY_CACHE_TTL_SECONDS)
+        pipe.set(source_node_key, str(source_node_id))
+        pipe.expire(source_node_key, HIERARCHY_CACHE_TTL_SECONDS)
 
-    redis_client.expire(cache_key, HIERARCHY_CACHE_TTL_SECONDS)
-    redis_client.expire(raw_id_key, HIERARCHY_CACHE_TTL_SECONDS)
+    # Refresh TTL on every write (ensures cache stays alive during long indexing)
+    pipe.expire(cache_key, HIERARCHY_CACHE_TTL_SECONDS)
+    pipe.expire(raw_id_key, HIERARCHY_CACHE_TTL_SECONDS)
+    pipe.execute()
 
 
 def evict_hierarchy_nodes_from_cache(
@@ -226,6 +264,7 @@ def evict_hierarchy_nodes_from_cache(
     if node_id_strs:
         redis_client.hdel(cache_key, *node_id_strs)
     redis_client.hdel(raw_id_key, *raw_node_ids)
+    redis_client.hdel(_ancestors_cache_key(source), *raw_node_ids)
 
 
 def invalidate_hierarchy_cache_for_source(
@@ -240,6 +279,7 @@ def invalidate_hierarchy_cache_for_source(
     redis_client.delete(
         _cache_key(source),
         _raw_id_cache_key(source),
+        _ancestors_cache_key(source),
         _source_node_key(source),
     )
 
@@ -358,8 +398,10 @@ def refresh_hierarchy_cache_from_db(
             logger.warning("No hierarchy nodes found in DB for source %s", source.value)
             return
 
-        # Batch insert into cache
+        # Batch insert into cache. Chains are rewritten from scratch, since
+        # this load is complete and any cached chain may predate a move.
         cache_entries = [HierarchyNodeCacheEntry.from_db_model(node) for node in nodes]
+        redis_client.delete(_ancestors_cache_key(source))
         cache_hierarchy_nodes_batch(redis_client, source, cache_entries)
 
         logger.info(
@@ -495,6 +537,74 @@ def get_ancestors_from_raw_id(
     return _walk_ancestor_chain(redis_client, source, node_id, db_session)
 
 
+def get_ancestors_for_raw_ids(
+    redis_client: TenantRedisClient,
+    source: DocumentSource,
+    parent_hierarchy_raw_node_ids: list[str | None],
+    db_session: Session,
+) -> dict[str | None, list[int]]:
+    """
+    Batched get_ancestors_from_raw_id for a whole document batch.
+
+    The cached ancestor chains of every raw_node_id and the SOURCE node are
+    read in one pipelined round trip. Misses trigger a single cache refresh
+    for the source; anything still missing (e.g. a node with no materialized
+    path) falls back to get_ancestors_from_raw_id.
+
+    Returns:
+        Mapping from each given raw_node_id (None included) to its ancestors,
+        in the same form get_ancestors_from_raw_id returns them.
+    """
+    raw_node_ids = list(
+        dict.fromkeys(
+            raw_node_id
+            for raw_node_id in parent_hierarchy_raw_node_ids
+            if raw_node_id is not None
+        )
+    )
+    ancestors_key = _ancestors_cache_key(source)
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(_source_node_key(source))
+    if raw_node_ids:
+        pipe.hmget(ancestors_key, raw_node_ids)
+    source_node_value, *rest = pipe.execute()
+    cached_values: list[bytes | None] = rest[0] if rest else []
+
+    result: dict[str | None, list[int]] = {
+        raw_node_id: _unpack_ancestors_value(value)
+        for raw_node_id, value in zip(raw_node_ids, cached_values, strict=True)
+        if value is not None
+    }
+
+    missing = [raw_node_id for raw_node_id in raw_node_ids if raw_node_id not in result]
+    if missing:
+        logger.debug(
+            "Ancestor cache miss for %s raw_node_ids of source %s, attempting refresh",
+            len(missing),
+            source.value,
+        )
+        refresh_hierarchy_cache_from_db(redis_client, db_session, source)
+        refreshed_values = redis_client.hmget(ancestors_key, missing)
+        for raw_node_id, value in zip(missing, refreshed_values, strict=True):
+            if value is not None:
+                result[raw_node_id] = _unpack_ancestors_value(value)
+            else:
+                result[raw_node_id] = get_ancestors_from_raw_id(
+                    redis_client, source, raw_node_id, db_session
+                )
+
+    if None in parent_hierarchy_raw_node_ids:
+        if source_node_value is not None:
+            result[None] = [int(source_node_value)]
+        else:
+            result[None] = get_ancestors_from_raw_id(
+                redis_client, source, None, db_session
+            )
+
+    return result
+
+
 def get_source_node_id_from_cache(
     redis_client: TenantRedisClient,
     db_session: Session,
@@ -544,6 +654,7 @@ def clear_hierarchy_cache(
     source_node_key = _source_node_key(source)
     redis_client.delete(cache_key)
     redis_client.delete(raw_id_key)
+    redis_client.delete(_ancestors_cache_key(source))
     redis_client.delete(source_node_key)
 
 
@@ -1331,6 +1331,60 @@ class TenantRedisPipeline:
         self._p.sadd(_prefix_key(self._prefix, name), *values)
         return self
 
+    def hset(
+        self,
+        name: KeyArg,
+        key: str | bytes | None = None,
+        value: str | bytes | int | float | None = None,
+        mapping: Mapping[Any, Any] | None = None,
+    ) -> TenantRedisPipeline:
+        """Queues an HSET against a tenant-prefixed hash key.
+
+        Hash fields are not prefixed — only the outer Redis key is namespaced.
+
+        Args:
+            name: The (unprefixed) hash key.
+            key: Single hash field to set. Use with ``value``.
+            value: Value for the single hash field set via ``key``.
+            mapping: ``{field: value}`` dict to set in one call.
+
+        Returns:
+            ``self``, to allow chaining further pipeline commands.
+        """
+        self._p.hset(
+            _prefix_key(self._prefix, name), key=key, value=value, mapping=mapping
+        )
+        return self
+
+    # --------------------------------------------------------------------------
+    # Read commands (results are visible after :meth:`execute`)
+    # --------------------------------------------------------------------------
+
+    def get(self, name: KeyArg) -> TenantRedisPipeline:
+        """Queues a GET against a tenant-prefixed key.
+
+        Args:
+            name: The (unprefixed) key to read.
+
+        Returns:
+            ``self``, to allow chaining further pipeline commands.
+        """
+        self._p.get(_prefix_key(self._prefix, name))
+        return self
+
+    def hmget(self, name: KeyArg, keys: list[str] | list[bytes]) -> TenantRedisPipeline:
+        """Queues an HMGET against a tenant-prefixed hash key.
+
+        Args:
+            name: The (unprefixed) hash key.
+            keys: Hash fields to read; missing fields come back as ``None``.
+
+        Returns:
+            ``self``, to allow chaining further pipeline commands.
+        """
+        self._p.hmget(_prefix_key(self._prefix, name), keys)
+        return self
+
     # --------------------------------------------------------------------------
     # Passthrough
     # --------------------------------------------------------------------------
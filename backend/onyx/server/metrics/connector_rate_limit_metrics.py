@@ -0,0 +1,44 @@
+"""Prometheus metrics for the shared connector rate limiter.
+
+Labeled by source only; credentials are intentionally excluded to keep
+cardinality bounded.
+
+Usage:
+    from onyx.server.metrics.connector_rate_limit_metrics import (
+        observe_connector_rate_limit_wait,
+        inc_connector_rate_limit_pause,
+    )
+"""
+
+from prometheus_client import Counter, Histogram
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+CONNECTOR_RATE_LIMIT_WAIT = Histogram(
+    "onyx_connector_rate_limit_wait_seconds",
+    "Time a connector call waited for a token from the shared rate limiter",
+    ["source"],
+    buckets=[0, 0.1, 0.5, 1, 5, 15, 60, 300, 900],
+)
+
+CONNECTOR_RATE_LIMIT_PAUSES = Counter(
+    "onyx_connector_rate_limit_pauses_total",
+    "Rate-limit responses from a provider that paused every worker sharing its budget",
+    ["source"],
+)
+
+
+def observe_connector_rate_limit_wait(source: str, wait_seconds: float) -> None:
+    try:
+        CONNECTOR_RATE_LIMIT_WAIT.labels(source=source).observe(wait_seconds)
+    except Exception:
+        logger.debug("Failed to record connector rate limit wait", exc_info=True)
+
+
+def inc_connector_rate_limit_pause(source: str) -> None:
+    try:
+        CONNECTOR_RATE_LIMIT_PAUSES.labels(source=source).inc()
+    except Exception:
+        logger.debug("Failed to record connector rate limit pause", exc_info=True)
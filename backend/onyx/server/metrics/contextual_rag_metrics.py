@@ -0,0 +1,41 @@
+"""Contextual RAG Prometheus metrics.
+
+Tracks how many document summaries and chunk contexts are served from the
+contextual RAG summary cache during indexing, instead of an LLM call.
+
+Usage:
+    from onyx.server.metrics.contextual_rag_metrics import (
+        inc_contextual_rag_summary_cache_lookups,
+    )
+"""
+
+from prometheus_client import Counter
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+CONTEXTUAL_RAG_SUMMARY_CACHE_LOOKUPS = Counter(
+    "onyx_contextual_rag_summary_cache_lookups_total",
+    "Contextual RAG summaries looked up in the summary cache during indexing, by "
+    "summary kind and outcome",
+    ["kind", "outcome"],
+)
+
+
+def inc_contextual_rag_summary_cache_lookups(
+    kind: str, num_hits: int, num_misses: int
+) -> None:
+    try:
+        if num_hits:
+            CONTEXTUAL_RAG_SUMMARY_CACHE_LOOKUPS.labels(kind=kind, outcome="hit").inc(
+                num_hits
+            )
+        if num_misses:
+            CONTEXTUAL_RAG_SUMMARY_CACHE_LOOKUPS.labels(kind=kind, outcome="miss").inc(
+                num_misses
+            )
+    except Exception:
+        logger.debug(
+            "Failed to record contextual RAG summary cache lookups", exc_info=True
+        )
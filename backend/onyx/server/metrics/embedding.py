@@ -26,6 +26,17 @@ class QueryEmbeddingCacheWriteOutcome(str, Enum):
     ERROR = "error"
 
 
+class PassageEmbeddingCacheLookupOutcome(str, Enum):
+    HIT = "hit"
+    MISS = "miss"
+    ERROR = "error"
+
+
+class PassageEmbeddingCacheWriteOutcome(str, Enum):
+    SUCCESS = "success"
+    ERROR = "error"
+
+
 logger = logging.getLogger(__name__)
 
 LOCAL_PROVIDER_LABEL = "local"
@@ -94,6 +105,18 @@ _query_embedding_cache_writes_total = Counter(
     [PROVIDER_LABEL_NAME, CACHE_OUTCOME_LABEL_NAME],
 )
 
+_passage_embedding_cache_lookups_total = Counter(
+    "onyx_passage_embedding_cache_lookups_total",
+    "Passage-embedding cache lookups during indexing, labeled by outcome.",
+    [PROVIDER_LABEL_NAME, CACHE_OUTCOME_LABEL_NAME],
+)
+
+_passage_embedding_cache_writes_total = Counter(
+    "onyx_passage_embedding_cache_writes_total",
+    "Passage-embedding cache writes during indexing, labeled by outcome.",
+    [PROVIDER_LABEL_NAME, CACHE_OUTCOME_LABEL_NAME],
+)
+
 
 def provider_label(provider: EmbeddingProvider | None) -> str:
     if provider is None:
@@ -177,6 +200,42 @@ def observe_query_embedding_cache_write(
         )
 
 
+def observe_passage_embedding_cache_lookup(
+    provider: EmbeddingProvider | None,
+    outcome: PassageEmbeddingCacheLookupOutcome,
+    count: int = 1,
+) -> None:
+    """Records the result of cache lookups for passage embeddings."""
+    if count <= 0:
+        return
+    try:
+        _passage_embedding_cache_lookups_total.labels(
+            provider=provider_label(provider), outcome=outcome.value
+        ).inc(count)
+    except Exception:
+        logger.warning(
+            "Failed to record passage-embedding cache lookup metric.", exc_info=True
+        )
+
+
+def observe_passage_embedding_cache_write(
+    provider: EmbeddingProvider | None,
+    outcome: PassageEmbeddingCacheWriteOutcome,
+    count: int = 1,
+) -> None:
+    """Records the result of cache writes for passage embeddings."""
+    if count <= 0:
+        return
+    try:
+        _passage_embedding_cache_writes_total.labels(
+            provider=provider_label(provider), outcome=outcome.value
+        ).inc(count)
+    except Exception:
+        logger.warning(
+            "Failed to record passage-embedding cache write metric.", exc_info=True
+        )
+
+
 @contextmanager
 def track_embedding_in_progress(
     provider: EmbeddingProvider | None,
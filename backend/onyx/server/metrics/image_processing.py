@@ -5,6 +5,7 @@ import io
 import logging
 import time
 from collections.abc import Callable
+from enum import Enum
 from typing import ParamSpec, TypeVar
 
 from prometheus_client import Counter, Histogram
@@ -33,6 +34,12 @@ _LLM_LATENCY_BUCKETS = (
 _LABEL_NAMES = ["size_bucket", "width_bucket", "height_bucket"]
 
 
+class ImageSummaryCacheOutcome(str, Enum):
+    HIT = "hit"
+    MISS = "miss"
+    ERROR = "error"
+
+
 def _size_tier(size_bytes: int) -> str:
     return _SIZE_TIER_LABELS[bisect.bisect_right(_SIZE_TIERS, size_bytes)]
 
@@ -54,6 +61,24 @@ _image_summarization_total = Counter(
     _LABEL_NAMES,
 )
 
+_image_summary_cache_lookups_total = Counter(
+    "onyx_image_summary_cache_lookups_total",
+    "Image summary cache lookups during indexing, labeled by outcome.",
+    ["outcome"],
+)
+
+
+def observe_image_summary_cache_lookup(
+    outcome: ImageSummaryCacheOutcome, count: int = 1
+) -> None:
+    """Records the result of image summary cache lookups."""
+    if count <= 0:
+        return
+    try:
+        _image_summary_cache_lookups_total.labels(outcome=outcome.value).inc(count)
+    except Exception:
+        logger.warning("Failed to record image summary cache metric.", exc_info=True)
+
 
 def track_image_summarization(
     fn: Callable[P, R],
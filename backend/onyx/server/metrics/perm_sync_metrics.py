@@ -7,6 +7,8 @@ Doc permission sync (connector_permission_sync_generator_task):
   2. Cumulative per-element DB update duration within update_db
   3. Documents successfully synced
   4. Documents with permission errors
+  5. Elements whose permissions changed vs. were already up to date
+  6. Batch write throughput (elements per second)
 
 External group sync (_perform_external_group_sync):
   1. Overall sync duration
@@ -25,6 +27,8 @@ Usage:
         observe_doc_perm_sync_db_update_duration,
         inc_doc_perm_sync_docs_processed,
         inc_doc_perm_sync_errors,
+        inc_doc_perm_sync_elements,
+        observe_doc_perm_sync_batch_throughput,
         observe_group_sync_duration,
         observe_group_sync_upsert_duration,
         inc_group_sync_groups_processed,
@@ -67,6 +71,20 @@ DOC_PERM_SYNC_ERRORS = Counter(
     ["connector_type"],
 )
 
+DOC_PERM_SYNC_ELEMENTS = Counter(
+    "onyx_doc_perm_sync_elements_total",
+    "Total documents and hierarchy nodes written by doc permission sync, by "
+    "whether their permissions changed",
+    ["connector_type", "outcome"],
+)
+
+DOC_PERM_SYNC_BATCH_THROUGHPUT = Histogram(
+    "onyx_doc_perm_sync_batch_elements_per_second",
+    "Elements processed per second by a single batched permission write",
+    ["connector_type"],
+    buckets=[10, 50, 100, 500, 1000, 5000, 10000, 50000],
+)
+
 # --- External group sync metrics ---
 
 GROUP_SYNC_DURATION = Histogram(
@@ -141,6 +159,33 @@ def inc_doc_perm_sync_errors(connector_type: str, amount: int = 1) -> None:
         logger.debug("Failed to record doc perm sync errors", exc_info=True)
 
 
+def inc_doc_perm_sync_elements(
+    connector_type: str, num_changed: int, num_unchanged: int
+) -> None:
+    try:
+        DOC_PERM_SYNC_ELEMENTS.labels(
+            connector_type=connector_type, outcome="changed"
+        ).inc(num_changed)
+        DOC_PERM_SYNC_ELEMENTS.labels(
+            connector_type=connector_type, outcome="unchanged"
+        ).inc(num_unchanged)
+    except Exception:
+        logger.debug("Failed to record doc perm sync element outcomes", exc_info=True)
+
+
+def observe_doc_perm_sync_batch_throughput(
+    num_elements: int, duration_seconds: float, connector_type: str
+) -> None:
+    if duration_seconds <= 0:
+        return
+    try:
+        DOC_PERM_SYNC_BATCH_THROUGHPUT.labels(connector_type=connector_type).observe(
+            num_elements / duration_seconds
+        )
+    except Exception:
+        logger.debug("Failed to record doc perm sync batch throughput", exc_info=True)
+
+
 # --- External group sync helpers ---
 
 
@@ -0,0 +1,74 @@
+"""Prometheus metrics for the named shared thread pools.
+
+Reads a snapshot of every shared executor (see
+``onyx.utils.threadpool_concurrency.get_shared_executor``) on each scrape:
+
+- Queue depth, active workers and configured size (gauges)
+- Tasks submitted and total seconds spent queued (counters); their ratio is
+  the mean queue wait time
+"""
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import REGISTRY, Collector
+
+from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import get_shared_executor_stats
+
+logger = setup_logger()
+
+_EXECUTOR_LABELS = ["executor"]
+
+
+class SharedExecutorCollector(Collector):
+    def collect(self) -> list[Metric]:
+        queue_depth = GaugeMetricFamily(
+            "onyx_shared_executor_queue_depth",
+            "Tasks submitted to the shared executor but not yet started",
+            labels=_EXECUTOR_LABELS,
+        )
+        active = GaugeMetricFamily(
+            "onyx_shared_executor_active_workers",
+            "Shared executor workers currently running a task",
+            labels=_EXECUTOR_LABELS,
+        )
+        max_workers = GaugeMetricFamily(
+            "onyx_shared_executor_max_workers",
+            "Configured size of the shared executor",
+            labels=_EXECUTOR_LABELS,
+        )
+        submitted = CounterMetricFamily(
+            "onyx_shared_executor_tasks_submitted",
+            "Tasks submitted to the shared executor",
+            labels=_EXECUTOR_LABELS,
+        )
+        wait_seconds = CounterMetricFamily(
+            "onyx_shared_executor_queue_wait_seconds",
+            "Total time tasks spent queued before a shared executor worker started them",
+            labels=_EXECUTOR_LABELS,
+        )
+
+        for stats in get_shared_executor_stats():
+            queue_depth.add_metric([stats.name], stats.queue_depth)
+            active.add_metric([stats.name], stats.active)
+            max_workers.add_metric([stats.name], stats.max_workers)
+            submitted.add_metric([stats.name], stats.submitted_total)
+            wait_seconds.add_metric([stats.name], stats.wait_seconds_total)
+
+        return [queue_depth, active, max_workers, submitted, wait_seconds]
+
+    def describe(self) -> list[Metric]:
+        # Unchecked collector, executors are created lazily at runtime.
+        return []
+
+
+_SHARED_EXECUTOR_COLLECTOR_REGISTERED = False
+
+
+def register_shared_executor_metrics() -> None:
+    global _SHARED_EXECUTOR_COLLECTOR_REGISTERED
+    if _SHARED_EXECUTOR_COLLECTOR_REGISTERED:
+        logger.debug("Shared executor metrics collector already registered")
+        return
+    REGISTRY.register(SharedExecutorCollector())
+    _SHARED_EXECUTOR_COLLECTOR_REGISTERED = True
+    logger.info("Shared executor metrics collector registered")
@@ -114,6 +114,7 @@ from onyx.tools.models import (
     ToolResponse,
 )
 from onyx.tools.tool_implementations.search.constants import (
+    FULL_DOC_NUM_CHUNKS_AROUND,
     KEYWORD_QUERY_HYBRID_ALPHA,
     LLM_KEYWORD_QUERY_WEIGHT,
     LLM_NON_CUSTOM_QUERY_WEIGHT,
@@ -124,13 +125,17 @@ from onyx.tools.tool_implementations.search.constants import (
 from onyx.tools.tool_implementations.search.search_utils import (
     expand_section_with_context,
     merge_overlapping_sections,
+    retrieve_adjacent_chunks_batch,
     weighted_reciprocal_rank_fusion,
 )
 from onyx.tools.tool_implementations.utils import (
     convert_inference_sections_to_llm_string,
 )
 from onyx.utils.logger import setup_logger
-from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import (
+    SEARCH_IO_EXECUTOR,
+    run_functions_tuples_in_parallel,
+)
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import (
     DOC_EMBEDDING_CONTEXT_SIZE,
@@ -1141,6 +1146,9 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             llm: LLM,
             document_index: DocumentIndex,
             expand_override: bool,
+            prefetched_adjacent_chunks: (
+                tuple[list[InferenceChunk], list[InferenceChunk]] | None
+            ),
         ) -> InferenceSection:
             """Wrapper that handles exceptions and returns original section on error."""
             try:
@@ -1150,6 +1158,7 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                     llm=llm,
                     document_index=document_index,
                     expand_override=expand_override,
+                    prefetched_adjacent_chunks=prefetched_adjacent_chunks,
                 )
                 # Return expanded section if not None, otherwise original
                 return expanded_section if expanded_section is not None else section
@@ -1160,6 +1169,19 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 )
                 return section
 
+        # Start timing for document expansion
+        document_expansion_start_time = time.time()
+
+        # Fetch the surrounding chunks for every section in one index call,
+        # wide enough for both the classification prompt and full expansion.
+        # If it fails, each section falls back to fetching its own.
+        adjacent_chunks = retrieve_adjacent_chunks_batch(
+            sections=selected_sections,
+            document_index=self.document_index,
+            num_chunks_above=FULL_DOC_NUM_CHUNKS_AROUND,
+            num_chunks_below=FULL_DOC_NUM_CHUNKS_AROUND,
+        )
+
         # Build parallel function calls for all sections
         expansion_functions: list[tuple[Callable, tuple]] = [
             (
@@ -1170,16 +1192,16 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                     self.llm,
                     self.document_index,
                     section.center_chunk.document_id in best_doc_ids_set,
+                    adjacent_chunks[i] if adjacent_chunks is not None else None,
                 ),
             )
-            for section in selected_sections
+            for i, section in enumerate(selected_sections)
         ]
 
-        # Start timing for document expansion
-        document_expansion_start_time = time.time()
-
         # Run all expansions in parallel
-        expanded_sections = run_functions_tuples_in_parallel(expansion_functions)
+        expanded_sections = run_functions_tuples_in_parallel(
+            expansion_functions, executor_name=SEARCH_IO_EXECUTOR
+        )
 
         # End timing for document expansion
         document_expansion_elapsed = time.time() - document_expansion_start_time
@@ -24,6 +24,8 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Chunks on each side of a section shown to the LLM when classifying relevance
+_NUM_CHUNKS_AROUND_FOR_PROMPT = 2
 
 T = TypeVar("T")
 
@@ -210,6 +212,108 @@ def _retrieve_adjacent_chunks(
     return chunks_above, chunks_below
 
 
+def _adjacent_chunk_ranges(
+    section: InferenceSection, num_chunks_above: int, num_chunks_below: int
+) -> tuple[tuple[int, int] | None, tuple[int, int] | None]:
+    """Inclusive (min, max) chunk ranges above and below the section, or None
+    where there is nothing to fetch."""
+    chunk_ids = [chunk.chunk_id for chunk in section.chunks]
+    min_chunk_id = min(chunk_ids)
+    max_chunk_id = max(chunk_ids)
+
+    above_range = None
+    if num_chunks_above > 0 and min_chunk_id > 0:
+        above_range = (max(0, min_chunk_id - num_chunks_above), min_chunk_id - 1)
+
+    below_range = None
+    if num_chunks_below > 0:
+        below_range = (max_chunk_id + 1, max_chunk_id + num_chunks_below)
+
+    return above_range, below_range
+
+
+def retrieve_adjacent_chunks_batch(
+    sections: list[InferenceSection],
+    document_index: DocumentIndex,
+    num_chunks_above: int,
+    num_chunks_below: int,
+) -> list[tuple[list[InferenceChunk], list[InferenceChunk]]] | None:
+    """Batched form of _retrieve_adjacent_chunks.
+
+    Collects the above/below requests for every section and sends them to the
+    index in a single id_based_retrieval call, then splits the returned chunks
+    back out per section.
+
+    Returns:
+        (chunks_above, chunks_below) for each section, in the same order as
+        sections, or None if the retrieval failed.
+    """
+    section_ranges = [
+        _adjacent_chunk_ranges(section, num_chunks_above, num_chunks_below)
+        for section in sections
+    ]
+
+    chunk_requests: list[DocumentSectionRequest] = []
+    for section, ranges in zip(sections, section_ranges, strict=True):
+        document_id = replace_invalid_doc_id_characters(
+            section.center_chunk.document_id
+        )
+        for chunk_range in ranges:
+            if chunk_range is None:
+                continue
+            chunk_requests.append(
+                DocumentSectionRequest(
+                    document_id=document_id,
+                    min_chunk_ind=chunk_range[0],
+                    max_chunk_ind=chunk_range[1],
+                )
+            )
+
+    chunks_by_document: dict[str, dict[int, InferenceChunk]] = defaultdict(dict)
+    if chunk_requests:
+        try:
+            retrieved_chunks = document_index.id_based_retrieval(
+                chunk_requests=chunk_requests,
+                # The document fetching already enforced permissions
+                filters=IndexFilters(access_control_list=None),
+                batch_retrieval=True,
+            )
+        except Exception as e:
+            logger.warning("Failed to retrieve adjacent chunks for sections: %s", e)
+            return None
+
+        for chunk in retrieved_chunks:
+            document_id = replace_invalid_doc_id_characters(chunk.document_id)
+            chunks_by_document[document_id][chunk.chunk_id] = chunk
+
+    def _chunks_in_range(
+        document_chunks: dict[int, InferenceChunk],
+        chunk_range: tuple[int, int] | None,
+    ) -> list[InferenceChunk]:
+        if chunk_range is None:
+            return []
+        return [
+            document_chunks[chunk_id]
+            for chunk_id in range(chunk_range[0], chunk_range[1] + 1)
+            if chunk_id in document_chunks
+        ]
+
+    adjacent_chunks: list[tuple[list[InferenceChunk], list[InferenceChunk]]] = []
+    for section, (above_range, below_range) in zip(
+        sections, section_ranges, strict=True
+    ):
+        document_chunks = chunks_by_document.get(
+            replace_invalid_doc_id_characters(section.center_chunk.document_id), {}
+        )
+        adjacent_chunks.append(
+            (
+                _chunks_in_range(document_chunks, above_range),
+                _chunks_in_range(document_chunks, below_range),
+            )
+        )
+    return adjacent_chunks
+
+
 def merge_overlapping_sections(
     sections: list[InferenceSection],
 ) -> list[InferenceSection]:
@@ -359,6 +463,9 @@ def expand_section_with_context(
     llm: LLM,
     document_index: DocumentIndex,
     expand_override: bool = False,
+    prefetched_adjacent_chunks: (
+        tuple[list[InferenceChunk], list[InferenceChunk]] | None
+    ) = None,
 ) -> InferenceSection | None:
     """Use LLM to classify section relevance and return expanded section with appropriate context.
 
@@ -374,6 +481,9 @@ def expand_section_with_context(
         llm: LLM instance to use for classification
         document_index: Document index for retrieving adjacent chunks
         expand_override: If True, skip LLM classification and use FULL_DOCUMENT expansion
+        prefetched_adjacent_chunks: Chunks above and below the section from
+            retrieve_adjacent_chunks_batch, covering FULL_DOC_NUM_CHUNKS_AROUND on each
+            side. When given, no index calls are made here.
 
     Returns:
         Expanded InferenceSection with appropriate context, or None if NOT_RELEVANT
@@ -386,13 +496,31 @@ def expand_section_with_context(
         classification = ContextExpansionType.FULL_DOCUMENT
         # These are not used, but need to be defined to avoid type errors
     else:
-        # Retrieve 2 chunks above and below for the LLM classification prompt
-        chunks_above_for_prompt, chunks_below_for_prompt = _retrieve_adjacent_chunks(
-            section=section,
-            document_index=document_index,
-            num_chunks_above=2,
-            num_chunks_below=2,
-        )
+        if prefetched_adjacent_chunks is not None:
+            # The prefetched chunks are ordered by chunk_id and cover a wider
+            # range, keep only the ones closest to the section for the prompt
+            min_chunk_id = min(chunk.chunk_id for chunk in section.chunks)
+            max_chunk_id = max(chunk.chunk_id for chunk in section.chunks)
+            chunks_above_for_prompt = [
+                chunk
+                for chunk in prefetched_adjacent_chunks[0]
+                if chunk.chunk_id >= min_chunk_id - _NUM_CHUNKS_AROUND_FOR_PROMPT
+            ]
+            chunks_below_for_prompt = [
+                chunk
+                for chunk in prefetched_adjacent_chunks[1]
+                if chunk.chunk_id <= max_chunk_id + _NUM_CHUNKS_AROUND_FOR_PROMPT
+            ]
+        else:
+            # Retrieve 2 chunks above and below for the LLM classification prompt
+            chunks_above_for_prompt, chunks_below_for_prompt = (
+                _retrieve_adjacent_chunks(
+                    section=section,
+                    document_index=document_index,
+                    num_chunks_above=_NUM_CHUNKS_AROUND_FOR_PROMPT,
+                    num_chunks_below=_NUM_CHUNKS_AROUND_FOR_PROMPT,
+                )
+            )
 
         # Format the section content for the prompt
         section_above_text = (
@@ -465,12 +593,15 @@ def expand_section_with_context(
                 section.center_chunk.semantic_identifier,
             )
 
-        chunks_above_full, chunks_below_full = _retrieve_adjacent_chunks(
-            section=section,
-            document_index=document_index,
-            num_chunks_above=FULL_DOC_NUM_CHUNKS_AROUND,
-            num_chunks_below=FULL_DOC_NUM_CHUNKS_AROUND,
-        )
+        if prefetched_adjacent_chunks is not None:
+            chunks_above_full, chunks_below_full = prefetched_adjacent_chunks
+        else:
+            chunks_above_full, chunks_below_full = _retrieve_adjacent_chunks(
+                section=section,
+                document_index=document_index,
+                num_chunks_above=FULL_DOC_NUM_CHUNKS_AROUND,
+                num_chunks_below=FULL_DOC_NUM_CHUNKS_AROUND,
+            )
 
         # Combine all chunks: 5 above + section + 5 below
         all_chunks = chunks_above_full + section.chunks + chunks_below_full
@@ -3,7 +3,9 @@ import collections.abc
 import concurrent.futures
 import contextvars
 import copy
+import os
 import threading
+import time
 import uuid
 from collections.abc import Callable, Coroutine, Iterator, MutableMapping, Sequence
 from concurrent.futures import (
@@ -13,12 +15,17 @@ from concurrent.futures import (
     as_completed,
     wait,
 )
-from typing import Any, Generic, Protocol, TypeVar, cast, overload
+from dataclasses import dataclass
+from typing import Any, Generic, ParamSpec, Protocol, TypeVar, cast, overload
 
 from pydantic import GetCoreSchemaHandler
 from pydantic.types import T
 from pydantic_core import core_schema
 
+from onyx.configs.app_configs import (
+    LLM_IO_EXECUTOR_MAX_WORKERS,
+    SEARCH_IO_EXECUTOR_MAX_WORKERS,
+)
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -27,6 +34,7 @@ R = TypeVar("R")
 KT = TypeVar("KT")  # Key type
 VT = TypeVar("VT")  # Value type
 _T = TypeVar("_T")  # Default type
+_P = ParamSpec("_P")
 _MISSING: object = object()
 
 
@@ -275,6 +283,178 @@ class CallableProtocol(Protocol):
     def __call__(self, *args: Any, **kwargs: Any) -> Any: ...
 
 
+SEARCH_IO_EXECUTOR = "search-io"
+LLM_IO_EXECUTOR = "llm-io"
+
+_SHARED_EXECUTOR_MAX_WORKERS: dict[str, int] = {
+    SEARCH_IO_EXECUTOR: SEARCH_IO_EXECUTOR_MAX_WORKERS,
+    LLM_IO_EXECUTOR: LLM_IO_EXECUTOR_MAX_WORKERS,
+}
+
+
+@dataclass(frozen=True)
+class SharedExecutorStats:
+    name: str
+    max_workers: int
+    # submitted but not yet picked up by a worker
+    queue_depth: int
+    active: int
+    submitted_total: int
+    # summed time tasks spent queued before a worker picked them up
+    wait_seconds_total: float
+
+
+# Name of the shared executor owning the current thread, if any. Used to avoid
+# deadlocking a bounded pool by waiting on it from one of its own workers.
+_shared_executor_worker = threading.local()
+
+
+class SharedExecutor:
+    """A named, long-lived, bounded thread pool shared by the whole process.
+
+    Submitted callables run in a copy of the submitter's contextvars, same as
+    run_functions_tuples_in_parallel, and the pool keeps queue depth and queue
+    wait time counters for metrics. Use get_shared_executor rather than
+    constructing one directly.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"shared-{name}",
+            initializer=self._init_worker,
+        )
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self._active = 0
+        self._submitted_total = 0
+        self._wait_seconds_total = 0.0
+
+    def _init_worker(self) -> None:
+        _shared_executor_worker.name = self.name
+
+    def is_worker_thread(self) -> bool:
+        return getattr(_shared_executor_worker, "name", None) == self.name
+
+    def submit(self, fn: Callable[..., R], *args: Any) -> Future[R]:
+        ctx = contextvars.copy_context()
+        enqueued_at = time.monotonic()
+
+        def _run() -> R:
+            with self._lock:
+                self._queue_depth -= 1
+                self._active += 1
+                self._wait_seconds_total += time.monotonic() - enqueued_at
+            try:
+                return ctx.run(fn, *args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        with self._lock:
+            self._queue_depth += 1
+            self._submitted_total += 1
+        future = self._executor.submit(_run)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future[Any]) -> None:
+        # A future cancelled before it started never ran _run
+        if future.cancelled():
+            with self._lock:
+                self._queue_depth -= 1
+
+    def stats(self) -> SharedExecutorStats:
+        with self._lock:
+            return SharedExecutorStats(
+                name=self.name,
+                max_workers=self.max_workers,
+                queue_depth=self._queue_depth,
+                active=self._active,
+                submitted_total=self._submitted_total,
+                wait_seconds_total=self._wait_seconds_total,
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_shared_executors: dict[str, SharedExecutor] = {}
+_shared_executors_lock = threading.Lock()
+
+
+def _reset_shared_executors_after_fork() -> None:
+    # Worker threads do not survive fork, so a child (e.g. a prefork celery
+    # worker) has to build its own pools on first use.
+    global _shared_executors_lock
+    _shared_executors.clear()
+    _shared_executors_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_shared_executors_after_fork)
+
+
+def get_shared_executor(name: str) -> SharedExecutor:
+    """Returns the process-wide executor with the given name, creating it on
+    first use. Names are fixed (see _SHARED_EXECUTOR_MAX_WORKERS) so that the
+    total thread count stays bounded."""
+    executor = _shared_executors.get(name)
+    if executor is not None:
+        return executor
+
+    if name not in _SHARED_EXECUTOR_MAX_WORKERS:
+        raise ValueError(
+            f"Unknown shared executor {name!r}. "
+            f"Expected one of {sorted(_SHARED_EXECUTOR_MAX_WORKERS)}."
+        )
+    with _shared_executors_lock:
+        executor = _shared_executors.get(name)
+        if executor is None:
+            executor = SharedExecutor(name, _SHARED_EXECUTOR_MAX_WORKERS[name])
+            _shared_executors[name] = executor
+    return executor
+
+
+def get_shared_executor_stats() -> list[SharedExecutorStats]:
+    """Stats for every shared executor created so far in this process."""
+    return [executor.stats() for executor in list(_shared_executors.values())]
+
+
+def _resolve_shared_executor(executor_name: str | None) -> SharedExecutor | None:
+    if executor_name is None:
+        return None
+    executor = get_shared_executor(executor_name)
+    if executor.is_worker_thread():
+        # Blocking a worker on work queued behind it in the same bounded pool
+        # can deadlock, so nested calls get a throwaway pool instead.
+        return None
+    return executor
+
+
+def _submit_to_shared_executor(
+    executor: SharedExecutor,
+    functions_with_args: Sequence[tuple[CallableProtocol, tuple[Any, ...]]],
+    max_concurrency: int,
+    deadline: float | None,
+) -> dict[Future[Any], int]:
+    """Submits the functions, keeping at most max_concurrency of them queued
+    or running at once. Blocks the caller until everything is submitted or the
+    deadline passes; functions not submitted by then are left out."""
+    slots = threading.BoundedSemaphore(max_concurrency)
+    future_to_index: dict[Future[Any], int] = {}
+    for i, (func, args) in enumerate(functions_with_args):
+        if deadline is None:
+            slots.acquire()
+        elif not slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            break
+        future = executor.submit(func, *args)
+        future.add_done_callback(lambda _: slots.release())
+        future_to_index[future] = i
+    return future_to_index
+
+
 def run_functions_tuples_in_parallel(
     functions_with_args: Sequence[tuple[CallableProtocol, tuple[Any, ...]]],
     allow_failures: bool = False,
@@ -283,6 +463,7 @@ def run_functions_tuples_in_parallel(
     timeout_callback: (
         Callable[[int, CallableProtocol, tuple[Any, ...]], Any] | None
     ) = None,
+    executor_name: str | None = None,
 ) -> list[Any]:
     """
     Executes multiple functions in parallel and returns a list of the results for each function.
@@ -303,6 +484,9 @@ def run_functions_tuples_in_parallel(
             for each timed-out function. If provided, its return value is used as the result.
             If not provided and allow_failures is False, TimeoutError is raised.
             If not provided and allow_failures is True, None is returned for timed-out functions.
+        executor_name: Optional name of a shared executor (see get_shared_executor) to run
+            on instead of a pool created for this call. max_workers then caps how many of
+            these functions are in flight at once rather than sizing a new pool.
 
     Returns:
         list: A list of results from each function, in the same order as the input functions.
@@ -317,20 +501,40 @@ def run_functions_tuples_in_parallel(
         return []
 
     results: list[tuple[int, Any]] = []
-    executor = ThreadPoolExecutor(max_workers=workers)
+    shared_executor = _resolve_shared_executor(executor_name)
+    executor = (
+        ThreadPoolExecutor(max_workers=workers) if shared_executor is None else None
+    )
+    future_to_index: dict[Future[Any], int] = {}
+    deadline = time.monotonic() + timeout if timeout is not None else None
 
     try:
-        # The primary reason for propagating contextvars is to allow acquiring a db session
-        # that respects tenant id. Context.run is expected to be low-overhead, but if we later
-        # find that it is increasing latency we can make using it optional.
-        future_to_index = {
-            executor.submit(contextvars.copy_context().run, func, *args): i
-            for i, (func, args) in enumerate(functions_with_args)
-        }
-
-        if timeout is not None:
+        if executor is not None:
+            # The primary reason for propagating contextvars is to allow acquiring a db session
+            # that respects tenant id. Context.run is expected to be low-overhead, but if we later
+            # find that it is increasing latency we can make using it optional.
+            future_to_index = {
+                executor.submit(contextvars.copy_context().run, func, *args): i
+                for i, (func, args) in enumerate(functions_with_args)
+            }
+        elif shared_executor is not None:
+            future_to_index = _submit_to_shared_executor(
+                shared_executor, functions_with_args, workers, deadline
+            )
+
+        if deadline is not None:
             # Wait for completion or timeout
-            done, not_done = wait(future_to_index.keys(), timeout=timeout)
+            done, not_done_futures = wait(
+                future_to_index.keys(),
+                timeout=max(0.0, deadline - time.monotonic()),
+            )
+            # Functions a bounded shared executor never got to count as timed out
+            not_done = [future_to_index[future] for future in not_done_futures]
+            submitted = set(future_to_index.values())
+            not_done += [
+                i for i in range(len(functions_with_args)) if i not in submitted
+            ]
+            index_to_future = {i: future for future, i in future_to_index.items()}
 
             # Process completed futures
             for future in done:
@@ -344,8 +548,7 @@ def run_functions_tuples_in_parallel(
                         raise
 
             # Process timed-out futures
-            for future in not_done:
-                index = future_to_index[future]
+            for index in sorted(not_done):
                 func, args = functions_with_args[index]
                 logger.warning(
                     "Function at index %s timed out after %s seconds", index, timeout
@@ -362,7 +565,9 @@ def run_functions_tuples_in_parallel(
                         )
 
                 # Attempt to cancel (only effective if not yet started)
-                future.cancel()
+                future = index_to_future.get(index)
+                if future is not None:
+                    future.cancel()
         else:
             for future in as_completed(future_to_index):
                 index = future_to_index[future]
@@ -378,7 +583,10 @@ def run_functions_tuples_in_parallel(
         # When timeout is used, don't wait for timed-out threads to complete
         # (they will continue running in the background)
         # When no timeout, wait for all threads to complete (original behavior)
-        executor.shutdown(wait=(timeout is None))
+        if executor is not None:
+            executor.shutdown(wait=(timeout is None))
+        elif timeout is None:
+            wait(future_to_index.keys())
 
     results.sort(key=lambda x: x[0])
     return [result for index, result in results]
@@ -405,36 +613,25 @@ class FunctionCall(Generic[R]):
 def run_functions_in_parallel(
     function_calls: list[FunctionCall],
     allow_failures: bool = False,
+    executor_name: str | None = None,
 ) -> dict[str, Any]:
     """
     Executes a list of FunctionCalls in parallel and stores the results in a dictionary where the keys
     are the result_id of the FunctionCall and the values are the results of the call.
+    If executor_name is set the calls run on that shared executor.
     """
-    results: dict[str, Any] = {}
-
     if len(function_calls) == 0:
-        return results
-
-    with ThreadPoolExecutor(max_workers=len(function_calls)) as executor:
-        future_to_id = {
-            executor.submit(
-                contextvars.copy_context().run, func_call.execute
-            ): func_call.result_id
-            for func_call in function_calls
-        }
-
-        for future in as_completed(future_to_id):
-            result_id = future_to_id[future]
-            try:
-                results[result_id] = future.result()
-            except Exception as e:
-                logger.exception("Function with ID %s failed due to %s", result_id, e)
-                results[result_id] = None
-
-                if not allow_failures:
-                    raise
+        return {}
 
-    return results
+    outputs = run_functions_tuples_in_parallel(
+        [(func_call.execute, ()) for func_call in function_calls],
+        allow_failures=allow_failures,
+        executor_name=executor_name,
+    )
+    return {
+        func_call.result_id: output
+        for func_call, output in zip(function_calls, outputs, strict=True)
+    }
 
 
 def run_async_sync_no_cancel(coro: Coroutine[Any, Any, T]) -> T:
@@ -499,6 +696,22 @@ def start_thread_with_context(
     return thread
 
 
+def submit_with_context(
+    executor: concurrent.futures.Executor,
+    func: Callable[_P, R],
+    *args: _P.args,
+    **kwargs: _P.kwargs,
+) -> Future[R]:
+    """``executor.submit`` that runs ``func`` in a copy of the caller's
+    contextvars (tenant id, request id), keeping the future's result type."""
+    ctx = contextvars.copy_context()
+
+    def _run() -> R:
+        return ctx.run(func, *args, **kwargs)
+
+    return executor.submit(_run)
+
+
 class TimeoutThread(threading.Thread, Generic[R]):
     def __init__(
         self, timeout: float, func: Callable[..., R], *args: Any, **kwargs: Any
@@ -577,7 +790,11 @@ def _next_or_none(ind: int, gen: Iterator[R]) -> tuple[int, R | None]:
     return ind, next(gen, None)
 
 
-def parallel_yield(gens: list[Iterator[R]], max_workers: int = 10) -> Iterator[R]:
+def parallel_yield(
+    gens: list[Iterator[R]],
+    max_workers: int = 10,
+    executor_name: str | None = None,
+) -> Iterator[R]:
     """
     Runs the list of generators with thread-level parallelism, yielding
     results as available. The asynchronous nature of this yielding means
@@ -585,32 +802,42 @@ def parallel_yield(gens: list[Iterator[R]], max_workers: int = 10) -> Iterator[R
     FURTHER ITEMS WERE PRODUCED by the input gens. Only use this function
     if you are consuming all elements from the generators OR it is acceptable
     for some extra generator code to run and not have the result(s) yielded.
+
+    If executor_name is set the generators are advanced on that shared
+    executor, whose own bound applies instead of max_workers.
     """
+    shared_executor = _resolve_shared_executor(executor_name)
+    if shared_executor is not None:
+        yield from _parallel_yield_on(shared_executor.submit, gens)
+        return
+
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_index: dict[Future[tuple[int, R | None]], int] = (  # ty: ignore[invalid-assignment]
-            {
-                executor.submit(_next_or_none, ind, gen): ind
-                for ind, gen in enumerate(gens)
-            }
-        )
+        yield from _parallel_yield_on(executor.submit, gens)
 
-        next_ind = len(gens)
-        while future_to_index:
-            done, _ = wait(future_to_index, return_when=FIRST_COMPLETED)
-            for future in done:
-                ind, result = future.result()
-                if result is not None:
-                    yield result
-                    future_to_index[executor.submit(_next_or_none, ind, gens[ind])] = (
-                        next_ind  # ty: ignore[invalid-assignment]
-                    )
-                    next_ind += 1
-                del future_to_index[future]
+
+def _parallel_yield_on(
+    submit: Callable[..., Future[Any]], gens: list[Iterator[R]]
+) -> Iterator[R]:
+    future_to_index: dict[Future[tuple[int, R | None]], int] = {
+        submit(_next_or_none, ind, gen): ind for ind, gen in enumerate(gens)
+    }
+
+    next_ind = len(gens)
+    while future_to_index:
+        done, _ = wait(future_to_index, return_when=FIRST_COMPLETED)
+        for future in done:
+            ind, result = future.result()
+            if result is not None:
+                yield result
+                future_to_index[submit(_next_or_none, ind, gens[ind])] = next_ind
+                next_ind += 1
+            del future_to_index[future]
 
 
 def parallel_yield_from_funcs(
     funcs: list[Callable[..., R]],
     max_workers: int = 10,
+    executor_name: str | None = None,
 ) -> Iterator[R]:
     """
     Runs the list of functions with thread-level parallelism, yielding
@@ -625,5 +852,7 @@ def parallel_yield_from_funcs(
         yield func()
 
     yield from parallel_yield(
-        [func_wrapper(func) for func in funcs], max_workers=max_workers
+        [func_wrapper(func) for func in funcs],
+        max_workers=max_workers,
+        executor_name=executor_name,
     )
@@ -0,0 +1,111 @@
+"""
+Compares bi-encoder throughput and parity of torch and ONNX Runtime (optionally
+int8-quantized) on this machine, to decide per model whether to run the model
+server with EMBEDDING_MODEL_BACKEND=onnx.
+
+Exports are written to EMBEDDING_ONNX_EXPORT_DIR, so a model server started
+with the same setting reuses them.
+
+Usage (from backend/, in the model server environment):
+    python scripts/benchmark_embedding_backends.py \\
+        --model nomic-ai/nomic-embed-text-v1 --quantization none avx512_vnni
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentence_transformers import SentenceTransformer  # noqa: E402
+
+from model_server.onnx_backend import (  # noqa: E402
+    ONNX_QUANTIZATION_CONFIGS,
+    PARITY_CORPUS,
+    export_onnx_model,
+    load_onnx_model,
+    measure_parity,
+)
+
+_WORDS = (
+    "the team reviewed quarterly revenue onboarding policy incident runbook "
+    "deployment pipeline customer escalation password reset vacation planning "
+    "dashboard latency database migration security review contract renewal"
+).split()
+
+
+def _make_texts(num_texts: int, words_per_text: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(_WORDS) for _ in range(words_per_text))
+        for _ in range(num_texts)
+    ]
+
+
+def _texts_per_second(
+    model: SentenceTransformer, texts: list[str], batch_size: int, repeats: int
+) -> float:
+    # Warm up (graph optimization, allocator, thread pools)
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.encode(texts, batch_size=batch_size)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", required=True, help="Hugging Face model name")
+    parser.add_argument(
+        "--quantization",
+        nargs="+",
+        default=["none"],
+        choices=["none", *ONNX_QUANTIZATION_CONFIGS],
+        help="ONNX variants to compare, 'none' is the unquantized graph",
+    )
+    parser.add_argument("--max-seq-length", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--num-texts", type=int, default=512)
+    parser.add_argument(
+        "--words-per-text",
+        type=int,
+        default=120,
+        help="About 1.3 tokens per word, so 120 is roughly a 160-token chunk",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = _make_texts(args.num_texts, args.words_per_text, args.seed)
+
+    torch_model = SentenceTransformer(args.model, trust_remote_code=False)
+    torch_model.max_seq_length = args.max_seq_length
+    torch_rate = _texts_per_second(torch_model, texts, args.batch_size, args.repeats)
+
+    print(f"model={args.model} texts={len(texts)} batch_size={args.batch_size}")
+    print(f"{'backend':<28}{'texts/s':>10}{'speedup':>10}{'min cos':>10}")
+    print(f"{'torch':<28}{torch_rate:>10.1f}{1.0:>10.2f}{1.0:>10.4f}")
+
+    for variant in args.quantization:
+        quantization = None if variant == "none" else variant
+        export_dir, file_name = export_onnx_model(
+            args.model, quantization, local_files_only=False
+        )
+        onnx_model = load_onnx_model(str(export_dir), file_name)
+        onnx_model.max_seq_length = args.max_seq_length
+        rate = _texts_per_second(onnx_model, texts, args.batch_size, args.repeats)
+        similarity = measure_parity(onnx_model, torch_model, PARITY_CORPUS + texts[:32])
+        print(
+            f"{'onnx/' + file_name.split('/')[-1]:<28}{rate:>10.1f}"
+            f"{rate / torch_rate:>10.2f}{similarity:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Benchmarks Chunker throughput on synthetic documents with many small sections.
+
+Documents made of many short sections (Slack threads, spreadsheets, Confluence
+pages with many paragraphs) are the worst case for chunking, since every section
+passes through the text chunker's accumulator. Reports wall time and how many
+characters went through the tokenizer, which should stay close to the size of
+the input.
+
+Does not need Onyx to be running. The default tokenizer may be downloaded on
+first use.
+
+Usage:
+    source .venv/bin/activate
+    PYTHONPATH=backend python backend/scripts/debugging/benchmark_chunking.py --help
+"""
+
+import argparse
+import statistics
+import time
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import IndexingDocument, Section, SectionType
+from onyx.indexing.chunker import Chunker
+from onyx.indexing.models import DocAwareChunk
+from onyx.natural_language_processing.utils import BaseTokenizer, get_tokenizer
+
+DEFAULT_N = 5
+
+
+class CountingTokenizer(BaseTokenizer):
+    """Wraps a tokenizer and counts the characters passed to ``encode``."""
+
+    def __init__(self, tokenizer: BaseTokenizer) -> None:
+        self._tokenizer = tokenizer
+        self.encoded_chars = 0
+
+    def encode(self, string: str) -> list[int]:
+        self.encoded_chars += len(string)
+        return self._tokenizer.encode(string)
+
+    def tokenize(self, string: str) -> list[str]:
+        self.encoded_chars += len(string)
+        return self._tokenizer.tokenize(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return self._tokenizer.decode(tokens)
+
+
+def _make_documents(
+    num_docs: int, sections_per_doc: int, section_words: int
+) -> list[IndexingDocument]:
+    documents = []
+    for doc_idx in range(num_docs):
+        sections: list[Section] = [
+            Section(
+                type=SectionType.TEXT,
+                text=" ".join(
+                    f"word{(doc_idx + section_idx + word_idx) % 997}"
+                    for word_idx in range(section_words)
+                )
+                + ".",
+                link=f"https://example.com/{doc_idx}#{section_idx}",
+            )
+            for section_idx in range(sections_per_doc)
+        ]
+        documents.append(
+            IndexingDocument(
+                id=f"benchmark-doc-{doc_idx}",
+                source=DocumentSource.MOCK_CONNECTOR,
+                semantic_identifier=f"Benchmark document {doc_idx}",
+                title=f"Benchmark document {doc_idx}",
+                metadata={"channel": "benchmark", "tags": ["a", "b"]},
+                # The chunker only reads processed_sections.
+                sections=[],
+                processed_sections=sections,
+            )
+        )
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="A benchmarking tool to measure chunking throughput."
+    )
+    parser.add_argument(
+        "-n",
+        "--num-trials",
+        type=int,
+        default=DEFAULT_N,
+        help=f"Number of trials to run (default: {DEFAULT_N}).",
+    )
+    parser.add_argument(
+        "-d", "--num-docs", type=int, default=10, help="Documents per trial."
+    )
+    parser.add_argument(
+        "-s",
+        "--sections-per-doc",
+        type=int,
+        default=2000,
+        help="Sections per document.",
+    )
+    parser.add_argument(
+        "-w", "--section-words", type=int, default=12, help="Words per section."
+    )
+    args = parser.parse_args()
+
+    documents = _make_documents(
+        args.num_docs, args.sections_per_doc, args.section_words
+    )
+    input_chars = sum(
+        len(section.text or "")
+        for document in documents
+        for section in document.processed_sections
+    )
+    tokenizer = CountingTokenizer(get_tokenizer(model_name=None, provider_type=None))
+    chunker = Chunker(tokenizer=tokenizer)
+
+    timings_s: list[float] = []
+    chunks: list[DocAwareChunk] = []
+    for _ in range(args.num_trials):
+        tokenizer.encoded_chars = 0
+        start = time.perf_counter()
+        chunks = chunker.chunk(documents)
+        timings_s.append(time.perf_counter() - start)
+
+    print(
+        f"{len(documents)} docs x {args.sections_per_doc} sections "
+        f"({input_chars:,} chars) -> {len(chunks)} chunks"
+    )
+    print(
+        f"Time per trial: mean {statistics.mean(timings_s):.3f}s, "
+        f"min {min(timings_s):.3f}s, max {max(timings_s):.3f}s"
+    )
+    # Blurb and sentence splitters also tokenize, so this is a small multiple of
+    # the input rather than exactly 1x; it must not grow with sections per doc.
+    print(
+        f"Tokenizer input per trial: {tokenizer.encoded_chars:,} chars "
+        f"({tokenizer.encoded_chars / input_chars:.2f}x the document text)"
+    )
+
+
+if __name__ == "__main__":
+    main()
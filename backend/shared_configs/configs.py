@@ -61,6 +61,32 @@ DISABLE_RERANK_FOR_STREAMING = (
 # model. If torch finds more threads on its own, this value is not used.
 MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 
+# The model server gathers concurrent embedding requests for the same model into
+# one forward pass. A request waits at most this long for others to join it.
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.environ.get("EMBEDDING_BATCH_MAX_WAIT_MS") or 5)
+# Upper bound on the (estimated) tokens of one gathered batch, padding included.
+EMBEDDING_BATCH_MAX_TOKENS = int(os.environ.get("EMBEDDING_BATCH_MAX_TOKENS") or 32768)
+
+# Runtime for the local bi-encoder: "torch" (default) or "onnx". With "onnx" the
+# model is exported to ONNX once (or the repo's own ONNX graph is used) and run
+# with ONNX Runtime on CPU, which is usually faster on CPU-only pods. Requires
+# optimum[onnxruntime], which the published model server image does not include,
+# so this is only for custom images; without it the model server stays on torch.
+EMBEDDING_MODEL_BACKEND = (os.environ.get("EMBEDDING_MODEL_BACKEND") or "torch").lower()
+# Optional int8 dynamic quantization of the ONNX graph, one of "arm64", "avx2",
+# "avx512" or "avx512_vnni" (match the CPUs the model server runs on)
+EMBEDDING_ONNX_QUANTIZATION = os.environ.get("EMBEDDING_ONNX_QUANTIZATION") or None
+# Where exported / quantized ONNX graphs are kept between restarts
+EMBEDDING_ONNX_EXPORT_DIR = (
+    os.environ.get("EMBEDDING_ONNX_EXPORT_DIR") or ".cache/onnx_embedding_models"
+)
+# An ONNX model is only used if every embedding of a fixed corpus has at least
+# this cosine similarity to the torch embedding, otherwise torch is used.
+# The check runs once per exported graph and its result is saved next to it.
+EMBEDDING_ONNX_MIN_COSINE_SIMILARITY = float(
+    os.environ.get("EMBEDDING_ONNX_MIN_COSINE_SIMILARITY") or 0.99
+)
+
 # Model server that has indexing only set will throw exception if used for reranking
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
@@ -21,6 +21,17 @@ class EmbedTextType(str, Enum):
     PASSAGE = "passage"
 
 
+class EmbeddingsEncoding(str, Enum):
+    """How the model server returns embeddings."""
+
+    # JSON lists of floats
+    FLOAT_LIST = "float_list"
+    # Little-endian float32 payload, base64 encoded inside the JSON response
+    BASE64 = "base64"
+    # The raw float32 payload as the response body
+    BINARY = "binary"
+
+
 class WebSearchProviderType(str, Enum):
     GOOGLE_PSE = "google_pse"
     SERPER = "serper"
@@ -1,9 +1,103 @@
-from pydantic import BaseModel
+import base64
+import struct
+from typing import Annotated, Any
 
-from shared_configs.enums import EmbeddingProvider, EmbedTextType, RerankerProvider
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel, PlainSerializer, PlainValidator, TypeAdapter
+
+from shared_configs.enums import (
+    EmbeddingProvider,
+    EmbeddingsEncoding,
+    EmbedTextType,
+    RerankerProvider,
+)
 
 Embedding = list[float]
 
+# Content-Type of a model server response carrying EmbeddingsEncoding.BINARY
+EMBEDDINGS_BINARY_MEDIA_TYPE = "application/x-onyx-embeddings"
+
+# magic, version, reserved, number of vectors, dimension
+_EMBEDDINGS_HEADER = struct.Struct("<4sHHII")
+_EMBEDDINGS_MAGIC = b"OXEM"
+_EMBEDDINGS_VERSION = 1
+_FLOAT32_LE = np.dtype("<f4")
+
+_FLOAT_LIST_ADAPTER = TypeAdapter(list[float])
+
+
+def _validate_embedding_vector(value: Any) -> Embedding | npt.NDArray[np.float32]:
+    # Arrays are kept as is, so decoded responses are never copied into lists
+    if isinstance(value, np.ndarray):
+        return value
+    return _FLOAT_LIST_ADAPTER.validate_python(value)
+
+
+def embedding_to_list(vector: "Embedding | npt.NDArray[np.float32]") -> Embedding:
+    if isinstance(vector, np.ndarray):
+        # asarray is a no-op here, it only gives tolist a plain array type
+        return np.asarray(vector, dtype=np.float32).tolist()
+    return vector
+
+
+# An embedding that may stay backed by a NumPy array (e.g. a row of a decoded
+# binary response) until it is serialized, where it becomes a list of floats.
+EmbeddingVector = Annotated[
+    Embedding | npt.NDArray[np.float32],
+    PlainValidator(_validate_embedding_vector),
+    PlainSerializer(embedding_to_list, return_type=list[float]),
+]
+
+
+def encode_embeddings_binary(embeddings: npt.ArrayLike) -> bytes:
+    """Packs a 2D array of embeddings as a header followed by the vectors as
+    little-endian float32, row major."""
+    array = np.ascontiguousarray(embeddings, dtype=_FLOAT32_LE)
+    if array.ndim != 2:
+        raise ValueError(f"Expected a 2D array of embeddings, got {array.ndim}D")
+    count, dim = array.shape
+    header = _EMBEDDINGS_HEADER.pack(
+        _EMBEDDINGS_MAGIC, _EMBEDDINGS_VERSION, 0, count, dim
+    )
+    return header + array.tobytes()
+
+
+def decode_embeddings_binary(payload: bytes) -> npt.NDArray[np.float32]:
+    """Inverse of encode_embeddings_binary. The returned array is a read-only
+    view over ``payload``, nothing is copied."""
+    if len(payload) < _EMBEDDINGS_HEADER.size:
+        raise ValueError("Embeddings payload is shorter than its header")
+    magic, version, _, count, dim = _EMBEDDINGS_HEADER.unpack_from(payload)
+    if magic != _EMBEDDINGS_MAGIC or version != _EMBEDDINGS_VERSION:
+        raise ValueError(
+            f"Unsupported embeddings payload (magic={magic!r}, version={version})"
+        )
+    expected_size = _EMBEDDINGS_HEADER.size + count * dim * _FLOAT32_LE.itemsize
+    if len(payload) != expected_size:
+        raise ValueError(
+            f"Embeddings payload is {len(payload)} bytes, expected {expected_size}"
+        )
+    # astype is a no-op on little-endian hosts and byte swaps on the others
+    return (
+        np.frombuffer(
+            payload,
+            dtype=_FLOAT32_LE,
+            count=count * dim,
+            offset=_EMBEDDINGS_HEADER.size,
+        )
+        .reshape(count, dim)
+        .astype(np.float32, copy=False)
+    )
+
+
+def encode_embeddings_base64(embeddings: npt.ArrayLike) -> str:
+    return base64.b64encode(encode_embeddings_binary(embeddings)).decode("ascii")
+
+
+def decode_embeddings_base64(payload: str) -> npt.NDArray[np.float32]:
+    return decode_embeddings_binary(base64.b64decode(payload))
+
 
 class EmbedRequest(BaseModel):
     texts: list[str]
@@ -25,12 +119,23 @@ class EmbedRequest(BaseModel):
     # will be ignored for other providers.
     reduced_dimension: int | None = None
 
+    # Only honored by the model server. Servers that predate this field always
+    # answer with FLOAT_LIST, so clients must check the response Content-Type.
+    response_encoding: EmbeddingsEncoding = EmbeddingsEncoding.FLOAT_LIST
+
     # This disables the "model_" protected namespace for pydantic
     model_config = {"protected_namespaces": ()}
 
 
 class EmbedResponse(BaseModel):
-    embeddings: list[Embedding]
+    embeddings: list[EmbeddingVector]
+    # Set instead of embeddings for EmbeddingsEncoding.BASE64
+    embeddings_base64: str | None = None
+
+    def decoded_embeddings(self) -> list[EmbeddingVector]:
+        if self.embeddings_base64 is not None:
+            return list(decode_embeddings_base64(self.embeddings_base64))
+        return self.embeddings
 
 
 class RerankRequest(BaseModel):
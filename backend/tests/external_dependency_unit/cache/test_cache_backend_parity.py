@@ -76,6 +76,43 @@ class TestTTLParity:
         assert cache.get(k) is None
 
 
+class TestMultiKeyParity:
+    def test_mset_mget(self, cache: CacheBackend) -> None:
+        a, b = _key(), _key()
+        cache.mset({a: b"a", b: 2})
+        assert cache.mget([b, _key(), a]) == [b"2", None, b"a"]
+
+    def test_mget_empty(self, cache: CacheBackend) -> None:
+        assert cache.mget([]) == []
+
+    def test_mset_overwrites_with_ttl(self, cache: CacheBackend) -> None:
+        k = _key()
+        cache.set(k, b"old")
+        cache.mset({k: b"new"}, ex=10)
+        assert cache.get(k) == b"new"
+        assert 8 <= cache.ttl(k) <= 10
+
+    def test_mexpire(self, cache: CacheBackend) -> None:
+        a, b, missing = _key(), _key(), _key()
+        cache.mset({a: b"a", b: b"b"})
+        cache.mexpire([a, b, missing], 10)
+        assert 8 <= cache.ttl(a) <= 10
+        assert 8 <= cache.ttl(b) <= 10
+        assert cache.ttl(missing) == TTL_KEY_NOT_FOUND
+
+    def test_pipeline(self, cache: CacheBackend) -> None:
+        a, b = _key(), _key()
+        with cache.pipeline() as pipe:
+            pipe.set(a, b"1")
+            pipe.set(b, b"2", ex=10)
+            pipe.set(a, b"3")
+            pipe.expire(a, 10)
+            pipe.delete(b)
+        assert cache.get(a) == b"3"
+        assert 8 <= cache.ttl(a) <= 10
+        assert cache.get(b) is None
+
+
 class TestLockParity:
     def test_acquire_release(self, cache: CacheBackend) -> None:
         lock = cache.lock(f"parity_lock_{uuid4().hex[:8]}")
@@ -222,7 +222,7 @@ class TestFailOpen:
         )
 
         with patch(
-            "onyx.cache.redis_backend.RedisCacheBackend.get",
+            "onyx.cache.redis_backend.RedisCacheBackend.mget",
             side_effect=RedisError("boom"),
         ):
             # Under test.
@@ -243,7 +243,7 @@ class TestFailOpen:
         # Precondition.
         query = _unique_query()
         with patch(
-            "onyx.cache.redis_backend.RedisCacheBackend.set",
+            "onyx.cache.redis_backend.RedisCacheBackend.mset",
             side_effect=RedisError("boom"),
         ):
             # Under test.
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from ee.onyx.db.document import upsert_document_external_perms_batch
+from onyx.access.models import DocExternalAccess, ExternalAccess
+from onyx.access.utils import build_ext_group_name_for_onyx
+from onyx.configs.constants import DocumentSource
+
+_SOURCE = DocumentSource.GOOGLE_DRIVE
+
+
+def _doc_access(
+    doc_id: str, emails: set[str], groups: set[str], is_public: bool = False
+) -> DocExternalAccess:
+    return DocExternalAccess(
+        external_access=ExternalAccess(
+            external_user_emails=emails,
+            external_user_group_ids=groups,
+            is_public=is_public,
+        ),
+        doc_id=doc_id,
+    )
+
+
+def _stored(
+    doc_id: str, emails: list[str], groups: list[str], is_public: bool = False
+) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=doc_id,
+        external_user_emails=emails,
+        external_user_group_ids=[
+            build_ext_group_name_for_onyx(ext_group_name=group, source=_SOURCE)
+            for group in groups
+        ],
+        is_public=is_public,
+    )
+
+
+def test_only_changed_and_new_documents_are_written() -> None:
+    db_session = MagicMock()
+    db_session.execute.side_effect = [
+        [
+            # Same ACL, different order: unchanged
+            _stored("unchanged", ["b@x.com", "a@x.com"], ["eng"]),
+            _stored("regrouped", ["a@x.com"], ["eng"]),
+            _stored("published", ["a@x.com"], [], is_public=False),
+        ],
+        None,
+    ]
+    db_session.scalars.return_value = ["new"]
+
+    result = upsert_document_external_perms_batch(
+        db_session=db_session,
+        doc_external_accesses=[
+            _doc_access("unchanged", {"a@x.com", "b@x.com"}, {"eng"}),
+            _doc_access("regrouped", {"a@x.com"}, {"sales"}),
+            _doc_access("published", {"a@x.com"}, set(), is_public=True),
+            _doc_access("new", {"c@x.com"}, set()),
+        ],
+        source_type=_SOURCE,
+    )
+
+    assert result.created_doc_ids == ["new"]
+    assert result.changed_doc_ids == ["regrouped", "published"]
+    assert result.num_unchanged == 1
+
+    # One read, one insert for the new document, one bulk update
+    assert db_session.execute.call_count == 2
+    db_session.scalars.assert_called_once()
+    update_rows = db_session.execute.call_args.args[1]
+    assert [row["id"] for row in update_rows] == ["regrouped", "published"]
+    assert update_rows[0]["external_user_group_ids"] == [
+        build_ext_group_name_for_onyx(ext_group_name="sales", source=_SOURCE)
+    ]
+    assert all("last_modified" in row for row in update_rows)
+    db_session.commit.assert_called_once()
+
+
+def test_unchanged_batch_writes_nothing() -> None:
+    db_session = MagicMock()
+    db_session.execute.return_value = [_stored("doc", ["a@x.com"], [])]
+
+    result = upsert_document_external_perms_batch(
+        db_session=db_session,
+        doc_external_accesses=[_doc_access("doc", {"a@x.com"}, set())],
+        source_type=_SOURCE,
+    )
+
+    assert result.num_unchanged == 1
+    assert not result.created_doc_ids and not result.changed_doc_ids
+    db_session.execute.assert_called_once()
+    db_session.scalars.assert_not_called()
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from ee.onyx.server.query_history.api import fetch_and_process_chat_session_history
+from onyx.configs.constants import MessageType, QAFeedbackType
+
+_API_MODULE = "ee.onyx.server.query_history.api"
+_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _make_session(minutes_ago: int) -> MagicMock:
+    chat_session = MagicMock()
+    chat_session.id = uuid4()
+    chat_session.time_created = _NOW - timedelta(minutes=minutes_ago)
+    chat_session.user = None
+    chat_session.persona = None
+    chat_session.persona_id = None
+    chat_session.description = None
+    chat_session.onyxbot_flow = False
+    return chat_session
+
+
+def _make_message(
+    chat_session: MagicMock,
+    message_id: int,
+    message_type: MessageType,
+    parent_id: int | None,
+    child_id: int | None,
+) -> MagicMock:
+    message = MagicMock()
+    message.id = message_id
+    message.chat_session_id = chat_session.id
+    message.message = f"message {message_id}"
+    message.message_type = message_type
+    message.parent_message_id = parent_id
+    message.latest_child_message_id = child_id
+    message.time_sent = _NOW
+    return message
+
+
+def _make_conversation(chat_session: MagicMock, first_id: int) -> list[MagicMock]:
+    return [
+        _make_message(chat_session, first_id, MessageType.SYSTEM, None, first_id + 1),
+        _make_message(
+            chat_session, first_id + 1, MessageType.USER, first_id, first_id + 2
+        ),
+        _make_message(
+            chat_session, first_id + 2, MessageType.ASSISTANT, first_id + 1, None
+        ),
+    ]
+
+
+@patch(f"{_API_MODULE}._EXPORT_PAGE_SIZE", 2)
+def test_export_pages_by_keyset_and_loads_details_per_page() -> None:
+    sessions = [_make_session(minutes_ago) for minutes_ago in range(3)]
+    messages = [
+        *_make_conversation(sessions[0], 1),
+        *_make_conversation(sessions[1], 10),
+        *_make_conversation(sessions[2], 20),
+    ]
+    # Two assistant messages in a row: skipped, like create_chat_history_chain
+    messages[5].latest_child_message_id = 13
+    messages.append(_make_message(sessions[1], 13, MessageType.ASSISTANT, 12, None))
+
+    feedback = MagicMock(is_positive=False, feedback_text="wrong")
+    search_doc = MagicMock(document_id="doc", semantic_id="Doc", link=None)
+
+    def _get_sessions(before: tuple[datetime, Any] | None, **_: Any) -> list[Any]:
+        if before is None:
+            return sessions[:2]
+        assert before == (sessions[1].time_created, sessions[1].id)
+        return sessions[2:]
+
+    def _yield_messages(chat_session_ids: list[Any], **_: Any) -> list[MagicMock]:
+        return [m for m in messages if m.chat_session_id in chat_session_ids]
+
+    with (
+        patch(f"{_API_MODULE}.get_chat_sessions_before", side_effect=_get_sessions),
+        patch(
+            f"{_API_MODULE}.yield_chat_messages_for_sessions",
+            side_effect=_yield_messages,
+        ) as mock_yield_messages,
+        patch(
+            f"{_API_MODULE}.get_latest_feedback_by_message",
+            return_value={3: feedback},
+        ) as mock_feedback,
+        patch(
+            f"{_API_MODULE}.get_search_docs_by_message",
+            return_value={3: [search_doc]},
+        ),
+    ):
+        snapshots = list(
+            fetch_and_process_chat_session_history(
+                db_session=MagicMock(), start=_NOW - timedelta(days=1), end=_NOW
+            )
+        )
+
+    assert [snapshot.id for snapshot in snapshots] == [sessions[0].id, sessions[2].id]
+    assert mock_yield_messages.call_count == 2
+    assert mock_feedback.call_count == 2
+
+    first = snapshots[0]
+    assert [message.id for message in first.messages] == [2, 3]
+    assert first.messages[1].feedback_type == QAFeedbackType.DISLIKE
+    assert first.messages[1].feedback_text == "wrong"
+    assert [doc.document_id for doc in first.messages[1].documents] == ["doc"]
+    assert first.messages[0].feedback_type is None
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from model_server.batching import EmbeddingBatcher
+
+
+class _RecordingModel:
+    """Embeds each text as [len(text)] and records the batches it saw."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def encode(self, texts: list[str], **kwargs: Any) -> list[list[float]]:  # noqa: ARG002
+        self.batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+def _batcher(
+    model: Any, max_wait_seconds: float = 0.05, max_batch_tokens: int = 10_000
+) -> EmbeddingBatcher:
+    return EmbeddingBatcher(
+        load_model=lambda model_name, max_context_length: model,  # noqa: ARG005
+        max_wait_seconds=max_wait_seconds,
+        max_batch_tokens=max_batch_tokens,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward_pass() -> None:
+    model = _RecordingModel()
+    batcher = _batcher(model)
+
+    results = await asyncio.gather(
+        batcher.embed(["a", "bb"], "model", 512, True),
+        batcher.embed(["ccc"], "model", 512, True),
+        batcher.embed(["dddd", "e"], "model", 512, True),
+    )
+
+    assert [result.tolist() for result in results] == [
+        [[1.0], [2.0]],
+        [[3.0]],
+        [[4.0], [1.0]],
+    ]
+    assert model.batches == [["a", "bb", "ccc", "dddd", "e"]]
+
+
+@pytest.mark.asyncio
+async def test_requests_are_split_by_model_and_length_bucket() -> None:
+    model = _RecordingModel()
+    batcher = _batcher(model)
+    long_text = "x" * 2000
+
+    await asyncio.gather(
+        batcher.embed(["short"], "model-a", 512, True),
+        batcher.embed(["short"], "model-b", 512, True),
+        batcher.embed([long_text], "model-a", 512, True),
+        batcher.embed(["tiny"], "model-a", 512, True),
+    )
+
+    assert sorted(model.batches) == sorted([["short", "tiny"], ["short"], [long_text]])
+
+
+@pytest.mark.asyncio
+async def test_token_budget_caps_batch_size() -> None:
+    model = _RecordingModel()
+    # Each short text costs the minimum bucket of 16 tokens.
+    batcher = _batcher(model, max_batch_tokens=32)
+
+    await asyncio.gather(*(batcher.embed(["q"], "model", 512, True) for _ in range(5)))
+
+    assert [len(batch) for batch in model.batches] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_encode_errors_reach_every_caller_in_the_batch() -> None:
+    model = MagicMock()
+    model.encode.side_effect = RuntimeError("boom")
+    batcher = _batcher(model)
+
+    results = await asyncio.gather(
+        batcher.embed(["a"], "model", 512, True),
+        batcher.embed(["b"], "model", 512, True),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    model.encode.assert_called_once()
@@ -0,0 +1,109 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from model_server import onnx_backend
+from model_server.onnx_backend import (
+    load_onnx_embedding_model,
+    min_cosine_similarity,
+    onnx_file_name,
+)
+
+
+def _model(embeddings: np.ndarray) -> MagicMock:
+    model = MagicMock()
+    model.encode.return_value = embeddings
+    return model
+
+
+def test_min_cosine_similarity_is_scale_invariant() -> None:
+    reference = np.array([[1.0, 0.0], [1.0, 1.0]])
+    assert min_cosine_similarity(reference, reference * 3) == pytest.approx(1.0)
+    assert min_cosine_similarity(reference, [[0.0, 1.0], [1.0, 1.0]]) == (
+        pytest.approx(0.0)
+    )
+    with pytest.raises(ValueError):
+        min_cosine_similarity(reference, reference[:1])
+
+
+def test_onnx_file_name() -> None:
+    assert onnx_file_name(None) == "onnx/model.onnx"
+    assert onnx_file_name("avx2") == "onnx/model_qint8_avx2.onnx"
+    with pytest.raises(ValueError):
+        onnx_file_name("fp8")
+
+
+def test_parity_is_checked_once_per_graph(tmp_path: Path) -> None:
+    reference = np.array([[1.0, 0.0], [0.0, 1.0]])
+    onnx_model = _model(reference * 1.01)
+    load_torch_model = MagicMock(return_value=_model(reference))
+
+    with (
+        patch.object(
+            onnx_backend,
+            "export_onnx_model",
+            return_value=(tmp_path, "onnx/model_qint8_avx2.onnx"),
+        ),
+        patch.object(onnx_backend, "load_onnx_model", return_value=onnx_model),
+    ):
+        for _ in range(2):
+            model = load_onnx_embedding_model(
+                "some/model", load_torch_model, local_files_only=False
+            )
+            assert model is onnx_model
+
+    load_torch_model.assert_called_once()
+    assert (tmp_path / "parity.json").exists()
+
+
+def test_falls_back_when_parity_is_too_low(tmp_path: Path) -> None:
+    with (
+        patch.object(
+            onnx_backend,
+            "export_onnx_model",
+            return_value=(tmp_path, "onnx/model.onnx"),
+        ),
+        patch.object(onnx_backend, "load_onnx_model", return_value=_model(np.eye(2))),
+    ):
+        model = load_onnx_embedding_model(
+            "some/model",
+            lambda: _model(np.array([[1.0, 1.0], [0.0, 1.0]])),
+            local_files_only=False,
+            min_similarity=0.99,
+        )
+
+    assert model is None
+
+
+def test_falls_back_when_export_fails() -> None:
+    load_torch_model = MagicMock()
+    with patch.object(
+        onnx_backend, "export_onnx_model", side_effect=ImportError("no optimum")
+    ):
+        model = load_onnx_embedding_model(
+            "some/model", load_torch_model, local_files_only=False
+        )
+
+    assert model is None
+    load_torch_model.assert_not_called()
+
+
+def test_falls_back_when_parity_check_fails(tmp_path: Path) -> None:
+    with (
+        patch.object(
+            onnx_backend,
+            "export_onnx_model",
+            return_value=(tmp_path, "onnx/model.onnx"),
+        ),
+        patch.object(onnx_backend, "load_onnx_model", return_value=_model(np.eye(2))),
+    ):
+        model = load_onnx_embedding_model(
+            "some/model",
+            MagicMock(side_effect=OSError("torch weights missing")),
+            local_files_only=False,
+        )
+
+    assert model is None
+    assert not (tmp_path / "parity.json").exists()
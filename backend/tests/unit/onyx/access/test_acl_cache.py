@@ -0,0 +1,127 @@
+from typing import Any
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from onyx.access import acl_cache
+from onyx.context.search.preprocessing.access_filters import (
+    build_access_filters_for_user,
+)
+
+_FILTERS_MODULE = "onyx.context.search.preprocessing.access_filters"
+
+
+class _FakeCache:
+    def __init__(self) -> None:
+        self._vals: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self._vals.get(key)
+
+    def set(
+        self,
+        key: str,
+        value: str | bytes,
+        ex: int | None = None,  # noqa: ARG002
+    ) -> None:
+        self._vals[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def set_if_absent(
+        self,
+        key: str,
+        value: str | bytes,
+        ex: int | None = None,
+    ) -> bool:
+        if key in self._vals:
+            return False
+        self.set(key, value, ex=ex)
+        return True
+
+
+@pytest.fixture
+def fake_cache(monkeypatch: pytest.MonkeyPatch) -> _FakeCache:
+    cache = _FakeCache()
+    monkeypatch.setattr(acl_cache, "get_cache_backend", lambda **_: cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def _ee_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(f"{_FILTERS_MODULE}.global_version.is_ee_version", lambda: True)
+
+
+def _make_user() -> MagicMock:
+    user = MagicMock()
+    user.id = uuid4()
+    user.is_anonymous = False
+    return user
+
+
+@pytest.mark.usefixtures("fake_cache")
+def test_acl_is_served_from_cache_until_invalidated() -> None:
+    user = _make_user()
+    acls: list[set[str]] = [
+        {"user_email:a@x.com", "group:eng", "PUBLIC"},
+        {"user_email:a@x.com", "group:eng", "group:sales", "PUBLIC"},
+    ]
+
+    with patch(f"{_FILTERS_MODULE}.get_acl_for_user", side_effect=acls) as mock_get_acl:
+        first = build_access_filters_for_user(user, MagicMock())
+        second = build_access_filters_for_user(user, MagicMock())
+        acl_cache.invalidate_user_acl_cache()
+        third = build_access_filters_for_user(user, MagicMock())
+
+    assert first == second == sorted(acls[0])
+    assert third == sorted(acls[1])
+    assert mock_get_acl.call_count == 2
+
+
+@pytest.mark.usefixtures("fake_cache")
+def test_fill_is_written_under_the_generation_read_before_the_db() -> None:
+    user = _make_user()
+
+    def _acl_changed_mid_read(*_: Any) -> set[str]:
+        # A membership change commits while this reader is in Postgres
+        acl_cache.invalidate_user_acl_cache()
+        return {"group:stale"}
+
+    with patch(
+        f"{_FILTERS_MODULE}.get_acl_for_user", side_effect=_acl_changed_mid_read
+    ):
+        build_access_filters_for_user(user, MagicMock())
+
+    assert acl_cache.get_cached_user_acl(user.id).acl is None
+
+
+def test_cache_outage_falls_through_to_db(monkeypatch: pytest.MonkeyPatch) -> None:
+    broken = MagicMock()
+    broken.get.side_effect = RedisError("redis down")
+    monkeypatch.setattr(acl_cache, "get_cache_backend", lambda **_: broken)
+
+    with patch(f"{_FILTERS_MODULE}.get_acl_for_user", return_value={"b", "a"}):
+        assert build_access_filters_for_user(_make_user(), MagicMock()) == ["a", "b"]
+    broken.set.assert_not_called()
+
+
+def test_invalidation_waits_for_commit() -> None:
+    db_session = MagicMock(spec=Session)
+    db_session.info = {}
+
+    with (
+        patch.object(acl_cache, "invalidate_user_acl_cache") as mock_invalidate,
+        patch.object(acl_cache.event, "listen") as mock_listen,
+    ):
+        acl_cache.invalidate_user_acl_cache_on_commit(db_session)
+        acl_cache.invalidate_user_acl_cache_on_commit(db_session)
+
+        mock_invalidate.assert_not_called()
+        mock_listen.assert_called_once()
+        _, event_name, on_commit = mock_listen.call_args.args
+        assert event_name == "after_commit"
+        on_commit(db_session)
+
+    mock_invalidate.assert_called_once()
+    assert db_session.info == {}
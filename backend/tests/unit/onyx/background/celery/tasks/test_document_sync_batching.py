@@ -0,0 +1,197 @@
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from onyx.access.models import DocumentAccess
+from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
+from onyx.background.celery.tasks.vespa.document_sync import (
+    DOCUMENT_SYNC_TASKSET_KEY,
+    generate_document_sync_tasks,
+)
+from onyx.background.celery.tasks.vespa.tasks import (
+    _apply_batch_metadata_update,
+    _build_batch_metadata_update_requests,
+)
+from onyx.configs.constants import OnyxCeleryPriority, OnyxCeleryTask
+from onyx.db.models import Document as DbDocument
+from onyx.document_index.interfaces_new import (
+    MetadataUpdateRequest,
+    SecondaryIndexDocumentMissingError,
+)
+
+_MODULE = "onyx.background.celery.tasks.vespa.document_sync"
+
+
+def _access(is_public: bool, emails: list[str | None]) -> DocumentAccess:
+    return DocumentAccess.build(
+        user_emails=emails,
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=is_public,
+    )
+
+
+def _generate(
+    rows: list[tuple[str, bool]], batch_size: int, max_tasks: int = 100
+) -> tuple[tuple[int, int], MagicMock, MagicMock]:
+    r = MagicMock()
+    celery_app = MagicMock()
+    db_session = MagicMock()
+    db_session.execute.return_value.yield_per.return_value = rows
+    with (
+        patch(
+            f"{_MODULE}.construct_document_id_select_by_needs_sync_or_secondary_pending"
+        ),
+        patch(f"{_MODULE}.any_future_port_in_progress", return_value=True),
+        patch(f"{_MODULE}.count_secondary_only_sync_pending_documents", return_value=0),
+    ):
+        result = generate_document_sync_tasks(
+            r,
+            max_tasks,
+            celery_app,
+            db_session,
+            MagicMock(),
+            "tenant",
+            batch_size=batch_size,
+        )
+    return result, r, celery_app
+
+
+def test_generate_batches_documents_per_priority() -> None:
+    rows = [(f"doc{i}", False) for i in range(5)] + [("pending", True)]
+
+    (num_tasks, num_docs), r, celery_app = _generate(rows, batch_size=2)
+
+    assert (num_tasks, num_docs) == (4, 6)
+    sent = [
+        (c.args[0], c.kwargs["kwargs"], c.kwargs["priority"])
+        for c in celery_app.send_task.call_args_list
+    ]
+    batch_task = OnyxCeleryTask.DOCUMENT_INDEX_METADATA_BATCH_SYNC_TASK
+    single_task = OnyxCeleryTask.DOCUMENT_INDEX_METADATA_SYNC_TASK
+    assert sent == [
+        (
+            batch_task,
+            {"document_ids": ["doc0", "doc1"], "tenant_id": "tenant"},
+            OnyxCeleryPriority.MEDIUM,
+        ),
+        (
+            batch_task,
+            {"document_ids": ["doc2", "doc3"], "tenant_id": "tenant"},
+            OnyxCeleryPriority.MEDIUM,
+        ),
+        # Partial batches are flushed at the end, a lone document uses the
+        # per-document task.
+        (
+            single_task,
+            {"document_id": "doc4", "tenant_id": "tenant"},
+            OnyxCeleryPriority.MEDIUM,
+        ),
+        (
+            single_task,
+            {"document_id": "pending", "tenant_id": "tenant"},
+            OnyxCeleryPriority.LOW,
+        ),
+    ]
+    # One taskset entry per task, not per document.
+    assert r.sadd.call_count == 4
+    assert all(c.args[0] == DOCUMENT_SYNC_TASKSET_KEY for c in r.sadd.call_args_list)
+
+
+def test_generate_respects_max_tasks_when_batching() -> None:
+    rows = [(f"doc{i}", False) for i in range(10)]
+
+    (num_tasks, _), _, celery_app = _generate(rows, batch_size=3, max_tasks=2)
+
+    assert num_tasks == 2
+    assert celery_app.send_task.call_count == 2
+
+
+def test_generate_batch_size_one_is_per_document() -> None:
+    rows = [(f"doc{i}", False) for i in range(3)]
+
+    (num_tasks, _), _, celery_app = _generate(rows, batch_size=1)
+
+    assert num_tasks == 3
+    assert {c.args[0] for c in celery_app.send_task.call_args_list} == {
+        OnyxCeleryTask.DOCUMENT_INDEX_METADATA_SYNC_TASK
+    }
+
+
+def test_build_requests_groups_identical_metadata() -> None:
+    docs = [
+        DbDocument(id="a", boost=0, hidden=False, chunk_count=3),
+        DbDocument(id="b", boost=0, hidden=False, chunk_count=None),
+        DbDocument(id="c", boost=1, hidden=False, chunk_count=1),
+    ]
+    public = _access(True, [])
+    requests = _build_batch_metadata_update_requests(
+        docs,
+        {"a": ["eng"], "b": ["eng"], "c": ["eng"]},
+        {"a": public, "b": _access(True, []), "c": public},
+    )
+
+    assert [r.document_ids for r in requests] == [["a", "b"], ["c"]]
+    assert requests[0].doc_id_to_chunk_cnt == {"a": 3, "b": -1}
+    assert requests[0].document_sets == {"eng"}
+    assert requests[1].boost == 1
+
+
+def _request(document_ids: list[str]) -> MetadataUpdateRequest:
+    return MetadataUpdateRequest(
+        document_ids=document_ids,
+        doc_id_to_chunk_cnt={document_id: 1 for document_id in document_ids},
+        hidden=False,
+    )
+
+
+def test_apply_batch_update_reports_deferred_documents() -> None:
+    index = MagicMock(spec=RetryDocumentIndex)
+    index.update.side_effect = SecondaryIndexDocumentMissingError(["b"])
+
+    deferred, failed = _apply_batch_metadata_update(index, [_request(["a", "b"])])
+
+    assert deferred == {"b"}
+    assert failed == {}
+    index.update.assert_called_once()
+
+
+def test_apply_batch_update_isolates_rejected_document() -> None:
+    rejected = httpx.HTTPStatusError(
+        "bad request",
+        request=httpx.Request("POST", "http://index"),
+        response=httpx.Response(400),
+    )
+
+    def _update(update_requests: list[MetadataUpdateRequest]) -> None:
+        document_ids = [d for r in update_requests for d in r.document_ids]
+        if "bad" in document_ids:
+            raise rejected
+        if document_ids == ["porting"]:
+            raise SecondaryIndexDocumentMissingError(["porting"])
+
+    index = MagicMock(spec=RetryDocumentIndex)
+    index.update.side_effect = _update
+
+    deferred, failed = _apply_batch_metadata_update(
+        index, [_request(["ok", "bad"]), _request(["porting"])]
+    )
+
+    assert deferred == {"porting"}
+    assert failed == {"bad": rejected}
+    # the batched call plus one call per document
+    assert index.update.call_count == 4
+
+
+def test_apply_batch_update_fails_whole_batch_on_transient_error() -> None:
+    index = MagicMock(spec=RetryDocumentIndex)
+    index.update.side_effect = httpx.ReadTimeout("timed out")
+
+    deferred, failed = _apply_batch_metadata_update(
+        index, [_request(["a"]), _request(["b"])]
+    )
+
+    assert deferred == set()
+    assert set(failed) == {"a", "b"}
+    index.update.assert_called_once()
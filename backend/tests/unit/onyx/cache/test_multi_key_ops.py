@@ -0,0 +1,134 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any, cast
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from onyx.cache.postgres_backend import PostgresCacheBackend
+from onyx.cache.redis_backend import RedisCacheBackend
+from onyx.redis.tenant_redis_client import TenantRedisClient
+from tests.unit.fakes import FakeCache
+
+
+def test_default_multi_key_ops_fall_back_to_single_key_calls() -> None:
+    cache = FakeCache()
+    cache.mset({"a": b"1", "b": 2}, ex=30)
+
+    assert cache.mget(["a", "missing", "b"]) == [b"1", None, b"2"]
+    assert cache.expiries == {"a": 30, "b": 30}
+
+    cache.mexpire(["a", "b"], 90)
+    assert cache.expiries == {"a": 90, "b": 90}
+
+
+def test_default_pipeline_applies_in_order_and_discards_on_error() -> None:
+    cache = FakeCache()
+
+    with cache.pipeline() as pipe:
+        pipe.set("a", b"1", ex=10)
+        pipe.delete("a")
+        pipe.set("b", b"2")
+        pipe.expire("b", 20)
+        # Nothing is sent until the block exits.
+        assert cache.store == {}
+
+    assert cache.store == {"b": b"2"}
+    assert cache.expiries == {"b": 20}
+
+    with pytest.raises(RuntimeError):
+        with cache.pipeline() as pipe:
+            pipe.set("c", b"3")
+            raise RuntimeError("boom")
+    assert "c" not in cache.store
+
+
+def test_redis_multi_key_ops_use_one_round_trip() -> None:
+    client = MagicMock()
+    client.mget.return_value = [b"1", None]
+    backend = RedisCacheBackend(cast(TenantRedisClient, client))
+
+    assert backend.mget(["a", "b"]) == [b"1", None]
+    client.mget.assert_called_once_with(["a", "b"])
+
+    backend.mexpire(["a", "b"], 60)
+    client.pipeline.assert_called_once_with(transaction=False)
+    pipe = client.pipeline.return_value
+    assert [c.args for c in pipe.expire.call_args_list] == [("a", 60), ("b", 60)]
+    pipe.execute.assert_called_once()
+
+
+class _RecordingSession:
+    def __init__(self, rows: list[tuple[str, bytes]] | None = None) -> None:
+        self.statements: list[str] = []
+        self.commits = 0
+        self._rows = rows or []
+
+    def execute(self, stmt: Any) -> list[tuple[str, bytes]]:
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return self._rows
+
+    def commit(self) -> None:
+        self.commits += 1
+
+
+@contextmanager
+def _patched_session(
+    session: _RecordingSession,
+) -> Generator[MagicMock, None, None]:
+    @contextmanager
+    def _get_session(tenant_id: str) -> Generator[_RecordingSession, None, None]:  # noqa: ARG001
+        yield session
+
+    with patch(
+        "onyx.db.engine.sql_engine.get_session_with_tenant", side_effect=_get_session
+    ) as get_session:
+        yield get_session
+
+
+def test_postgres_mget_is_one_statement() -> None:
+    session = _RecordingSession(rows=[("b", b"2"), ("a", b"1")])
+    with _patched_session(session) as get_session:
+        values = PostgresCacheBackend("tenant").mget(["a", "missing", "b"])
+
+    assert values == [b"1", None, b"2"]
+    get_session.assert_called_once()
+    (statement,) = session.statements
+    assert "cache_store.key = ANY" in statement
+
+
+def test_postgres_mset_and_mexpire_are_one_statement_each() -> None:
+    session = _RecordingSession()
+    backend = PostgresCacheBackend("tenant")
+    with _patched_session(session):
+        backend.mset({"a": b"1", "b": "2"}, ex=60)
+        backend.mexpire(["a", "b"], 120)
+
+    upsert, expire = session.statements
+    assert upsert.startswith("INSERT INTO cache_store")
+    assert "ON CONFLICT (key) DO UPDATE" in upsert
+    assert expire.startswith("UPDATE cache_store")
+    assert "cache_store.key = ANY" in expire
+
+
+def test_postgres_pipeline_folds_runs_into_one_transaction() -> None:
+    session = _RecordingSession()
+    with _patched_session(session) as get_session:
+        with PostgresCacheBackend("tenant").pipeline() as pipe:
+            pipe.set("a", b"1", ex=60)
+            pipe.set("b", b"2", ex=60)
+            # A repeated key cannot join the same ON CONFLICT statement.
+            pipe.set("a", b"3", ex=60)
+            pipe.expire("c", 10)
+            pipe.expire("d", 10)
+            pipe.delete("e")
+
+    get_session.assert_called_once()
+    assert session.commits == 1
+    assert [s.split()[0] for s in session.statements] == [
+        "INSERT",
+        "INSERT",
+        "UPDATE",
+        "DELETE",
+    ]
@@ -258,7 +258,10 @@ def test_load_from_checkpoint_with_page_processing_error(
     ]
 
     # Mock _convert_page_to_document to fail for the second page
-    def mock_convert_side_effect(page: dict[str, Any]) -> Document | ConnectorFailure:
+    def mock_convert_side_effect(
+        page: dict[str, Any],
+        comments: Any = None,  # noqa: ARG001
+    ) -> Document | ConnectorFailure:
         if page["id"] == "1":
             return Document(
                 id=f"{confluence_connector.wiki_base}/spaces/TEST/pages/1",
@@ -1,4 +1,6 @@
 import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from unittest import mock
 
@@ -1471,3 +1473,34 @@ def test_get_user_email_from_userkey_caches_negative_result(
     assert first is None
     assert second is None
     assert user_details_mock.call_count == 1
+
+
+def test_wrapped_calls_do_not_hold_the_credentials_lock(
+    confluence_server_client: OnyxConfluence,
+    mock_credentials_provider: mock.Mock,
+) -> None:
+    """The provider lock guards credential renewal only, so concurrent calls
+    (e.g. the page enrichment prefetch) still overlap."""
+    provider_lock = threading.Lock()
+    mock_credentials_provider.__enter__ = mock.Mock(
+        side_effect=lambda *_: provider_lock.acquire()
+    )
+    mock_credentials_provider.__exit__ = mock.Mock(
+        side_effect=lambda *_: provider_lock.release()
+    )
+    both_in_flight = threading.Barrier(2, timeout=5)
+
+    def _get_page_comments(page_id: str) -> str:
+        both_in_flight.wait()
+        return page_id
+
+    internal_client = mock.Mock()
+    internal_client.get_page_comments.side_effect = _get_page_comments
+    confluence_server_client._confluence = internal_client
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(
+            executor.map(confluence_server_client.get_page_comments, ["1", "2"])
+        )
+
+    assert results == ["1", "2"]
+    assert mock_credentials_provider.__enter__.call_count == 2
@@ -0,0 +1,169 @@
+"""Tests that prefetching comments/attachments for upcoming pages keeps the
+sequential output order and never reads past a checkpoint boundary."""
+
+from collections.abc import Callable, Generator, Iterator
+from typing import Any
+from unittest import mock
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.confluence.connector import (
+    ConfluenceCheckpoint,
+    ConfluenceConnector,
+)
+from onyx.connectors.models import ConnectorFailure, Document, HierarchyNode
+from onyx.db.enums import HierarchyNodeType
+
+_WIKI_BASE = "https://fake-cloud.atlassian.net/wiki"
+_NEXT_PAGE_URL = "rest/api/content/search?cql=type%3Dpage&cursor=1"
+
+
+def _page(page_id: str) -> dict[str, Any]:
+    return {
+        "id": page_id,
+        "title": f"Page {page_id}",
+        "version": {"when": "2023-01-01T12:00:00.000+0000"},
+        "history": {"createdDate": "2023-01-01T12:00:00.000+0000"},
+        "body": {"storage": {"value": f"content {page_id}"}},
+        "space": {"key": "X"},
+        "ancestors": [],
+        "_links": {"webui": f"/spaces/X/pages/{page_id}"},
+    }
+
+
+def _attachment_doc(page_id: str) -> Document:
+    return Document(
+        id=f"{_WIKI_BASE}/download/attachments/{page_id}/a.pdf",
+        sections=[],
+        source=DocumentSource.CONFLUENCE,
+        semantic_identifier="a.pdf",
+        metadata={},
+    )
+
+
+def _build_connector(
+    responses: list[list[dict[str, Any]]], pulled_page_ids: list[str]
+) -> ConfluenceConnector:
+    connector = ConfluenceConnector(
+        wiki_base=_WIKI_BASE,
+        is_cloud=True,
+        batch_size=2,
+        page_enrichment_concurrency=3,
+    )
+
+    def fake_page_retrieval(
+        cql_url: str, next_page_callback: Callable[[str], None], **_: Any
+    ) -> Iterator[dict[str, Any]]:
+        # Mirrors _paginate_url: the callback fires right before the last
+        # result of each API response is handed out.
+        first = int(cql_url.rsplit("cursor=", 1)[-1]) if "cursor=" in cql_url else 0
+        for i in range(first, len(responses)):
+            response = responses[i]
+            for j, page in enumerate(response):
+                if j == len(response) - 1 and i < len(responses) - 1:
+                    next_page_callback(f"{_NEXT_PAGE_URL[:-1]}{i + 1}")
+                pulled_page_ids.append(page["id"])
+                yield page
+
+    client = mock.MagicMock()
+    client.paginated_page_retrieval.side_effect = fake_page_retrieval
+    connector._confluence_client = client
+    connector._low_timeout_confluence_client = client
+    connector._build_page_retrieval_url = mock.MagicMock(
+        return_value="rest/api/content/search?cql=type%3Dpage"
+    )
+    return connector
+
+
+def _run(
+    connector: ConfluenceConnector, checkpoint: ConfluenceCheckpoint
+) -> tuple[list[Any], ConfluenceCheckpoint]:
+    gen: Generator[Any, None, ConfluenceCheckpoint] = connector._fetch_document_batches(
+        checkpoint
+    )
+    items: list[Any] = []
+    while True:
+        try:
+            item = next(gen)
+        except StopIteration as e:
+            return items, e.value
+        # space nodes come from the ancestor walk, which isn't under test here
+        if not (
+            isinstance(item, HierarchyNode)
+            and item.node_type == HierarchyNodeType.SPACE
+        ):
+            items.append(item)
+
+
+def test_prefetch_stops_at_checkpoint_and_keeps_order() -> None:
+    pulled_page_ids: list[str] = []
+    connector = _build_connector(
+        [[_page("1"), _page("2")], [_page("3")]], pulled_page_ids
+    )
+
+    def fake_attachments(
+        page: dict[str, Any], *_: Any, include_page_hierarchy_node: bool = True
+    ) -> tuple[list[Document | HierarchyNode], list[ConnectorFailure]]:
+        assert not include_page_hierarchy_node
+        return [_attachment_doc(page["id"])], []
+
+    with (
+        mock.patch.object(connector, "_yield_space_hierarchy_nodes", return_value=[]),
+        mock.patch.object(
+            connector, "_get_comment_string_for_page_id", return_value=""
+        ),
+        mock.patch.object(
+            connector, "_fetch_page_attachments", side_effect=fake_attachments
+        ) as mock_attachments,
+    ):
+        items, checkpoint = _run(connector, connector.build_dummy_checkpoint())
+
+        # the second API response is not touched until this checkpoint is saved
+        assert pulled_page_ids == ["1", "2"]
+        assert mock_attachments.call_count == 2
+        assert checkpoint.has_more
+        assert checkpoint.next_page_url == _NEXT_PAGE_URL
+
+        page_url = f"{_WIKI_BASE}/spaces/X/pages"
+        assert [
+            (type(item).__name__, getattr(item, "id", None) or item.raw_node_id)
+            for item in items
+        ] == [
+            ("Document", f"{page_url}/1"),
+            ("HierarchyNode", f"{page_url}/1"),
+            ("Document", _attachment_doc("1").id),
+            ("Document", f"{page_url}/2"),
+            ("HierarchyNode", f"{page_url}/2"),
+            ("Document", _attachment_doc("2").id),
+        ]
+
+        items, checkpoint = _run(connector, checkpoint)
+        assert pulled_page_ids == ["1", "2", "3"]
+        assert [item.id for item in items if isinstance(item, Document)] == [
+            f"{page_url}/3",
+            _attachment_doc("3").id,
+        ]
+        assert not checkpoint.has_more
+
+
+def test_prefetched_comment_errors_become_page_failures() -> None:
+    connector = _build_connector([[_page("1"), _page("2")]], [])
+
+    def fake_comments(page_id: str) -> str:
+        if page_id == "1":
+            raise RuntimeError("comment fetch failed")
+        return "\nComment:\nhello"
+
+    with (
+        mock.patch.object(connector, "_yield_space_hierarchy_nodes", return_value=[]),
+        mock.patch.object(
+            connector, "_get_comment_string_for_page_id", side_effect=fake_comments
+        ),
+        mock.patch.object(connector, "_fetch_page_attachments", return_value=([], [])),
+    ):
+        items, checkpoint = _run(connector, connector.build_dummy_checkpoint())
+
+    assert isinstance(items[0], ConnectorFailure)
+    assert "comment fetch failed" in items[0].failure_message
+    assert isinstance(items[1], Document)
+    assert items[1].sections[-1].text == "\nComment:\nhello"
+    assert not checkpoint.has_more
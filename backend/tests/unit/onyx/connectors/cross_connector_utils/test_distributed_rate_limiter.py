@@ -0,0 +1,116 @@
+from unittest.mock import MagicMock
+
+import pytest
+from redis.exceptions import RedisError
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.cross_connector_utils import distributed_rate_limiter
+from onyx.connectors.cross_connector_utils.distributed_rate_limiter import (
+    DistributedRateLimiter,
+)
+from tests.unit.fakes import FakeCache
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+        self.slept: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _FakeClock:
+    fake_clock = _FakeClock()
+    monkeypatch.setattr(distributed_rate_limiter.time, "time", fake_clock.time)
+    monkeypatch.setattr(distributed_rate_limiter.time, "monotonic", fake_clock.time)
+    monkeypatch.setattr(distributed_rate_limiter.time, "sleep", fake_clock.sleep)
+    return fake_clock
+
+
+def _limiter(cache: object, monkeypatch: pytest.MonkeyPatch) -> DistributedRateLimiter:
+    monkeypatch.setattr(
+        distributed_rate_limiter, "get_cache_backend", lambda **_: cache
+    )
+    return DistributedRateLimiter(
+        source=DocumentSource.GITHUB,
+        credential_key="token",
+        requests_per_second=2,
+        burst=2,
+    )
+
+
+def test_workers_share_one_budget(
+    clock: _FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = FakeCache()
+    worker_a = _limiter(cache, monkeypatch)
+    worker_b = _limiter(cache, monkeypatch)
+
+    # the burst is free, then the two workers are paced together at 2/s
+    for worker in (worker_a, worker_b, worker_a, worker_b):
+        worker.acquire()
+    assert clock.slept == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert not any("token" in key for key in cache.store)
+
+
+def test_retry_after_pauses_every_worker(
+    clock: _FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = FakeCache()
+    worker_a = _limiter(cache, monkeypatch)
+    worker_b = _limiter(cache, monkeypatch)
+
+    worker_a.pause_until(clock.now + 30)
+    worker_b.acquire()
+
+    assert clock.now == pytest.approx(1_030.0)
+
+
+def test_cache_outage_does_not_block(
+    clock: _FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    broken = MagicMock()
+    broken.lock.side_effect = RedisError("redis down")
+    worker = _limiter(broken, monkeypatch)
+
+    for _ in range(5):
+        worker.acquire()
+    worker.pause_until(clock.now + 30)
+
+    assert clock.slept == []
+
+
+def test_configured_budget_overrides_the_default(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    default_budget = {"requests_per_second": 1.0, "burst": 10}
+    monkeypatch.setattr(distributed_rate_limiter, "CONNECTOR_RATE_LIMITS", {})
+    assert (
+        distributed_rate_limiter.build_connector_rate_limiter(
+            DocumentSource.GITHUB, "token"
+        )
+        is None
+    )
+    assert (
+        distributed_rate_limiter.build_connector_rate_limiter(
+            DocumentSource.GITHUB, "token", default_budget=default_budget
+        )
+        is not None
+    )
+
+    monkeypatch.setattr(
+        distributed_rate_limiter,
+        "CONNECTOR_RATE_LIMITS",
+        {"github": {"requests_per_second": 4.0}},
+    )
+    limiter = distributed_rate_limiter.build_connector_rate_limiter(
+        DocumentSource.GITHUB, "token", default_budget=default_budget
+    )
+    assert limiter is not None
+    assert limiter._emission_interval == pytest.approx(0.25)
@@ -4,7 +4,9 @@ from typing import Any, cast
 import pytest
 import requests
 
+from onyx.connectors.cross_connector_utils import rate_limit_wrapper
 from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    TokenBucket,
     rate_limit_builder,
     wrap_request_to_handle_ratelimiting,
 )
@@ -64,3 +66,28 @@ def test_wrap_request_caps_absurd_retry_after(
 
     assert result.status_code == 200
     assert slept == [300]
+
+
+def test_token_bucket_paces_and_pauses_all_callers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = 100.0
+
+    def fake_sleep(seconds: float) -> None:
+        nonlocal now
+        now += seconds
+
+    monkeypatch.setattr(rate_limit_wrapper.time, "monotonic", lambda: now)
+    monkeypatch.setattr(rate_limit_wrapper.time, "sleep", fake_sleep)
+
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    # the initial burst is free, after that calls are spaced 1 / rate apart
+    for _ in range(4):
+        bucket.acquire()
+    assert now == pytest.approx(101.0)
+
+    # a backoff requested by one caller holds back the next acquire as well
+    bucket.pause_until(now + 30)
+    bucket.acquire()
+    assert now == pytest.approx(131.0)
@@ -950,3 +950,31 @@ def test_load_from_checkpoint_cursor_pagination_completion(
     assert (
         pull_requests_func_invocation_count == 3
     )  # twice for repo2 PRs, once for repo1 PRs
+
+
+@pytest.mark.parametrize(
+    "token,enterprise_url,paced",
+    [
+        ("ghp_classic", None, True),
+        ("github_pat_fine_grained", None, True),
+        # GitHub App installation tokens get a larger budget of their own
+        ("ghs_installation", None, False),
+        # Enterprise servers set their own limits
+        ("ghp_classic", "https://github.example.com/api/v3", False),
+    ],
+)
+def test_default_rate_limit_only_paces_github_com_pats(
+    token: str, enterprise_url: str | None, paced: bool
+) -> None:
+    connector = GithubConnector(repo_owner="test-org")
+    with (
+        patch(
+            "onyx.connectors.github.connector.GITHUB_CONNECTOR_BASE_URL", enterprise_url
+        ),
+        patch(
+            "onyx.connectors.github.connector.build_connector_rate_limiter"
+        ) as mock_build,
+    ):
+        connector.load_credentials({"github_access_token": token})
+
+    assert (mock_build.call_args.kwargs["default_budget"] is not None) is paced
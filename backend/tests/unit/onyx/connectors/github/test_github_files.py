@@ -1,5 +1,10 @@
+import hashlib
+import io
+import json
+import tarfile
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
@@ -17,6 +22,8 @@ from onyx.connectors.github.connector import (
 )
 from onyx.connectors.github.models import SerializedRepository
 from onyx.connectors.models import ConnectorFailure, Document
+from shared_configs.contextvars import INDEX_ATTEMPT_INFO_CONTEXTVAR
+from tests.unit.fakes import FakeCache
 from tests.unit.onyx.connectors.utils import load_everything_from_checkpoint_connector
 
 
@@ -70,11 +77,68 @@ def mock_github_client() -> MagicMock:
     return mock
 
 
-def _tree_element(path: str, size: int, type_: str = "blob") -> MagicMock:
+@pytest.fixture(autouse=True)
+def fake_cache() -> Generator[FakeCache, None, None]:
+    cache = FakeCache()
+    with patch(
+        "onyx.connectors.github.file_tree_snapshot.get_cache_backend",
+        return_value=cache,
+    ):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def _fetch_files_one_by_one() -> Generator[None, None, None]:
+    """Keeps tests off the branch archive path unless they opt in."""
+    with patch(
+        "onyx.connectors.github.connector.GITHUB_CONNECTOR_ARCHIVE_MIN_FILES", 0
+    ):
+        yield
+
+
+@contextmanager
+def _index_attempt(
+    cc_pair_id: int = 1, from_beginning: bool = False
+) -> Generator[None, None, None]:
+    """Runs the connector as an index attempt of `cc_pair_id`."""
+    index_attempt = MagicMock(search_settings_id=1, from_beginning=from_beginning)
+    token = INDEX_ATTEMPT_INFO_CONTEXTVAR.set((cc_pair_id, 100))
+    try:
+        with (
+            patch("onyx.connectors.github.connector.get_session_with_current_tenant"),
+            patch(
+                "onyx.connectors.github.connector.get_index_attempt",
+                return_value=index_attempt,
+            ),
+        ):
+            yield
+    finally:
+        INDEX_ATTEMPT_INFO_CONTEXTVAR.reset(token)
+
+
+def _backdate_snapshot(fake_cache: FakeCache, key: str, seconds: float) -> dict:
+    """Pretends every blob in the snapshot was first listed `seconds` ago."""
+    snapshot = json.loads(fake_cache.store[key])
+    snapshot["files"] = {
+        path: [sha, first_seen - seconds]
+        for path, (sha, first_seen) in snapshot["files"].items()
+    }
+    fake_cache.store[key] = json.dumps(snapshot).encode()
+    return snapshot
+
+
+def _blob_sha(content: bytes) -> str:
+    return hashlib.sha1(content).hexdigest()
+
+
+def _tree_element(
+    path: str, size: int, type_: str = "blob", sha: str | None = None
+) -> MagicMock:
     el = MagicMock()
     el.path = path
     el.size = size
     el.type = type_
+    el.sha = sha or f"sha-{path}"
     return el
 
 
@@ -98,9 +162,15 @@ def create_mock_repo() -> Callable[..., MagicMock]:
         )
 
         tree = MagicMock()
-        tree.tree = [_tree_element(p, len(c)) for p, c in files.items()]
+        tree.tree = [
+            _tree_element(p, len(c), sha=_blob_sha(c)) for p, c in files.items()
+        ]
         tree.raw_data = {"truncated": truncated}
+        tree.sha = "tree-sha"
         mock_repo.get_git_tree = MagicMock(return_value=tree)
+        head = mock_repo.get_branch.return_value.commit
+        head.sha = "commit-sha"
+        head.commit.tree.sha = "tree-sha"
 
         def _get_contents(path: str, ref: str | None = None) -> MagicMock:
             del ref  # accepted as a kwarg by the connector, unused in the mock
@@ -546,3 +616,273 @@ def test_files_paginated_with_issues_enabled_no_stage_regression(
     assert len(ids) == 250
     assert len(set(ids)) == 250  # no duplicates from re-indexing page 0
     assert outputs[-1].next_checkpoint.has_more is False
+
+
+def _tarball(files: dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for path, content in files.items():
+            info = tarfile.TarInfo(f"test-org-test-repo-abc123/{path}")
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buf.getvalue()
+
+
+def test_files_read_from_branch_archive(
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+) -> None:
+    connector = _build_connector(mock_github_client)
+    files = {
+        "README.md": b"# Hello",
+        "docs/guide.md": b"guide",
+        "missing.md": b"not in the archive",
+    }
+    mock_repo = create_mock_repo(files)
+    mock_repo.get_archive_link.return_value = "https://codeload.example/tarball"
+    mock_github_client.get_repo.return_value = mock_repo
+
+    archive = _tarball(
+        {"README.md": files["README.md"], "docs/guide.md": files["docs/guide.md"]}
+    )
+    response = MagicMock()
+    response.__enter__.return_value.raw = io.BytesIO(archive)
+
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=mock_repo),
+        patch("onyx.connectors.github.connector.GITHUB_CONNECTOR_ARCHIVE_MIN_FILES", 2),
+        patch(
+            "onyx.connectors.github.connector.requests.get", return_value=response
+        ) as mock_get,
+    ):
+        outputs = load_everything_from_checkpoint_connector(connector, 0, time.time())
+
+    docs = [i for i in _all_items(outputs) if isinstance(i, Document)]
+    assert sorted(d.semantic_identifier for d in docs) == [
+        "README.md",
+        "docs/guide.md",
+        "missing.md",
+    ]
+    # the archive is pinned to the commit whose tree was listed
+    mock_repo.get_archive_link.assert_called_once_with("tarball", ref="commit-sha")
+    mock_get.assert_called_once()
+    # only the file the archive did not contain is fetched on its own
+    mock_repo.get_contents.assert_called_once_with("missing.md", ref="main")
+
+
+def test_unchanged_files_skipped_on_later_runs(
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+    fake_cache: FakeCache,
+) -> None:
+    connector = _build_connector(mock_github_client)
+    first_repo = create_mock_repo({"a.md": b"same", "b.md": b"old"})
+    mock_github_client.get_repo.return_value = first_repo
+
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=first_repo),
+        _index_attempt(),
+    ):
+        outputs = load_everything_from_checkpoint_connector(connector, 0, time.time())
+    assert len([i for i in _all_items(outputs) if isinstance(i, Document)]) == 2
+
+    # pretend the first run's files were first listed a day ago
+    _backdate_snapshot(fake_cache, "github_file_tree:1:1:1:main", 86400)
+
+    second_repo = create_mock_repo(
+        {"a.md": b"same", "b.md": b"new", "c.md": b"added"},
+        pushed_at=datetime.now(timezone.utc),
+    )
+    mock_github_client.get_repo.return_value = second_repo
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=second_repo),
+        _index_attempt(),
+    ):
+        outputs = load_everything_from_checkpoint_connector(
+            connector, time.time() - 3600, time.time()
+        )
+
+    docs = [i for i in _all_items(outputs) if isinstance(i, Document)]
+    assert sorted(d.semantic_identifier for d in docs) == ["b.md", "c.md"]
+    assert sorted(call.args[0] for call in second_repo.get_contents.call_args_list) == [
+        "b.md",
+        "c.md",
+    ]
+
+
+def test_branch_archive_advances_the_checkpoint_in_batches(
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+) -> None:
+    connector = _build_connector(mock_github_client)
+    files = {f"doc{i}.md": f"content {i}".encode() for i in range(3)}
+    mock_repo = create_mock_repo(files)
+    mock_repo.get_archive_link.return_value = "https://codeload.example/tarball"
+    mock_github_client.get_repo.return_value = mock_repo
+
+    response = MagicMock()
+    response.__enter__.return_value.raw = io.BytesIO(_tarball(files))
+
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=mock_repo),
+        patch("onyx.connectors.github.connector.GITHUB_CONNECTOR_ARCHIVE_MIN_FILES", 2),
+        patch("onyx.connectors.github.connector.ARCHIVE_FILE_BATCH_SIZE", 2),
+        patch(
+            "onyx.connectors.github.connector.requests.get", return_value=response
+        ) as mock_get,
+    ):
+        outputs = load_everything_from_checkpoint_connector(connector, 0, time.time())
+
+    docs_per_step = [
+        sorted(i.semantic_identifier for i in o.items if isinstance(i, Document))
+        for o in outputs
+    ]
+    assert [docs for docs in docs_per_step if docs] == [
+        ["doc0.md", "doc1.md"],
+        ["doc2.md"],
+    ]
+    # later steps read from the spooled archive instead of downloading it again
+    mock_get.assert_called_once()
+    mock_repo.get_contents.assert_not_called()
+
+
+def test_full_archive_spool_downloaded_again_once_emitted(
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+) -> None:
+    connector = _build_connector(mock_github_client)
+    files = {f"doc{i}.md": b"0123456789" for i in range(3)}
+    mock_repo = create_mock_repo(files)
+    mock_repo.get_archive_link.return_value = "https://codeload.example/tarball"
+    mock_github_client.get_repo.return_value = mock_repo
+
+    def _download(*_args: object, **_kwargs: object) -> MagicMock:
+        response = MagicMock()
+        response.__enter__.return_value.raw = io.BytesIO(_tarball(files))
+        return response
+
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=mock_repo),
+        patch("onyx.connectors.github.connector.GITHUB_CONNECTOR_ARCHIVE_MIN_FILES", 2),
+        patch("onyx.connectors.github.connector.ARCHIVE_SPOOL_MAX_BYTES", 20),
+        patch(
+            "onyx.connectors.github.connector.requests.get", side_effect=_download
+        ) as mock_get,
+    ):
+        outputs = load_everything_from_checkpoint_connector(connector, 0, time.time())
+
+    docs = [i for i in _all_items(outputs) if isinstance(i, Document)]
+    assert sorted(d.semantic_identifier for d in docs) == list(files)
+    assert mock_get.call_count == 2
+    mock_repo.get_contents.assert_not_called()
+
+
+def test_files_fetched_one_by_one_when_the_branch_moved_after_listing(
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+) -> None:
+    connector = _build_connector(mock_github_client)
+    files = {"a.md": b"a", "b.md": b"b"}
+    mock_repo = create_mock_repo(files)
+    mock_repo.get_branch.return_value.commit.commit.tree.sha = "newer-tree-sha"
+    mock_github_client.get_repo.return_value = mock_repo
+
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=mock_repo),
+        patch("onyx.connectors.github.connector.GITHUB_CONNECTOR_ARCHIVE_MIN_FILES", 2),
+        patch("onyx.connectors.github.connector.requests.get") as mock_get,
+    ):
+        outputs = load_everything_from_checkpoint_connector(connector, 0, time.time())
+
+    docs = [i for i in _all_items(outputs) if isinstance(i, Document)]
+    assert sorted(d.semantic_identifier for d in docs) == ["a.md", "b.md"]
+    mock_get.assert_not_called()
+    assert mock_repo.get_contents.call_count == 2
+
+
+def test_failed_files_fetched_again_on_later_runs(
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+    fake_cache: FakeCache,
+) -> None:
+    connector = _build_connector(mock_github_client)
+    files = {"a.md": b"fine", "b.md": b"flaky"}
+    first_repo = create_mock_repo(files)
+
+    def _flaky_contents(path: str, ref: str | None = None) -> MagicMock:
+        del ref
+        if path == "b.md":
+            raise RuntimeError("connection reset")
+        content = MagicMock()
+        content.decoded_content = files[path]
+        return content
+
+    first_repo.get_contents.side_effect = _flaky_contents
+    mock_github_client.get_repo.return_value = first_repo
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=first_repo),
+        _index_attempt(),
+    ):
+        outputs = load_everything_from_checkpoint_connector(connector, 0, time.time())
+    assert [
+        i.failed_document.document_id
+        for i in _all_items(outputs)
+        if isinstance(i, ConnectorFailure) and i.failed_document
+    ] == ["https://github.com/test-org/test-repo/blob/main/b.md"]
+
+    # pretend the first run's files were first listed a day ago
+    snapshot = _backdate_snapshot(fake_cache, "github_file_tree:1:1:1:main", 86400)
+    assert set(snapshot["files"]) == {"a.md"}
+
+    second_repo = create_mock_repo(files, pushed_at=datetime.now(timezone.utc))
+    mock_github_client.get_repo.return_value = second_repo
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=second_repo),
+        _index_attempt(),
+    ):
+        outputs = load_everything_from_checkpoint_connector(
+            connector, time.time() - 3600, time.time()
+        )
+
+    docs = [i for i in _all_items(outputs) if isinstance(i, Document)]
+    assert [d.semantic_identifier for d in docs] == ["b.md"]
+
+
+def test_unchanged_files_only_skipped_for_the_index_that_fetched_them(
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+    fake_cache: FakeCache,
+) -> None:
+    files = {"a.md": b"same", "b.md": b"same too"}
+    first_repo = create_mock_repo(files)
+    mock_github_client.get_repo.return_value = first_repo
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=first_repo),
+        _index_attempt(cc_pair_id=1),
+    ):
+        load_everything_from_checkpoint_connector(
+            _build_connector(mock_github_client), 0, time.time()
+        )
+    _backdate_snapshot(fake_cache, "github_file_tree:1:1:1:main", 86400)
+
+    def _indexed_files(cc_pair_id: int, from_beginning: bool = False) -> list[str]:
+        repo = create_mock_repo(files, pushed_at=datetime.now(timezone.utc))
+        mock_github_client.get_repo.return_value = repo
+        with (
+            patch.object(SerializedRepository, "to_Repository", return_value=repo),
+            _index_attempt(cc_pair_id=cc_pair_id, from_beginning=from_beginning),
+        ):
+            outputs = load_everything_from_checkpoint_connector(
+                _build_connector(mock_github_client), time.time() - 3600, time.time()
+            )
+        return sorted(
+            i.semantic_identifier
+            for i in _all_items(outputs)
+            if isinstance(i, Document)
+        )
+
+    # a second connector on the same repo, whose indexing_start is an hour ago,
+    # has never fetched the files the first one did
+    assert _indexed_files(cc_pair_id=2) == ["a.md", "b.md"]
+    assert _indexed_files(cc_pair_id=1, from_beginning=True) == ["a.md", "b.md"]
+    assert _indexed_files(cc_pair_id=1) == []
@@ -0,0 +1,278 @@
+"""Unit tests for the web connector's concurrent crawl mode, against a local
+HTTP server: pages are fetched in parallel, each URL once, only JS-rendered
+pages go to Playwright, and a second crawl revalidates with conditional GETs."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document, TextSection
+from onyx.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS, WebConnector
+from onyx.connectors.web.crawler import PageValidators, normalize_url
+from shared_configs.contextvars import INDEX_ATTEMPT_INFO_CONTEXTVAR
+
+_MODULE = "onyx.connectors.web.connector"
+_FILLER = "Plain server-rendered documentation text. " * 10
+
+
+class _Site:
+    def __init__(self) -> None:
+        self.pages: dict[str, tuple[str, str]] = {}
+        self.requests: Counter[str] = Counter()
+        self.not_modified: Counter[str] = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def set_page(self, path: str, body: str, etag: str) -> None:
+        self.pages[path] = (f"<html><body>{body}</body></html>", etag)
+
+
+def _make_handler(site: _Site) -> type[BaseHTTPRequestHandler]:
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            with site.lock:
+                site.requests[self.path] += 1
+                site.in_flight += 1
+                site.max_in_flight = max(site.max_in_flight, site.in_flight)
+            try:
+                time.sleep(0.2)
+                if self.path not in site.pages:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body, etag = site.pages[self.path]
+                if self.headers.get("If-None-Match") == etag:
+                    site.not_modified[self.path] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+            finally:
+                with site.lock:
+                    site.in_flight -= 1
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+    return _Handler
+
+
+@pytest.fixture
+def site() -> Iterator[tuple[_Site, str]]:
+    site = _Site()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(site))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    site.set_page(
+        "/",
+        f'<a href="/a">A</a><a href="/b">B</a><a href="/js">JS</a>'
+        f'<a href="/a#usage">A again</a><a href="HTTP://127.0.0.1:{server.server_address[1]}/a">'
+        f"A upper</a><p>{_FILLER}</p>",
+        etag='"root-1"',
+    )
+    site.set_page("/a", f'<a href="/">Home</a><p>Page A. {_FILLER}</p>', '"a-1"')
+    site.set_page("/b", f"<p>Page B. {_FILLER}</p>", '"b-1"')
+    site.set_page(
+        "/js", '<div id="root"></div><script src="/app.js"></script>', '"js-1"'
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield site, base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _skip_web_connector_ssrf_check(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The fixture server is on loopback, which the SSRF gate rejects."""
+    monkeypatch.setattr(f"{_MODULE}.protected_url_check", lambda _url: None)
+
+
+def _crawl(
+    base_url: str,
+    stored: dict[str, dict[str, PageValidators]],
+    slim: bool = False,
+    fail_handoff: bool = False,
+) -> tuple[list[Any], list[str]]:
+    rendered: list[str] = []
+
+    def _render(
+        _connector: WebConnector, _index: int, url: str, *_args: Any
+    ) -> Document:
+        rendered.append(url)
+        return Document(
+            id=url,
+            sections=[TextSection(link=url, text="rendered")],
+            source=DocumentSource.WEB,
+            semantic_identifier=url,
+            metadata={},
+        )
+
+    connector = WebConnector(
+        base_url=base_url + "/",
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+        crawl_concurrency=4,
+    )
+    with (
+        patch.object(
+            WebConnector,
+            "_get_crawl_cache_settings",
+            return_value=("web_crawl_cache_test", True),
+        ),
+        patch(
+            f"{_MODULE}.load_page_validators",
+            side_effect=lambda file_id: dict(stored.get(file_id, {})),
+        ),
+        patch(
+            f"{_MODULE}.save_page_validators",
+            side_effect=lambda file_id, validators: stored.__setitem__(
+                file_id, validators
+            ),
+        ),
+        patch.object(WebConnector, "_scrape_with_retries", _render),
+        patch(f"{_MODULE}.ScrapeSessionContext.initialize"),
+        patch(f"{_MODULE}.check_internet_connection"),
+    ):
+        batches = connector.load_from_state(slim=slim)
+        if fail_handoff:
+            # The consumer fails on the batch and never resumes the crawl
+            return list(next(batches)), rendered
+        docs = [doc for batch in batches for doc in batch]
+    return docs, rendered
+
+
+def test_concurrent_crawl_fetches_each_page_once_in_parallel(
+    site: tuple[_Site, str],
+) -> None:
+    server, base_url = site
+
+    docs, rendered = _crawl(base_url, stored={})
+
+    assert sorted(doc.id for doc in docs) == [
+        f"{base_url}/",
+        f"{base_url}/a",
+        f"{base_url}/b",
+        f"{base_url}/js",
+    ]
+    assert all(count == 1 for count in server.requests.values())
+    assert server.max_in_flight > 1
+    # Only the client-rendered page needs a browser
+    assert rendered == [f"{base_url}/js"]
+
+
+def test_recrawl_skips_pages_answering_not_modified(site: tuple[_Site, str]) -> None:
+    server, base_url = site
+    stored: dict[str, dict[str, PageValidators]] = {}
+    _crawl(base_url, stored)
+    server.set_page("/b", f"<p>Page B, revised. {_FILLER}</p>", '"b-2"')
+    server.requests.clear()
+
+    docs, rendered = _crawl(base_url, stored)
+
+    # The link from the unchanged root page still leads the crawl to /b
+    assert sorted(doc.id for doc in docs) == [f"{base_url}/b", f"{base_url}/js"]
+    revised = next(doc for doc in docs if doc.id == f"{base_url}/b")
+    assert "revised" in revised.sections[0].text
+    assert set(server.not_modified) == {"/", "/a"}
+    # No validators are kept for rendered pages, which can change behind them
+    assert f"{base_url}/js" not in stored["web_crawl_cache_test"]
+    assert rendered == [f"{base_url}/js"]
+
+
+def test_slim_recrawl_still_reports_unchanged_pages(site: tuple[_Site, str]) -> None:
+    _server, base_url = site
+    stored: dict[str, dict[str, PageValidators]] = {}
+    _crawl(base_url, stored)
+
+    docs, _rendered = _crawl(base_url, stored, slim=True)
+
+    assert sorted(doc.id for doc in docs) == [
+        f"{base_url}/",
+        f"{base_url}/a",
+        f"{base_url}/b",
+        f"{base_url}/js",
+    ]
+
+
+def test_validators_are_only_saved_after_the_batch_is_handed_off(
+    site: tuple[_Site, str],
+) -> None:
+    _server, base_url = site
+    stored: dict[str, dict[str, PageValidators]] = {}
+
+    _crawl(base_url, stored, fail_handoff=True)
+    assert stored == {}
+
+    # Slim runs don't index what they fetch
+    _crawl(base_url, stored, slim=True)
+    assert stored == {}
+
+    _crawl(base_url, stored)
+    assert {normalize_url(url) for url in stored["web_crawl_cache_test"]} == {
+        normalize_url(f"{base_url}/"),
+        normalize_url(f"{base_url}/a"),
+        normalize_url(f"{base_url}/b"),
+    }
+
+
+def test_crawl_cache_is_keyed_by_cc_pair_and_config() -> None:
+    def _settings(
+        connector: WebConnector, cc_pair_id: int, from_beginning: bool = False
+    ) -> tuple[str | None, bool]:
+        index_attempt = MagicMock(search_settings_id=7, from_beginning=from_beginning)
+        token = INDEX_ATTEMPT_INFO_CONTEXTVAR.set((cc_pair_id, 100))
+        try:
+            with (
+                patch(f"{_MODULE}.get_session_with_current_tenant"),
+                patch(f"{_MODULE}.get_index_attempt", return_value=index_attempt),
+            ):
+                return connector._get_crawl_cache_settings(slim=False)
+        finally:
+            INDEX_ATTEMPT_INFO_CONTEXTVAR.reset(token)
+
+    def _connector(**kwargs: Any) -> WebConnector:
+        return WebConnector(
+            base_url="https://docs.example.com/",
+            web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+            **kwargs,
+        )
+
+    file_id, use_validators = _settings(_connector(), cc_pair_id=1)
+    assert use_validators
+    assert _settings(_connector(), cc_pair_id=1)[0] == file_id
+    # Another connector starting from the same URL has its own validators
+    assert _settings(_connector(), cc_pair_id=2)[0] != file_id
+    assert _settings(_connector(mintlify_cleanup=False), cc_pair_id=1)[0] != file_id
+    assert (
+        _settings(
+            _connector(
+                url_rewrites=[{"source": "https://docs.example.com/", "target": "x"}]
+            ),
+            cc_pair_id=1,
+        )[0]
+        != file_id
+    )
+    assert _settings(_connector(), cc_pair_id=1, from_beginning=True) == (
+        file_id,
+        False,
+    )
+    # Outside of an indexing run there is nothing to key the cache by
+    assert _connector()._get_crawl_cache_settings(slim=False) == (None, False)
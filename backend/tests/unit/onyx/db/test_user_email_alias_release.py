@@ -80,3 +80,23 @@ def test_an_inserted_address_is_released_from_everyone() -> None:
         models._release_inserted_user_email(MagicMock(), connection, user)
 
     release.assert_called_once_with("claimed@example.com", connection)
+
+
+def test_releasing_an_alias_invalidates_the_acl_cache() -> None:
+    """The former holder's cached ACL still names the alias until the cache is
+    dropped, whichever write path claimed the address."""
+    user = User(email="claimed@example.com", hashed_password="unused")
+    db_session = MagicMock()
+    connection = MagicMock(spec=Connection)
+
+    with (
+        patch.object(models, "object_session", return_value=db_session),
+        patch.object(models, "invalidate_user_acl_cache_on_commit") as invalidate,
+    ):
+        connection.execute.return_value.rowcount = 0
+        models._release_inserted_user_email(MagicMock(), connection, user)
+        invalidate.assert_not_called()
+
+        connection.execute.return_value.rowcount = 1
+        models._release_inserted_user_email(MagicMock(), connection, user)
+        invalidate.assert_called_once_with(db_session)
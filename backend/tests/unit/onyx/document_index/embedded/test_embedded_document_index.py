@@ -0,0 +1,389 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from onyx.access.models import DocumentAccess
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document, TextSection
+from onyx.context.search.enums import QueryType
+from onyx.context.search.models import IndexFilters, TimeRange
+from onyx.db.enums import EmbeddingPrecision
+from onyx.document_index.embedded.embedded_document_index import (
+    EmbeddedDocumentIndex,
+)
+from onyx.document_index.interfaces_new import (
+    DocumentSectionRequest,
+    IndexingMetadata,
+    MetadataUpdateRequest,
+    TenantState,
+)
+from onyx.indexing.models import ChunkEmbedding, DocMetadataAwareIndexChunk
+
+_DIM = 4
+_TENANT = TenantState(tenant_id="public", multitenant=False)
+
+
+def _make_chunk(
+    doc_id: str,
+    chunk_id: int,
+    content: str,
+    embedding: list[float],
+    is_public: bool = True,
+    user_emails: list[str | None] | None = None,
+    document_sets: set[str] | None = None,
+    source: DocumentSource = DocumentSource.FILE,
+    doc_updated_at: datetime | None = None,
+) -> DocMetadataAwareIndexChunk:
+    doc = Document(
+        id=doc_id,
+        sections=[TextSection(text=content, link=f"http://{doc_id}")],
+        source=source,
+        semantic_identifier=f"title {doc_id}",
+        metadata={"team": "search"},
+        doc_updated_at=doc_updated_at,
+    )
+    access = DocumentAccess.build(
+        user_emails=user_emails or [],
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=is_public,
+    )
+    return DocMetadataAwareIndexChunk(
+        chunk_id=chunk_id,
+        blurb=content[:20],
+        content=content,
+        source_links={0: f"http://{doc_id}"},
+        image_file_id=None,
+        section_continuation=False,
+        source_document=doc,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        mini_chunk_texts=None,
+        large_chunk_id=None,
+        doc_summary="",
+        chunk_context="",
+        contextual_rag_reserved_tokens=0,
+        embeddings=ChunkEmbedding(full_embedding=embedding, mini_chunk_embeddings=[]),
+        title_embedding=None,
+        tenant_id="public",
+        access=access,
+        document_sets=document_sets or set(),
+        user_project=[],
+        personas=[],
+        boost=0,
+        aggregated_chunk_boost_factor=1.0,
+        ancestor_hierarchy_node_ids=[],
+    )
+
+
+def _metadata(chunks: list[DocMetadataAwareIndexChunk]) -> IndexingMetadata:
+    counts: dict[str, int] = {}
+    for chunk in chunks:
+        counts[chunk.source_document.id] = counts.get(chunk.source_document.id, 0) + 1
+    return IndexingMetadata(
+        doc_id_to_chunk_cnt_diff={
+            doc_id: IndexingMetadata.ChunkCounts(old_chunk_cnt=0, new_chunk_cnt=count)
+            for doc_id, count in counts.items()
+        }
+    )
+
+
+def _index(
+    index: EmbeddedDocumentIndex, chunks: list[DocMetadataAwareIndexChunk]
+) -> None:
+    index.index(chunks, _metadata(chunks))
+
+
+def _public_filters(**kwargs: object) -> IndexFilters:
+    return IndexFilters(access_control_list=[], **kwargs)  # ty: ignore[invalid-argument-type]
+
+
+@pytest.fixture
+def index() -> EmbeddedDocumentIndex:
+    document_index = EmbeddedDocumentIndex(
+        tenant_state=_TENANT, index_name="test_index", root_dir=None
+    )
+    document_index.verify_and_create_index_if_necessary(_DIM, EmbeddingPrecision.FLOAT)
+    return document_index
+
+
+def test_index_reports_already_existed_and_replaces_chunks(
+    index: EmbeddedDocumentIndex,
+) -> None:
+    first = [
+        _make_chunk("doc1", 0, "alpha", [1, 0, 0, 0]),
+        _make_chunk("doc1", 1, "beta", [1, 0, 0, 0]),
+    ]
+    records = index.index(first, _metadata(first))
+    assert [(r.document_id, r.already_existed) for r in records] == [("doc1", False)]
+
+    # Re-index with a shorter document, the tail chunk must not survive.
+    second = [_make_chunk("doc1", 0, "gamma", [1, 0, 0, 0])]
+    records = index.index(second, _metadata(second))
+    assert [(r.document_id, r.already_existed) for r in records] == [("doc1", True)]
+
+    chunks = index.id_based_retrieval(
+        [DocumentSectionRequest(document_id="doc1")], _public_filters()
+    )
+    assert [(c.chunk_id, c.content) for c in chunks] == [(0, "gamma")]
+
+
+def test_semantic_and_keyword_ranking(index: EmbeddedDocumentIndex) -> None:
+    _index(
+        index,
+        [
+            _make_chunk("near", 0, "embedded vector search", [1, 0, 0, 0]),
+            _make_chunk("far", 0, "something unrelated", [0, 1, 0, 0]),
+        ],
+    )
+
+    semantic = index.semantic_retrieval([0.9, 0.1, 0, 0], _public_filters(), 2)
+    assert [c.document_id for c in semantic] == ["near", "far"]
+
+    keyword = index.keyword_retrieval("unrelated", _public_filters(), 10)
+    assert [c.document_id for c in keyword] == ["far"]
+    assert keyword[0].match_highlights == ["something <hi>unrelated</hi>"]
+
+
+def test_hybrid_combines_keyword_and_vector(index: EmbeddedDocumentIndex) -> None:
+    _index(
+        index,
+        [
+            _make_chunk("both", 0, "postgres tuning guide", [1, 0, 0, 0]),
+            _make_chunk("vector_only", 0, "unrelated words", [0.9, 0.1, 0, 0]),
+            _make_chunk("neither", 0, "more unrelated words", [0, 0, 1, 0]),
+        ],
+    )
+
+    results = index.hybrid_retrieval(
+        query="postgres",
+        query_embedding=[1, 0, 0, 0],
+        final_keywords=None,
+        query_type=QueryType.SEMANTIC,
+        filters=_public_filters(),
+        num_to_retrieve=2,
+    )
+    assert [c.document_id for c in results] == ["both", "vector_only"]
+    assert results[0].score is not None and results[1].score is not None
+    assert results[0].score > results[1].score
+
+
+def test_acl_and_document_set_filters(index: EmbeddedDocumentIndex) -> None:
+    _index(
+        index,
+        [
+            _make_chunk("public", 0, "shared text", [1, 0, 0, 0]),
+            _make_chunk(
+                "private",
+                0,
+                "shared text",
+                [1, 0, 0, 0],
+                is_public=False,
+                user_emails=["a@example.com"],
+                document_sets={"eng"},
+            ),
+        ],
+    )
+
+    anonymous = index.keyword_retrieval("shared", _public_filters(), 10)
+    assert {c.document_id for c in anonymous} == {"public"}
+
+    owner = index.keyword_retrieval(
+        "shared", IndexFilters(access_control_list=["user_email:a@example.com"]), 10
+    )
+    assert {c.document_id for c in owner} == {"public", "private"}
+
+    scoped = index.keyword_retrieval(
+        "shared",
+        IndexFilters(access_control_list=None, document_set=["eng"]),
+        10,
+    )
+    assert {c.document_id for c in scoped} == {"private"}
+
+
+def test_time_and_source_filters(index: EmbeddedDocumentIndex) -> None:
+    now = datetime.now(timezone.utc)
+    _index(
+        index,
+        [
+            _make_chunk("recent", 0, "report", [1, 0, 0, 0], doc_updated_at=now),
+            _make_chunk(
+                "old",
+                0,
+                "report",
+                [1, 0, 0, 0],
+                doc_updated_at=now - timedelta(days=30),
+                source=DocumentSource.WEB,
+            ),
+        ],
+    )
+
+    recent = index.keyword_retrieval(
+        "report",
+        _public_filters(updated_at_range=TimeRange(start=now - timedelta(days=1))),
+        10,
+    )
+    assert [c.document_id for c in recent] == ["recent"]
+
+    web = index.keyword_retrieval(
+        "report", _public_filters(source_type=[DocumentSource.WEB]), 10
+    )
+    assert [c.document_id for c in web] == ["old"]
+
+
+def test_update_hidden_access_and_delete(index: EmbeddedDocumentIndex) -> None:
+    _index(index, [_make_chunk("doc1", 0, "hello world", [1, 0, 0, 0])])
+
+    index.update(
+        [
+            MetadataUpdateRequest(
+                document_ids=["doc1"], doc_id_to_chunk_cnt={"doc1": 1}, hidden=True
+            )
+        ]
+    )
+    assert index.keyword_retrieval("hello", _public_filters(), 10) == []
+    hidden = index.keyword_retrieval(
+        "hello", _public_filters(), 10, include_hidden=True
+    )
+    assert [c.document_id for c in hidden] == ["doc1"]
+
+    index.update(
+        [
+            MetadataUpdateRequest(
+                document_ids=["doc1", "missing"],
+                doc_id_to_chunk_cnt={"doc1": 1, "missing": -1},
+                hidden=False,
+                access=DocumentAccess.build(
+                    user_emails=["b@example.com"],
+                    user_groups=[],
+                    external_user_emails=[],
+                    external_user_group_ids=[],
+                    is_public=False,
+                ),
+            )
+        ]
+    )
+    assert index.keyword_retrieval("hello", _public_filters(), 10) == []
+    assert (
+        len(
+            index.keyword_retrieval(
+                "hello",
+                IndexFilters(access_control_list=["user_email:b@example.com"]),
+                10,
+            )
+        )
+        == 1
+    )
+
+    assert index.delete("doc1") == 1
+    assert index.delete("doc1") == 0
+    assert index.random_retrieval(IndexFilters(access_control_list=None)) == []
+
+
+def test_id_based_retrieval_ranges(index: EmbeddedDocumentIndex) -> None:
+    _index(
+        index,
+        [_make_chunk("doc1", i, f"chunk {i}", [1, 0, 0, 0]) for i in range(5)]
+        + [_make_chunk("doc2", 0, "other", [0, 1, 0, 0])],
+    )
+
+    chunks = index.id_based_retrieval(
+        [
+            DocumentSectionRequest(
+                document_id="doc1", min_chunk_ind=1, max_chunk_ind=3
+            ),
+            DocumentSectionRequest(document_id="doc2"),
+        ],
+        _public_filters(),
+    )
+    assert [(c.document_id, c.chunk_id) for c in chunks] == [
+        ("doc1", 1),
+        ("doc1", 2),
+        ("doc1", 3),
+        ("doc2", 0),
+    ]
+
+
+def test_persists_across_instances(tmp_path: Path) -> None:
+    writer = EmbeddedDocumentIndex(
+        tenant_state=_TENANT, index_name="persisted", root_dir=str(tmp_path)
+    )
+    writer.verify_and_create_index_if_necessary(_DIM, EmbeddingPrecision.FLOAT)
+    _index(
+        writer,
+        [
+            _make_chunk("doc1", 0, "durable content", [0, 0, 1, 0]),
+            _make_chunk("doc2", 0, "deleted content", [0, 0, 1, 0]),
+        ],
+    )
+    writer.delete("doc2")
+
+    # Bypass the per-process store registry to force a replay from disk.
+    from onyx.document_index.embedded import embedded_document_index
+
+    embedded_document_index._stores.clear()
+    reader = EmbeddedDocumentIndex(
+        tenant_state=_TENANT, index_name="persisted", root_dir=str(tmp_path)
+    )
+    semantic = reader.semantic_retrieval([0, 0, 1, 0], _public_filters(), 10)
+    assert [c.document_id for c in semantic] == ["doc1"]
+    assert semantic[0].score == pytest.approx(1.0)
+
+    with pytest.raises(ValueError):
+        reader.verify_and_create_index_if_necessary(_DIM + 1, EmbeddingPrecision.FLOAT)
+
+
+def _open_in_new_process(root_dir: Path) -> EmbeddedDocumentIndex:
+    """Opens the index with its own store, as a separate process would."""
+    from onyx.document_index.embedded import embedded_document_index
+
+    embedded_document_index._stores.clear()
+    return EmbeddedDocumentIndex(
+        tenant_state=_TENANT, index_name="shared", root_dir=str(root_dir)
+    )
+
+
+def test_processes_see_each_others_writes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from onyx.document_index.embedded import embedded_document_index
+
+    api_server = _open_in_new_process(tmp_path)
+    worker = _open_in_new_process(tmp_path)
+    worker.verify_and_create_index_if_necessary(_DIM, EmbeddingPrecision.FLOAT)
+
+    _index(worker, [_make_chunk("doc1", 0, "from the worker", [1, 0, 0, 0])])
+    semantic = api_server.semantic_retrieval([1, 0, 0, 0], _public_filters(), 10)
+    assert [c.document_id for c in semantic] == ["doc1"]
+
+    # Slots freed and reused by one process stay consistent in the other, and
+    # a compaction by one makes the other reload from the rewritten log.
+    monkeypatch.setattr(embedded_document_index, "OPLOG_COMPACTION_MIN_ENTRIES", 0)
+    api_server.delete("doc1")
+    _index(worker, [_make_chunk("doc2", 0, "second doc", [0, 1, 0, 0])])
+    _index(api_server, [_make_chunk("doc3", 0, "third doc", [0, 0, 1, 0])])
+
+    for handle in (api_server, worker, _open_in_new_process(tmp_path)):
+        semantic = handle.semantic_retrieval([0, 1, 1, 0], _public_filters(), 10)
+        assert sorted(c.document_id for c in semantic) == ["doc2", "doc3"]
+
+
+def test_append_after_torn_write_survives_restart(tmp_path: Path) -> None:
+    index = _open_in_new_process(tmp_path)
+    index.verify_and_create_index_if_necessary(_DIM, EmbeddingPrecision.FLOAT)
+    _index(index, [_make_chunk("doc1", 0, "before the crash", [1, 0, 0, 0])])
+
+    # A crash mid-append leaves a partial last line behind.
+    with open(tmp_path / "shared" / "oplog.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "slot": 1, "tena')
+
+    restarted = _open_in_new_process(tmp_path)
+    _index(restarted, [_make_chunk("doc2", 0, "after the crash", [1, 0, 0, 0])])
+
+    semantic = _open_in_new_process(tmp_path).semantic_retrieval(
+        [1, 0, 0, 0], _public_filters(), 10
+    )
+    assert sorted(c.document_id for c in semantic) == ["doc1", "doc2"]
@@ -0,0 +1,179 @@
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from onyx.document_index.interfaces_new import IndexingMetadata, TenantState
+from onyx.document_index.opensearch.client import (
+    BulkWriteOutcome,
+    OpenSearchIndexClient,
+)
+from onyx.document_index.opensearch.constants import DEFAULT_MAX_CHUNK_SIZE
+from onyx.document_index.opensearch.opensearch_document_index import (
+    OpenSearchDocumentIndex,
+    _convert_onyx_chunk_to_opensearch_document,
+)
+from onyx.document_index.opensearch.schema import (
+    CHUNK_INDEX_FIELD_NAME,
+    DOCUMENT_ID_FIELD_NAME,
+    MAX_CHUNK_SIZE_FIELD_NAME,
+    TENANT_ID_FIELD_NAME,
+)
+from onyx.document_index.opensearch.search import DocumentQuery
+from tests.unit.onyx.document_index.opensearch.test_opensearch_batch_flush import (
+    _make_chunk,
+)
+
+
+def _make_index(tenant_state: TenantState) -> tuple[OpenSearchDocumentIndex, MagicMock]:
+    mock_client = MagicMock()
+    index = OpenSearchDocumentIndex.__new__(OpenSearchDocumentIndex)
+    index._index_name = "test_index"
+    index._client = mock_client
+    index._tenant_state = tenant_state
+    return index, mock_client
+
+
+def _outcomes_from_documents(
+    documents: list[Any], existing: set[str], failing: set[str]
+) -> list[BulkWriteOutcome]:
+    return [
+        BulkWriteOutcome(
+            document_id=document.document_id,
+            chunk_index=document.chunk_index,
+            created=document.document_id not in existing,
+            error="1x op=index status=400 type=mapper_parsing_exception"
+            if document.document_id in failing
+            else None,
+        )
+        for document in documents
+    ]
+
+
+@patch(
+    "onyx.document_index.opensearch.opensearch_document_index.MAX_CHUNKS_PER_DOC_BATCH",
+    4,
+)
+def test_replace_documents_deletes_stale_chunks_in_one_request() -> None:
+    """All documents' stale chunks go in one delete-by-query, and the new
+    chunks are bulk written in batches that span documents."""
+    index, mock_client = _make_index(
+        TenantState(tenant_id="test_tenant", multitenant=False)
+    )
+    mock_client.bulk_overwrite_documents.side_effect = lambda documents, **_: (
+        _outcomes_from_documents(documents, existing={"doc_0"}, failing={"doc_2"})
+    )
+
+    chunks = [
+        _make_chunk(f"doc_{doc_idx}", chunk_idx)
+        for doc_idx in range(3)
+        for chunk_idx in range(3)
+    ]
+    metadata = IndexingMetadata(
+        doc_id_to_chunk_cnt_diff={
+            "doc_0": IndexingMetadata.ChunkCounts(old_chunk_cnt=5, new_chunk_cnt=3),
+            "doc_1": IndexingMetadata.ChunkCounts(old_chunk_cnt=0, new_chunk_cnt=3),
+            "doc_2": IndexingMetadata.ChunkCounts(old_chunk_cnt=3, new_chunk_cnt=3),
+        }
+    )
+
+    results = {
+        result.document_id: result
+        for result in index.replace_documents(chunks, metadata)
+    }
+
+    mock_client.delete_by_query.assert_called_once()
+    assert [
+        len(call.kwargs["documents"])
+        for call in mock_client.bulk_overwrite_documents.call_args_list
+    ] == [4, 4, 1]
+    mock_client.bulk_index_documents.assert_not_called()
+
+    assert set(results) == {"doc_0", "doc_1", "doc_2"}
+    assert results["doc_0"].already_existed and results["doc_0"].succeeded
+    assert not results["doc_1"].already_existed and results["doc_1"].succeeded
+    assert not results["doc_2"].succeeded
+    assert "mapper_parsing_exception" in (results["doc_2"].failure_message or "")
+
+
+def test_delete_stale_chunks_query_keeps_chunks_that_will_be_overwritten() -> None:
+    query = DocumentQuery.delete_stale_chunks_query(
+        document_id_to_new_chunk_count={"doc_0": 3, "doc_1": 0},
+        tenant_state=TenantState(tenant_id="test_tenant", multitenant=True),
+    )
+
+    filter_clauses = query["query"]["bool"]["filter"]
+    assert {"term": {TENANT_ID_FIELD_NAME: {"value": "test_tenant"}}} in (
+        filter_clauses
+    )
+    per_document_clauses = filter_clauses[0]["bool"]["should"]
+    assert per_document_clauses[0] == {
+        "bool": {
+            "filter": [{"term": {DOCUMENT_ID_FIELD_NAME: {"value": "doc_0"}}}],
+            "must_not": [
+                {
+                    "bool": {
+                        "filter": [
+                            {"range": {CHUNK_INDEX_FIELD_NAME: {"lt": 3}}},
+                            {
+                                "term": {
+                                    MAX_CHUNK_SIZE_FIELD_NAME: {
+                                        "value": DEFAULT_MAX_CHUNK_SIZE
+                                    }
+                                }
+                            },
+                        ]
+                    }
+                }
+            ],
+        }
+    }
+    # A document without new chunks loses all of them.
+    assert per_document_clauses[1]["bool"]["must_not"][0]["bool"]["filter"][0] == {
+        "range": {CHUNK_INDEX_FIELD_NAME: {"lt": 0}}
+    }
+
+
+def test_bulk_overwrite_documents_reports_every_outcome() -> None:
+    client = OpenSearchIndexClient.__new__(OpenSearchIndexClient)
+    client._index_name = "test_index"
+    client._client = MagicMock()
+    tenant_state = TenantState(tenant_id="test_tenant", multitenant=False)
+    documents = [
+        _convert_onyx_chunk_to_opensearch_document(_make_chunk("doc_0", i))
+        for i in range(3)
+    ]
+
+    def _fake_streaming_bulk(
+        _client: Any, actions: list[dict[str, Any]], **_: Any
+    ) -> list[tuple[bool, dict[str, Any]]]:
+        assert all(action["_op_type"] == "index" for action in actions)
+        # Retried items come back last.
+        return [
+            (True, {"index": {"_id": actions[1]["_id"], "result": "updated"}}),
+            (True, {"index": {"_id": actions[2]["_id"], "result": "created"}}),
+            (
+                False,
+                {
+                    "index": {
+                        "_id": actions[0]["_id"],
+                        "status": 429,
+                        "error": {
+                            "type": "es_rejected_execution_exception",
+                            "reason": "secret document text",
+                        },
+                    }
+                },
+            ),
+        ]
+
+    with patch(
+        "onyx.document_index.opensearch.client.streaming_bulk",
+        side_effect=_fake_streaming_bulk,
+    ):
+        outcomes = client.bulk_overwrite_documents(documents, tenant_state)
+
+    by_chunk = {outcome.chunk_index: outcome for outcome in outcomes}
+    assert not by_chunk[1].created and by_chunk[1].error is None
+    assert by_chunk[2].created and by_chunk[2].error is None
+    assert by_chunk[0].error is not None
+    assert "es_rejected_execution_exception" in by_chunk[0].error
+    assert "secret document text" not in by_chunk[0].error
@@ -0,0 +1,174 @@
+"""Feeds chunks through the real HTTP stack into a local stub of Vespa's
+/document/v1 API."""
+
+import concurrent.futures
+import json
+import threading
+from collections.abc import Generator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from onyx.document_index.vespa import feed_client as feed_client_module
+from onyx.document_index.vespa import indexing_utils
+from onyx.document_index.vespa.feed_client import (
+    AdaptiveWindow,
+    VespaFeedClient,
+    VespaFeedError,
+)
+from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
+from tests.unit.onyx.document_index.vespa.test_vespa_batch_flush import _make_chunk
+
+
+class _StubVespa(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubVespaHandler)
+        self.lock = threading.Lock()
+        self.documents: dict[str, dict[str, Any]] = {}
+        self.throttle_remaining = 0
+        self.rejected_document_ids: set[str] = set()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _StubVespaHandler(BaseHTTPRequestHandler):
+    server: _StubVespa
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        fields = body["fields"]
+        with self.server.lock:
+            self.server.requests += 1
+            if self.server.throttle_remaining > 0:
+                self.server.throttle_remaining -= 1
+                status = HTTPStatus.TOO_MANY_REQUESTS
+            elif fields["document_id"] in self.server.rejected_document_ids:
+                status = HTTPStatus.BAD_REQUEST
+            else:
+                self.server.documents[self.path.rsplit("/", 1)[-1]] = fields
+                status = HTTPStatus.OK
+
+        payload = json.dumps({"pathId": self.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def stub_vespa() -> Generator[_StubVespa, None, None]:
+    server = _StubVespa()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with (
+        patch.object(
+            indexing_utils,
+            "DOCUMENT_ID_ENDPOINT",
+            f"{server.url}/document/v1/default/{{index_name}}/docid",
+        ),
+        patch.object(feed_client_module, "INDEXING_BASE_DELAY", 0.001),
+    ):
+        yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_feeds_every_chunk(
+    stub_vespa: _StubVespa,
+) -> None:
+    chunks = [_make_chunk(f"doc{i % 3}", chunk_id=i) for i in range(30)]
+
+    with (
+        httpx.Client() as http_client,
+        concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor,
+    ):
+        batch_index_vespa_chunks(
+            chunks=chunks,
+            index_name="danswer_chunk",
+            http_client=http_client,
+            multitenant=True,
+            executor=executor,
+        )
+
+    assert len(stub_vespa.documents) == 30
+    fields = next(iter(stub_vespa.documents.values()))
+    assert fields["tenant_id"] == "test_tenant"
+    assert fields["embeddings"]["full_chunk"] == [0.1] * 10
+    assert {f["chunk_id"] for f in stub_vespa.documents.values()} == set(range(30))
+
+
+def test_throttling_shrinks_the_window_and_is_retried(
+    stub_vespa: _StubVespa,
+) -> None:
+    stub_vespa.throttle_remaining = 6
+    chunks = [_make_chunk("doc", chunk_id=i) for i in range(10)]
+
+    with (
+        httpx.Client() as http_client,
+        concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor,
+    ):
+        feed_client = VespaFeedClient(
+            http_client, executor, max_in_flight=8, initial_in_flight=8
+        )
+        failures = feed_client.feed(
+            indexing_utils.build_vespa_feed_operations(
+                chunks, "danswer_chunk", multitenant=False
+            )
+        )
+
+    assert failures == []
+    assert len(stub_vespa.documents) == 10
+    assert stub_vespa.requests == 16
+    assert feed_client.in_flight_limit < 8
+
+
+def test_failures_are_reported_per_chunk(stub_vespa: _StubVespa) -> None:
+    stub_vespa.rejected_document_ids = {"bad"}
+    chunks = [_make_chunk("good", chunk_id=i) for i in range(3)] + [
+        _make_chunk("bad", chunk_id=i) for i in range(2)
+    ]
+
+    with httpx.Client() as http_client, pytest.raises(VespaFeedError) as exc_info:
+        batch_index_vespa_chunks(
+            chunks=chunks,
+            index_name="danswer_chunk",
+            http_client=http_client,
+            multitenant=False,
+        )
+
+    failures = exc_info.value.failures
+    assert [(f.document_id, f.chunk_id, f.status_code) for f in failures] == [
+        ("bad", 0, 400),
+        ("bad", 1, 400),
+    ]
+    # Non-retryable errors are not retried and do not block other chunks.
+    assert stub_vespa.requests == 5
+    assert len(stub_vespa.documents) == 3
+
+
+def test_adaptive_window_grows_additively_and_halves_on_throttle() -> None:
+    window = AdaptiveWindow(initial=4, maximum=6)
+    # About one more slot per full window of successes.
+    for _ in range(5):
+        window.on_success()
+    assert window.limit == 5
+    for _ in range(100):
+        window.on_success()
+    assert window.limit == 6
+
+    window.on_throttled()
+    assert window.limit == 3
+    for _ in range(20):
+        window.on_throttled()
+    assert window.limit == 1
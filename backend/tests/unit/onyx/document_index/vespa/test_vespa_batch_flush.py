@@ -1,4 +1,4 @@
-"""Unit tests for VespaDocumentIndex.index().
+"""Unit tests for VespaDocumentIndex.index() and replace_documents().
 
 These tests mock all external I/O (HTTP calls, thread pools) and verify
 the streaming logic, ID cleaning/mapping, and DocumentInsertionRecord
@@ -11,6 +11,7 @@ from onyx.access.models import DocumentAccess
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.models import Document, TextSection
 from onyx.document_index.interfaces_new import IndexingMetadata, TenantState
+from onyx.document_index.vespa.feed_client import VespaFeedFailure
 from onyx.document_index.vespa.internal_types import EnrichedDocumentIndexingInfo
 from onyx.document_index.vespa.vespa_document_index import VespaDocumentIndex
 from onyx.indexing.models import ChunkEmbedding, DocMetadataAwareIndexChunk, IndexChunk
@@ -145,3 +146,54 @@ def test_index_respects_batch_size(
     ]
     assert len(all_indexed) == 7
     assert [c.chunk_id for c in all_indexed] == list(range(7))
+
+
+@patch("onyx.document_index.vespa.vespa_document_index.VespaFeedClient")
+@patch("onyx.document_index.vespa.vespa_document_index.delete_vespa_chunks")
+@patch(
+    "onyx.document_index.vespa.vespa_document_index.get_document_chunk_ids",
+    return_value=[],
+)
+@patch("onyx.document_index.vespa.vespa_document_index._enrich_basic_chunk_info")
+def test_replace_documents_reports_feed_failures_per_document(
+    mock_enrich: MagicMock,
+    mock_get_chunk_ids: MagicMock,  # noqa: ARG001
+    mock_delete: MagicMock,  # noqa: ARG001
+    mock_feed_client_cls: MagicMock,
+) -> None:
+    """A chunk Vespa rejects fails only its own document, and document IDs
+    come back as the caller supplied them."""
+    mock_enrich.side_effect = lambda document_id, previous_chunk_count, **_: (
+        _stub_enrich(document_id, old_chunk_cnt=previous_chunk_count)
+    )
+    mock_feed_client_cls.return_value.feed.return_value = [
+        VespaFeedFailure(
+            document_id="doc_b", chunk_id=1, status_code=400, error="bad field"
+        )
+    ]
+
+    index = VespaDocumentIndex(
+        index_name="test_index",
+        tenant_state=TenantState(tenant_id="test_tenant", multitenant=False),
+        large_chunks_enabled=False,
+        httpx_client=MagicMock(),
+    )
+
+    chunks = [_make_chunk("doc'a", chunk_id=i) for i in range(2)] + [
+        _make_chunk("doc_b", chunk_id=i) for i in range(2)
+    ]
+    metadata = _make_indexing_metadata(
+        ["doc'a", "doc_b"], old_counts=[3, 0], new_counts=[2, 2]
+    )
+
+    results = {
+        result.document_id: result
+        for result in index.replace_documents(chunks=chunks, indexing_metadata=metadata)
+    }
+
+    assert set(results) == {"doc'a", "doc_b"}
+    assert results["doc'a"].succeeded
+    assert results["doc'a"].already_existed
+    assert not results["doc_b"].succeeded
+    assert not results["doc_b"].already_existed
+    assert "bad field" in (results["doc_b"].failure_message or "")
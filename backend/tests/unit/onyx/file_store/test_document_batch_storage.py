@@ -1,13 +1,110 @@
 """Tests for FileStoreDocumentBatchStorage."""
 
+import json
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import IO, Any
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document, TextSection
+from onyx.file_store import document_batch_storage
 from onyx.file_store.document_batch_storage import FileStoreDocumentBatchStorage
 from onyx.file_store.file_store import S3BackedFileStore
 
 _S3_MODULE = "onyx.file_store.file_store"
 
 
+def _make_document(i: int) -> Document:
+    return Document(
+        id=f"doc-{i}",
+        source=DocumentSource.WEB,
+        semantic_identifier=f"Document {i}",
+        metadata={"tags": ["a", "b"], "owner": "someone"},
+        doc_updated_at=datetime(2024, 1, i + 1, tzinfo=timezone.utc),
+        sections=[TextSection(text=f"text {i} " * 50, link=f"https://x/{i}")],
+    )
+
+
+def _in_memory_storage() -> tuple[FileStoreDocumentBatchStorage, dict[str, bytes]]:
+    files: dict[str, bytes] = {}
+
+    def _save_file(content: IO, file_id: str, **_: Any) -> str:
+        files[file_id] = content.read()
+        return file_id
+
+    file_store = MagicMock()
+    file_store.save_file.side_effect = _save_file
+    file_store.has_file.side_effect = lambda file_id, **_: file_id in files
+    file_store.read_file.side_effect = lambda file_id, **_: BytesIO(files[file_id])
+    storage = FileStoreDocumentBatchStorage(
+        cc_pair_id=1, index_attempt_id=42, file_store=file_store
+    )
+    return storage, files
+
+
+def test_batch_round_trip_is_compressed_and_streamed() -> None:
+    storage, files = _in_memory_storage()
+    documents = [_make_document(i) for i in range(5)]
+
+    storage.store_batch(0, documents)
+
+    (stored,) = files.values()
+    legacy_size = len(
+        json.dumps([doc.model_dump(mode="json") for doc in documents], indent=2)
+    )
+    assert len(stored) < legacy_size / 4
+
+    batch = storage.get_batch(0)
+    assert batch is not None
+    # Documents are decoded lazily, one at a time.
+    assert next(batch) == documents[0]
+    assert list(batch) == documents[1:]
+
+
+def test_legacy_json_batches_are_still_readable() -> None:
+    storage, files = _in_memory_storage()
+    documents = [_make_document(i) for i in range(3)]
+    files[storage._get_batch_file_name(7)] = json.dumps(
+        [doc.model_dump(mode="json") for doc in documents], indent=2
+    ).encode()
+
+    batch = storage.get_batch(7)
+    assert batch is not None
+    assert list(batch) == documents
+    assert storage.get_batch(8) is None
+
+
+def test_legacy_json_write_flag(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        document_batch_storage, "DOCUMENT_BATCH_LEGACY_JSON_FORMAT", True
+    )
+    storage, files = _in_memory_storage()
+    documents = [_make_document(0)]
+
+    storage.store_batch(0, documents)
+
+    (stored,) = files.values()
+    assert json.loads(stored)[0]["id"] == "doc-0"
+    batch = storage.get_batch(0)
+    assert batch is not None
+    assert list(batch) == documents
+
+
+def test_unknown_batch_format_version_is_rejected() -> None:
+    storage, files = _in_memory_storage()
+    files[storage._get_batch_file_name(0)] = (
+        document_batch_storage._BATCH_FORMAT_MAGIC + bytes([99])
+    )
+
+    batch = storage.get_batch(0)
+    assert batch is not None
+    with pytest.raises(ValueError):
+        list(batch)
+
+
 def _mock_db_session() -> MagicMock:
     session = MagicMock()
     session.__enter__ = MagicMock(return_value=session)
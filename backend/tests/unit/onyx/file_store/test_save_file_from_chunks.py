@@ -0,0 +1,133 @@
+import base64
+import hashlib
+from collections.abc import Iterator
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from onyx.configs.constants import FileOrigin
+from onyx.file_store.file_store import S3BackedFileStore, _iter_multipart_parts
+
+_MODULE = "onyx.file_store.file_store"
+
+
+def test_iter_multipart_parts_regroups_chunks() -> None:
+    parts = list(_iter_multipart_parts([b"ab", b"cde", b"f", b"g"], part_size=4))
+
+    assert parts == [b"abcde", b"fg"]
+    assert list(_iter_multipart_parts([], part_size=4)) == [b""]
+
+
+def _make_store(s3_client: MagicMock) -> S3BackedFileStore:
+    file_store = S3BackedFileStore(bucket_name="test-bucket")
+    file_store._get_s3_client = MagicMock(return_value=s3_client)
+    file_store._get_s3_key = MagicMock(return_value="onyx-files/public/report.csv")
+    return file_store
+
+
+@patch(f"{_MODULE}.S3_MULTIPART_PART_SIZE_BYTES", 4)
+@patch(f"{_MODULE}.upsert_filerecord")
+@patch(f"{_MODULE}.get_session_with_current_tenant_if_none")
+def test_s3_save_file_from_chunks_uploads_parts(
+    mock_get_session: MagicMock,
+    mock_upsert: MagicMock,
+) -> None:
+    mock_get_session.return_value = nullcontext(MagicMock())
+    s3_client = MagicMock()
+    s3_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    s3_client.upload_part.side_effect = lambda **kwargs: {
+        "ETag": f"etag-{kwargs['PartNumber']}"
+    }
+
+    file_id = _make_store(s3_client).save_file_from_chunks(
+        chunks=iter([b"head", b"row1", b"r2"]),
+        display_name="report.csv",
+        file_origin=FileOrigin.QUERY_HISTORY_CSV,
+        file_type="text/csv",
+        file_id="report.csv",
+    )
+
+    assert file_id == "report.csv"
+    assert [call.kwargs["Body"] for call in s3_client.upload_part.call_args_list] == [
+        b"head",
+        b"row1",
+        b"r2",
+    ]
+    s3_client.complete_multipart_upload.assert_called_once()
+    assert s3_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"] == {
+        "Parts": [
+            {"ETag": "etag-1", "PartNumber": 1},
+            {"ETag": "etag-2", "PartNumber": 2},
+            {"ETag": "etag-3", "PartNumber": 3},
+        ]
+    }
+    s3_client.abort_multipart_upload.assert_not_called()
+    assert mock_upsert.call_args.kwargs["file_size"] == 10
+
+
+@patch(f"{_MODULE}.S3_GENERATE_LOCAL_CHECKSUM", True)
+@patch(f"{_MODULE}.S3_MULTIPART_PART_SIZE_BYTES", 4)
+@patch(f"{_MODULE}.upsert_filerecord")
+@patch(f"{_MODULE}.get_session_with_current_tenant_if_none")
+def test_s3_save_file_from_chunks_sends_part_checksums(
+    mock_get_session: MagicMock,
+    mock_upsert: MagicMock,  # noqa: ARG001
+) -> None:
+    mock_get_session.return_value = nullcontext(MagicMock())
+    s3_client = MagicMock()
+    s3_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    s3_client.upload_part.side_effect = lambda **kwargs: {
+        "ETag": f"etag-{kwargs['PartNumber']}"
+    }
+
+    _make_store(s3_client).save_file_from_chunks(
+        chunks=iter([b"head", b"r2"]),
+        display_name="report.csv",
+        file_origin=FileOrigin.QUERY_HISTORY_CSV,
+        file_type="text/csv",
+    )
+
+    checksums = [
+        base64.b64encode(hashlib.sha256(part).digest()).decode("ascii")
+        for part in (b"head", b"r2")
+    ]
+    assert (
+        s3_client.create_multipart_upload.call_args.kwargs["ChecksumAlgorithm"]
+        == "SHA256"
+    )
+    assert [
+        call.kwargs["ChecksumSHA256"] for call in s3_client.upload_part.call_args_list
+    ] == checksums
+    assert s3_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"] == {
+        "Parts": [
+            {"ETag": "etag-1", "PartNumber": 1, "ChecksumSHA256": checksums[0]},
+            {"ETag": "etag-2", "PartNumber": 2, "ChecksumSHA256": checksums[1]},
+        ]
+    }
+
+
+@patch(f"{_MODULE}.upsert_filerecord")
+def test_s3_save_file_from_chunks_aborts_on_failure(mock_upsert: MagicMock) -> None:
+    s3_client = MagicMock()
+    s3_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+
+    def _failing_chunks() -> Iterator[bytes]:
+        yield b"header"
+        raise RuntimeError("export query failed")
+
+    with pytest.raises(RuntimeError):
+        _make_store(s3_client).save_file_from_chunks(
+            chunks=_failing_chunks(),
+            display_name="report.csv",
+            file_origin=FileOrigin.QUERY_HISTORY_CSV,
+            file_type="text/csv",
+        )
+
+    s3_client.abort_multipart_upload.assert_called_once_with(
+        Bucket="test-bucket",
+        Key="onyx-files/public/report.csv",
+        UploadId="upload-1",
+    )
+    s3_client.complete_multipart_upload.assert_not_called()
+    mock_upsert.assert_not_called()
@@ -0,0 +1,121 @@
+from collections.abc import Generator
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from onyx.indexing import contextual_rag_cache
+from onyx.indexing.contextual_rag_cache import ContextualRagSummaryCache
+from onyx.indexing.indexing_pipeline import add_contextual_summaries
+from onyx.llm.model_response import Choice, Message, ModelResponse
+from onyx.natural_language_processing.utils import BaseTokenizer
+from tests.unit.fakes import FakeCache
+
+
+class _CharTokenizer(BaseTokenizer):
+    def encode(self, string: str) -> list[int]:
+        return [ord(c) for c in string]
+
+    def tokenize(self, string: str) -> list[str]:
+        return list(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+@pytest.fixture
+def cache() -> Generator[FakeCache, None, None]:
+    fake_cache = FakeCache()
+    with (
+        patch.object(
+            contextual_rag_cache, "get_cache_backend", return_value=fake_cache
+        ),
+        patch(
+            "onyx.llm.prompt_cache.processor.process_with_prompt_cache",
+            side_effect=lambda cacheable_prefix, suffix, **_: (
+                f"{cacheable_prefix.content}{suffix.content}",
+                None,
+            ),
+        ),
+    ):
+        yield fake_cache
+
+
+def _make_llm(model_name: str = "gpt-4o") -> MagicMock:
+    llm = MagicMock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = model_name
+    llm.config.max_input_tokens = 100_000
+
+    def _invoke(prompt: Any, **_: Any) -> ModelResponse:
+        text = prompt if isinstance(prompt, str) else prompt.content
+        summary = "chunk context" if "<chunk>" in text else "doc summary"
+        return ModelResponse(
+            id="test",
+            created="2024-01-01T00:00:00Z",
+            choice=Choice(
+                message=Message(content=f"{summary} {llm.invoke.call_count}")
+            ),
+        )
+
+    llm.invoke.side_effect = _invoke
+    return llm
+
+
+def _make_chunks(doc_text: str) -> list[Any]:
+    source_document = SimpleNamespace(id="doc", get_text_content=lambda: doc_text)
+    return [
+        SimpleNamespace(
+            source_document=source_document,
+            content=content,
+            contextual_rag_reserved_tokens=128,
+            doc_summary="",
+            chunk_context="",
+        )
+        for content in doc_text.split(". ")
+    ]
+
+
+def _summarize(llm: MagicMock, chunks: list[Any]) -> int:
+    summary_cache = ContextualRagSummaryCache(llm=llm, ttl_seconds=60)
+    add_contextual_summaries(
+        chunks=chunks,
+        llm=llm,
+        tokenizer=_CharTokenizer(),
+        chunk_token_limit=512,
+        summary_cache=summary_cache,
+    )
+    return summary_cache.llm_calls_saved
+
+
+def test_unchanged_document_reuses_every_summary(cache: FakeCache) -> None:
+    doc_text = "First part. Second part. Third part"
+    first_chunks = _make_chunks(doc_text)
+    llm = _make_llm()
+
+    assert _summarize(llm, first_chunks) == 0
+    assert llm.invoke.call_count == 4
+    assert set(cache.expiries.values()) == {60}
+
+    llm.invoke.reset_mock()
+    second_chunks = _make_chunks(doc_text)
+    assert _summarize(llm, second_chunks) == 4
+    llm.invoke.assert_not_called()
+    assert [(c.doc_summary, c.chunk_context) for c in second_chunks] == [
+        (c.doc_summary, c.chunk_context) for c in first_chunks
+    ]
+
+
+@pytest.mark.usefixtures("cache")
+def test_changed_document_or_llm_calls_the_llm_again() -> None:
+    llm = _make_llm()
+    _summarize(llm, _make_chunks("First part. Second part"))
+
+    llm.invoke.reset_mock()
+    assert _summarize(llm, _make_chunks("First part. Second part, edited")) == 0
+    assert llm.invoke.call_count == 3
+
+    other_llm = _make_llm(model_name="claude")
+    assert _summarize(other_llm, _make_chunks("First part. Second part")) == 0
+    assert other_llm.invoke.call_count == 3
@@ -250,6 +250,53 @@ def test_sections_overflow_into_second_chunk() -> None:
     assert chunks[1].source_links == {0: "lb"}
 
 
+def test_each_section_is_tokenized_once() -> None:
+    """The accumulator carries a running token count, so a document with many
+    small sections costs linear — not quadratic — tokenizer work."""
+
+    class CountingTokenizer(CharTokenizer):
+        encoded_chars = 0
+
+        def encode(self, string: str) -> list[int]:
+            CountingTokenizer.encoded_chars += len(string)
+            return super().encode(string)
+
+    dc = _make_document_chunker()
+    dc._dispatch[SectionType.TEXT] = text_chunker_module.TextChunker(
+        tokenizer=CountingTokenizer(),
+        chunk_splitter=SentenceChunker(
+            tokenizer_or_token_counter=len,
+            chunk_size=CHUNK_LIMIT,
+            chunk_overlap=0,
+            return_type="texts",
+        ),
+    )
+    texts = [f"section {i:04d}" for i in range(500)]
+    doc = _make_doc(
+        sections=[Section(type=SectionType.TEXT, text=t, link=None) for t in texts]
+    )
+    CountingTokenizer.encoded_chars = 0
+
+    chunks = dc.chunk(
+        document=doc,
+        sections=doc.processed_sections,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        content_token_limit=CHUNK_LIMIT,
+    )
+
+    assert CountingTokenizer.encoded_chars == sum(len(t) for t in texts)
+    assert SECTION_SEPARATOR.join(c.content for c in chunks) == (
+        SECTION_SEPARATOR.join(texts)
+    )
+    # The running count stays exact: chunks respect the limit and are only
+    # flushed once the next section no longer fits.
+    next_section_tokens = len(SECTION_SEPARATOR) + len(texts[0])
+    assert all(len(c.content) <= CHUNK_LIMIT for c in chunks)
+    assert all(len(c.content) + next_section_tokens > CHUNK_LIMIT for c in chunks[:-1])
+
+
 # --- Image section handling --------------------------------------------------
 
 
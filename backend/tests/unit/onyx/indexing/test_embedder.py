@@ -33,7 +33,7 @@ def test_default_indexing_embedder_embed_chunks(
     )
 
     # Mock the encode method of the embedding model
-    mock_embedding_model.return_value.encode.side_effect = [
+    mock_embedding_model.return_value.encode_vectors.side_effect = [
         [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]],  # Main chunk embeddings
         [[7.0, 8.0, 9.0]],  # Title embedding
     ]
@@ -84,7 +84,7 @@ def test_default_indexing_embedder_embed_chunks(
     assert result[0].title_embedding == [7.0, 8.0, 9.0]
 
     # Verify the embedding model was called exactly as follows
-    mock_embedding_model.return_value.encode.assert_any_call(
+    mock_embedding_model.return_value.encode_vectors.assert_any_call(
         texts=[f"Title: {doc_summary}Test chunk{chunk_context}"],
         text_type=EmbedTextType.PASSAGE,
         large_chunks_present=False,
@@ -92,9 +92,10 @@ def test_default_indexing_embedder_embed_chunks(
         request_id=None,
     )
     # Same for title only embedding call
-    mock_embedding_model.return_value.encode.assert_any_call(
-        ["Test Document"],
+    mock_embedding_model.return_value.encode_vectors.assert_any_call(
+        texts=["Test Document"],
         text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
         tenant_id=None,
         request_id=None,
     )
@@ -0,0 +1,58 @@
+from collections.abc import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from onyx.indexing import image_summary_cache
+from onyx.indexing.image_summary_cache import (
+    cache_image_summaries,
+    get_cached_image_summaries,
+    image_summary_cache_namespace,
+)
+from tests.unit.fakes import FakeCache
+
+
+@pytest.fixture
+def cache() -> Generator[FakeCache, None, None]:
+    fake_cache = FakeCache()
+    with patch.object(
+        image_summary_cache, "get_cache_backend", return_value=fake_cache
+    ):
+        yield fake_cache
+
+
+def _namespace(model_name: str = "gpt-4o", system_prompt: str = "sys") -> str:
+    llm = MagicMock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = model_name
+    return image_summary_cache_namespace(
+        llm=llm, system_prompt=system_prompt, user_prompt_template="user"
+    )
+
+
+def test_hits_are_scoped_to_model_and_prompts(cache: FakeCache) -> None:
+    cache_image_summaries({"h1": "a logo"}, namespace=_namespace(), ttl_seconds=60)
+
+    assert get_cached_image_summaries(
+        ["h1", "h2"], namespace=_namespace(), ttl_seconds=60
+    ) == ["a logo", None]
+    assert set(cache.expiries.values()) == {60}
+    for other_namespace in (
+        _namespace(model_name="claude"),
+        _namespace("gpt-4o", "v2"),
+    ):
+        assert get_cached_image_summaries(
+            ["h1"], namespace=other_namespace, ttl_seconds=60
+        ) == [None]
+
+
+def test_cache_errors_are_treated_as_misses(cache: FakeCache) -> None:
+    with (
+        patch.object(cache, "mget", side_effect=RedisError("down")),
+        patch.object(cache, "mset", side_effect=RedisError("down")),
+    ):
+        cache_image_summaries({"h1": "a logo"}, namespace="ns", ttl_seconds=60)
+        assert get_cached_image_summaries(["h1"], namespace="ns", ttl_seconds=60) == [
+            None
+        ]
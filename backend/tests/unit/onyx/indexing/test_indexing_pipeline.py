@@ -31,6 +31,7 @@ from onyx.indexing.indexing_pipeline import (
 from onyx.llm.constants import LlmProviderNames
 from onyx.llm.model_capabilities import get_max_input_tokens
 from onyx.llm.model_response import Choice, Message, ModelResponse
+from tests.unit.fakes import FakeCache
 
 
 def create_test_document(
@@ -677,6 +678,13 @@ def _mock_file_store(image_map: dict[str, bytes]) -> MagicMock:
     return store
 
 
+def _mock_vision_llm(model_name: str = "gpt-4o") -> MagicMock:
+    llm = MagicMock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = model_name
+    return llm
+
+
 def _make_image_doc(
     doc_id: str,
     sections: list[TextSection | ImageSection],
@@ -711,6 +719,7 @@ class TestProcessImageSections:
         documents: list[Document],
         image_map: dict[str, bytes],
         summarize_side_effect: Any = None,
+        cache: FakeCache | None = None,
     ) -> list[Any]:
         """Helper that patches all external deps and calls process_image_sections."""
         if summarize_side_effect is None:
@@ -727,7 +736,7 @@ class TestProcessImageSections:
             ),
             patch(
                 f"{_PATCH_PREFIX}.get_default_llm_with_vision",
-                return_value=MagicMock(),
+                return_value=_mock_vision_llm(),
             ),
             patch(
                 f"{_PATCH_PREFIX}.get_default_file_store",
@@ -737,6 +746,10 @@ class TestProcessImageSections:
                 f"{_PATCH_PREFIX}.summarize_image_with_error_handling",
                 side_effect=summarize_side_effect,
             ),
+            patch(
+                "onyx.indexing.image_summary_cache.get_cache_backend",
+                return_value=cache or FakeCache(),
+            ),
         ):
             return process_image_sections(documents)
 
@@ -909,6 +922,47 @@ class TestProcessImageSections:
         assert sections[1].text == "[Error processing image]"
         assert sections[2].text == "summary-of-ok2"
 
+    def test_repeated_images_are_summarized_once_and_cached(self) -> None:
+        """The same image bytes under different files are summarized once per
+        batch, and a re-index is served from the cache."""
+        doc = _make_image_doc(
+            "doc1",
+            [
+                ImageSection(image_file_id="logo-page-1"),
+                ImageSection(image_file_id="diagram"),
+                ImageSection(image_file_id="logo-page-2"),
+            ],
+        )
+        image_map = {"logo-page-1": b"logo", "diagram": b"d", "logo-page-2": b"logo"}
+        summarize = MagicMock(
+            side_effect=lambda **kwargs: f"summary-of-{kwargs['context_name']}"
+        )
+        cache = FakeCache()
+
+        first = self._run([doc], image_map, summarize, cache)[0].processed_sections
+        assert summarize.call_count == 2
+        assert [s.text for s in first] == [
+            "summary-of-logo-page-1",
+            "summary-of-diagram",
+            "summary-of-logo-page-1",
+        ]
+
+        summarize.reset_mock()
+        second = self._run([doc], image_map, summarize, cache)[0].processed_sections
+        summarize.assert_not_called()
+        assert [s.text for s in second] == [s.text for s in first]
+
+    def test_unsummarized_images_are_not_cached(self) -> None:
+        doc = _make_image_doc("doc1", [ImageSection(image_file_id="img")])
+        cache = FakeCache()
+
+        result = self._run(
+            [doc], {"img": b"tiff"}, summarize_side_effect=lambda **_: None, cache=cache
+        )
+
+        assert result[0].processed_sections[0].text == "[Image could not be summarized]"
+        assert cache.store == {}
+
 
 # ---------------------------------------------------------------------------
 # content_hash
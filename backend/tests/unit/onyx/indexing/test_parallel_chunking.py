@@ -0,0 +1,153 @@
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import IndexingDocument, Section, SectionType
+from onyx.indexing import parallel_chunking
+from onyx.indexing.chunker import Chunker
+from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.indexing.parallel_chunking import ChunkerSpec, chunk_documents
+from onyx.natural_language_processing.utils import BaseTokenizer
+
+_NUM_PROCESSES = 2
+
+
+class CharTokenizer(BaseTokenizer):
+    """1 character == 1 token."""
+
+    def encode(self, string: str) -> list[int]:
+        return [ord(c) for c in string]
+
+    def tokenize(self, string: str) -> list[str]:
+        return list(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+class _Heartbeat(IndexingHeartbeatInterface):
+    def __init__(self, stop_after_checks: int | None = None) -> None:
+        self.stop_after_checks = stop_after_checks
+        self.checks = 0
+        self.progress_amounts: list[int] = []
+
+    def should_stop(self) -> bool:
+        self.checks += 1
+        return (
+            self.stop_after_checks is not None and self.checks > self.stop_after_checks
+        )
+
+    def progress(self, tag: str, amount: int) -> None:  # noqa: ARG002
+        self.progress_amounts.append(amount)
+
+
+def _make_docs(count: int) -> list[IndexingDocument]:
+    return [
+        IndexingDocument(
+            id=f"doc{i}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"doc{i}",
+            title=f"Doc {i}",
+            metadata={},
+            sections=[],
+            processed_sections=[
+                Section(
+                    type=SectionType.TEXT,
+                    text=f"Sentence {j} of document {i}. " * 20,
+                    link=f"https://example.com/{i}/{j}",
+                )
+                for j in range(i % 3 + 1)
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def thread_pool() -> Generator[ThreadPoolExecutor, None, None]:
+    """Stands in for the spawn process pool, whose workers could not see the
+    test's tokenizer. Sharding, ordering and stop handling are the same."""
+    pool = ThreadPoolExecutor(max_workers=_NUM_PROCESSES)
+    worker_chunker = Chunker(tokenizer=CharTokenizer(), chunk_token_limit=200)
+    with (
+        patch.object(parallel_chunking, "INDEXING_CHUNKING_PROCESSES", _NUM_PROCESSES),
+        patch.object(parallel_chunking, "INDEXING_PARALLEL_CHUNKING_MIN_DOCS", 4),
+        patch.object(parallel_chunking, "_get_pool", return_value=pool),
+        patch.object(
+            parallel_chunking, "_get_worker_chunker", return_value=worker_chunker
+        ),
+    ):
+        yield pool
+    pool.shutdown()
+
+
+def test_parallel_chunking_matches_serial_order(
+    thread_pool: ThreadPoolExecutor,  # noqa: ARG001
+) -> None:
+    docs = _make_docs(20)
+    heartbeat = _Heartbeat()
+    chunker = Chunker(
+        tokenizer=CharTokenizer(), chunk_token_limit=200, callback=heartbeat
+    )
+
+    expected = Chunker(tokenizer=CharTokenizer(), chunk_token_limit=200).chunk(docs)
+    chunks = chunk_documents(chunker, docs, model_name=None, provider_type=None)
+
+    assert [(c.source_document.id, c.chunk_id, c.content) for c in chunks] == [
+        (c.source_document.id, c.chunk_id, c.content) for c in expected
+    ]
+    # Chunks reference the caller's documents.
+    docs_by_id = {doc.id: doc for doc in docs}
+    assert all(c.source_document is docs_by_id[c.source_document.id] for c in chunks)
+    # Progress is reported once per shard and covers every chunk.
+    assert len(heartbeat.progress_amounts) > 1
+    assert sum(heartbeat.progress_amounts) == len(chunks)
+
+
+def test_parallel_chunking_honors_stop_signal(
+    thread_pool: ThreadPoolExecutor,  # noqa: ARG001
+) -> None:
+    heartbeat = _Heartbeat(stop_after_checks=1)
+    chunker = Chunker(
+        tokenizer=CharTokenizer(), chunk_token_limit=200, callback=heartbeat
+    )
+
+    with pytest.raises(RuntimeError, match="Stop signal detected"):
+        chunk_documents(chunker, _make_docs(20), model_name=None, provider_type=None)
+
+
+def test_small_batches_are_chunked_serially(
+    thread_pool: ThreadPoolExecutor,  # noqa: ARG001
+) -> None:
+    chunker = MagicMock(spec=Chunker)
+
+    with patch.object(parallel_chunking, "_get_pool") as mock_get_pool:
+        chunk_documents(chunker, _make_docs(3), model_name=None, provider_type=None)
+
+    chunker.chunk.assert_called_once()
+    mock_get_pool.assert_not_called()
+
+
+def test_broken_pool_falls_back_to_serial_chunking() -> None:
+    pool = MagicMock()
+    chunker = MagicMock(spec=Chunker, callback=None)
+    docs = _make_docs(20)
+
+    with (
+        patch.object(parallel_chunking, "INDEXING_CHUNKING_PROCESSES", 2),
+        patch.object(parallel_chunking, "_get_pool", return_value=pool),
+        patch.object(
+            parallel_chunking, "_wait_for_shard", side_effect=BrokenProcessPool
+        ),
+        patch.object(
+            ChunkerSpec, "from_chunker", return_value=MagicMock(spec=ChunkerSpec)
+        ),
+    ):
+        chunk_documents(chunker, docs, model_name=None, provider_type=None)
+
+    chunker.chunk.assert_called_once_with(docs)
+    pool.shutdown.assert_called_once()
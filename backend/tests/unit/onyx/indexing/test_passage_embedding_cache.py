@@ -0,0 +1,144 @@
+from collections.abc import Generator
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from redis.exceptions import RedisError
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document, TextSection
+from onyx.indexing import passage_embedding_cache
+from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.indexing.models import DocAwareChunk
+from onyx.indexing.passage_embedding_cache import embed_passages_with_cache
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.model_server_models import EmbeddingVector, embedding_to_list
+from tests.unit.fakes import FakeCache
+
+
+@pytest.fixture
+def cache() -> Generator[FakeCache, None, None]:
+    fake_cache = FakeCache()
+    with patch.object(
+        passage_embedding_cache, "get_cache_backend", return_value=fake_cache
+    ):
+        yield fake_cache
+
+
+def _encode(texts: list[str]) -> list[EmbeddingVector]:
+    return [[float(len(text)), 0.5] for text in texts]
+
+
+def _embed(texts: list[str], encode: MagicMock) -> list[list[float]]:
+    return [
+        embedding_to_list(vector)
+        for vector in embed_passages_with_cache(
+            texts=texts,
+            encode=encode,
+            search_settings_id=1,
+            provider_type=EmbeddingProvider.OPENAI,
+            ttl_seconds=60,
+        )
+    ]
+
+
+def test_only_distinct_misses_are_embedded(cache: FakeCache) -> None:
+    encode = MagicMock(side_effect=_encode)
+
+    first = _embed(["a", "bb", "a"], encode)
+    encode.assert_called_once_with(["a", "bb"])
+    assert first == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    assert set(cache.expiries.values()) == {60}
+
+    encode.reset_mock()
+    second = _embed(["bb", "ccc", "a"], encode)
+    encode.assert_called_once_with(["ccc"])
+    assert second == [[2.0, 0.5], [3.0, 0.5], [1.0, 0.5]]
+
+
+@pytest.mark.usefixtures("cache")
+def test_entries_are_scoped_to_search_settings() -> None:
+    encode = MagicMock(side_effect=_encode)
+    _embed(["a"], encode)
+
+    embed_passages_with_cache(
+        texts=["a"],
+        encode=encode,
+        search_settings_id=2,
+        provider_type=None,
+        ttl_seconds=60,
+    )
+    assert encode.call_count == 2
+
+
+def test_cache_errors_fall_back_to_embedding(cache: FakeCache) -> None:
+    encode = MagicMock(side_effect=_encode)
+    with (
+        patch.object(cache, "mget", side_effect=RedisError("down")),
+        patch.object(cache, "mset", side_effect=RedisError("down")),
+    ):
+        assert _embed(["a", "bb"], encode) == [[1.0, 0.5], [2.0, 0.5]]
+    encode.assert_called_once_with(["a", "bb"])
+
+
+def _chunk(doc_id: str, content: str) -> DocAwareChunk:
+    document = Document(
+        id=doc_id,
+        source=DocumentSource.WEB,
+        semantic_identifier=f"Title of {doc_id}",
+        metadata={},
+        sections=[TextSection(text=content, link=None)],
+    )
+    return DocAwareChunk(
+        chunk_id=0,
+        blurb=content,
+        content=content,
+        source_links=None,
+        image_file_id=None,
+        section_continuation=False,
+        source_document=document,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        mini_chunk_texts=None,
+        large_chunk_id=None,
+        large_chunk_reference_ids=[],
+        chunk_context="",
+        doc_summary="",
+        contextual_rag_reserved_tokens=0,
+    )
+
+
+@pytest.mark.usefixtures("cache")
+def test_embedder_reuses_cached_chunk_and_title_embeddings() -> None:
+    with (
+        patch("onyx.indexing.embedder.PASSAGE_EMBEDDING_CACHE_ENABLED", True),
+        patch("onyx.indexing.embedder.EmbeddingModel") as embedding_model_cls,
+    ):
+        embedding_model = embedding_model_cls.return_value
+        embedding_model.encode_vectors.side_effect = lambda texts, **_: _encode(texts)
+        embedder = DefaultIndexingEmbedder(
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            provider_type=EmbeddingProvider.OPENAI,
+            search_settings_id=1,
+        )
+
+        embedder.embed_chunks([_chunk("doc1", "unchanged text")])
+        first_calls = embedding_model.encode_vectors.call_count
+
+        # Re-index: the same chunk and title, plus one new document
+        result = embedder.embed_chunks(
+            [_chunk("doc1", "unchanged text"), _chunk("doc2", "new text")]
+        )
+
+    new_texts = [
+        call.kwargs["texts"]
+        for call in embedding_model.encode_vectors.call_args_list[first_calls:]
+    ]
+    assert new_texts == [["new text"], ["Title of doc2"]]
+    assert isinstance(result[0].embeddings.full_embedding, np.ndarray)
+    assert embedding_to_list(result[0].embeddings.full_embedding) == [14.0, 0.5]
+    assert result[0].title_embedding == [13.0, 0.5]
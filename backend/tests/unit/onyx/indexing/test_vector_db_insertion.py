@@ -0,0 +1,119 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from onyx.connectors.models import ConnectorFailure
+from onyx.document_index.interfaces_new import (
+    DocumentInsertionRecord,
+    DocumentReplaceResult,
+    IndexingMetadata,
+)
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.vector_db_insertion import write_chunks_to_vector_db_with_backoff
+from tests.unit.onyx.document_index.opensearch.test_opensearch_batch_flush import (
+    _make_chunk,
+)
+
+_DOC_IDS = ["doc_0", "doc_1", "doc_2"]
+
+
+def _make_chunks() -> Iterator[DocMetadataAwareIndexChunk]:
+    for doc_id in _DOC_IDS:
+        for chunk_id in range(2):
+            yield _make_chunk(doc_id, chunk_id)
+
+
+def _failed_document_ids(failures: list[ConnectorFailure]) -> list[str]:
+    document_ids: list[str] = []
+    for failure in failures:
+        assert failure.failed_document is not None
+        document_ids.append(failure.failed_document.document_id)
+    return document_ids
+
+
+def _metadata() -> IndexingMetadata:
+    return IndexingMetadata(
+        doc_id_to_chunk_cnt_diff={
+            doc_id: IndexingMetadata.ChunkCounts(old_chunk_cnt=0, new_chunk_cnt=2)
+            for doc_id in _DOC_IDS
+        }
+    )
+
+
+def _index_per_doc(
+    chunks: Iterator[DocMetadataAwareIndexChunk],
+    indexing_metadata: IndexingMetadata,  # noqa: ARG001
+    attempted_doc_ids: list[str] | None = None,
+) -> list[DocumentInsertionRecord]:
+    doc_ids = {chunk.source_document.id for chunk in chunks}
+    if attempted_doc_ids is not None:
+        attempted_doc_ids.extend(doc_ids)
+    if "doc_2" in doc_ids:
+        raise RuntimeError("still broken")
+    return [
+        DocumentInsertionRecord(document_id=doc_id, already_existed=False)
+        for doc_id in doc_ids
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep() -> Iterator[None]:
+    with patch("onyx.indexing.vector_db_insertion.time.sleep"):
+        yield
+
+
+def test_batch_success_skips_per_doc_retry() -> None:
+    document_index = MagicMock()
+    document_index.replace_documents.return_value = [
+        DocumentReplaceResult(document_id=doc_id, already_existed=True)
+        for doc_id in _DOC_IDS
+    ]
+
+    records, failures = write_chunks_to_vector_db_with_backoff(
+        document_index, _make_chunks, _metadata(), tenant_id="test_tenant"
+    )
+
+    assert {record.document_id for record in records} == set(_DOC_IDS)
+    assert all(record.already_existed for record in records)
+    assert failures == []
+    document_index.index.assert_not_called()
+
+
+def test_only_failed_documents_are_retried() -> None:
+    document_index = MagicMock()
+    document_index.replace_documents.return_value = [
+        DocumentReplaceResult(document_id="doc_0", already_existed=False),
+        DocumentReplaceResult(
+            document_id="doc_1", already_existed=False, failure_message="rejected"
+        ),
+        DocumentReplaceResult(
+            document_id="doc_2", already_existed=False, failure_message="rejected"
+        ),
+    ]
+    retried_doc_ids: list[str] = []
+    document_index.index.side_effect = lambda chunks, indexing_metadata: _index_per_doc(
+        chunks, indexing_metadata, retried_doc_ids
+    )
+
+    records, failures = write_chunks_to_vector_db_with_backoff(
+        document_index, _make_chunks, _metadata(), tenant_id="test_tenant"
+    )
+
+    assert retried_doc_ids == ["doc_1", "doc_2"]
+    assert {record.document_id for record in records} == {"doc_0", "doc_1"}
+    assert _failed_document_ids(failures) == ["doc_2"]
+
+
+def test_batch_exception_retries_every_document() -> None:
+    document_index = MagicMock()
+    document_index.replace_documents.side_effect = RuntimeError("timed out")
+    document_index.index.side_effect = _index_per_doc
+
+    records, failures = write_chunks_to_vector_db_with_backoff(
+        document_index, _make_chunks, _metadata(), tenant_id="test_tenant"
+    )
+
+    assert document_index.index.call_count == len(_DOC_IDS)
+    assert {record.document_id for record in records} == {"doc_0", "doc_1"}
+    assert _failed_document_ids(failures) == ["doc_2"]
@@ -0,0 +1,227 @@
+from collections.abc import Generator
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from onyx.kg.clustering import entity_index
+from onyx.kg.clustering.entity_index import (
+    EntityQuery,
+    EntityTrigramIndex,
+    _EntityRow,
+    name_trigrams,
+)
+
+_T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+_T1 = datetime(2025, 1, 2, tzinfo=timezone.utc)
+
+
+def _row(
+    id_name: str,
+    name: str,
+    entity_type: str = "ACCOUNT",
+    document_id: str | None = None,
+    subtype: str | None = None,
+    updated_epoch: int = 0,
+) -> _EntityRow:
+    return _EntityRow(
+        id_name,
+        name,
+        entity_type,
+        document_id,
+        subtype,
+        sorted(name_trigrams(name.replace(" ", ""))),
+        updated_epoch,
+    )
+
+
+def _session(max_time_updated: datetime, count: int, epoch_sum: int = 0) -> MagicMock:
+    session = MagicMock()
+    session.execute.return_value.one.return_value = (
+        max_time_updated,
+        count,
+        epoch_sum,
+    )
+    return session
+
+
+@pytest.fixture(autouse=True)
+def no_refresh_interval() -> Generator[None, None, None]:
+    with patch.object(entity_index, "KG_ENTITY_INDEX_REFRESH_INTERVAL_SECONDS", 0):
+        yield
+
+
+def test_name_trigrams_match_pg_trgm() -> None:
+    # SELECT show_trgm('Cat') -> {"  c"," ca","at ",cat}
+    assert name_trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert name_trigrams("a-b") == {"  a", " a ", "  b", " b "}
+
+
+def test_search_filters_by_type_subtype_and_allowed_docs() -> None:
+    rows = [
+        _row("ACCOUNT::acme", "acme corp"),
+        _row("ACCOUNT::acme2", "acme corporation", document_id="hidden"),
+        _row("ACCOUNT::acmex", "acme x", document_id="visible", subtype="big"),
+        _row("ACCOUNT::other", "globex"),
+        _row("VENDOR::acme", "acme corp", entity_type="VENDOR"),
+    ]
+    index = EntityTrigramIndex()
+    with patch.object(entity_index, "_load_rows", return_value=rows):
+        index.refresh(_session(_T0, len(rows)))
+
+    with patch.object(
+        entity_index, "_get_allowed_doc_ids", return_value={"visible"}
+    ) as get_allowed:
+        results = index.search(
+            [
+                EntityQuery("ACCOUNT", "acmecorp"),
+                EntityQuery("ACCOUNT", "acme", subtype="big"),
+                EntityQuery("MISSING", "acme"),
+            ],
+            MagicMock(),
+            "allowed_docs",
+        )
+
+    # One allowed-docs lookup for every candidate document of the batch.
+    get_allowed.assert_called_once()
+    assert get_allowed.call_args.args[2] == {"hidden", "visible"}
+
+    account, subtyped, missing = results
+    assert [c.id_name for c in account] == ["ACCOUNT::acme", "ACCOUNT::acmex"]
+    assert account[0].score == 1.0
+    assert [c.id_name for c in subtyped] == ["ACCOUNT::acmex"]
+    assert missing == []
+
+
+def test_refresh_applies_only_changed_rows() -> None:
+    index = EntityTrigramIndex()
+    with patch.object(
+        entity_index, "_load_rows", return_value=[_row("ACCOUNT::acme", "acme")]
+    ):
+        index.refresh(_session(_T0, 1))
+
+    # Nothing changed: no rows are loaded.
+    with patch.object(entity_index, "_load_rows") as load_rows:
+        index.refresh(_session(_T0, 1))
+    load_rows.assert_not_called()
+
+    # A renamed entity and a new one arrive as a delta.
+    with patch.object(
+        entity_index,
+        "_load_rows",
+        return_value=[_row("ACCOUNT::acme", "acme inc"), _row("ACCOUNT::beta", "beta")],
+    ) as load_rows:
+        index.refresh(_session(_T1, 2))
+    load_rows.assert_called_once()
+
+    with patch.object(entity_index, "_get_allowed_doc_ids", return_value=set()):
+        (acme,) = index.search(
+            [EntityQuery("ACCOUNT", "acmeinc")], MagicMock(), "allowed_docs"
+        )
+    assert [(c.id_name, c.name) for c in acme] == [("ACCOUNT::acme", "acme inc")]
+
+
+def test_refresh_reloads_fully_after_deletes() -> None:
+    index = EntityTrigramIndex()
+    with patch.object(
+        entity_index,
+        "_load_rows",
+        return_value=[_row("ACCOUNT::acme", "acme"), _row("ACCOUNT::beta", "beta")],
+    ):
+        index.refresh(_session(_T0, 2))
+
+    with patch.object(
+        entity_index,
+        "_load_rows",
+        side_effect=[[], [_row("ACCOUNT::beta", "beta")]],
+    ) as load_rows:
+        index.refresh(_session(_T0, 1))
+    assert load_rows.call_count == 2
+
+    with patch.object(entity_index, "_get_allowed_doc_ids", return_value=set()):
+        (acme,) = index.search(
+            [EntityQuery("ACCOUNT", "acme")], MagicMock(), "allowed_docs"
+        )
+    assert acme == []
+
+
+def test_refresh_moves_entities_that_changed_type() -> None:
+    index = EntityTrigramIndex()
+    with patch.object(
+        entity_index, "_load_rows", return_value=[_row("X::acme", "acme", "ACCOUNT")]
+    ):
+        index.refresh(_session(_T0, 1))
+
+    with patch.object(
+        entity_index,
+        "_load_rows",
+        return_value=[_row("X::acme", "acme", "VENDOR", updated_epoch=1)],
+    ) as load_rows:
+        index.refresh(_session(_T1, 1, epoch_sum=1))
+    load_rows.assert_called_once()
+
+    with patch.object(entity_index, "_get_allowed_doc_ids", return_value=set()):
+        account, vendor = index.search(
+            [EntityQuery("ACCOUNT", "acme"), EntityQuery("VENDOR", "acme")],
+            MagicMock(),
+            "allowed_docs",
+        )
+    assert account == []
+    assert [c.id_name for c in vendor] == ["X::acme"]
+
+
+def test_refresh_reloads_when_checksum_disagrees() -> None:
+    index = EntityTrigramIndex()
+    with patch.object(
+        entity_index,
+        "_load_rows",
+        return_value=[_row("ACCOUNT::acme", "acme", updated_epoch=5)],
+    ):
+        index.refresh(_session(_T1, 1, epoch_sum=5))
+
+    # acme was deleted and beta inserted with an older time_updated: neither the
+    # max nor the count moved, and the delta query can't see beta.
+    with patch.object(
+        entity_index,
+        "_load_rows",
+        side_effect=[[], [_row("ACCOUNT::beta", "beta", updated_epoch=3)]],
+    ) as load_rows:
+        index.refresh(_session(_T1, 1, epoch_sum=3))
+    assert load_rows.call_count == 2
+
+    with patch.object(entity_index, "_get_allowed_doc_ids", return_value=set()):
+        acme, beta = index.search(
+            [EntityQuery("ACCOUNT", "acme"), EntityQuery("ACCOUNT", "beta")],
+            MagicMock(),
+            "allowed_docs",
+        )
+    assert acme == []
+    assert [c.id_name for c in beta] == ["ACCOUNT::beta"]
+
+
+def test_refresh_checks_the_table_at_most_once_per_interval() -> None:
+    index = EntityTrigramIndex()
+    session = _session(_T0, 0)
+    with (
+        patch.object(entity_index, "KG_ENTITY_INDEX_REFRESH_INTERVAL_SECONDS", 60),
+        patch.object(entity_index, "_load_rows", return_value=[]),
+    ):
+        index.refresh(session)
+        index.refresh(session)
+        assert session.execute.call_count == 1
+
+        index.refresh(session, force=True)
+        assert session.execute.call_count == 2
+
+
+def test_tenant_indexes_are_bounded() -> None:
+    with (
+        patch.object(entity_index, "_indexes", entity_index.OrderedDict()),
+        patch.object(entity_index, "KG_ENTITY_INDEX_MAX_TENANTS", 2),
+    ):
+        first = entity_index.get_entity_index("a")
+        entity_index.get_entity_index("b")
+        # Touching "a" makes "b" the least recently used.
+        assert entity_index.get_entity_index("a") is first
+        entity_index.get_entity_index("c")
+        assert list(entity_index._indexes) == ["a", "c"]
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from redis.exceptions import RedisError
+
+from onyx.natural_language_processing import query_embedding_cache
+from onyx.natural_language_processing.query_embedding_cache import (
+    get_cached_query_embeddings,
+)
+from onyx.server.metrics.embedding import QueryEmbeddingCacheLookupOutcome
+from shared_configs.enums import EmbeddingProvider
+from tests.unit.fakes import FakeCache
+
+
+def test_mget_failure_treats_every_query_as_a_miss() -> None:
+    cache = FakeCache()
+    with (
+        patch.object(query_embedding_cache, "get_cache_backend", return_value=cache),
+        patch.object(cache, "mget", side_effect=RedisError("down")),
+        patch.object(
+            query_embedding_cache, "observe_query_embedding_cache_lookup"
+        ) as observe,
+    ):
+        results = get_cached_query_embeddings(
+            queries=["a", "b"],
+            search_settings_id=1,
+            provider_type=EmbeddingProvider.OPENAI,
+            ttl_seconds=60,
+        )
+
+    assert results == [None, None]
+    observe.assert_called_once_with(
+        EmbeddingProvider.OPENAI,
+        outcome=QueryEmbeddingCacheLookupOutcome.ERROR,
+        count=2,
+    )
@@ -1,9 +1,12 @@
+import json
 from collections.abc import AsyncGenerator
 from threading import Lock
 from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
+import requests
 from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
 from tenacity import wait_none
@@ -15,7 +18,13 @@ from onyx.natural_language_processing.search_nlp_models import (
     clean_model_name,
 )
 from shared_configs.enums import EmbeddingProvider, EmbedTextType
-from shared_configs.model_server_models import EmbedRequest, EmbedResponse
+from shared_configs.model_server_models import (
+    EMBEDDINGS_BINARY_MEDIA_TYPE,
+    EmbedRequest,
+    EmbedResponse,
+    encode_embeddings_base64,
+    encode_embeddings_binary,
+)
 
 
 @pytest.fixture
@@ -673,3 +682,46 @@ async def test_batch_encode_async_caller_multi_batch() -> None:
     # Postcondition.
     assert result == [_embedding_for_idx(i) for i in range(n_texts)]
     assert spy_asyncio_run.call_count == 0
+
+
+def _model_server_response(content: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.headers["Content-Type"] = content_type
+    return response
+
+
+def test_local_model_requests_and_decodes_binary_embeddings() -> None:
+    model = _make_local_embedding_model()
+    vectors = np.array([[0.5, 1.5], [2.5, 3.5]], dtype=np.float32)
+    response = _model_server_response(
+        encode_embeddings_binary(vectors), EMBEDDINGS_BINARY_MEDIA_TYPE
+    )
+
+    with patch(f"{_SEARCH_NLP_MODULE}.requests.post", return_value=response) as post:
+        arrays = model.encode_vectors(["a", "b"], text_type=EmbedTextType.PASSAGE)
+        lists = model.encode(["a", "b"], text_type=EmbedTextType.QUERY)
+
+    assert post.call_args.kwargs["json"]["response_encoding"] == "binary"
+    assert all(isinstance(vector, np.ndarray) for vector in arrays)
+    np.testing.assert_array_equal(np.stack(arrays), vectors)
+    assert lists == [[0.5, 1.5], [2.5, 3.5]]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        # Model server that predates response_encoding
+        {"embeddings": [[0.5, 1.5]]},
+        {"embeddings": [], "embeddings_base64": encode_embeddings_base64([[0.5, 1.5]])},
+    ],
+)
+def test_local_model_decodes_json_embeddings(body: dict[str, Any]) -> None:
+    model = _make_local_embedding_model()
+    response = _model_server_response(json.dumps(body).encode(), "application/json")
+
+    with patch(f"{_SEARCH_NLP_MODULE}.requests.post", return_value=response):
+        result = model.encode(["a"], text_type=EmbedTextType.QUERY)
+
+    assert result == [[0.5, 1.5]]
@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock, patch
+
+from onyx.access.models import (
+    DocExternalAccess,
+    ElementExternalAccess,
+    ExternalAccess,
+)
+from onyx.redis.redis_connector_doc_perm_sync import RedisConnectorPermissionSync
+
+_MODULE = "onyx.redis.redis_connector_doc_perm_sync"
+
+
+def _doc_access(doc_id: str, num_emails: int = 1) -> DocExternalAccess:
+    return DocExternalAccess(
+        external_access=ExternalAccess(
+            external_user_emails={f"user{i}@x.com" for i in range(num_emails)},
+            external_user_group_ids=set(),
+            is_public=False,
+        ),
+        doc_id=doc_id,
+    )
+
+
+def _make_sync() -> RedisConnectorPermissionSync:
+    return RedisConnectorPermissionSync(tenant_id="tenant", id=1, redis=MagicMock())
+
+
+@patch.object(RedisConnectorPermissionSync, "DB_UPDATE_BATCH_SIZE", 2)
+def test_update_db_writes_in_batches_and_skips_oversized() -> None:
+    batch_fn = MagicMock(side_effect=[(1, 1), (0, 1)])
+    permissions: list[ElementExternalAccess] = [
+        _doc_access("a"),
+        _doc_access("too-big", num_emails=ExternalAccess.MAX_NUM_ENTRIES + 1),
+        _doc_access("b"),
+        _doc_access("c"),
+    ]
+
+    with (
+        patch(f"{_MODULE}.fetch_versioned_implementation", return_value=batch_fn),
+        patch(f"{_MODULE}.inc_doc_perm_sync_elements") as mock_elements_metric,
+    ):
+        result = _make_sync().update_db(
+            lock=None,
+            new_permissions=permissions,
+            source_string="google_drive",
+            connector_id=1,
+            credential_id=2,
+        )
+
+    assert [
+        [access.doc_id for access in call.args[1]] for call in batch_fn.call_args_list
+    ] == [["a", "b"], ["c"]]
+    assert result.num_updated == 3
+    assert result.num_changed == 1
+    assert result.num_errors == 0
+    mock_elements_metric.assert_called_once_with("google_drive", 1, 2)
+
+
+def test_update_db_retries_a_failed_batch_per_element() -> None:
+    batch_fn = MagicMock(side_effect=RuntimeError("deadlock"))
+    element_fn = MagicMock(side_effect=[True, RuntimeError("bad doc")])
+
+    def _versioned(_module: str, name: str) -> MagicMock:
+        return batch_fn if name == "elements_update_permissions" else element_fn
+
+    with patch(f"{_MODULE}.fetch_versioned_implementation", side_effect=_versioned):
+        result = _make_sync().update_db(
+            lock=None,
+            new_permissions=[_doc_access("a"), _doc_access("b")],
+            source_string="google_drive",
+            connector_id=1,
+            credential_id=2,
+        )
+
+    assert element_fn.call_count == 2
+    assert result.num_updated == 1
+    assert result.num_errors == 1
+
+
+def test_update_db_keeps_the_lock_alive_while_retrying_per_element() -> None:
+    batch_fn = MagicMock(side_effect=RuntimeError("deadlock"))
+    element_fn = MagicMock()
+    lock = MagicMock()
+
+    def _versioned(_module: str, name: str) -> MagicMock:
+        return batch_fn if name == "elements_update_permissions" else element_fn
+
+    # every element write takes longer than the reacquire interval
+    clock = iter(float(tick) * 10_000 for tick in range(100))
+    with (
+        patch(f"{_MODULE}.fetch_versioned_implementation", side_effect=_versioned),
+        patch(f"{_MODULE}.time.monotonic", side_effect=lambda: next(clock)),
+    ):
+        _make_sync().update_db(
+            lock=lock,
+            new_permissions=[_doc_access("a"), _doc_access("b"), _doc_access("c")],
+            source_string="google_drive",
+            connector_id=1,
+            credential_id=2,
+        )
+
+    assert element_fn.call_count == 3
+    # once for the batch, then once per element
+    assert lock.reacquire.call_count == 4
@@ -0,0 +1,108 @@
+from unittest.mock import MagicMock, patch
+
+from onyx.configs.constants import DocumentSource
+from onyx.db.enums import HierarchyNodeType
+from onyx.redis.redis_hierarchy import (
+    HierarchyNodeCacheEntry,
+    cache_hierarchy_nodes_batch,
+    get_ancestors_for_raw_ids,
+)
+
+_MODULE = "onyx.redis.redis_hierarchy"
+_SOURCE = DocumentSource.GOOGLE_DRIVE
+
+
+def _entry(
+    node_id: int, raw_node_id: str, ancestor_ids: list[int]
+) -> HierarchyNodeCacheEntry:
+    return HierarchyNodeCacheEntry(
+        node_id=node_id,
+        parent_id=ancestor_ids[0] if ancestor_ids else None,
+        node_type=HierarchyNodeType.FOLDER,
+        raw_node_id=raw_node_id,
+        ancestor_ids=ancestor_ids,
+    )
+
+
+def test_batch_lookup_reads_all_chains_in_one_round_trip() -> None:
+    redis_client = MagicMock()
+    pipe = redis_client.pipeline.return_value
+    pipe.execute.return_value = [b"1", [b"5,3,1", None]]
+    redis_client.hmget.return_value = [b"7,1"]
+
+    with (
+        patch(f"{_MODULE}.refresh_hierarchy_cache_from_db") as mock_refresh,
+        patch(f"{_MODULE}.get_ancestors_from_raw_id") as mock_walk,
+    ):
+        result = get_ancestors_for_raw_ids(
+            redis_client=redis_client,
+            source=_SOURCE,
+            parent_hierarchy_raw_node_ids=["folder_a", "folder_b", None, "folder_a"],
+            db_session=MagicMock(),
+        )
+
+    assert result == {"folder_a": [5, 3, 1], "folder_b": [7, 1], None: [1]}
+    pipe.hmget.assert_called_once_with(
+        f"hierarchy_cache_ancestors:{_SOURCE.value}", ["folder_a", "folder_b"]
+    )
+    pipe.execute.assert_called_once()
+    # Only the miss is re-read, after a single refresh
+    mock_refresh.assert_called_once()
+    redis_client.hmget.assert_called_once_with(
+        f"hierarchy_cache_ancestors:{_SOURCE.value}", ["folder_b"]
+    )
+    mock_walk.assert_not_called()
+
+
+def test_batch_lookup_walks_nodes_without_a_materialized_chain() -> None:
+    redis_client = MagicMock()
+    redis_client.pipeline.return_value.execute.return_value = [b"1", [None]]
+    redis_client.hmget.return_value = [None]
+
+    with (
+        patch(f"{_MODULE}.refresh_hierarchy_cache_from_db"),
+        patch(f"{_MODULE}.get_ancestors_from_raw_id", return_value=[9, 1]) as mock_walk,
+    ):
+        result = get_ancestors_for_raw_ids(
+            redis_client=redis_client,
+            source=_SOURCE,
+            parent_hierarchy_raw_node_ids=["legacy"],
+            db_session=MagicMock(),
+        )
+
+    assert result == {"legacy": [9, 1]}
+    mock_walk.assert_called_once()
+
+
+def test_cache_batch_writes_chains_incrementally() -> None:
+    redis_client = MagicMock()
+    redis_client.hmget.return_value = [None, b"6,5,1"]
+    pipe = redis_client.pipeline.return_value
+
+    cache_hierarchy_nodes_batch(
+        redis_client,
+        _SOURCE,
+        [_entry(5, "folder_a", [1]), _entry(6, "folder_b", [5, 1])],
+    )
+
+    pipe.hset.assert_any_call(
+        f"hierarchy_cache_ancestors:{_SOURCE.value}",
+        mapping={"folder_a": "5,1", "folder_b": "6,5,1"},
+    )
+    pipe.delete.assert_not_called()
+    pipe.execute.assert_called_once()
+
+
+def test_cache_batch_drops_chains_when_a_node_moved() -> None:
+    redis_client = MagicMock()
+    # folder_b used to live under node 4; its descendants' chains are stale
+    redis_client.hmget.return_value = [b"6,4,1"]
+    pipe = redis_client.pipeline.return_value
+
+    cache_hierarchy_nodes_batch(redis_client, _SOURCE, [_entry(6, "folder_b", [5, 1])])
+
+    pipe.delete.assert_called_once_with(f"hierarchy_cache_ancestors:{_SOURCE.value}")
+    assert all(
+        call.args[0] != f"hierarchy_cache_ancestors:{_SOURCE.value}"
+        for call in pipe.hset.call_args_list
+    )
@@ -0,0 +1,138 @@
+from unittest.mock import MagicMock, patch
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import (
+    ContextExpansionType,
+    InferenceChunk,
+    InferenceSection,
+)
+from onyx.document_index.interfaces_new import DocumentSectionRequest
+from onyx.tools.tool_implementations.search.search_utils import (
+    expand_section_with_context,
+    retrieve_adjacent_chunks_batch,
+)
+
+MODULE = "onyx.tools.tool_implementations.search.search_utils"
+
+
+def _make_chunk(document_id: str, chunk_id: int) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=document_id,
+        chunk_id=chunk_id,
+        content=f"{document_id}-{chunk_id}",
+        source_type=DocumentSource.MOCK_CONNECTOR,
+        semantic_identifier=f"sem-{document_id}",
+        title=document_id,
+        boost=1,
+        score=0.5,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        doc_summary="",
+        chunk_context="",
+        updated_at=None,
+        image_file_id=None,
+        source_links={},
+        section_continuation=False,
+        blurb=f"blurb-{document_id}",
+    )
+
+
+def _make_section(document_id: str, chunk_id: int) -> InferenceSection:
+    chunk = _make_chunk(document_id, chunk_id)
+    return InferenceSection(
+        center_chunk=chunk, chunks=[chunk], combined_content=chunk.content
+    )
+
+
+def _index_with_documents(documents: dict[str, int]) -> MagicMock:
+    """Index mock that serves every requested chunk of documents, which maps
+    document id to chunk count."""
+
+    def _retrieve(
+        chunk_requests: list[DocumentSectionRequest], **_: object
+    ) -> list[InferenceChunk]:
+        chunks = []
+        for request in chunk_requests:
+            num_chunks = documents.get(request.document_id, 0)
+            min_ind = request.min_chunk_ind or 0
+            max_ind = min(request.max_chunk_ind or num_chunks, num_chunks - 1)
+            chunks.extend(
+                _make_chunk(request.document_id, i) for i in range(min_ind, max_ind + 1)
+            )
+        # the index gives no ordering guarantee
+        return chunks[::-1]
+
+    document_index = MagicMock()
+    document_index.id_based_retrieval.side_effect = _retrieve
+    return document_index
+
+
+def test_retrieve_adjacent_chunks_batch_uses_one_index_call() -> None:
+    document_index = _index_with_documents({"a": 10, "b": 3})
+    sections = [_make_section("a", 0), _make_section("a", 6), _make_section("b", 1)]
+
+    adjacent = retrieve_adjacent_chunks_batch(
+        sections, document_index, num_chunks_above=2, num_chunks_below=2
+    )
+
+    document_index.id_based_retrieval.assert_called_once()
+    assert adjacent is not None
+    ids = [
+        ([c.chunk_id for c in above], [c.chunk_id for c in below])
+        for above, below in adjacent
+    ]
+    assert ids == [([], [1, 2]), ([4, 5], [7, 8]), ([0], [2])]
+    assert all(
+        chunk.document_id == section.center_chunk.document_id
+        for section, (above, below) in zip(sections, adjacent, strict=True)
+        for chunk in above + below
+    )
+
+
+def test_retrieve_adjacent_chunks_batch_returns_none_on_failure() -> None:
+    document_index = MagicMock()
+    document_index.id_based_retrieval.side_effect = RuntimeError("index down")
+
+    assert (
+        retrieve_adjacent_chunks_batch([_make_section("a", 3)], document_index, 1, 1)
+        is None
+    )
+
+
+def test_expand_section_uses_prefetched_chunks() -> None:
+    document_index = MagicMock()
+    section = _make_section("a", 5)
+    above = [_make_chunk("a", i) for i in range(0, 5)]
+    below = [_make_chunk("a", i) for i in range(6, 11)]
+
+    with patch(
+        f"{MODULE}.classify_section_relevance",
+        return_value=ContextExpansionType.INCLUDE_ADJACENT_SECTIONS,
+    ) as classify:
+        expanded = expand_section_with_context(
+            section=section,
+            user_query="query",
+            llm=MagicMock(),
+            document_index=document_index,
+            prefetched_adjacent_chunks=(above, below),
+        )
+
+    document_index.id_based_retrieval.assert_not_called()
+    # the prompt only sees the two closest chunks on each side
+    assert classify.call_args.kwargs["section_above_text"] == "a-3 a-4"
+    assert classify.call_args.kwargs["section_below_text"] == "a-6 a-7"
+    assert expanded is not None
+    assert [c.chunk_id for c in expanded.chunks] == [3, 4, 5, 6, 7]
+
+    full = expand_section_with_context(
+        section=section,
+        user_query="query",
+        llm=MagicMock(),
+        document_index=document_index,
+        expand_override=True,
+        prefetched_adjacent_chunks=(above, below),
+    )
+    assert full is not None
+    assert [c.chunk_id for c in full.chunks] == list(range(11))
+    document_index.id_based_retrieval.assert_not_called()
@@ -0,0 +1,153 @@
+import contextvars
+import threading
+import time
+from collections.abc import Generator, Iterator
+
+import pytest
+
+from onyx.utils import threadpool_concurrency
+from onyx.utils.threadpool_concurrency import (
+    FunctionCall,
+    get_shared_executor,
+    get_shared_executor_stats,
+    parallel_yield,
+    run_functions_in_parallel,
+    run_functions_tuples_in_parallel,
+)
+
+_POOL = "test-pool"
+_SMALL_POOL = "test-small-pool"
+
+test_context_var = contextvars.ContextVar("shared_executor_test_var", default="unset")
+
+
+@pytest.fixture(autouse=True)
+def test_pools(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    monkeypatch.setattr(
+        threadpool_concurrency,
+        "_SHARED_EXECUTOR_MAX_WORKERS",
+        {_POOL: 4, _SMALL_POOL: 1},
+    )
+    monkeypatch.setattr(threadpool_concurrency, "_shared_executors", {})
+    yield
+    for executor in threadpool_concurrency._shared_executors.values():
+        executor.shutdown(wait=True)
+
+
+def test_shared_executor_is_reused_and_bounded() -> None:
+    assert get_shared_executor(_POOL) is get_shared_executor(_POOL)
+    with pytest.raises(ValueError):
+        get_shared_executor("not-a-pool")
+
+    thread_names: set[str] = set()
+
+    def record_thread() -> None:
+        time.sleep(0.01)
+        thread_names.add(threading.current_thread().name)
+
+    run_functions_tuples_in_parallel(
+        [(record_thread, ()) for _ in range(20)], executor_name=_POOL
+    )
+    assert 1 <= len(thread_names) <= 4
+    assert all(name.startswith(f"shared-{_POOL}") for name in thread_names)
+
+
+def test_run_on_shared_executor_keeps_order_and_context() -> None:
+    test_context_var.set("request-scoped")
+
+    def read_context(i: int) -> tuple[int, str]:
+        time.sleep(0.001 * (10 - i))
+        return i, test_context_var.get()
+
+    results = run_functions_tuples_in_parallel(
+        [(read_context, (i,)) for i in range(10)], executor_name=_POOL
+    )
+    assert results == [(i, "request-scoped") for i in range(10)]
+
+    calls = [FunctionCall(test_context_var.get) for _ in range(3)]
+    by_id = run_functions_in_parallel(calls, executor_name=_POOL)
+    assert by_id == {call.result_id: "request-scoped" for call in calls}
+
+
+def test_max_workers_caps_in_flight_calls_on_shared_executor() -> None:
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def track() -> None:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+
+    run_functions_tuples_in_parallel(
+        [(track, ()) for _ in range(8)], max_workers=2, executor_name=_POOL
+    )
+    assert peak == 2
+
+
+def test_nested_call_on_same_pool_does_not_deadlock() -> None:
+    def inner(x: int) -> int:
+        return x * 2
+
+    def outer() -> list[int]:
+        return run_functions_tuples_in_parallel(
+            [(inner, (1,)), (inner, (2,))], executor_name=_SMALL_POOL
+        )
+
+    results = run_functions_tuples_in_parallel(
+        [(outer, ())], executor_name=_SMALL_POOL, timeout=5
+    )
+    assert results == [[2, 4]]
+
+
+def test_timeout_counts_unsubmitted_functions_as_timed_out() -> None:
+    def slow() -> str:
+        time.sleep(0.5)
+        return "done"
+
+    results = run_functions_tuples_in_parallel(
+        [(slow, ()), (slow, ())],
+        allow_failures=True,
+        max_workers=1,
+        timeout=0.1,
+        executor_name=_POOL,
+    )
+    assert results == [None, None]
+
+
+def test_stats_track_queue_depth_and_wait_time() -> None:
+    release = threading.Event()
+    executor = get_shared_executor(_SMALL_POOL)
+
+    blocker = executor.submit(release.wait)
+    queued = executor.submit(lambda: "queued")
+    time.sleep(0.05)
+
+    stats = executor.stats()
+    assert stats.max_workers == 1
+    assert stats.active == 1
+    assert stats.queue_depth == 1
+
+    release.set()
+    blocker.result()
+    assert queued.result() == "queued"
+
+    (stats,) = get_shared_executor_stats()
+    assert stats.name == _SMALL_POOL
+    assert stats.queue_depth == 0
+    assert stats.submitted_total == 2
+    # the second task waited behind the blocker
+    assert stats.wait_seconds_total >= 0.04
+
+
+def test_parallel_yield_on_shared_executor() -> None:
+    def gen(start: int) -> Iterator[int]:
+        for i in range(start, start + 3):
+            yield i
+
+    results = list(parallel_yield([gen(0), gen(10)], executor_name=_POOL))
+    assert sorted(results) == [0, 1, 2, 10, 11, 12]
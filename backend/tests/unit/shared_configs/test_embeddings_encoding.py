@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from shared_configs.model_server_models import (
+    EmbedResponse,
+    decode_embeddings_base64,
+    decode_embeddings_binary,
+    encode_embeddings_base64,
+    encode_embeddings_binary,
+)
+
+
+def test_binary_round_trip_is_zero_copy() -> None:
+    embeddings = np.random.default_rng(0).random((3, 8), dtype=np.float32)
+
+    payload = encode_embeddings_binary(embeddings)
+    decoded = decode_embeddings_binary(payload)
+
+    assert len(payload) == 16 + embeddings.nbytes
+    np.testing.assert_array_equal(decoded, embeddings)
+    assert decoded.dtype == np.dtype("<f4")
+    # A view over the payload, not a copy
+    assert not decoded.flags.owndata
+    assert not decoded.flags.writeable
+
+
+def test_binary_converts_to_float32() -> None:
+    decoded = decode_embeddings_binary(encode_embeddings_binary([[0.5, 1.0]]))
+    assert decoded.tolist() == [[0.5, 1.0]]
+
+
+def test_base64_round_trip() -> None:
+    embeddings = np.arange(6, dtype=np.float32).reshape(2, 3)
+    np.testing.assert_array_equal(
+        decode_embeddings_base64(encode_embeddings_base64(embeddings)), embeddings
+    )
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"OXEM",
+        b"NOPE" + encode_embeddings_binary([[1.0]])[4:],
+        encode_embeddings_binary([[1.0, 2.0]])[:-1],
+    ],
+)
+def test_decode_rejects_malformed_payloads(payload: bytes) -> None:
+    with pytest.raises(ValueError):
+        decode_embeddings_binary(payload)
+
+
+def test_array_backed_response_serializes_as_float_lists() -> None:
+    rows = list(np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32))
+    response = EmbedResponse(embeddings=rows)
+
+    assert response.embeddings[0] is rows[0]
+    assert response.model_dump() == {
+        "embeddings": [[1.0, 2.0], [3.0, 4.0]],
+        "embeddings_base64": None,
+    }
+    assert EmbedResponse.model_validate_json(response.model_dump_json()).embeddings == [
+        [1.0, 2.0],
+        [3.0, 4.0],
+    ]
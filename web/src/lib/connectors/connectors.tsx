@@ -228,6 +228,16 @@ export const connectorConfigs: Record<
         rightPlaceholder: "https://docs.example.com",
         default: [],
       },
+      {
+        type: "number",
+        label: "Crawl Concurrency",
+        name: "crawl_concurrency",
+        optional: true,
+        description:
+          "Number of pages to fetch in parallel (default: 1). Above 1, pages are " +
+          "fetched without a browser and pages unchanged since the last crawl are " +
+          "skipped; only pages that need JavaScript are rendered in a browser.",
+      },
     ],
     overrideDefaultFreq: 60 * 60 * 24,
   },